@@ -4,11 +4,19 @@
 协调 LLM 适配器进行情报分析
 """
 
+import logging
 from typing import List, Optional
 from models import Article, Analysis, AnalysisType, IndustryCategory
-from llm.adapter import create_llm_adapter, BaseLLMAdapter
+from llm.adapter import BaseLLMAdapter
+from llm.client_registry import get_llm_client_registry
+from llm.map_reduce import map_reduce_analyze, MAP_REDUCE_THRESHOLD
+from llm.response_cache import get_llm_response_cache
+from llm.article_digest import ensure_digests
+from llm.resilience import ResiliencePolicy, RetryBudget, DEFAULT_RETRY_BUDGET
 from utils.proxy_helper import ProxyHelper
 
+logger = logging.getLogger(__name__)
+
 
 class Analyzer:
     """分析器"""
@@ -19,8 +27,33 @@ class Analyzer:
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         proxy_url: Optional[str] = None,
-        proxy_config: Optional[dict] = None
+        proxy_config: Optional[dict] = None,
+        map_reduce_threshold: Optional[int] = MAP_REDUCE_THRESHOLD,
+        use_cache: bool = True,
+        use_digests: bool = False,
+        db=None,
+        resilience: Optional[dict] = None,
+        failover: Optional[List[dict]] = None,
+        cluster_articles: bool = False
     ):
+        """
+        Args:
+            map_reduce_threshold: 文章数超过该值时使用 Map-Reduce 分析，为 None 时总是单次分析
+            use_cache: 是否使用 LLM 响应缓存（相同提示词直接返回已有结果）
+            use_digests: 是否先为文章生成（或复用）摘要，提示词中用摘要代替截断的原文
+            db: 摘要缓存使用的 Database 实例（默认使用默认路径的数据库）
+            resilience: 重试 / 对冲配置（见 ConfigManager.get_llm_resilience_config），为 None 时不重试
+            failover: 主后端失败后依次尝试的备用后端 [{'backend', 'api_key', 'model'}, ...]
+            cluster_articles: 是否先按主题聚类，提示词中每个主题只展开代表文章
+        """
+        self.map_reduce_threshold = map_reduce_threshold
+        self.use_cache = use_cache
+        self.use_digests = use_digests
+        self.db = db
+        self.resilience = resilience
+        self.failover = failover or []
+        self.cluster_articles = cluster_articles
+        
         # 使用工具类统一处理代理配置
         effective_proxy = ProxyHelper.get_first_available_proxy(proxy_config)
         
@@ -28,13 +61,23 @@ class Analyzer:
         if effective_proxy is None and proxy_url:
             effective_proxy = proxy_url
 
-        self.adapter: BaseLLMAdapter = create_llm_adapter(
-            backend=llm_backend,
+        self.proxy_url = effective_proxy
+        self.proxy_config = proxy_config
+        self.adapter: BaseLLMAdapter = self._acquire(llm_backend, api_key, model)
+    
+    def _acquire(self, backend: str, api_key: Optional[str], model: Optional[str]) -> BaseLLMAdapter:
+        """从应用级注册表获取适配器（复用连接池），得到的是请求级副本"""
+        adapter = get_llm_client_registry().acquire(
+            backend=backend,
             api_key=api_key,
             model=model,
-            proxy_url=effective_proxy,
-            proxy_config=proxy_config
+            proxy_url=self.proxy_url,
+            proxy_config=self.proxy_config
         )
+        if self.use_cache:
+            adapter.response_cache = get_llm_response_cache()
+        adapter.cluster_articles = self.cluster_articles
+        return adapter
     
     async def analyze(
         self,
@@ -74,13 +117,53 @@ class Analyzer:
                     # 如果无法识别，保持为None
                     industry = None
         
-        # 使用 LLM 进行分析
-        analysis = await self.adapter.analyze(
-            articles=articles,
-            analysis_type=analysis_type,
-            custom_prompt=custom_prompt,
-            industry=industry
-        )
+        # 一次分析内（含故障转移后的备用后端）共享重试预算
+        budget = None
+        if self.resilience is not None:
+            budget = RetryBudget(self.resilience.get('retry_budget', DEFAULT_RETRY_BUDGET))
+            self.adapter.resilience = ResiliencePolicy.from_config(self.resilience, budget)
+        
+        # 先准备文章摘要（已缓存的直接复用），摘要生成失败的文章仍使用原文
+        digest_tokens = 0
+        if self.use_digests:
+            if self.db is None:
+                from storage.database import Database
+                self.db = Database()
+            digest_result = await ensure_digests(self.adapter, self.db, articles)
+            self.adapter.article_digests = digest_result['digests']
+            digest_tokens = digest_result['token_usage']
+        digest_cost = (digest_tokens / 1000) * self.adapter.get_model_info().get('cost_per_1k_tokens', 0)
+        
+        # 主后端重试耗尽后按链路切换备用后端
+        attempts: List[dict] = []
+        candidates = [None] + self.failover
+        for index, candidate in enumerate(candidates):
+            if candidate is None:
+                adapter = self.adapter
+            else:
+                adapter = self._acquire(candidate['backend'], candidate.get('api_key'), candidate.get('model'))
+                adapter.article_digests = self.adapter.article_digests
+                if self.resilience is not None:
+                    adapter.resilience = ResiliencePolicy.from_config(self.resilience, budget)
+            try:
+                analysis = await self._run(adapter, articles, analysis_type, custom_prompt, industry)
+            except Exception as e:
+                attempts.extend(adapter.attempts)
+                if index == len(candidates) - 1:
+                    raise
+                logger.warning(
+                    f"{adapter.get_model_info()['backend']} 分析失败（{e}），"
+                    f"切换到 {candidates[index + 1]['backend']}"
+                )
+                continue
+            attempts.extend(adapter.attempts)
+            break
+        
+        analysis.llm_attempts = attempts
+        analysis.prompt_stats = adapter.prompt_stats
+        if digest_tokens:
+            analysis.token_usage = (analysis.token_usage or 0) + digest_tokens
+            analysis.estimated_cost = (analysis.estimated_cost or 0) + digest_cost
         
         # 设置行业分类到分析结果中
         if industry:
@@ -88,6 +171,30 @@ class Analyzer:
         
         return analysis
     
+    async def _run(
+        self,
+        adapter: BaseLLMAdapter,
+        articles: List[Article],
+        analysis_type: AnalysisType,
+        custom_prompt: Optional[str],
+        industry: Optional[IndustryCategory]
+    ) -> Analysis:
+        """使用指定适配器分析（文章过多时分块摘要后再汇总，避免逐篇截断）"""
+        if self.map_reduce_threshold is not None and len(articles) > self.map_reduce_threshold:
+            return await map_reduce_analyze(
+                adapter,
+                articles=articles,
+                analysis_type=analysis_type,
+                custom_prompt=custom_prompt,
+                industry=industry
+            )
+        return await adapter.analyze(
+            articles=articles,
+            analysis_type=analysis_type,
+            custom_prompt=custom_prompt,
+            industry=industry
+        )
+    
     def estimate_cost(self, articles: List[Article]) -> dict:
         """估算分析成本"""
         return self.adapter.estimate_cost(articles)
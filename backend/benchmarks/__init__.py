@@ -0,0 +1,3 @@
+"""
+基准测试（本地 Mock 服务，不访问外网）
+"""
@@ -0,0 +1,210 @@
+"""
+爬取吞吐基准测试
+
+启动本地 Mock RSSHub 服务器，将 config/sources.yaml 中的全部源改写到该服务器，
+端到端测量 CrawlerService + 入库：
+- 源/秒、文章/秒
+- 单源爬取延迟 p50 / p99
+- 数据库写入耗时
+
+用法（在 backend 目录下）:
+    python -m benchmarks.crawl_benchmark [--latency-ms 50] [--jitter-ms 20] [--error-rate 0.05]
+                                         [--items 20] [--item-bytes 2000] [--concurrency 0]
+                                         [--rounds 1] [--json]
+    python -m benchmarks.crawl_benchmark --record-snapshots   # 录制真实 feed 快照（需要网络）
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from config.source_loader import SourceConfigLoader
+from crawler.service import CrawlerService
+from crawler.ingest import crawl_source
+from crawler.seen_filter import get_seen_url_filter
+from storage.database import Database
+from benchmarks.mock_rsshub import MockRSSHubServer, record_snapshots, snapshot_checksum, SNAPSHOT_DIR
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """最近秩法百分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+async def _crawl_one(db, crawler, source, hours, semaphore, batch_seen) -> dict:
+    """通过 crawl_source 爬取单个源（与 /api/fetch 相同的路径），分别计时网络/解析与写库"""
+    async with semaphore:
+        start = time.perf_counter()
+        result = await crawl_source(db, crawler, source, hours=hours, batch_seen=batch_seen)
+        elapsed = time.perf_counter() - start
+
+    latency = result['latency_ms'] / 1000
+    fetched = result['success'] or result['save_failed']
+    return {
+        'success': result['success'],
+        'latency': latency,
+        'articles': result.get('article_count', 0),
+        # crawl_source 中除网络请求与解析外的耗时（写库、高水位与健康统计）
+        'db_write': elapsed - latency if fetched else 0.0,
+        # 写库失败（如并发写入时 database is locked）单独计数
+        'db_error': result.get('save_failed', False),
+        'bytes': result['bytes_downloaded'],
+    }
+
+
+async def run_benchmark(
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    error_rate: float = 0.0,
+    items: int = 20,
+    item_bytes: int = 2000,
+    concurrency: int = 0,
+    hours: int = 24,
+    rounds: int = 1,
+    limit: Optional[int] = None,
+    db_path: Optional[str] = None,
+    snapshot_dir: Optional[Path] = SNAPSHOT_DIR
+) -> dict:
+    """
+    运行一次基准测试
+
+    Args:
+        concurrency: 最大并发源数，0 表示不限制（与 /api/fetch 行为一致）
+        rounds: 重复爬取轮数（第 2 轮起按高水位增量爬取，可观察增量与去重路径的开销）
+        limit: 只使用前 N 个源
+        db_path: 数据库路径，默认使用临时目录
+
+    Returns:
+        指标字典
+    """
+    sources = SourceConfigLoader().load_sources()
+    if limit:
+        sources = sources[:limit]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(db_path=db_path or str(Path(tmp_dir) / "benchmark.db"))
+        await db.initialize()
+        get_seen_url_filter().clear()
+
+        async with MockRSSHubServer(
+            latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate,
+            items=items, item_bytes=item_bytes, snapshot_dir=snapshot_dir
+        ) as server:
+            for source in sources:
+                source.url = server.url_for(source.url)
+                source.id = await db.save_source(source)
+
+            crawler = CrawlerService()
+            # 所有请求都指向本地服务器，不做 RSSHub 实例改写
+            crawler.fetcher.rsshub_failover = False
+            semaphore = asyncio.Semaphore(concurrency if concurrency > 0 else len(sources) or 1)
+
+            results = []
+            start = time.perf_counter()
+            for _ in range(rounds):
+                batch_seen = {}
+                results.extend(await asyncio.gather(*(
+                    _crawl_one(db, crawler, source, hours, semaphore, batch_seen)
+                    for source in sources
+                )))
+            elapsed = time.perf_counter() - start
+
+            server_stats = {
+                'requests': server.requests,
+                'errors': server.errors,
+                'bytes_sent': server.bytes_sent,
+            }
+
+    latencies = [r['latency'] for r in results]
+    total_articles = sum(r['articles'] for r in results)
+    db_write_seconds = sum(r['db_write'] for r in results)
+    return {
+        'sources': len(sources),
+        'rounds': rounds,
+        'concurrency': concurrency or 'unlimited',
+        'elapsed_seconds': round(elapsed, 3),
+        'sources_per_second': round(len(results) / elapsed, 2) if elapsed else None,
+        'articles_per_second': round(total_articles / elapsed, 2) if elapsed else None,
+        'articles': total_articles,
+        'failed_sources': sum(1 for r in results if not r['success']),
+        'db_errors': sum(1 for r in results if r.get('db_error')),
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        'db_write_seconds': round(db_write_seconds, 3),
+        'db_write_ms_per_article': round(db_write_seconds * 1000 / total_articles, 3) if total_articles else None,
+        'bytes_downloaded': sum(r['bytes'] for r in results),
+        'mock_server': server_stats,
+        'snapshot_checksum': snapshot_checksum(snapshot_dir) if snapshot_dir else None,
+    }
+
+
+def print_report(metrics: dict):
+    """打印基准测试报告"""
+    print("\n📊 爬取基准测试")
+    print("=" * 60)
+    print(f"信息源: {metrics['sources']} × {metrics['rounds']} 轮，并发 {metrics['concurrency']}")
+    print(f"总耗时: {metrics['elapsed_seconds']} 秒")
+    print(f"吞吐:   {metrics['sources_per_second']} 源/秒，{metrics['articles_per_second']} 文章/秒")
+    print(f"延迟:   p50 {metrics['latency_p50_ms']} ms，p99 {metrics['latency_p99_ms']} ms")
+    print(f"写库:   累计 {metrics['db_write_seconds']} 秒（{metrics['db_write_ms_per_article']} ms/篇）")
+    print(f"文章:   {metrics['articles']} 篇，失败源 {metrics['failed_sources']} 个（写库失败 {metrics['db_errors']} 个）")
+    print(f"流量:   {metrics['bytes_downloaded'] / 1024 / 1024:.2f} MB")
+    print("=" * 60)
+
+
+async def _record(limit: Optional[int]):
+    sources = SourceConfigLoader().load_sources()
+    if limit:
+        sources = sources[:limit]
+    count = await record_snapshots(sources, CrawlerService().fetcher)
+    print(f"已录制 {count}/{len(sources)} 个快照到 {SNAPSHOT_DIR}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬取吞吐基准测试（本地 Mock RSSHub）")
+    parser.add_argument('--latency-ms', type=float, default=0, help="响应延迟均值（毫秒）")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="503 错误率（0-1）")
+    parser.add_argument('--items', type=int, default=20, help="合成 feed 条目数")
+    parser.add_argument('--item-bytes', type=int, default=2000, help="合成 feed 每条正文字节数")
+    parser.add_argument('--concurrency', type=int, default=0, help="最大并发源数，0 表示不限制")
+    parser.add_argument('--rounds', type=int, default=1, help="重复爬取轮数")
+    parser.add_argument('--limit', type=int, default=None, help="只使用前 N 个源")
+    parser.add_argument('--no-snapshots', action='store_true', help="忽略快照，只使用合成 feed")
+    parser.add_argument('--record-snapshots', action='store_true', help="录制真实 feed 快照（需要网络）")
+    parser.add_argument('--json', action='store_true', help="以 JSON 输出指标")
+    args = parser.parse_args()
+
+    if args.record_snapshots:
+        asyncio.run(_record(args.limit))
+        return
+
+    metrics = asyncio.run(run_benchmark(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        items=args.items,
+        item_bytes=args.item_bytes,
+        concurrency=args.concurrency,
+        rounds=args.rounds,
+        limit=args.limit,
+        snapshot_dir=None if args.no_snapshots else SNAPSHOT_DIR
+    ))
+
+    if args.json:
+        print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    else:
+        print_report(metrics)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+本地 Mock RSSHub 服务器
+
+为 config/sources.yaml 中的每个路由提供 feed 响应，不访问外网：
+- 优先回放录制的快照（snapshots/<路由键>.xml）
+- 没有快照时生成合成 RSS（条目数与正文大小可配置）
+- 可配置响应延迟（均值 + 抖动）与错误率（返回 503）
+
+基于 asyncio.start_server 的最小 HTTP/1.1 实现，只依赖标准库。
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from xml.sax.saxutils import escape
+
+SNAPSHOT_DIR = Path(__file__).parent / "snapshots"
+
+
+def route_key(url: str) -> str:
+    """源 URL 对应的路由键（主机 + 路径），也是快照文件名"""
+    parts = urlsplit(url)
+    raw = f"{parts.netloc}{parts.path}".rstrip('/')
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', raw).strip('_')
+
+
+def build_feed(key: str, items: int, item_bytes: int, seed: Optional[int] = None) -> bytes:
+    """生成合成 RSS feed，发布时间分布在最近 24 小时内"""
+    rng = random.Random(seed if seed is not None else key)
+    now = datetime.now(timezone.utc)
+    body_unit = "模拟正文内容 mock content "
+    entries = []
+    for i in range(items):
+        published = now - timedelta(minutes=rng.randint(0, 24 * 60 - 1))
+        repeat = max(1, item_bytes // len(body_unit.encode('utf-8')))
+        entries.append(
+            "<item>"
+            f"<title>{escape(key)} 第 {i} 条</title>"
+            f"<link>https://mock.local/{escape(key)}/{i}?utm_source=rss</link>"
+            f"<guid>{escape(key)}-{i}</guid>"
+            f"<pubDate>{format_datetime(published)}</pubDate>"
+            f"<description>{escape(body_unit * repeat)}</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{escape(key)}</title><link>https://mock.local/{escape(key)}</link>"
+        f"{''.join(entries)}"
+        "</channel></rss>"
+    ).encode('utf-8')
+
+
+class MockRSSHubServer:
+    """
+    本地 feed 回放服务器
+
+    Example:
+        async with MockRSSHubServer(latency_ms=50, error_rate=0.05) as server:
+            url = server.url_for("http://localhost:1200/zhihu/hotlist")
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0.0,
+        items: int = 20,
+        item_bytes: int = 2000,
+        snapshot_dir: Optional[Path] = SNAPSHOT_DIR,
+        seed: int = 42
+    ):
+        """
+        Args:
+            port: 监听端口，0 表示自动分配
+            latency_ms: 响应延迟均值（毫秒）
+            jitter_ms: 延迟抖动（毫秒，均匀分布 ±jitter）
+            error_rate: 返回 503 的概率
+            items: 合成 feed 的条目数
+            item_bytes: 合成 feed 每条正文的字节数
+            snapshot_dir: 快照目录，为 None 时只使用合成 feed
+        """
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.items = items
+        self.item_bytes = item_bytes
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self._rng = random.Random(seed)
+        self._feeds: Dict[str, bytes] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def url_for(self, source_url: str) -> str:
+        """将源 URL 改写为指向本服务器的 URL"""
+        return f"{self.base_url}/{route_key(source_url)}"
+
+    def _feed_for(self, key: str) -> bytes:
+        """读取快照或生成合成 feed（缓存）"""
+        if key not in self._feeds:
+            snapshot = self.snapshot_dir / f"{key}.xml" if self.snapshot_dir else None
+            if snapshot and snapshot.exists():
+                self._feeds[key] = snapshot.read_bytes()
+            else:
+                self._feeds[key] = build_feed(key, self.items, self.item_bytes)
+        return self._feeds[key]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # 读完请求头
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+            key = path.split('?', 1)[0].strip('/')
+            self.requests += 1
+
+            delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+
+            if self._rng.random() < self.error_rate:
+                self.errors += 1
+                status, body, content_type = "503 Service Unavailable", b"mock error", "text/plain"
+            else:
+                status, body, content_type = "200 OK", self._feed_for(key), "application/rss+xml; charset=utf-8"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+            self.bytes_sent += len(body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def record_snapshots(sources, fetcher, snapshot_dir: Path = SNAPSHOT_DIR) -> int:
+    """
+    录制快照：请求真实 URL 并保存到 snapshot_dir（需要网络）
+
+    Returns:
+        成功录制的数量
+    """
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+
+    async def record(source) -> bool:
+        try:
+            content, _ = await fetcher.fetch(source.url)
+        except Exception:
+            return False
+        (snapshot_dir / f"{route_key(source.url)}.xml").write_text(content, encoding='utf-8')
+        return True
+
+    results = await asyncio.gather(*(record(s) for s in sources))
+    return sum(results)
+
+
+def snapshot_checksum(snapshot_dir: Path = SNAPSHOT_DIR) -> str:
+    """快照集合的校验和，便于在报告中标识回放数据版本"""
+    digest = hashlib.blake2b(digest_size=8)
+    if snapshot_dir.exists():
+        for path in sorted(snapshot_dir.glob('*.xml')):
+            digest.update(path.name.encode('utf-8'))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
@@ -0,0 +1,162 @@
+"""
+成本估算基准测试
+
+生成 N 篇合成文章写入临时数据库，端到端测量 /api/analyze/estimate-cost 的核心路径
+（批量读取文章 + TokenAccountant.estimate）：
+- 原实现：逐篇读取文章，拼接全部正文后整体编码
+- 冷启动：token 数未缓存，逐篇编码并写入 article_token_counts
+- 数据库缓存：清空内存缓存后重新估算（模拟进程重启）
+- 内存缓存：同一进程内重复估算
+
+用法（在 backend 目录下）:
+    python -m benchmarks.token_benchmark [--articles 1000] [--content-chars 3000]
+                                         [--backend deepseek] [--model deepseek-chat] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+from models import Article
+from storage.database import Database
+from crawler.ingest import save_articles
+from llm.token_accounting import TokenAccountant
+from llm.token_counter import ENCODING_NAME, clear_count_cache, count_tokens, effective_encoding
+
+_WORDS = ["人工智能", "芯片", "市场", "发布", "融资", "开源", "模型", "政策", "增长", "用户",
+          "OpenAI", "GPU", "API", "startup", "revenue", "benchmark", "release", "cloud"]
+
+
+def make_articles(count: int, content_chars: int, seed: int = 42) -> List[Article]:
+    """生成中英混合的合成文章"""
+    rng = random.Random(seed)
+    base_time = datetime.now() - timedelta(hours=12)
+    articles = []
+    for i in range(count):
+        parts = []
+        length = 0
+        while length < content_chars:
+            word = rng.choice(_WORDS)
+            parts.append(word)
+            length += len(word) + 1
+        articles.append(Article(
+            title=f"基准文章 {i}：{rng.choice(_WORDS)}{rng.choice(_WORDS)}",
+            url=f"https://bench.example.com/{i}",
+            source_name=f"基准源 {i % 20}",
+            content=" ".join(parts)[:content_chars],
+            published_at=base_time + timedelta(seconds=i)
+        ))
+    return articles
+
+
+def _legacy_estimate(articles: List[Article]) -> int:
+    """原实现：拼接全部正文后整体编码（编码器使用进程内实例，不计加载开销）"""
+    total_text = ""
+    for article in articles:
+        total_text += f"{article.title}\n{article.content}\n\n"
+    return count_tokens(total_text) + 500
+
+
+async def run_benchmark(
+    articles: int = 1000,
+    content_chars: int = 3000,
+    backend: str = "deepseek",
+    model: Optional[str] = None,
+    db_path: Optional[str] = None
+) -> dict:
+    """
+    运行一次基准测试
+
+    Returns:
+        指标字典（耗时单位为毫秒）
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(db_path=db_path or str(Path(tmp_dir) / "benchmark.db"))
+        await db.initialize()
+        article_ids = await save_articles(db, make_articles(articles, content_chars))
+        clear_count_cache()
+
+        start = time.perf_counter()
+        loaded = []
+        for article_id in article_ids:
+            article = await db.get_article(article_id)
+            if article:
+                loaded.append(article)
+        legacy_tokens = _legacy_estimate(loaded)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        async def timed_estimate(accountant: TokenAccountant):
+            start = time.perf_counter()
+            selected = await db.get_articles_by_ids(article_ids)
+            estimate = await accountant.estimate(selected, backend, model)
+            return estimate, (time.perf_counter() - start) * 1000
+
+        cold, cold_ms = await timed_estimate(TokenAccountant(db))
+        clear_count_cache()
+        db_accountant = TokenAccountant(db)
+        _, warm_db_ms = await timed_estimate(db_accountant)
+        _, warm_memory_ms = await timed_estimate(db_accountant)
+
+    return {
+        'articles': len(article_ids),
+        'content_chars': content_chars,
+        'backend': backend,
+        'model': cold['model'],
+        'encoding': effective_encoding(ENCODING_NAME),
+        'content_tokens': cold['content_tokens'],
+        'estimated_prompt_tokens': cold['token_count'],
+        'legacy_tokens': legacy_tokens,
+        'legacy_ms': round(legacy_ms, 1),
+        'cold_ms': round(cold_ms, 1),
+        'warm_db_ms': round(warm_db_ms, 1),
+        'warm_memory_ms': round(warm_memory_ms, 1),
+        'db_hits': db_accountant.db_hits,
+        'memory_hits': db_accountant.memory_hits,
+    }
+
+
+def print_report(metrics: dict):
+    """打印可读报告"""
+    print("\n📊 成本估算基准测试")
+    print("=" * 60)
+    print(f"文章:     {metrics['articles']} 篇 × {metrics['content_chars']} 字，"
+          f"{metrics['backend']}/{metrics['model']}（编码 {metrics['encoding']}）")
+    print(f"token:    正文 {metrics['content_tokens']}，预计发送 {metrics['estimated_prompt_tokens']}"
+          f"（原实现估算 {metrics['legacy_tokens']}）")
+    print(f"原实现:   {metrics['legacy_ms']} ms")
+    print(f"冷启动:   {metrics['cold_ms']} ms")
+    print(f"库缓存:   {metrics['warm_db_ms']} ms（命中 {metrics['db_hits']} 篇）")
+    print(f"内存缓存: {metrics['warm_memory_ms']} ms")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="成本估算基准测试（临时数据库，不访问 LLM）")
+    parser.add_argument('--articles', type=int, default=1000, help="文章数")
+    parser.add_argument('--content-chars', type=int, default=3000, help="每篇正文字数")
+    parser.add_argument('--backend', default="deepseek", help="LLM 后端")
+    parser.add_argument('--model', default=None, help="模型名称（默认使用后端的默认模型）")
+    parser.add_argument('--json', action='store_true', help="以 JSON 输出指标")
+    args = parser.parse_args()
+
+    metrics = asyncio.run(run_benchmark(
+        articles=args.articles,
+        content_chars=args.content_chars,
+        backend=args.backend,
+        model=args.model
+    ))
+
+    if args.json:
+        print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    else:
+        print_report(metrics)
+
+
+if __name__ == "__main__":
+    main()
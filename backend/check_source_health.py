@@ -1,81 +1,70 @@
 """
 检查所有信息源的健康状态，建议使用官方RSS替代不可用的RSSHub路由
+
+并发验证（有限并发），结果按完成顺序输出，并写回数据库中的源健康统计。
+
+用法:
+    python check_source_health.py [--industry tech] [--concurrency 20] [--timeout 20]
+                                  [--enabled-only] [--no-record]
 """
 
+import argparse
 import asyncio
-import aiohttp
+import time
+
+from models import IndustryCategory
 from storage.database import Database
+from config_manager import ConfigManager
+from crawler.service import CrawlerService
+from crawler.source_validator import (
+    validate_sources, summarize_results, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+)
 
-async def check_source_health():
+
+async def check_source_health(
+    industry: str = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+    enabled_only: bool = False,
+    record: bool = True
+):
     db = Database()
     await db.initialize()
-    
-    all_sources = await db.get_sources()
-    
+
+    all_sources = await db.get_sources(
+        industry=IndustryCategory(industry) if industry else None,
+        enabled_only=enabled_only
+    )
+
+    proxy_config = await ConfigManager(db).get_detailed_proxy_config()
+    crawler = CrawlerService(proxy_config=proxy_config if proxy_config and proxy_config.get('enabled') else None)
+
     print(f"\n📊 信息源健康检查报告")
     print("=" * 80)
-    print(f"总计: {len(all_sources)} 个信息源\n")
-    
+    print(f"总计: {len(all_sources)} 个信息源，并发 {concurrency}，单源超时 {timeout} 秒\n")
+
     issues_by_industry = {}
-    healthy_by_industry = {}
-    
-    async with aiohttp.ClientSession() as session:
-        for source in all_sources:
-            if not source.enabled:
-                continue
-            
-            industry = source.industry.value
-            
-            # 检查是否使用本地RSSHub
-            if 'localhost:1200' in source.url:
-                try:
-                    async with session.get(source.url, timeout=aiohttp.ClientTimeout(total=5)) as response:
-                        if response.status == 503:
-                            # 503错误 - RSSHub路由不可用
-                            if industry not in issues_by_industry:
-                                issues_by_industry[industry] = []
-                            issues_by_industry[industry].append({
-                                'name': source.name,
-                                'url': source.url,
-                                'error': 'RSSHub路由返回503'
-                            })
-                        elif response.status == 200:
-                            if industry not in healthy_by_industry:
-                                healthy_by_industry[industry] = 0
-                            healthy_by_industry[industry] += 1
-                        else:
-                            if industry not in issues_by_industry:
-                                issues_by_industry[industry] = []
-                            issues_by_industry[industry].append({
-                                'name': source.name,
-                                'url': source.url,
-                                'error': f'HTTP {response.status}'
-                            })
-                except asyncio.TimeoutError:
-                    if industry not in issues_by_industry:
-                        issues_by_industry[industry] = []
-                    issues_by_industry[industry].append({
-                        'name': source.name,
-                        'url': source.url,
-                        'error': '超时'
-                    })
-                except Exception as e:
-                    if industry not in issues_by_industry:
-                        issues_by_industry[industry] = []
-                    issues_by_industry[industry].append({
-                        'name': source.name,
-                        'url': source.url,
-                        'error': str(e)
-                    })
-            else:
-                # 非本地RSSHub源，假设健康
-                if industry not in healthy_by_industry:
-                    healthy_by_industry[industry] = 0
-                healthy_by_industry[industry] += 1
-    
+    results = []
+    start = time.monotonic()
+
+    async for result in validate_sources(
+        crawler,
+        all_sources,
+        db=db if record else None,
+        concurrency=concurrency,
+        timeout=timeout
+    ):
+        results.append(result)
+        mark = "✓" if result['valid'] else "✗"
+        print(f"[{len(results):3d}/{len(all_sources)}] {mark} {result['name']} ({result['latency_ms']:.0f}ms)")
+        if not result['valid']:
+            issues_by_industry.setdefault(result['industry'], []).append(result)
+
+    summary = summarize_results(results, time.monotonic() - start)
+
     # 打印问题源
     if issues_by_industry:
-        print("❌ 发现问题的信息源：")
+        print("\n❌ 发现问题的信息源：")
         print("-" * 80)
         for industry, issues in sorted(issues_by_industry.items()):
             print(f"\n【{industry}】")
@@ -85,32 +74,47 @@ async def check_source_health():
                 print(f"    错误: {issue['error']}")
         print("\n" + "-" * 80)
     else:
-        print("✅ 所有信息源健康状态良好！\n")
-    
+        print("\n✅ 所有信息源健康状态良好！\n")
+
     # 打印健康统计
     print("\n📈 各行业健康源统计：")
     print("-" * 80)
-    
-    all_industries = sorted(set(list(healthy_by_industry.keys()) + list(issues_by_industry.keys())))
-    
-    for industry in all_industries:
-        healthy = healthy_by_industry.get(industry, 0)
-        problematic = len(issues_by_industry.get(industry, []))
-        total = healthy + problematic
-        
-        status = "✓" if problematic == 0 else "⚠️"
-        print(f"{status} {industry:15s} 健康: {healthy:2d}/{total:2d}")
-    
+
+    for industry, stats in sorted(summary['by_industry'].items()):
+        status = "✓" if stats['valid'] == stats['total'] else "⚠️"
+        print(f"{status} {industry:15s} 健康: {stats['valid']:2d}/{stats['total']:2d}")
+
     print("-" * 80)
-    
+    print(f"耗时 {summary['elapsed_seconds']} 秒（{summary['sources_per_second']} 源/秒）")
+    if record:
+        print("健康结果已写回数据库")
+
     # 建议
     if issues_by_industry:
         print("\n💡 建议：")
         print("1. 使用 'rsshub.app' 替代 'localhost:1200'（公共实例）")
         print("2. 或者使用官方RSS源替代RSSHub路由")
-        print("3. 使用以下命令查看哪些源需要修复：")
-        print("   SELECT name, url FROM sources WHERE url LIKE '%localhost:1200%' AND enabled = 1")
+        print("3. 查看各源的持久化健康状态：GET /api/config/sources/health?unhealthy_only=true")
         print()
 
+
+def main():
+    parser = argparse.ArgumentParser(description="并发验证信息源")
+    parser.add_argument('--industry', choices=[c.value for c in IndustryCategory], help="只验证指定行业")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="最大并发数")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="单源超时（秒）")
+    parser.add_argument('--enabled-only', action='store_true', help="只验证启用的源")
+    parser.add_argument('--no-record', action='store_true', help="不写回健康统计")
+    args = parser.parse_args()
+
+    asyncio.run(check_source_health(
+        industry=args.industry,
+        concurrency=args.concurrency,
+        timeout=args.timeout,
+        enabled_only=args.enabled_only,
+        record=not args.no_record
+    ))
+
+
 if __name__ == "__main__":
-    asyncio.run(check_source_health())
+    main()
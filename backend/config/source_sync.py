@@ -0,0 +1,206 @@
+"""
+信息源配置同步
+
+将 config/sources.yaml 以差量方式同步到数据库（单个事务内完成插入/更新/禁用）：
+- YAML 中新增的源：插入
+- YAML 中定义有变化的源（按定义哈希判断）：更新名称、类型、行业、间隔、元数据和启用状态
+- 从 YAML 中移除的源：禁用（disabled_reason = 'config_removed'），只影响由配置同步管理的源
+- 因连续失败被自动禁用的源（disabled_reason = 'auto'）不会被配置重新启用
+
+另提供基于 mtime 轮询的文件监听，修改 sources.yaml 后无需重启即可生效。
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models import Source
+from config.source_loader import SourceConfigLoader
+from crawler.source_health import DISABLED_REASON_AUTO
+
+logger = logging.getLogger(__name__)
+
+# 禁用原因
+DISABLED_REASON_CONFIG = 'config'  # YAML 中 enabled: false
+DISABLED_REASON_CONFIG_REMOVED = 'config_removed'  # 已从 YAML 中移除
+
+# 最近一次同步结果
+_last_sync_report: Optional[dict] = None
+
+
+def source_config_hash(source: Source) -> str:
+    """信息源 YAML 定义的哈希（只包含配置字段，不含运行时状态）"""
+    payload = json.dumps({
+        'name': source.name,
+        'url': source.url,
+        'source_type': source.source_type.value,
+        'industry': source.industry.value,
+        'enabled': source.enabled,
+        'fetch_interval_hours': source.fetch_interval_hours,
+        'metadata': source.metadata,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def plan_source_sync(config_sources: List[Source], existing_rows: List[dict]) -> dict:
+    """
+    计算同步计划
+
+    Args:
+        config_sources: YAML 中的信息源
+        existing_rows: 数据库现有行（id、url、enabled、disabled_reason、config_hash）
+
+    Returns:
+        {
+            'inserts': [(Source, config_hash)],
+            'updates': [(id, Source, config_hash, enabled, disabled_reason)],
+            'disables': [id],
+            'unchanged': int
+        }
+    """
+    # YAML 中重复的 URL 以最后一个为准
+    wanted: Dict[str, Source] = {}
+    for source in config_sources:
+        wanted[source.url] = source
+
+    # 数据库中同一 URL 有多行时只处理第一行
+    rows_by_url: Dict[str, dict] = {}
+    for row in existing_rows:
+        rows_by_url.setdefault(row['url'], row)
+
+    inserts, updates, disables = [], [], []
+    unchanged = 0
+
+    for url, source in wanted.items():
+        config_hash = source_config_hash(source)
+        row = rows_by_url.get(url)
+        if row is None:
+            inserts.append((source, config_hash))
+            continue
+
+        reason = row['disabled_reason']
+        if row['config_hash'] == config_hash and reason != DISABLED_REASON_CONFIG_REMOVED:
+            unchanged += 1
+            continue
+
+        enabled, disabled_reason = bool(row['enabled']), reason
+        if not source.enabled:
+            if enabled or reason is None:
+                enabled, disabled_reason = False, DISABLED_REASON_CONFIG
+        elif reason == DISABLED_REASON_AUTO:
+            # 自动禁用的源只能通过健康重置或验证成功恢复
+            pass
+        elif row['config_hash'] is None and not enabled:
+            # 首次纳入配置管理：保留数据库中手动禁用的状态
+            pass
+        else:
+            enabled, disabled_reason = True, None
+
+        updates.append((row['id'], source, config_hash, enabled, disabled_reason))
+
+    for url, row in rows_by_url.items():
+        if url in wanted or row['config_hash'] is None:
+            continue
+        if row['enabled'] or row['disabled_reason'] != DISABLED_REASON_CONFIG_REMOVED:
+            disables.append(row['id'])
+
+    return {
+        'inserts': inserts,
+        'updates': updates,
+        'disables': disables,
+        'unchanged': unchanged,
+    }
+
+
+async def sync_sources_from_config(db, config_path: Optional[str] = None) -> dict:
+    """
+    从 YAML 差量同步信息源到数据库
+
+    Returns:
+        同步报告：inserted / updated / disabled / unchanged / total / elapsed_ms / synced_at
+    """
+    global _last_sync_report
+
+    start = time.perf_counter()
+    config_sources = SourceConfigLoader(config_path).load_sources()
+    existing_rows = await db.get_source_sync_state()
+    plan = plan_source_sync(config_sources, existing_rows)
+    await db.apply_source_sync(plan['inserts'], plan['updates'], plan['disables'])
+
+    report = {
+        'inserted': len(plan['inserts']),
+        'updated': len(plan['updates']),
+        'disabled': len(plan['disables']),
+        'unchanged': plan['unchanged'],
+        'total': len(config_sources),
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 1),
+        'synced_at': datetime.now().isoformat(),
+    }
+    _last_sync_report = report
+    logger.info(
+        f"信息源同步完成: 新增 {report['inserted']}，更新 {report['updated']}，"
+        f"禁用 {report['disabled']}，未变 {report['unchanged']}，耗时 {report['elapsed_ms']}ms"
+    )
+    return report
+
+
+def get_last_sync_report() -> Optional[dict]:
+    """最近一次同步结果"""
+    return _last_sync_report
+
+
+class SourceConfigWatcher:
+    """
+    sources.yaml 文件监听（mtime 轮询），变化时重新同步
+
+    Example:
+        watcher = SourceConfigWatcher(db)
+        watcher.start()
+        ...
+        await watcher.stop()
+    """
+
+    def __init__(self, db, config_path: Optional[str] = None, interval: float = 5.0):
+        self.db = db
+        self.config_path = Path(config_path) if config_path else Path(__file__).parent / "sources.yaml"
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_mtime = self._mtime()
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return self.config_path.stat().st_mtime
+        except OSError:
+            return None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            mtime = self._mtime()
+            if mtime is None or mtime == self._last_mtime:
+                continue
+            self._last_mtime = mtime
+            logger.info(f"检测到 {self.config_path.name} 变化，重新同步信息源")
+            try:
+                await sync_sources_from_config(self.db, str(self.config_path))
+            except Exception as e:
+                # 编辑中的 YAML 可能暂时无效，等待下次变化
+                logger.error(f"信息源同步失败: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -5,7 +5,7 @@
 """
 
 import json
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 from storage.database import Database
 from utils.proxy_helper import ProxyHelper
 
@@ -36,6 +36,18 @@ class ConfigManager:
                 (f"llm_{backend}_config", json.dumps(config))
             )
             await conn.commit()
+        
+        # API Key 等变化后丢弃该后端缓存的客户端
+        from llm.client_registry import get_llm_client_registry
+        get_llm_client_registry().invalidate(backend)
+        
+        if backend == 'ollama':
+            from llm.ollama_adapter import OllamaAdapter
+            OllamaAdapter.configure(
+                num_ctx=config.get('num_ctx'),
+                keep_alive=config.get('keep_alive'),
+                base_url=config.get('base_url')
+            )
     
     async def get_api_key(self, backend: str) -> Optional[str]:
         """获取 API Key"""
@@ -57,6 +69,169 @@ class ConfigManager:
             del config['api_key']
             await self.set_llm_config(backend, config)
     
+    async def get_llm_resilience_config(self) -> Dict:
+        """获取 LLM 重试 / 故障转移配置
+
+        Returns:
+            {
+                'failover_chain': [str],  # 后端优先顺序，如 ['deepseek', 'openai', 'ollama']，为空时不切换后端
+                'max_attempts': int,  # 单次调用最多尝试次数（含首次）
+                'retry_budget': int,  # 一次分析内所有调用共享的重试次数上限
+                'hedge_after_seconds': float | None  # 超过该耗时发起对冲请求，None 表示不对冲
+            }
+        """
+        from llm.resilience import DEFAULT_MAX_ATTEMPTS, DEFAULT_RETRY_BUDGET
+
+        config = {
+            'failover_chain': [],
+            'max_attempts': DEFAULT_MAX_ATTEMPTS,
+            'retry_budget': DEFAULT_RETRY_BUDGET,
+            'hedge_after_seconds': None
+        }
+        async with self.db._get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT value FROM config WHERE key = ?",
+                ("llm_resilience_config",)
+            )
+            row = await cursor.fetchone()
+            if row:
+                config.update(json.loads(row[0]))
+        return config
+    
+    async def set_llm_resilience_config(self, config: Dict):
+        """设置 LLM 重试 / 故障转移配置"""
+        async with self.db._get_connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, datetime('now'))",
+                ("llm_resilience_config", json.dumps(config))
+            )
+            await conn.commit()
+    
+    async def get_article_ranking_config(self) -> Dict:
+        """获取一键情报的文章预排序配置
+
+        Returns:
+            {
+                'top_k': int | None,  # 最多分析的文章数，None 表示不限
+                'token_budget': int | None,  # 所选文章的 token 总预算，None 表示不限
+                'novelty_days': int,  # 与最近多少天内已分析的文章比较新颖度
+                'weights': {'salience', 'coverage', 'novelty', 'priority'}  # 综合得分权重
+            }
+        """
+        from llm.article_ranking import DEFAULT_NOVELTY_DAYS, DEFAULT_WEIGHTS
+
+        config = {
+            'top_k': None,
+            'token_budget': None,
+            'novelty_days': DEFAULT_NOVELTY_DAYS,
+            'weights': dict(DEFAULT_WEIGHTS)
+        }
+        async with self.db._get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT value FROM config WHERE key = ?",
+                ("article_ranking_config",)
+            )
+            row = await cursor.fetchone()
+            if row:
+                config.update(json.loads(row[0]))
+        return config
+    
+    async def set_article_ranking_config(self, config: Dict):
+        """设置一键情报的文章预排序配置"""
+        async with self.db._get_connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, datetime('now'))",
+                ("article_ranking_config", json.dumps(config))
+            )
+            await conn.commit()
+
+    async def get_rolling_trend_config(self) -> Dict:
+        """获取滚动趋势洞察的定时更新配置
+
+        Returns:
+            {
+                'enabled': bool,  # 是否每天定时更新
+                'industries': [str],  # 参与滚动更新的行业
+                'llm_backend': str,
+                'llm_model': str | None,
+                'window_days': int,  # 滚动窗口（天）
+                'run_at_hour': int  # 每天几点（本地时间，0-23）运行
+            }
+        """
+        from rolling_trend import DEFAULT_RUN_AT_HOUR, DEFAULT_WINDOW_DAYS
+
+        config = {
+            'enabled': False,
+            'industries': [],
+            'llm_backend': 'deepseek',
+            'llm_model': None,
+            'window_days': DEFAULT_WINDOW_DAYS,
+            'run_at_hour': DEFAULT_RUN_AT_HOUR
+        }
+        async with self.db._get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT value FROM config WHERE key = ?",
+                ("rolling_trend_config",)
+            )
+            row = await cursor.fetchone()
+            if row:
+                config.update(json.loads(row[0]))
+        return config
+
+    async def set_rolling_trend_config(self, config: Dict):
+        """设置滚动趋势洞察的定时更新配置"""
+        async with self.db._get_connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, datetime('now'))",
+                ("rolling_trend_config", json.dumps(config))
+            )
+            await conn.commit()
+
+    async def get_llm_rate_limits(self) -> Dict:
+        """获取已保存的 LLM 限流配置 {backend: {'max_concurrency': int, 'tokens_per_minute': int | None}}"""
+        async with self.db._get_connection() as conn:
+            cursor = await conn.execute(
+                "SELECT value FROM config WHERE key = ?",
+                ("llm_rate_limits",)
+            )
+            row = await cursor.fetchone()
+            if row:
+                return json.loads(row[0])
+        return {}
+    
+    async def set_llm_rate_limits(self, limits: Dict):
+        """保存 LLM 限流配置并立即应用到进程级限流器"""
+        saved = await self.get_llm_rate_limits()
+        saved.update(limits)
+        async with self.db._get_connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO config (key, value, updated_at) VALUES (?, ?, datetime('now'))",
+                ("llm_rate_limits", json.dumps(saved))
+            )
+            await conn.commit()
+        
+        from llm.rate_limiter import get_llm_rate_limiters
+        get_llm_rate_limiters().configure(limits)
+    
+    async def get_llm_failover(self, primary_backend: str) -> List[Dict]:
+        """按故障转移链路生成备用后端列表（跳过主后端与未配置 API Key 的后端，Ollama 无需 Key）
+
+        Returns:
+            [{'backend': str, 'api_key': str | None, 'model': str | None}, ...]
+        """
+        config = await self.get_llm_resilience_config()
+        failover = []
+        for backend in config.get('failover_chain') or []:
+            backend = backend.lower()
+            if backend == primary_backend.lower() or any(f['backend'] == backend for f in failover):
+                continue
+            llm_config = await self.get_llm_config(backend) or {}
+            api_key = llm_config.get('api_key')
+            if backend != 'ollama' and not api_key:
+                continue
+            failover.append({'backend': backend, 'api_key': api_key, 'model': llm_config.get('model')})
+        return failover
+    
     async def set_proxy_config(self, proxy_config: Dict):
         """设置代理配置
 
@@ -65,7 +240,8 @@ class ConfigManager:
                 'enabled': bool,
                 'http_proxy': str,  # 'http://host:port'
                 'https_proxy': str, # 'https://host:port'
-                'socks5_proxy': str # 'socks5://host:port'
+                'socks5_proxy': str, # 'socks5://host:port'
+                'proxy_pool': [str] # 代理池（可选），多个代理 URL
             }
         """
         async with self.db._get_connection() as conn:
@@ -74,6 +250,10 @@ class ConfigManager:
                 ("proxy_config", json.dumps(proxy_config))
             )
             await conn.commit()
+        
+        # 代理变化后丢弃所有缓存的客户端
+        from llm.client_registry import get_llm_client_registry
+        get_llm_client_registry().invalidate()
     
     async def get_proxy_url(self) -> Optional[str]:
         """获取代理URL（如果启用）- 为了向后兼容，返回第一个可用的代理
@@ -108,7 +288,8 @@ class ConfigManager:
                 'enabled': bool,
                 'http': 'http://host:port' or None,
                 'https': 'https://host:port' or None,
-                'socks5': 'socks5://host:port' or None
+                'socks5': 'socks5://host:port' or None,
+                'pool': ['http://host:port', ...]
             }
         """
         config = await self.get_proxy_config()
@@ -117,11 +298,13 @@ class ConfigManager:
                 'enabled': True,
                 'http': config.get('http_proxy'),
                 'https': config.get('https_proxy'),
-                'socks5': config.get('socks5_proxy')
+                'socks5': config.get('socks5_proxy'),
+                'pool': config.get('proxy_pool') or []
             }
         return {
             'enabled': False,
             'http': None,
             'https': None,
-            'socks5': None
+            'socks5': None,
+            'pool': []
         }
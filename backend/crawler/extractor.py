@@ -12,6 +12,7 @@ from bs4 import BeautifulSoup
 
 from models import Article, Source
 from crawler.fetcher import Fetcher
+from crawler.url_normalizer import canonicalize_url
 
 
 class ContentExtractor:
@@ -68,6 +69,7 @@ class ContentExtractor:
         return Article(
             title=title,
             url=url,
+            canonical_url=canonicalize_url(url),
             source_id=source.id if source else None,
             source_name=source.name if source else self._extract_domain(url),
             content=content,
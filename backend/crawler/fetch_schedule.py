@@ -0,0 +1,105 @@
+"""
+自适应爬取间隔
+
+根据入库历史学习每个源的发布频率（文章发布间隔的指数加权滑动平均），
+在上下限内推算爬取间隔：
+- 高频源（如微博热搜）接近下限，保持新鲜
+- 低频源（如个人博客）接近上限，减少无效请求
+
+未到期的源在按需爬取时直接使用数据库中已入库的文章，不发起网络请求。
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from models import Source
+from crawler.source_health import ewma
+
+# 爬取间隔上下限（分钟）
+MIN_FETCH_INTERVAL_MINUTES = 10
+MAX_FETCH_INTERVAL_MINUTES = 24 * 60
+# 爬取间隔 = 平均发布间隔 × 系数（< 1 时平均每次爬取至多有一篇新文章）
+INTERVAL_FACTOR = 0.5
+# 发布间隔滑动平均系数
+PUBLISH_EWMA_ALPHA = 0.2
+
+
+def _as_utc(value: datetime) -> datetime:
+    """无时区的时间按 UTC 处理"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _local_as_utc(value: datetime) -> datetime:
+    """无时区的时间按本地时间处理（last_fetched_at 由 record_source_fetch 以本地时间写入）"""
+    return value.astimezone(timezone.utc)
+
+
+def update_publish_interval(
+    mean_minutes: Optional[float],
+    published_times: Iterable[datetime],
+    last_seen_published_at: Optional[datetime] = None,
+    now: Optional[datetime] = None,
+    last_fetched_at: Optional[datetime] = None
+) -> Optional[float]:
+    """
+    用本次新入库文章的发布时间更新平均发布间隔（分钟）
+
+    - 有新文章：按时间顺序逐个间隔更新滑动平均（以上次高水位为起点）
+    - 没有新文章：距上次发布的静默时长超过当前平均值时，将其计入（源变慢了）；
+      每经过一个平均间隔只计入一次——上次成功爬取（last_fetched_at）时已处于同一个间隔内则不再计入，
+      避免频繁爬取时同一段静默被反复叠加
+    """
+    times = sorted(_as_utc(t) for t in published_times)
+    anchor = _as_utc(last_seen_published_at) if last_seen_published_at else None
+    if anchor and (not times or anchor < times[0]):
+        times.insert(0, anchor)
+
+    if len(times) >= 2:
+        for previous, current in zip(times, times[1:]):
+            gap = max((current - previous).total_seconds() / 60, 1.0)
+            mean_minutes = ewma(mean_minutes, gap, PUBLISH_EWMA_ALPHA)
+        return mean_minutes
+
+    if anchor and mean_minutes is not None:
+        silence = ((now or datetime.now(timezone.utc)) - anchor).total_seconds() / 60
+        if silence <= mean_minutes:
+            return mean_minutes
+        if last_fetched_at is not None:
+            previous_silence = (_local_as_utc(last_fetched_at) - anchor).total_seconds() / 60
+            if previous_silence // mean_minutes >= silence // mean_minutes:
+                return mean_minutes
+        return ewma(mean_minutes, silence, PUBLISH_EWMA_ALPHA)
+    return mean_minutes
+
+
+def learned_interval(mean_publish_minutes: Optional[float]) -> Optional[float]:
+    """由平均发布间隔推算爬取间隔（分钟），尚无数据时返回 None"""
+    if mean_publish_minutes is None:
+        return None
+    interval = mean_publish_minutes * INTERVAL_FACTOR
+    return round(min(max(interval, MIN_FETCH_INTERVAL_MINUTES), MAX_FETCH_INTERVAL_MINUTES), 1)
+
+
+def next_fetch_at(source: Source) -> Optional[datetime]:
+    """源的下次到期时间，没有学习到间隔或从未爬取时返回 None（立即到期）"""
+    if not source.learned_interval_minutes or not source.last_fetched_at:
+        return None
+    return source.last_fetched_at + timedelta(minutes=source.learned_interval_minutes)
+
+
+def is_due(source: Source, now: Optional[datetime] = None) -> bool:
+    """源是否到期需要爬取"""
+    # last_fetched_at 为本地时间（与 record_source_fetch 一致）
+    due_at = next_fetch_at(source)
+    return due_at is None or (now or datetime.now()) >= due_at
+
+
+def can_serve_from_db(source: Source, hours: int, now: Optional[datetime] = None) -> bool:
+    """
+    未到期且已入库范围覆盖本次时间窗口时，可直接使用数据库中的文章
+    """
+    if is_due(source, now) or not source.seen_since:
+        return False
+    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return _as_utc(source.seen_since) <= cutoff_time
+
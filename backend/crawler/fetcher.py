@@ -4,28 +4,111 @@ HTTP 请求封装
 提供统一的 HTTP 请求接口,支持超时、重试、代理等
 """
 
+import asyncio
+import codecs
+import time
 import httpx
-from typing import Optional, Dict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, Tuple
 import logging
 from utils.proxy_helper import ProxyHelper
+from crawler.rsshub_helper import RSSHubHelper, get_rsshub_helper
 
 logger = logging.getLogger(__name__)
 
 
+class FetchError(Exception):
+    """请求失败
+
+    Attributes:
+        status_code: HTTP 状态码（网络错误时为 None）
+        retryable: 是否值得换实例重试（5xx、超时、网络错误）
+    """
+    
+    def __init__(self, message: str, status_code: Optional[int] = None, retryable: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+
+
+class TransferMeter:
+    """统计一次爬取（可能包含多次请求、实例切换）的传输量"""
+    
+    def __init__(self):
+        self.bytes_downloaded = 0  # 已接收的正文字节数（解压后）
+        self.requests = 0
+        self.aborted = 0  # 因超限或内容类型被中止的请求数
+    
+    def to_dict(self) -> dict:
+        return {
+            'bytes_downloaded': self.bytes_downloaded,
+            'requests': self.requests,
+            'aborted': self.aborted,
+        }
+
+
+_current_meter: ContextVar[Optional[TransferMeter]] = ContextVar('fetch_transfer_meter', default=None)
+
+
+@contextmanager
+def measure_transfer():
+    """
+    在上下文内统计 Fetcher 的传输量（按 asyncio 任务隔离，并发爬取互不干扰）
+    
+    Example:
+        with measure_transfer() as meter:
+            await crawler.fetch(source)
+        meter.bytes_downloaded
+    """
+    meter = TransferMeter()
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
 class Fetcher:
     """HTTP 请求器"""
     
+    # 默认单次请求的最大正文字节数（解压后）
+    DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+    
+    # 允许的文本类内容类型（前缀匹配；无 Content-Type 时放行）
+    TEXT_CONTENT_TYPES = (
+        'text/',
+        'application/xml',
+        'application/rss+xml',
+        'application/atom+xml',
+        'application/rdf+xml',
+        'application/xhtml+xml',
+        'application/json',
+        'application/feed+json',
+        'application/x-rss+xml',
+    )
+    
     def __init__(
         self,
         timeout: int = 15,
         user_agent: str = "NewsGap/0.1.0 (Information Intelligence Tool)",
         verify_ssl: bool = False,  # 默认不验证 SSL，避免证书问题
         proxy_url: Optional[str] = None,  # 旧版代理URL，格式: 'http://host:port' 或 'https://host:port' 或 'socks5://host:port'
-        proxy_config: Optional[dict] = None  # 新版代理配置，格式: {'enabled': bool, 'http': 'http://host:port', 'https': 'https://host:port', 'socks5': 'socks5://host:port'}
+        proxy_config: Optional[dict] = None,  # 新版代理配置，格式: {'enabled': bool, 'http': 'http://host:port', 'https': 'https://host:port', 'socks5': 'socks5://host:port'}
+        rsshub_helper: Optional[RSSHubHelper] = None,  # RSSHub 实例路由，默认使用全局实例
+        rsshub_failover: bool = True,  # RSSHub 请求遇到 5xx/超时时是否切换实例重试
+        rsshub_max_attempts: int = 3,  # RSSHub 请求最多尝试的实例数
+        hedge_delay: Optional[float] = None,  # 对冲请求：首个实例超过该秒数未响应时并发请求下一个实例
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES  # 单次请求最大正文字节数，为 None 时不限制
     ):
         self.timeout = timeout
         self.user_agent = user_agent
         self.verify_ssl = verify_ssl
+        self._rsshub_helper = rsshub_helper
+        self.rsshub_failover = rsshub_failover
+        self.rsshub_max_attempts = rsshub_max_attempts
+        self.hedge_delay = hedge_delay
+        self.max_bytes = max_bytes
         
         # 统一处理代理配置（向后兼容）
         if proxy_config is None and proxy_url is not None:
@@ -35,11 +118,23 @@ class Fetcher:
         # 预先转换为 httpx 格式，避免每次请求都转换
         self._httpx_proxies = ProxyHelper.convert_to_httpx_proxies(proxy_config)
         
-        if self._httpx_proxies:
+        # 配置了代理池时按主机选择代理（全局代理池统计与 LLM 适配器共享）
+        self._proxy_config = proxy_config
+        self._use_proxy_pool = bool(ProxyHelper.get_pool_urls(proxy_config))
+        
+        if self._use_proxy_pool:
+            logger.info(f"Fetcher 使用代理池: {ProxyHelper.get_pool_urls(proxy_config)}")
+        elif self._httpx_proxies:
             logger.info(f"Fetcher 使用代理: {self._httpx_proxies}")
     
     def _get_client_kwargs(self) -> dict:
         """获取 httpx.AsyncClient 的统一配置参数"""
+        if self._use_proxy_pool:
+            return {
+                'timeout': self.timeout,
+                'follow_redirects': True,
+                **ProxyHelper.build_httpx_client_kwargs(self._proxy_config, verify=self.verify_ssl)
+            }
         return {
             'timeout': self.timeout,
             'follow_redirects': True,
@@ -47,6 +142,11 @@ class Fetcher:
             'proxies': self._httpx_proxies
         }
     
+    @property
+    def rsshub_helper(self) -> RSSHubHelper:
+        """RSSHub 实例路由（未指定时跟随全局实例设置）"""
+        return self._rsshub_helper or get_rsshub_helper()
+    
     async def fetch(
         self,
         url: str,
@@ -55,9 +155,101 @@ class Fetcher:
         """
         获取 URL 内容
         
+        RSSHub URL 会按实例健康/延迟改写到最佳实例，并在 5xx/超时时切换实例重试。
+        
         Returns:
             (content, status_code)
         """
+        if self.rsshub_failover:
+            candidates = self.rsshub_helper.get_candidate_urls(url, self.rsshub_max_attempts)
+            if candidates:
+                return await self._fetch_with_failover(candidates, headers)
+        
+        return await self._fetch_once(url, headers)
+    
+    async def _fetch_with_failover(
+        self,
+        candidates: list,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, int]:
+        """依次（或对冲）尝试多个 RSSHub 实例，返回第一个成功结果"""
+        remaining = list(candidates)
+        last_error: Optional[FetchError] = None
+        
+        while remaining:
+            primary = remaining.pop(0)
+            try:
+                if self.hedge_delay is not None and remaining:
+                    return await self._hedged_attempt(primary, remaining, headers)
+                return await self._instance_attempt(primary, headers)
+            except FetchError as e:
+                last_error = e
+                if not e.retryable:
+                    raise
+                if remaining:
+                    logger.info(f"RSSHub 实例 {primary[0]} 失败，切换到下一个实例: {e}")
+        
+        raise last_error
+    
+    async def _hedged_attempt(
+        self,
+        primary: Tuple[str, str],
+        remaining: list,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, int]:
+        """对冲请求：主实例超过 hedge_delay 未响应时，并发请求下一个实例，取先成功者"""
+        primary_task = asyncio.create_task(self._instance_attempt(primary, headers))
+        done, _ = await asyncio.wait({primary_task}, timeout=self.hedge_delay)
+        if done:
+            return primary_task.result()
+        
+        backup = remaining.pop(0)
+        logger.info(f"RSSHub 实例 {primary[0]} 超过 {self.hedge_delay}s 未响应，对冲请求 {backup[0]}")
+        pending = {primary_task, asyncio.create_task(self._instance_attempt(backup, headers))}
+        last_error = None
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    if isinstance(last_error, FetchError) and not last_error.retryable:
+                        raise last_error
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _instance_attempt(
+        self,
+        candidate: Tuple[str, str],
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, int]:
+        """请求单个 RSSHub 实例，并记录健康/延迟统计"""
+        instance, url = candidate
+        helper = self.rsshub_helper
+        route = url[len(instance):]
+        start = time.monotonic()
+        try:
+            result = await self._fetch_once(url, headers)
+        except FetchError as e:
+            if e.retryable:
+                helper.record_failure(instance, str(e))
+            else:
+                # 4xx 说明实例本身可用，只是路由有问题
+                helper.record_success(instance, time.monotonic() - start, route)
+            raise
+        helper.record_success(instance, time.monotonic() - start, route)
+        return result
+    
+    async def _fetch_once(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, int]:
+        """单次请求"""
         default_headers = {
             'User-Agent': self.user_agent,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -67,19 +259,80 @@ class Fetcher:
         if headers:
             default_headers.update(headers)
         
+        meter = _current_meter.get()
+        if meter is not None:
+            meter.requests += 1
+        
         try:
             async with httpx.AsyncClient(**self._get_client_kwargs()) as client:
-                response = await client.get(url, headers=default_headers)
-                response.raise_for_status()
-                return response.text, response.status_code
+                async with client.stream('GET', url, headers=default_headers) as response:
+                    response.raise_for_status()
+                    self._check_headers(url, response)
+                    content = await self._read_text(url, response, meter)
+                    return content, response.status_code
+        
+        except FetchError:
+            if meter is not None:
+                meter.aborted += 1
+            raise
         
         except httpx.HTTPStatusError as e:
-            logger.warning(f"HTTP error {e.response.status_code} for {url}")
-            raise Exception(f"HTTP error {e.response.status_code} for {url}")
+            status_code = e.response.status_code
+            logger.warning(f"HTTP error {status_code} for {url}")
+            raise FetchError(
+                f"HTTP error {status_code} for {url}",
+                status_code=status_code,
+                retryable=status_code >= 500
+            )
         
         except (httpx.TimeoutException, httpx.NetworkError, httpx.ConnectError) as e:
             logger.warning(f"Network error for {url}: {str(e)}")
-            raise Exception(f"Network error for {url}: {str(e)}")
+            raise FetchError(f"Network error for {url}: {str(e)}", retryable=True)
+    
+    def _is_text_content_type(self, content_type: str) -> bool:
+        """是否为允许的文本类内容类型"""
+        media_type = content_type.split(';', 1)[0].strip().lower()
+        return not media_type or media_type.startswith(self.TEXT_CONTENT_TYPES) or media_type.endswith('+xml')
+    
+    def _check_headers(self, url: str, response: httpx.Response):
+        """根据响应头提前中止：非文本内容类型、声明长度超限"""
+        content_type = response.headers.get('content-type', '')
+        if not self._is_text_content_type(content_type):
+            raise FetchError(f"Unsupported content type {content_type} for {url}")
+        
+        content_length = response.headers.get('content-length')
+        if self.max_bytes and content_length and content_length.isdigit() \
+                and int(content_length) > self.max_bytes:
+            raise FetchError(
+                f"Response too large for {url}: {content_length} bytes (limit {self.max_bytes})"
+            )
+    
+    async def _read_text(
+        self,
+        url: str,
+        response: httpx.Response,
+        meter: Optional[TransferMeter] = None
+    ) -> str:
+        """流式读取正文并增量解码，超过字节上限时中止"""
+        encoding = response.charset_encoding or 'utf-8'
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        parts = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if meter is not None:
+                meter.bytes_downloaded += len(chunk)
+            if self.max_bytes and received > self.max_bytes:
+                raise FetchError(
+                    f"Response too large for {url}: exceeded {self.max_bytes} bytes"
+                )
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b'', final=True))
+        return ''.join(parts)
     
     async def fetch_binary(
         self,
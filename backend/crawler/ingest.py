@@ -0,0 +1,281 @@
+"""
+文章入库
+
+爬取结果写库前的统一处理：URL 规范化、本批次去重，
+以及基于已见 URL 过滤器跳过已入库文章的写操作；
+单源爬取并记录健康统计；多个目标共用一次爬取
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from models import Article, Source
+from crawler.url_normalizer import canonicalize_url
+from crawler.seen_filter import get_seen_url_filter
+from crawler.fetcher import measure_transfer
+from crawler.fetch_schedule import update_publish_interval, learned_interval, can_serve_from_db
+
+logger = logging.getLogger(__name__)
+
+
+async def save_articles(
+    db,
+    articles: List[Article],
+    batch_seen: Optional[Dict[str, asyncio.Future]] = None
+) -> List[str]:
+    """
+    批量入库文章，返回文章 ID 列表（保持原顺序）
+
+    过滤器判定为"一定是新 URL"的文章直接写入；判定为"可能已存在"的文章
+    通过一次批量查询取回已有 ID，不再逐篇 SELECT + UPDATE。
+    过滤器误判（实际不存在）的文章会回退为正常写入。
+
+    Args:
+        db: Database 实例
+        articles: 待入库文章
+        batch_seen: 本次爬取的 {canonical URL: 文章 ID 的 Future}（跨源去重，会被原地更新）。
+                    其他源已认领的文章不重复写入，但仍以其 ID 出现在本源的结果中
+    """
+    seen_filter = get_seen_url_filter()
+
+    pending: List[Article] = []
+    maybe_known: List[str] = []
+    # 结果中每个位置：本源写入的文章，或 (其他源认领的文章 ID Future, 本源的文章)
+    slots: list = []
+    claimed: Dict[str, asyncio.Future] = {}
+    handled: Set[str] = set()
+    for article in articles:
+        if not article.canonical_url:
+            article.canonical_url = canonicalize_url(article.url)
+        key = article.canonical_url
+        if batch_seen is not None:
+            if key in handled:
+                continue
+            handled.add(key)
+            shared = batch_seen.get(key)
+            if shared is not None:
+                slots.append((shared, article))
+                continue
+            claimed[key] = batch_seen[key] = asyncio.get_running_loop().create_future()
+        pending.append(article)
+        slots.append(article)
+        if seen_filter.might_contain(key):
+            maybe_known.append(key)
+
+    skipped = 0
+    try:
+        known_ids = {}
+        if maybe_known:
+            known_ids = await db.get_article_ids_by_canonical_urls(maybe_known)
+
+        for article in pending:
+            existing_id = known_ids.get(article.canonical_url)
+            if existing_id:
+                article.id = existing_id
+                skipped += 1
+            else:
+                await db.save_article(article)
+                seen_filter.add(article.canonical_url)
+            if article.canonical_url in claimed:
+                claimed[article.canonical_url].set_result(article.id)
+    finally:
+        # 写入失败时通知等待的源自行写入，避免一直等待
+        for future in claimed.values():
+            if not future.done():
+                future.set_result(None)
+
+    if skipped:
+        logger.debug(f"已见 URL 过滤: {skipped}/{len(pending)} 篇跳过写入")
+
+    # 其他源认领的文章：等待其写入完成后取 ID（本源认领的 Future 已在上面全部完成，不会互相等待）
+    article_ids = []
+    for slot in slots:
+        if isinstance(slot, Article):
+            article_ids.append(slot.id)
+            continue
+        future, article = slot
+        shared_id = await future
+        if shared_id is None:
+            # 认领的源写入失败，由本源写入
+            shared_id = await db.save_article(article)
+            seen_filter.add(article.canonical_url)
+        article_ids.append(shared_id)
+    return article_ids
+
+
+async def _update_crawl_state(db, source: Source, fetched: dict, hours: int, article_ids: List[str]) -> List[str]:
+    """
+    持久化高水位与学习到的发布间隔；提前停止时补齐窗口内已入库的文章 ID
+    """
+    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    if fetched.get('reached_seen'):
+        known_ids = await db.get_article_ids_by_source(source.id, since=cutoff_time)
+        article_ids = list(dict.fromkeys(article_ids + known_ids))
+        seen_since = source.seen_since
+    else:
+        seen_since = cutoff_time
+
+    state = {}
+    high_water_mark = fetched.get('high_water_mark')
+    if high_water_mark and high_water_mark[0]:
+        guid, published_at = high_water_mark
+        state.update(last_seen_guid=guid, last_seen_published_at=published_at, seen_since=seen_since)
+
+    # 只有增量结果（新条目）才能反映发布间隔；首次爬取以窗口内全部文章估计
+    mean_interval = update_publish_interval(
+        source.mean_publish_interval_minutes,
+        [article.published_at for article in fetched['articles']],
+        last_seen_published_at=source.last_seen_published_at,
+        last_fetched_at=source.last_fetched_at
+    )
+    if mean_interval is not None:
+        state.update(
+            mean_publish_interval_minutes=mean_interval,
+            learned_interval_minutes=learned_interval(mean_interval)
+        )
+
+    if state:
+        await db.update_source_crawl_state(source.id, **state)
+    return article_ids
+
+
+async def crawl_source(
+    db,
+    crawler,
+    source: Source,
+    hours: int = 24,
+    batch_seen: Optional[Dict[str, asyncio.Future]] = None,
+    respect_schedule: bool = False
+) -> dict:
+    """
+    爬取单个信息源并入库，同时记录源的健康统计（失败不抛出异常）
+
+    RSS 源按高水位增量爬取：只解析、入库新条目，时间窗口内已入库的文章 ID
+    直接从数据库补齐，返回结果与完整爬取一致。
+
+    Args:
+        respect_schedule: 为 True 时，未到自适应爬取间隔的源直接返回数据库中窗口内的文章，
+                          不发起网络请求
+
+    Returns:
+        {
+            'success': bool,
+            'source_name': str,
+            'article_ids': List[str],  # 成功时
+            'article_count': int,      # 成功时，本次解析出的新文章数（去重前）
+            'bytes_downloaded': int,   # 本次爬取下载的字节数
+            'latency_ms': float,       # 网络请求与解析耗时（不含写库）
+            'from_cache': bool,        # 是否因未到期直接使用数据库文章
+            'save_failed': bool,       # 失败时，是否为写库失败
+            'error': str               # 失败时
+        }
+    """
+    if respect_schedule and source.id and can_serve_from_db(source, hours):
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return {
+            'success': True,
+            'source_name': source.name,
+            'article_ids': await db.get_article_ids_by_source(source.id, since=cutoff_time),
+            'article_count': 0,
+            'bytes_downloaded': 0,
+            'latency_ms': 0.0,
+            'from_cache': True
+        }
+
+    start = time.monotonic()
+    try:
+        with measure_transfer() as meter:
+            if hasattr(crawler, 'fetch_incremental'):
+                fetched = await crawler.fetch_incremental(source, hours=hours)
+            else:
+                fetched = {'articles': await crawler.fetch(source, hours=hours),
+                           'high_water_mark': None, 'reached_seen': False}
+        articles = fetched['articles']
+    except Exception as e:
+        latency_ms = (time.monotonic() - start) * 1000
+        if source.id:
+            await db.record_source_fetch(
+                source.id, success=False, latency_ms=latency_ms, error=str(e),
+                bytes_downloaded=meter.bytes_downloaded
+            )
+        return {
+            'success': False,
+            'source_name': source.name,
+            'bytes_downloaded': meter.bytes_downloaded,
+            'latency_ms': latency_ms,
+            'save_failed': False,
+            'error': str(e)
+        }
+
+    # 延迟只统计网络请求与解析，不含写库
+    latency_ms = (time.monotonic() - start) * 1000
+    try:
+        article_ids = await save_articles(db, articles, batch_seen=batch_seen)
+        if source.id:
+            article_ids = await _update_crawl_state(db, source, fetched, hours, article_ids)
+    except Exception as e:
+        return {
+            'success': False,
+            'source_name': source.name,
+            'bytes_downloaded': meter.bytes_downloaded,
+            'latency_ms': latency_ms,
+            'save_failed': True,
+            'error': f"保存文章失败: {str(e)}"
+        }
+
+    if source.id:
+        await db.record_source_fetch(
+            source.id, success=True, latency_ms=latency_ms, article_count=len(articles),
+            bytes_downloaded=meter.bytes_downloaded
+        )
+    return {
+        'success': True,
+        'source_name': source.name,
+        'article_ids': article_ids,
+        'article_count': len(articles),
+        'bytes_downloaded': meter.bytes_downloaded,
+        'latency_ms': latency_ms,
+        'from_cache': False
+    }
+
+
+def source_feed_key(source: Source) -> str:
+    """信息源的去重键：规范化后的订阅地址（不同行业下登记的同一 feed 视为同一源）"""
+    return canonicalize_url(source.url) or source.url
+
+
+async def crawl_sources_once(
+    db,
+    crawler,
+    sources: List[Source],
+    hours: int = 24,
+    respect_schedule: bool = False
+) -> Dict[str, dict]:
+    """
+    并发爬取多个信息源，相同 feed 只请求一次
+
+    多个行业 / 自定义分类共用的源（包括登记在不同行业下的同一地址）只爬取一次，
+    结果按去重键共享；同一 URL 的文章跨源只入库一次，但会出现在每个包含它的源的结果中。
+
+    Returns:
+        {source_feed_key(source): crawl_source() 的返回值}
+    """
+    unique: Dict[str, Source] = {}
+    for source in sources:
+        unique.setdefault(source_feed_key(source), source)
+
+    batch_seen: Dict[str, asyncio.Future] = {}
+    keys = list(unique)
+    results = await asyncio.gather(*(
+        crawl_source(
+            db, crawler, unique[key], hours=hours, batch_seen=batch_seen,
+            respect_schedule=respect_schedule
+        )
+        for key in keys
+    ))
+    logger.info(f"共用爬取: {len(sources)} 个源去重为 {len(keys)} 个 feed")
+    return dict(zip(keys, results))
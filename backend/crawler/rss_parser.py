@@ -5,12 +5,18 @@ RSS Feed 解析器
 """
 
 import feedparser
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from dateutil import parser as date_parser
 
 from models import Article, Source, IndustryCategory
 from crawler.fetcher import Fetcher
+from crawler.url_normalizer import canonicalize_url
+
+
+def _as_utc(value: datetime) -> datetime:
+    """无时区的时间按 UTC 处理"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 
 class RSSParser:
@@ -38,6 +44,34 @@ class RSSParser:
         Returns:
             文章列表
         """
+        result = await self.parse_incremental(source, hours, use_high_water_mark=False)
+        return result['articles']
+    
+    async def parse_incremental(
+        self,
+        source: Source,
+        hours: int = 24,
+        use_high_water_mark: bool = True
+    ) -> dict:
+        """
+        增量解析 RSS feed
+        
+        对按时间倒序排列的 feed，遇到高水位（上次见过的最新条目）或超出时间窗口的条目后
+        停止处理，稳态下只解析真正的新条目。乱序 feed 回退为完整处理。
+        
+        Args:
+            source: 信息源配置（last_seen_guid / last_seen_published_at / seen_since 为高水位）
+            hours: 只获取最近多少小时的文章
+            use_high_water_mark: 是否按高水位提前停止
+            
+        Returns:
+            {
+                'articles': List[Article],  # 新文章（未使用高水位时为窗口内全部文章）
+                'high_water_mark': Optional[tuple],  # (guid, published_at)，feed 中最新的条目
+                'reached_seen': bool,  # 是否因到达已见条目而提前停止
+                'ordered': bool  # feed 是否按时间倒序
+            }
+        """
         try:
             # 获取 feed 内容
             content, _ = await self.fetcher.fetch(source.url)
@@ -50,11 +84,25 @@ class RSSParser:
                 raise ValueError(f"Failed to parse RSS feed: {source.url}")
             
             # 计算时间阈值（使用UTC时区避免比较问题）
-            from datetime import timezone
             cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
             
+            ordered = self._is_newest_first(feed.entries)
+            high_water_mark = self._find_high_water_mark(feed.entries, ordered)
+            
+            # 只有已连续入库的范围覆盖本次时间窗口时，高水位以下的条目才确实都已入库
+            seen_guid, seen_time = None, None
+            if use_high_water_mark and ordered and source.seen_since \
+                    and _as_utc(source.seen_since) <= cutoff_time:
+                seen_guid = source.last_seen_guid
+                seen_time = _as_utc(source.last_seen_published_at) if source.last_seen_published_at else None
+            
             articles = []
+            reached_seen = False
             for entry in feed.entries:
+                if seen_guid and self._entry_key(entry) == seen_guid:
+                    reached_seen = True
+                    break
+                
                 # 提取发布时间
                 published_at = self._extract_published_time(entry)
                 
@@ -64,7 +112,14 @@ class RSSParser:
                     if published_at.tzinfo is None:
                         published_at = published_at.replace(tzinfo=timezone.utc)
                     
+                    if seen_time and published_at < seen_time:
+                        reached_seen = True
+                        break
+                    
                     if published_at < cutoff_time:
+                        if ordered:
+                            # 倒序 feed 之后的条目只会更旧
+                            break
                         continue
                 
                 # 如果没有发布时间，使用当前时间（UTC）
@@ -76,11 +131,51 @@ class RSSParser:
                 if article:
                     articles.append(article)
             
-            return articles
+            return {
+                'articles': articles,
+                'high_water_mark': high_water_mark,
+                'reached_seen': reached_seen,
+                'ordered': ordered
+            }
         
         except Exception as e:
             raise ValueError(f"Error parsing RSS feed {source.url}: {str(e)}")
     
+    @staticmethod
+    def _entry_key(entry) -> Optional[str]:
+        """条目的稳定标识（GUID，缺失时用链接）"""
+        return (entry.get('id') or entry.get('link') or '').strip() or None
+    
+    @staticmethod
+    def _entry_time(entry):
+        """feedparser 已解析的 UTC 时间（struct_time），缺失时为 None"""
+        return entry.get('published_parsed') or entry.get('updated_parsed')
+    
+    def _is_newest_first(self, entries) -> bool:
+        """feed 是否按发布时间倒序（所有条目都有时间且不递增）"""
+        times = [self._entry_time(entry) for entry in entries]
+        if not times or any(t is None for t in times):
+            return False
+        return all(times[i] >= times[i + 1] for i in range(len(times) - 1))
+    
+    def _find_high_water_mark(self, entries, ordered: bool) -> Optional[tuple]:
+        """feed 中最新条目的 (guid, 发布时间)"""
+        if not entries:
+            return None
+        if ordered:
+            newest = entries[0]
+        else:
+            timed = [e for e in entries if self._entry_time(e)]
+            if not timed:
+                return None
+            newest = max(timed, key=self._entry_time)
+        
+        published_at = None
+        entry_time = self._entry_time(newest)
+        if entry_time:
+            published_at = datetime(*entry_time[:6], tzinfo=timezone.utc)
+        return self._entry_key(newest), published_at
+    
     def _extract_published_time(self, entry) -> Optional[datetime]:
         """从 feed entry 提取发布时间"""
         # 尝试多个可能的时间字段
@@ -163,6 +258,7 @@ class RSSParser:
         article = Article(
             title=title[:500],  # 限制标题长度
             url=url,
+            canonical_url=canonicalize_url(url),
             source_id=source.id,
             source_name=source.name,
             content=content,
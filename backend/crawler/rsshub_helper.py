@@ -4,10 +4,46 @@ RSSHub 集成助手
 支持使用自定义 RSSHub 实例，以及将普通网站转换为 RSS 源
 """
 
-from typing import Optional
+import time
+from typing import Optional, Dict, List, Tuple
 from urllib.parse import urlparse, quote
 
 
+class InstanceStats:
+    """单个 RSSHub 实例的健康/延迟统计"""
+    
+    # 延迟 EWMA 平滑系数
+    EWMA_ALPHA = 0.3
+    
+    def __init__(self, instance: str):
+        self.instance = instance
+        self.ewma_latency: Optional[float] = None  # 秒
+        self.route_latency: Dict[str, float] = {}  # 按路由的 EWMA 延迟（秒），不同路由耗时差异很大
+        self.success_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0  # time.monotonic() 时间戳
+        self.last_error: Optional[str] = None
+    
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        """是否可用（不在冷却期内）"""
+        return (now or time.monotonic()) >= self.cooldown_until
+    
+    def to_dict(self) -> dict:
+        """转换为可序列化的字典"""
+        now = time.monotonic()
+        return {
+            'instance': self.instance,
+            'healthy': self.is_healthy(now),
+            'ewma_latency_ms': round(self.ewma_latency * 1000) if self.ewma_latency is not None else None,
+            'success_count': self.success_count,
+            'failure_count': self.failure_count,
+            'consecutive_failures': self.consecutive_failures,
+            'cooldown_remaining_seconds': max(0, round(self.cooldown_until - now, 1)),
+            'last_error': self.last_error,
+        }
+
+
 class RSSHubHelper:
     """RSSHub 助手类"""
     
@@ -18,31 +54,159 @@ class RSSHubHelper:
         "https://rsshub.rssforever.com",
     ]
     
-    def __init__(self, custom_instance: Optional[str] = None):
+    # docker-compose 部署的本地实例（sources.yaml 中的大部分路由指向它）
+    LOCAL_INSTANCE = "http://localhost:1200"
+    
+    # 健康判定：连续失败多少次后进入冷却
+    FAILURE_THRESHOLD = 3
+    # 冷却时间（指数退避）：基础秒数与上限
+    COOLDOWN_BASE_SECONDS = 30
+    COOLDOWN_MAX_SECONDS = 600
+    # 没有延迟数据的实例使用的先验延迟（秒）
+    LATENCY_PRIOR_SECONDS = 2.0
+    # 首选实例在同一路由上比其他健康实例慢多少倍以上时才让位
+    PREFERRED_SLOWDOWN_FACTOR = 2.0
+    
+    def __init__(self, custom_instance: Optional[str] = None, stats: Optional[Dict[str, InstanceStats]] = None):
         """
         初始化 RSSHub 助手
         
         Args:
             custom_instance: 自定义 RSSHub 实例地址（如 http://localhost:1200）
+            stats: 已有的实例统计（切换实例时沿用）
         """
-        self.instance = custom_instance or self.DEFAULT_INSTANCES[0]
+        self.instance = (custom_instance or self.DEFAULT_INSTANCES[0]).rstrip('/')
+        self.stats: Dict[str, InstanceStats] = stats if stats is not None else {}
     
     def get_instance_url(self) -> str:
         """获取当前使用的 RSSHub 实例地址"""
         return self.instance
     
-    def replace_rsshub_domain(self, rss_url: str) -> str:
+    def get_instances(self) -> List[str]:
+        """获取可用于故障转移的全部实例（首选实例在前，去重）"""
+        instances = [self.instance, self.LOCAL_INSTANCE, *self.DEFAULT_INSTANCES]
+        return list(dict.fromkeys(instances))
+    
+    def match_instance(self, rss_url: str) -> Optional[str]:
+        """返回 URL 所属的已知 RSSHub 实例，不属于任何实例时返回 None"""
+        for instance in self.get_instances():
+            if rss_url == instance or rss_url.startswith(instance + '/'):
+                return instance
+        return None
+    
+    def replace_rsshub_domain(self, rss_url: str, target_instance: Optional[str] = None) -> str:
         """
         替换 RSS URL 中的 RSSHub 域名为自定义实例
         
         例如：https://rsshub.app/github/trending/daily 
              → http://localhost:1200/github/trending/daily
+        
+        Args:
+            rss_url: RSS 地址
+            target_instance: 目标实例，默认为当前实例
         """
-        for default_instance in self.DEFAULT_INSTANCES:
-            if rss_url.startswith(default_instance):
-                return rss_url.replace(default_instance, self.instance, 1)
+        target = (target_instance or self.instance).rstrip('/')
+        source_instance = self.match_instance(rss_url)
+        if source_instance:
+            return target + rss_url[len(source_instance):]
         return rss_url
     
+    # ===== 实例健康与延迟路由 =====
+    
+    def _get_stats(self, instance: str) -> InstanceStats:
+        if instance not in self.stats:
+            self.stats[instance] = InstanceStats(instance)
+        return self.stats[instance]
+    
+    @staticmethod
+    def _ewma(previous: Optional[float], latency: float) -> float:
+        if previous is None:
+            return latency
+        return InstanceStats.EWMA_ALPHA * latency + (1 - InstanceStats.EWMA_ALPHA) * previous
+    
+    def record_success(self, instance: str, latency: float, route: Optional[str] = None):
+        """记录一次成功请求（route 为实例地址之后的路径，用于同路由比较延迟）"""
+        stats = self._get_stats(instance)
+        stats.ewma_latency = self._ewma(stats.ewma_latency, latency)
+        if route:
+            stats.route_latency[route] = self._ewma(stats.route_latency.get(route), latency)
+        stats.success_count += 1
+        stats.consecutive_failures = 0
+        stats.cooldown_until = 0.0
+    
+    def record_failure(self, instance: str, error: str):
+        """记录一次失败请求（5xx/超时/网络错误），连续失败达到阈值后进入指数冷却"""
+        stats = self._get_stats(instance)
+        stats.failure_count += 1
+        stats.consecutive_failures += 1
+        stats.last_error = error[:200]
+        
+        overflow = stats.consecutive_failures - self.FAILURE_THRESHOLD
+        if overflow >= 0:
+            cooldown = min(self.COOLDOWN_BASE_SECONDS * (2 ** overflow), self.COOLDOWN_MAX_SECONDS)
+            stats.cooldown_until = time.monotonic() + cooldown
+    
+    def rank_instances(self, preferred: Optional[str] = None, route: Optional[str] = None) -> List[str]:
+        """
+        按健康状态和延迟对实例排序
+        
+        排序规则：健康实例优先 → 延迟低优先（同路由的 EWMA 优先，其次整体 EWMA，无数据用先验值）。
+        健康的 preferred 始终排在最前，除非它在同一路由上比另一个健康实例慢
+        PREFERRED_SLOWDOWN_FACTOR 倍以上（不同路由的延迟不可比，未测过该路由的实例不参与比较）
+        """
+        now = time.monotonic()
+        
+        def healthy(instance: str) -> bool:
+            stats = self.stats.get(instance)
+            return stats.is_healthy(now) if stats else True
+        
+        def route_latency(instance: str) -> Optional[float]:
+            stats = self.stats.get(instance)
+            return stats.route_latency.get(route) if stats and route else None
+        
+        def latency(instance: str) -> float:
+            measured = route_latency(instance)
+            if measured is not None:
+                return measured
+            stats = self.stats.get(instance)
+            if stats and stats.ewma_latency is not None:
+                return stats.ewma_latency
+            return self.LATENCY_PRIOR_SECONDS
+        
+        instances = self.get_instances()
+        ranked = sorted(instances, key=lambda instance: (not healthy(instance), latency(instance)))
+        if preferred not in instances or not healthy(preferred):
+            return ranked
+        
+        own = route_latency(preferred)
+        alternatives = [
+            route_latency(instance) for instance in instances
+            if instance != preferred and healthy(instance) and route_latency(instance) is not None
+        ]
+        if own is not None and alternatives and own > self.PREFERRED_SLOWDOWN_FACTOR * min(alternatives):
+            return ranked
+        return [preferred] + [instance for instance in ranked if instance != preferred]
+    
+    def get_candidate_urls(self, rss_url: str, max_candidates: int = 3) -> List[Tuple[str, str]]:
+        """
+        获取 RSSHub URL 的故障转移候选列表
+        
+        Returns:
+            [(instance, rewritten_url), ...]，按推荐顺序排列；非 RSSHub URL 返回空列表
+        """
+        source_instance = self.match_instance(rss_url)
+        if not source_instance:
+            return []
+        ranked = self.rank_instances(preferred=source_instance, route=rss_url[len(source_instance):])
+        return [
+            (instance, self.replace_rsshub_domain(rss_url, instance))
+            for instance in ranked[:max_candidates]
+        ]
+    
+    def get_instance_stats(self) -> List[dict]:
+        """获取所有实例的健康统计（按推荐顺序）"""
+        return [self._get_stats(instance).to_dict() for instance in self.rank_instances(self.instance)]
+    
     # ===== 常用 RSSHub 路由生成器 =====
     
     def github_trending(self, since: str = "daily", language: str = "") -> str:
@@ -159,11 +323,13 @@ def get_rsshub_helper(custom_instance: Optional[str] = None) -> RSSHubHelper:
     """获取全局 RSSHub 助手实例"""
     global _rsshub_helper
     if _rsshub_helper is None or custom_instance:
-        _rsshub_helper = RSSHubHelper(custom_instance)
+        stats = _rsshub_helper.stats if _rsshub_helper else None
+        _rsshub_helper = RSSHubHelper(custom_instance, stats=stats)
     return _rsshub_helper
 
 
 def set_rsshub_instance(instance_url: str):
-    """设置全局 RSSHub 实例地址"""
+    """设置全局 RSSHub 实例地址（保留已有的实例健康统计）"""
     global _rsshub_helper
-    _rsshub_helper = RSSHubHelper(instance_url)
+    stats = _rsshub_helper.stats if _rsshub_helper else None
+    _rsshub_helper = RSSHubHelper(instance_url, stats=stats)
@@ -0,0 +1,153 @@
+"""
+已见 URL 过滤器
+
+基于布隆过滤器记录最近见过的 canonical URL，让入库流程在任何数据库操作之前
+就能识别出"肯定是新文章"的条目：
+- 不在过滤器中 → 一定是新 URL，可直接写入
+- 在过滤器中 → 可能已存在（有极小误判率），需要再查数据库确认
+
+采用双代轮换：当前代写满后降级为上一代，更早的一代被丢弃，
+从而只保留最近的 URL，内存占用恒定。
+"""
+
+import hashlib
+import logging
+import math
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """固定容量的布隆过滤器"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 预期容纳的元素数量
+            error_rate: 容量内的目标误判率
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        """双重哈希生成 k 个比特位置"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """添加元素，返回该元素此前是否（可能）已存在"""
+        existed = True
+        for pos in self._positions(item):
+            byte_index, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte_index] & mask:
+                existed = False
+                self._bits[byte_index] |= mask
+        if not existed:
+            self.count += 1
+        return existed
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SeenURLFilter:
+    """最近已见 canonical URL 过滤器（双代轮换布隆过滤器）"""
+
+    def __init__(self, capacity: int = 200_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 每一代的容量，总共最多记住约 2 倍容量的最近 URL
+            error_rate: 单代误判率
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._current = BloomFilter(capacity, error_rate)
+        self._previous: Optional[BloomFilter] = None
+        self.warmed = False
+
+    def add(self, url: str):
+        """记录一个 canonical URL"""
+        if not url:
+            return
+        if len(self._current) >= self.capacity:
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity, self.error_rate)
+            logger.info(f"已见 URL 过滤器轮换（容量 {self.capacity}）")
+        self._current.add(url)
+
+    def update(self, urls: Iterable[str]):
+        """批量记录"""
+        for url in urls:
+            self.add(url)
+
+    def might_contain(self, url: str) -> bool:
+        """是否可能已见过（False 表示一定没见过）"""
+        if not url:
+            return False
+        return url in self._current or (self._previous is not None and url in self._previous)
+
+    def __contains__(self, url: str) -> bool:
+        return self.might_contain(url)
+
+    def clear(self):
+        """清空过滤器"""
+        self._current = BloomFilter(self.capacity, self.error_rate)
+        self._previous = None
+        self.warmed = False
+
+    def get_stats(self) -> dict:
+        """获取过滤器统计信息"""
+        return {
+            'capacity_per_generation': self.capacity,
+            'error_rate': self.error_rate,
+            'current_count': len(self._current),
+            'previous_count': len(self._previous) if self._previous else 0,
+            'memory_bytes': len(self._current._bits) * (2 if self._previous else 1),
+            'warmed': self.warmed,
+        }
+
+
+# 全局过滤器实例
+_seen_url_filter: Optional[SeenURLFilter] = None
+
+
+def get_seen_url_filter() -> SeenURLFilter:
+    """获取全局已见 URL 过滤器"""
+    global _seen_url_filter
+    if _seen_url_filter is None:
+        _seen_url_filter = SeenURLFilter()
+    return _seen_url_filter
+
+
+async def warm_seen_url_filter(db, days: int = 30) -> int:
+    """
+    启动时用数据库中最近的 canonical URL 预热过滤器
+
+    Args:
+        db: Database 实例
+        days: 加载最近多少天抓取的文章
+
+    Returns:
+        加载的 URL 数量
+    """
+    seen_filter = get_seen_url_filter()
+    urls = await db.get_recent_canonical_urls(days=days, limit=seen_filter.capacity)
+    seen_filter.update(urls)
+    seen_filter.warmed = True
+    return len(urls)
@@ -6,7 +6,7 @@ from typing import List
 from datetime import datetime, timedelta
 
 from models import Source, Article, CrawlerInterface, SourceType
-from crawler.fetcher import Fetcher
+from crawler.fetcher import Fetcher, FetchError
 from crawler.rss_parser import RSSParser
 from crawler.extractor import ContentExtractor
 
@@ -14,12 +14,13 @@ from crawler.extractor import ContentExtractor
 class CrawlerService(CrawlerInterface):
     """爬虫服务"""
     
-    def __init__(self, proxy_config: dict = None):
+    def __init__(self, proxy_config: dict = None, rsshub_hedge_delay: float = None):
         """
         Args:
             proxy_config: 代理配置，格式: {'http': 'http://host:port', 'https': 'https://host:port', 'socks5': 'socks5://host:port'}
+            rsshub_hedge_delay: RSSHub 对冲请求延迟（秒），为 None 时不对冲，只在失败后切换实例
         """
-        self.fetcher = Fetcher(proxy_config=proxy_config)
+        self.fetcher = Fetcher(proxy_config=proxy_config, hedge_delay=rsshub_hedge_delay)
         self.rss_parser = RSSParser(fetcher=self.fetcher)
         self.extractor = ContentExtractor(fetcher=self.fetcher)
     
@@ -52,22 +53,70 @@ class CrawlerService(CrawlerInterface):
         else:
             raise NotImplementedError(f"Source type {source.source_type} not supported yet")
     
+    async def fetch_incremental(
+        self,
+        source: Source,
+        hours: int = 24
+    ) -> dict:
+        """
+        增量爬取：RSS 源按高水位提前停止，只返回新条目
+        
+        Returns:
+            {
+                'articles': List[Article],
+                'high_water_mark': Optional[tuple],  # (guid, published_at)，仅 RSS
+                'reached_seen': bool  # 为 True 时窗口内的旧文章需从数据库补齐
+            }
+        """
+        if source.source_type == SourceType.RSS:
+            return await self.rss_parser.parse_incremental(source, hours)
+        
+        articles = await self.fetch(source, hours)
+        return {'articles': articles, 'high_water_mark': None, 'reached_seen': False}
+    
     async def validate_source(self, source: Source) -> bool:
         """验证信息源是否可访问"""
+        result = await self.check_source(source)
+        return result['valid']
+    
+    async def check_source(self, source: Source) -> dict:
+        """
+        探测信息源并返回详细结果（不抛出异常）
+        
+        Returns:
+            {
+                'valid': bool,
+                'status_code': Optional[int],
+                'entry_count': Optional[int],  # RSS 源的条目数
+                'error': Optional[str]
+            }
+        """
+        result = {'valid': False, 'status_code': None, 'entry_count': None, 'error': None}
         try:
             if source.source_type == SourceType.RSS:
                 # 尝试获取并解析 RSS
-                content, _ = await self.fetcher.fetch(source.url)
+                content, status_code = await self.fetcher.fetch(source.url)
+                result['status_code'] = status_code
                 import feedparser
                 feed = feedparser.parse(content)
-                return not feed.bozo or len(feed.entries) > 0
+                result['entry_count'] = len(feed.entries)
+                result['valid'] = not feed.bozo or len(feed.entries) > 0
+                if not result['valid']:
+                    result['error'] = f"RSS 解析失败: {feed.get('bozo_exception', '无有效条目')}"
             
             elif source.source_type == SourceType.WEB:
                 # 检查 URL 是否可访问
-                return await self.fetcher.check_url(source.url)
+                result['valid'] = await self.fetcher.check_url(source.url)
+                if not result['valid']:
+                    result['error'] = "URL 无法访问"
             
             else:
-                return False
+                result['error'] = f"不支持的信息源类型: {source.source_type.value}"
+        
+        except FetchError as e:
+            result['status_code'] = e.status_code
+            result['error'] = str(e)
+        except Exception as e:
+            result['error'] = str(e) or type(e).__name__
         
-        except Exception:
-            return False
+        return result
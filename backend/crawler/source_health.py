@@ -0,0 +1,82 @@
+"""
+信息源健康与熔断策略
+
+每次爬取后记录源的健康数据（连续失败、最后错误、最后成功、平均延迟、
+平均文章数），并据此决定：
+- 熔断：连续失败达到阈值后，在指数增长的冷却期内跳过该源
+- 自动禁用：连续失败次数过多时将源标记为禁用（disabled_reason = 'auto'）
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from models import Source
+
+
+# 连续失败多少次后打开熔断
+CIRCUIT_FAILURE_THRESHOLD = 3
+# 熔断冷却时间：首次 30 分钟，之后每次翻倍，最长 24 小时
+COOLDOWN_BASE_MINUTES = 30
+COOLDOWN_MAX_MINUTES = 24 * 60
+# 连续失败多少次后自动禁用
+AUTO_DISABLE_THRESHOLD = 10
+# 延迟和文章数的滑动平均系数
+EWMA_ALPHA = 0.3
+
+# 自动禁用标记（sources.disabled_reason）
+DISABLED_REASON_AUTO = 'auto'
+
+
+def ewma(previous: Optional[float], value: float, alpha: float = EWMA_ALPHA) -> float:
+    """指数加权滑动平均"""
+    if previous is None:
+        return value
+    return alpha * value + (1 - alpha) * previous
+
+
+def cooldown_for(error_count: int) -> Optional[timedelta]:
+    """根据连续失败次数计算熔断冷却时间，未达到阈值时返回 None"""
+    overflow = error_count - CIRCUIT_FAILURE_THRESHOLD
+    if overflow < 0:
+        return None
+    minutes = min(COOLDOWN_BASE_MINUTES * (2 ** overflow), COOLDOWN_MAX_MINUTES)
+    return timedelta(minutes=minutes)
+
+
+def is_circuit_open(source: Source, now: Optional[datetime] = None) -> bool:
+    """源是否处于熔断冷却期"""
+    if not source.circuit_open_until:
+        return False
+    return (now or datetime.now()) < source.circuit_open_until
+
+
+def split_by_circuit(sources: List[Source]) -> Tuple[List[Source], List[Source]]:
+    """
+    按熔断状态拆分信息源
+
+    Returns:
+        (可爬取的源, 熔断中被跳过的源)
+    """
+    now = datetime.now()
+    available, skipped = [], []
+    for source in sources:
+        (skipped if is_circuit_open(source, now) else available).append(source)
+    return available, skipped
+
+
+def health_status(source: Source, now: Optional[datetime] = None) -> str:
+    """
+    汇总健康状态
+
+    Returns:
+        'disabled' | 'circuit_open' | 'failing' | 'healthy' | 'unknown'
+    """
+    if not source.enabled:
+        return 'disabled'
+    if is_circuit_open(source, now):
+        return 'circuit_open'
+    if source.error_count > 0:
+        return 'failing'
+    if source.last_success_at:
+        return 'healthy'
+    return 'unknown'
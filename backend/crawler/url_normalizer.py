@@ -0,0 +1,170 @@
+"""
+URL 规范化
+
+将同一篇文章的不同 URL 写法归一为 canonical URL，用于去重：
+- 协议统一为 https，主机名小写，去掉默认端口、www. 前缀
+- 去除 utm_* 等追踪参数，剩余参数排序
+- 去除片段（#...）和路径末尾的斜杠
+- RSSHub 包装链接：解包 url= 参数，或统一 RSSHub 实例域名
+- 按域名的特殊规则（只保留决定文章身份的参数）
+"""
+
+from typing import Optional, Dict, Set
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+
+# 追踪参数（精确匹配，小写）：只收录在任何站点都不决定文章身份的参数。
+# from / source / ref / feed 等通用参数名在部分站点是内容 ID，只在 DOMAIN_RULES 中按站点去除
+TRACKING_PARAMS: Set[str] = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'spm', 'scm', 'ref_src', 'ref_url', 'referer',
+    'share_source', 'share_medium', 'share_plat', 'share_session_id', 'share_from',
+    'share_token', 'sharer_shareid', 'vd_source', 'unique_k',
+    'mc_cid', 'mc_eid', '_hsenc', '_hsmi', 'isappinstalled',
+    'wfr', 'scene', 'chksm', 'ncid', 'cmpid', 'srcid', 'wechat_redirect',
+}
+
+# 追踪参数前缀（小写）
+TRACKING_PARAM_PREFIXES = ('utm_', 'hmsr', 'hmpl', 'hmcu', 'hmkw', 'hmci', 'pk_', 'mtm_')
+
+# 搜索词等决定页面身份的参数，任何规则下都保留（热搜、站内搜索链接只靠它区分）
+IDENTITY_PARAMS: Set[str] = {'q', 'query', 'keyword', 'keywords', 'kw', 'wd', 'word', 'search_text'}
+
+# 按域名的规则（默认只匹配该主机及 strip_prefixes 对应的移动版主机）：
+#   keep_params: 只保留这些参数（None 表示按通用规则处理）
+#   strip_params: 通用规则之外，在该站点已知为追踪用途的参数（keep_params 为 None 时生效）
+#   strip_prefixes: 需要去掉的主机前缀（移动版域名等）
+#   subdomains: 为 True 时同样适用于所有子域名
+DOMAIN_RULES: Dict[str, Dict] = {
+    'medium.com': {'strip_params': {'source'}, 'subdomains': True},  # RSS 链接带 ?source=rss----...
+    'sina.com.cn': {'strip_params': {'from'}, 'subdomains': True},  # 移动端跳转 ?from=wap
+    'sina.cn': {'strip_params': {'from'}, 'subdomains': True},
+    'mp.weixin.qq.com': {'keep_params': {'__biz', 'mid', 'idx', 'sn'}},
+    'youtube.com': {'keep_params': {'v', 'list'}, 'strip_prefixes': ('m.',)},
+    'bilibili.com': {'keep_params': {'p'}, 'strip_prefixes': ('m.',)},
+    'zhihu.com': {'keep_params': set()},
+    'zhuanlan.zhihu.com': {'keep_params': set()},
+    'weibo.com': {'keep_params': set(), 'strip_prefixes': ('m.',)},
+    'weibo.cn': {'keep_params': set(), 'strip_prefixes': ('m.',)},
+    'douban.com': {'keep_params': set(), 'strip_prefixes': ('m.',), 'subdomains': True},
+    'news.ycombinator.com': {'keep_params': {'id'}},
+    'v2ex.com': {'keep_params': set()},
+    'github.com': {'keep_params': set()},
+}
+
+# RSSHub 包装链接统一到的主机名
+RSSHUB_CANONICAL_HOST = 'rsshub.app'
+
+# 用于解包的 URL 参数名
+WRAPPED_URL_PARAMS = ('url', 'target', 'link', 'u')
+
+
+def _rsshub_hosts() -> Set[str]:
+    """已知的 RSSHub 实例主机名（含当前配置的实例）"""
+    from crawler.rsshub_helper import get_rsshub_helper
+
+    hosts = {urlsplit(instance).netloc.lower() for instance in get_rsshub_helper().get_instances()}
+    hosts.add('127.0.0.1:1200')
+    return hosts
+
+
+def _is_tracking_param(name: str) -> bool:
+    """判断是否为追踪参数"""
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PARAM_PREFIXES)
+
+
+def _normalize_host(host: str, port: Optional[int], scheme: str) -> str:
+    """主机名小写、去掉默认端口和 www. 前缀"""
+    host = host.lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        return f"{host}:{port}"
+    return host
+
+
+def _match_domain_rule(host: str) -> Optional[Dict]:
+    """按主机名匹配域名规则（s.weibo.com、search.bilibili.com 等其他子域名不套用主站规则）"""
+    bare_host = host.split(':', 1)[0]
+    for domain, rule in DOMAIN_RULES.items():
+        if bare_host == domain:
+            return rule
+        for prefix in rule.get('strip_prefixes', ()):
+            if bare_host == prefix + domain:
+                return rule
+        if rule.get('subdomains') and bare_host.endswith('.' + domain):
+            return rule
+    return None
+
+
+def _unwrap(url: str, rsshub_hosts: Set[str]) -> str:
+    """解包 RSSHub 等跳转链接中嵌入的原始 URL"""
+    parts = urlsplit(url)
+    if parts.netloc.lower() not in rsshub_hosts:
+        return url
+    for name, value in parse_qsl(parts.query, keep_blank_values=False):
+        if name.lower() in WRAPPED_URL_PARAMS:
+            candidate = unquote(value).strip()
+            if candidate.startswith(('http://', 'https://')):
+                return candidate
+    return url
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    计算 URL 的规范形式
+
+    无法解析的 URL 原样返回（去除首尾空白），保证总有可用的去重键。
+
+    Examples:
+        >>> canonicalize_url('http://www.Example.com/a/?utm_source=rss&b=2&a=1#top')
+        'https://example.com/a?a=1&b=2'
+    """
+    if not url:
+        return url
+    url = url.strip()
+
+    try:
+        rsshub_hosts = _rsshub_hosts()
+        url = _unwrap(url, rsshub_hosts)
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in ('http', 'https') or not parts.hostname:
+            return url
+
+        raw_netloc = parts.netloc.lower().rsplit('@', 1)[-1]
+        if raw_netloc in rsshub_hosts:
+            host = RSSHUB_CANONICAL_HOST
+        else:
+            host = _normalize_host(parts.hostname, parts.port, scheme)
+
+        rule = _match_domain_rule(host)
+        if rule:
+            for prefix in rule.get('strip_prefixes', ()):
+                if host.startswith(prefix):
+                    host = host[len(prefix):]
+                    break
+
+        # 查询参数：去追踪参数，按域名规则过滤，排序
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        keep_params = rule.get('keep_params') if rule else None
+        if keep_params is not None:
+            params = [(k, v) for k, v in params if k in keep_params or k.lower() in IDENTITY_PARAMS]
+        else:
+            strip_params = rule.get('strip_params', set()) if rule else set()
+            params = [
+                (k, v) for k, v in params
+                if not _is_tracking_param(k) and k.lower() not in strip_params
+            ]
+        query = urlencode(sorted(params))
+
+        # 路径：空路径视为 /，非根路径去掉末尾斜杠
+        path = parts.path or '/'
+        if len(path) > 1:
+            path = path.rstrip('/') or '/'
+
+        return urlunsplit(('https', host, path, query, ''))
+
+    except ValueError:
+        return url
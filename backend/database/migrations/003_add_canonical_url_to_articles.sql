@@ -0,0 +1,7 @@
+-- 迁移：为 articles 表添加 canonical_url 字段
+-- 原因：URL 去重只靠精确匹配，utm 参数、末尾斜杠、http/https、RSSHub 包装链接会产生重复文章
+-- 注意：Database.initialize() 会自动补齐该列并回填历史数据，此脚本供手动迁移使用
+
+ALTER TABLE articles ADD COLUMN canonical_url TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_articles_canonical_url ON articles(canonical_url);
@@ -0,0 +1,14 @@
+-- 迁移：为 sources 表添加健康统计字段
+-- 原因：Source.last_error / error_count 未持久化，每次爬取都会重复请求失效路由
+-- 注意：Database.initialize() 会自动补齐这些列，此脚本供手动迁移使用
+
+ALTER TABLE sources ADD COLUMN last_error TEXT;
+ALTER TABLE sources ADD COLUMN error_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE sources ADD COLUMN last_success_at TIMESTAMP;
+ALTER TABLE sources ADD COLUMN mean_latency_ms REAL;
+ALTER TABLE sources ADD COLUMN avg_articles_per_fetch REAL;
+ALTER TABLE sources ADD COLUMN fetch_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE sources ADD COLUMN circuit_open_until TIMESTAMP;
+ALTER TABLE sources ADD COLUMN disabled_reason TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_sources_error_count ON sources(error_count);
@@ -0,0 +1,6 @@
+-- 迁移：为 sources 表添加下载字节统计
+-- 原因：Fetcher 改为流式下载并限制单次请求大小，需要按源观察传输量
+-- 注意：Database.initialize() 会自动补齐这些列，此脚本供手动迁移使用
+
+ALTER TABLE sources ADD COLUMN avg_bytes_per_fetch REAL;
+ALTER TABLE sources ADD COLUMN total_bytes_downloaded INTEGER NOT NULL DEFAULT 0;
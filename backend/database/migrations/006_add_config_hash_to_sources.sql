@@ -0,0 +1,6 @@
+-- 迁移：为 sources 表添加配置定义哈希
+-- 原因：启动时按差量同步 sources.yaml，只更新定义有变化的源；
+--       config_hash 非空表示该源由配置文件管理，从 YAML 中移除时会被禁用
+-- 注意：Database.initialize() 会自动补齐该列，此脚本供手动迁移使用
+
+ALTER TABLE sources ADD COLUMN config_hash TEXT;
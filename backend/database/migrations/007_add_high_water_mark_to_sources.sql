@@ -0,0 +1,7 @@
+-- 迁移：为 sources 表添加增量爬取高水位
+-- 原因：倒序 feed 遇到上次已入库的条目即可停止解析，稳态爬取只处理新条目
+-- 注意：Database.initialize() 会自动补齐这些列，此脚本供手动迁移使用
+
+ALTER TABLE sources ADD COLUMN last_seen_guid TEXT;
+ALTER TABLE sources ADD COLUMN last_seen_published_at TIMESTAMP;
+ALTER TABLE sources ADD COLUMN seen_since TIMESTAMP;
@@ -0,0 +1,6 @@
+-- 迁移：为 sources 表添加自适应爬取间隔
+-- 原因：所有源统一 24 小时间隔，高频源不够新鲜、低频源浪费请求；改为按发布频率学习
+-- 注意：Database.initialize() 会自动补齐这些列，此脚本供手动迁移使用
+
+ALTER TABLE sources ADD COLUMN mean_publish_interval_minutes REAL;
+ALTER TABLE sources ADD COLUMN learned_interval_minutes REAL;
@@ -0,0 +1,17 @@
+-- 迁移：新增 LLM 响应缓存表
+-- 原因：相同文章、相同模型与提示词的重复分析（如 UI 超时后重试）每次都要重新付费调用 LLM
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建该表，此脚本供手动迁移使用
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    llm_backend TEXT NOT NULL,
+    llm_model TEXT,
+    response_text TEXT NOT NULL,
+    token_usage INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL,
+    last_hit_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_created ON llm_response_cache(created_at);
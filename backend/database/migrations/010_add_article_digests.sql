@@ -0,0 +1,11 @@
+-- 迁移：新增文章摘要缓存表
+-- 原因：同一篇热门文章会出现在多个每日/自定义分类分析中，每次都重新发送原文；改为生成一次摘要后复用
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建该表，此脚本供手动迁移使用
+
+CREATE TABLE IF NOT EXISTS article_digests (
+    content_hash TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    llm_backend TEXT,
+    llm_model TEXT,
+    created_at TIMESTAMP NOT NULL
+);
@@ -0,0 +1,11 @@
+-- 迁移：新增文章 token 数缓存表
+-- 原因：成本估算每次都重新编码所选文章的全部正文，1000 篇文章的估算耗时明显；改为按内容哈希持久化 token 数
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建该表，此脚本供手动迁移使用
+
+CREATE TABLE IF NOT EXISTS article_token_counts (
+    content_hash TEXT NOT NULL,
+    encoding TEXT NOT NULL,
+    token_count INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (content_hash, encoding)
+);
@@ -0,0 +1,5 @@
+-- 迁移：为 analyses 表添加 LLM 调用尝试记录
+-- 原因：重试、对冲与跨后端故障转移的每次尝试随分析结果保存，便于排查失败与延迟
+-- 注意：Database.initialize() 会自动补齐该列，此脚本供手动迁移使用
+
+ALTER TABLE analyses ADD COLUMN llm_attempts TEXT;
@@ -0,0 +1,5 @@
+-- 迁移：为 analyses 表添加提示词打包统计
+-- 原因：记录每次分析的输入 token 数，以及按主题聚类折叠重复报道节省的 token
+-- 注意：Database.initialize() 会自动补齐该列，此脚本供手动迁移使用
+
+ALTER TABLE analyses ADD COLUMN prompt_stats TEXT;
@@ -0,0 +1,20 @@
+-- 迁移：新增分析前预排序得分表
+-- 原因：一键情报先按显著性、跨源覆盖、新颖度与来源优先级筛选文章，保存每篇候选的得分便于排查筛选结果
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建该表，此脚本供手动迁移使用
+
+CREATE TABLE IF NOT EXISTS analysis_article_scores (
+    analysis_id TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    score REAL NOT NULL,
+    salience REAL NOT NULL,
+    coverage REAL NOT NULL,
+    novelty REAL NOT NULL,
+    priority REAL NOT NULL,
+    tokens INTEGER,
+    selected INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (analysis_id, article_id),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_analysis_article_scores_analysis ON analysis_article_scores(analysis_id, rank);
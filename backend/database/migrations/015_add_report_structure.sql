@@ -0,0 +1,41 @@
+-- 迁移：新增报告结构表（章节、条目、条目引用的文章）
+-- 原因：趋势 / 信号 / 信息差只存在于 Markdown 报告中，趋势洞察与检索每次都要重新读取并发送完整报告；保存分析时解析一次并建立索引
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建这些表，此脚本供手动迁移使用；已有分析可运行 scripts/backfill_report_structure.py 补齐
+
+CREATE TABLE IF NOT EXISTS report_sections (
+    analysis_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    path TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, position),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS report_items (
+    analysis_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    section_position INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    headline TEXT NOT NULL,
+    body TEXT NOT NULL,
+    score REAL NOT NULL,
+    score_source TEXT NOT NULL,
+    citations TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, position),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_items_kind ON report_items(kind, score DESC);
+
+CREATE TABLE IF NOT EXISTS report_item_articles (
+    analysis_id TEXT NOT NULL,
+    item_position INTEGER NOT NULL,
+    article_id TEXT NOT NULL,
+    PRIMARY KEY (analysis_id, item_position, article_id),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_item_articles_article ON report_item_articles(article_id);
@@ -0,0 +1,15 @@
+-- 迁移：新增滚动趋势洞察状态表
+-- 原因：趋势洞察每次都重新发送所选的全部报告，30 天视图的提示词很大且每天从头计算；改为按行业保存滚动状态，只发送新增分析
+-- 注意：Database.initialize() 执行 schema.sql 时会自动创建该表，此脚本供手动迁移使用
+
+CREATE TABLE IF NOT EXISTS rolling_trend_states (
+    industry TEXT PRIMARY KEY,
+    insight_id TEXT,
+    window_days INTEGER NOT NULL,
+    window_analyses TEXT NOT NULL,
+    last_analysis_at TIMESTAMP,
+    update_count INTEGER NOT NULL DEFAULT 0,
+    total_token_usage INTEGER NOT NULL DEFAULT 0,
+    last_token_usage INTEGER,
+    updated_at TIMESTAMP NOT NULL
+);
@@ -32,6 +32,29 @@ CREATE TABLE IF NOT EXISTS sources (
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     metadata TEXT,  -- JSON string for extra config
     
+    -- 健康统计
+    last_error TEXT,                            -- 最后一次错误信息
+    error_count INTEGER NOT NULL DEFAULT 0,     -- 连续失败次数
+    last_success_at TIMESTAMP,                  -- 最后一次成功爬取时间
+    mean_latency_ms REAL,                       -- 爬取延迟滑动平均（毫秒）
+    avg_articles_per_fetch REAL,                -- 每次爬取文章数滑动平均
+    fetch_count INTEGER NOT NULL DEFAULT 0,     -- 累计爬取次数
+    circuit_open_until TIMESTAMP,               -- 熔断冷却截止时间
+    disabled_reason TEXT,                       -- 禁用原因（'auto' = 连续失败自动禁用）
+    avg_bytes_per_fetch REAL,                   -- 每次爬取下载字节数滑动平均
+    total_bytes_downloaded INTEGER NOT NULL DEFAULT 0,  -- 累计下载字节数
+    
+    config_hash TEXT,                           -- sources.yaml 定义的哈希（NULL 表示非配置文件管理的源）
+    
+    -- 增量爬取高水位
+    last_seen_guid TEXT,                        -- 已入库的最新条目 GUID（缺失时为链接）
+    last_seen_published_at TIMESTAMP,           -- 已入库的最新条目发布时间
+    seen_since TIMESTAMP,                       -- 从该时间起的条目已连续入库
+    
+    -- 自适应爬取间隔
+    mean_publish_interval_minutes REAL,         -- 文章发布间隔滑动平均（分钟）
+    learned_interval_minutes REAL,              -- 学习到的爬取间隔（分钟）
+    
     CHECK (length(name) > 0 AND length(name) <= 200),
     CHECK (length(url) > 0),
     CHECK (source_type IN ('rss', 'web', 'api')),
@@ -42,6 +65,7 @@ CREATE TABLE IF NOT EXISTS sources (
 CREATE INDEX IF NOT EXISTS idx_sources_industry ON sources(industry);
 CREATE INDEX IF NOT EXISTS idx_sources_enabled ON sources(enabled);
 CREATE INDEX IF NOT EXISTS idx_sources_type ON sources(source_type);
+CREATE INDEX IF NOT EXISTS idx_sources_error_count ON sources(error_count);
 
 
 -- ============================================================================
@@ -90,6 +114,7 @@ CREATE TABLE IF NOT EXISTS articles (
     id TEXT PRIMARY KEY,
     title TEXT NOT NULL,
     url TEXT NOT NULL UNIQUE,  -- URL 作为去重依据
+    canonical_url TEXT,        -- 规范化 URL（去追踪参数、统一协议/域名），跨写法去重
     source_id TEXT,
     source_name TEXT,
     
@@ -129,6 +154,7 @@ CREATE INDEX IF NOT EXISTS idx_articles_industry ON articles(industry);
 CREATE INDEX IF NOT EXISTS idx_articles_source_id ON articles(source_id);
 CREATE INDEX IF NOT EXISTS idx_articles_archived ON articles(archived);
 CREATE INDEX IF NOT EXISTS idx_articles_url ON articles(url);
+CREATE INDEX IF NOT EXISTS idx_articles_canonical_url ON articles(canonical_url);
 
 -- 全文搜索索引（SQLite FTS5）
 CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
@@ -194,6 +220,8 @@ CREATE TABLE IF NOT EXISTS analyses (
     llm_model TEXT,
     token_usage INTEGER,
     estimated_cost REAL,
+    llm_attempts TEXT,  -- JSON array，每次 LLM 调用尝试（重试、对冲、故障转移）
+    prompt_stats TEXT,  -- JSON，提示词打包统计（输入 token、主题聚类节省的 token）
     
     -- 时间
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -232,6 +260,73 @@ CREATE INDEX IF NOT EXISTS idx_analysis_articles_analysis ON analysis_articles(a
 CREATE INDEX IF NOT EXISTS idx_analysis_articles_article ON analysis_articles(article_id);
 
 
+-- ============================================================================
+-- 分析前预排序得分表（每篇候选文章一行，含未被选中的文章）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS analysis_article_scores (
+    analysis_id TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    rank INTEGER NOT NULL,  -- 贪心选择顺序（1 为最先选中）
+    score REAL NOT NULL,  -- 综合得分
+    salience REAL NOT NULL,  -- 与本批文章质心的相似度（归一化）
+    coverage REAL NOT NULL,  -- 跨源覆盖（归一化）
+    novelty REAL NOT NULL,  -- 1 - 与近期已分析文章的最大相似度
+    priority REAL NOT NULL,  -- 信息源优先级权重
+    tokens INTEGER,  -- 按 token 预算筛选时的提示词 token 数
+    selected INTEGER NOT NULL DEFAULT 0,  -- 是否被选入分析
+    
+    PRIMARY KEY (analysis_id, article_id),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_analysis_article_scores_analysis ON analysis_article_scores(analysis_id, rank);
+
+
+-- ============================================================================
+-- 报告结构表（保存分析时由 Markdown 报告解析，供趋势洞察、检索与看板直接查询）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS report_sections (
+    analysis_id TEXT NOT NULL,
+    position INTEGER NOT NULL,  -- 章节在报告中的顺序
+    level INTEGER NOT NULL,  -- 标题层级（0 为首个标题前的导语）
+    heading TEXT NOT NULL,
+    path TEXT NOT NULL,  -- 标题路径，如 "投资与趋势 / 趋势洞察"
+    kind TEXT NOT NULL,  -- trend / signal / gap / other
+    content TEXT NOT NULL,
+    
+    PRIMARY KEY (analysis_id, position),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS report_items (
+    analysis_id TEXT NOT NULL,
+    position INTEGER NOT NULL,  -- 条目在报告中的顺序
+    section_position INTEGER NOT NULL,
+    kind TEXT NOT NULL,  -- trend / signal / gap / other（继承所在章节）
+    headline TEXT NOT NULL,
+    body TEXT NOT NULL,
+    score REAL NOT NULL,  -- 0-1
+    score_source TEXT NOT NULL,  -- explicit（报告中的评分）/ citations（按引用数估计）
+    citations TEXT NOT NULL,  -- JSON 数组：引用编号 [n]
+    
+    PRIMARY KEY (analysis_id, position),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_items_kind ON report_items(kind, score DESC);
+
+CREATE TABLE IF NOT EXISTS report_item_articles (
+    analysis_id TEXT NOT NULL,
+    item_position INTEGER NOT NULL,
+    article_id TEXT NOT NULL,
+    
+    PRIMARY KEY (analysis_id, item_position, article_id),
+    FOREIGN KEY (analysis_id) REFERENCES analyses(id) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_report_item_articles_article ON report_item_articles(article_id);
+
+
 -- ============================================================================
 -- 趋势洞察表（跨报告趋势分析）
 -- ============================================================================
@@ -254,6 +349,22 @@ CREATE INDEX IF NOT EXISTS idx_trend_insights_industry ON trend_insights(industr
 CREATE INDEX IF NOT EXISTS idx_trend_insights_created ON trend_insights(created_at DESC);
 
 
+-- ============================================================================
+-- 滚动趋势洞察状态表（每个行业一行，增量更新时只发送新增分析）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS rolling_trend_states (
+    industry TEXT PRIMARY KEY,
+    insight_id TEXT,  -- 最新一版趋势洞察
+    window_days INTEGER NOT NULL,
+    window_analyses TEXT NOT NULL,  -- JSON 数组：窗口内已纳入的分析 [{id, created_at}]
+    last_analysis_at TIMESTAMP,  -- 已纳入的最新分析的创建时间，下次只取此后的分析
+    update_count INTEGER NOT NULL DEFAULT 0,
+    total_token_usage INTEGER NOT NULL DEFAULT 0,
+    last_token_usage INTEGER,
+    updated_at TIMESTAMP NOT NULL
+);
+
+
 -- ============================================================================
 -- 趋势洞察-分析报告关联表（多对多）
 -- ============================================================================
@@ -271,6 +382,48 @@ CREATE INDEX IF NOT EXISTS idx_trend_insight_sources_insight ON trend_insight_so
 CREATE INDEX IF NOT EXISTS idx_trend_insight_sources_analysis ON trend_insight_sources(analysis_id);
 
 
+-- ============================================================================
+-- LLM 响应缓存（按内容寻址：后端、模型、提示词与生成参数的哈希）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    llm_backend TEXT NOT NULL,
+    llm_model TEXT,
+    response_text TEXT NOT NULL,
+    token_usage INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL,
+    last_hit_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_created ON llm_response_cache(created_at);
+
+
+-- ============================================================================
+-- 文章摘要缓存（按文章标题+正文的哈希，跨分析复用）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS article_digests (
+    content_hash TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    llm_backend TEXT,
+    llm_model TEXT,
+    created_at TIMESTAMP NOT NULL
+);
+
+
+-- ============================================================================
+-- 文章 token 数缓存（按内容哈希与编码，成本估算时不必重新编码）
+-- ============================================================================
+CREATE TABLE IF NOT EXISTS article_token_counts (
+    content_hash TEXT NOT NULL,
+    encoding TEXT NOT NULL,  -- tiktoken 编码名，编码器不可用时为 estimate
+    token_count INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (content_hash, encoding)
+);
+
+
 -- ============================================================================
 -- 配置表（键值对存储）
 -- ============================================================================
@@ -4,8 +4,9 @@ LLM 适配器基类与工厂
 定义统一的 LLM 接口，支持多种后端
 """
 
-import tiktoken
-from typing import List, Optional
+import copy
+import logging
+from typing import AsyncIterator, Dict, List, Optional
 from abc import ABC, abstractmethod
 from datetime import datetime
 
@@ -15,11 +16,22 @@ from models import (
 )
 from prompts import get_prompt_manager
 from utils.proxy_helper import ProxyHelper
+from llm.response_cache import LLMResponseCache, make_cache_key
+from llm.article_digest import article_content_hash
+from llm.prompt_packer import pack_articles, DEFAULT_CONTEXT_WINDOW, DEFAULT_MAX_OUTPUT_TOKENS
+from llm.token_counter import count_tokens, count_tokens_cached, encoding_for_model, estimate_tokens
+from llm.resilience import ResiliencePolicy
+from llm.rate_limiter import get_llm_rate_limiters, DEFAULT_OUTPUT_ESTIMATE
+from llm.article_clustering import cluster_articles, CLUSTER_MIN_ARTICLES
 
+logger = logging.getLogger(__name__)
 
 class BaseLLMAdapter(LLMAdapterInterface, ABC):
     """LLM 适配器基类"""
     
+    # 未指定模型时使用的默认模型（子类覆盖）
+    DEFAULT_MODEL: Optional[str] = None
+    
     # 行业中文名称映射
     INDUSTRY_NAME_MAP = {
         "daily_info_gap": "每日信息差",
@@ -56,6 +68,103 @@ class BaseLLMAdapter(LLMAdapterInterface, ABC):
         # 向后兼容：如果没有 proxy_config 但有 proxy_url
         if self.proxy_url is None and proxy_url:
             self.proxy_url = proxy_url
+        
+        # LLM 响应缓存（由 Analyzer 等调用方按需启用）
+        self.response_cache: Optional[LLMResponseCache] = None
+        
+        # 文章摘要 {content_hash: digest}（由 Analyzer 按需填充）
+        self.article_digests: Dict[str, str] = {}
+        
+        # 重试 / 对冲策略（由 Analyzer 按需设置）与每次调用尝试的记录
+        self.resilience: Optional[ResiliencePolicy] = None
+        self.attempts: List[dict] = []
+        
+        # 是否按主题聚类组织提示词（由 Analyzer 按需开启）与最近一次打包的统计
+        self.cluster_articles = False
+        self.prompt_stats: Optional[dict] = None
+    
+    def fork(self) -> "BaseLLMAdapter":
+        """请求级浅拷贝：共享底层客户端与连接池，响应缓存、文章摘要等请求状态独立"""
+        forked = copy.copy(self)
+        forked.response_cache = None
+        forked.article_digests = {}
+        forked.resilience = None
+        forked.attempts = []
+        forked.cluster_articles = False
+        forked.prompt_stats = None
+        return forked
+    
+    async def aclose(self):
+        """关闭底层客户端（由客户端注册表在失效或应用关闭时调用）"""
+        pass
+    
+    def _http_client_kwargs(self) -> dict:
+        """httpx.AsyncClient 的代理参数：配置了代理池时使用代理池 transport，否则使用单个代理"""
+        if ProxyHelper.get_pool_urls(self.proxy_config):
+            return ProxyHelper.build_httpx_client_kwargs(self.proxy_config)
+        if self.proxy_url:
+            return {'proxies': {'http://': self.proxy_url, 'https://': self.proxy_url}}
+        return {}
+    
+    def _article_prompt_content(self, article: Article, max_content: int) -> str:
+        """提示词中的文章内容：有摘要时使用摘要，否则截断原文"""
+        if self.article_digests:
+            digest = self.article_digests.get(article_content_hash(article))
+            if digest:
+                return digest
+        
+        content = article.content[:max_content]
+        if len(article.content) > max_content:
+            content += "..."
+        return content
+    
+    def _pack_articles_text(
+        self,
+        articles: List[Article],
+        overhead_texts: List[str],
+        time_format: str = '%m-%d %H:%M'
+    ) -> str:
+        """按模型上下文窗口与输出上限（get_model_info）分配 token 预算，生成文章列表文本
+        
+        Args:
+            articles: 文章列表
+            overhead_texts: 同一次调用中的其余提示词（系统提示词、任务说明等）
+            time_format: 时间显示格式
+        """
+        model_info = self.get_model_info()
+        options = dict(
+            context_window=model_info.get('context_window', DEFAULT_CONTEXT_WINDOW),
+            max_output_tokens=model_info.get('max_output_tokens', DEFAULT_MAX_OUTPUT_TOKENS),
+            digests=self.article_digests,
+            time_format=time_format,
+            encoding_name=encoding_for_model(model_info.get('backend'), self.model)
+        )
+        
+        clusters = None
+        if self.cluster_articles and len(articles) >= CLUSTER_MIN_ARTICLES:
+            clusters = cluster_articles(articles)
+            if all(len(c['members']) == 1 for c in clusters):
+                clusters = None
+        
+        packed = pack_articles(articles, overhead_texts, clusters=clusters, **options)
+        self.prompt_stats = {
+            'articles': len(articles),
+            'prompt_tokens': packed['prompt_tokens'],
+            'truncated': packed['truncated'],
+            'title_only': packed['title_only'],
+            'clusters': sum(1 for c in clusters if len(c['members']) > 1) if clusters else 0,
+            'collapsed': packed['collapsed'],
+        }
+        if clusters:
+            # 与不分组的打包结果比较，记录聚类节省的输入 token
+            flat = pack_articles(articles, overhead_texts, **options)
+            self.prompt_stats['flat_prompt_tokens'] = flat['prompt_tokens']
+            self.prompt_stats['tokens_saved'] = flat['prompt_tokens'] - packed['prompt_tokens']
+            logger.info(
+                f"主题聚类: {self.prompt_stats['clusters']} 组，折叠 {packed['collapsed']} 篇，"
+                f"输入 {flat['prompt_tokens']} → {packed['prompt_tokens']} tokens"
+            )
+        return packed['text']
     
     def estimate_cost(self, articles: List[Article]) -> dict:
         """估算分析成本"""
@@ -74,25 +183,17 @@ class BaseLLMAdapter(LLMAdapterInterface, ABC):
         }
     
     def _estimate_tokens(self, articles: List[Article]) -> int:
-        """估算 token 数量"""
-        # 简单估算：文章内容 + 系统提示
-        total_text = ""
-        for article in articles:
-            total_text += f"{article.title}\n{article.content}\n\n"
+        """估算 token 数量（逐篇计数并按内容哈希缓存，异步持久化版本见 llm/token_accounting.py）"""
+        encoding_name = encoding_for_model(self.get_model_info().get('backend'), self.model)
+        content_tokens = sum(
+            count_tokens_cached(f"content:{article_content_hash(article)}", article.content, encoding_name)
+            + count_tokens(article.title, encoding_name)
+            for article in articles
+        )
         
         # 加上系统提示词（约 500 tokens）
         system_prompt_tokens = 500
-        
-        # 使用 tiktoken 估算（如果可用）
-        try:
-            encoding = tiktoken.get_encoding("cl100k_base")
-            content_tokens = len(encoding.encode(total_text))
-            return content_tokens + system_prompt_tokens
-        except Exception:
-            # 简单估算：中文约 1.5 字/token，英文约 0.25 词/token
-            char_count = len(total_text)
-            estimated_tokens = int(char_count / 1.5)
-            return estimated_tokens + system_prompt_tokens
+        return content_tokens + system_prompt_tokens
     
     def _get_report_title_format(self, industry: Optional[IndustryCategory] = None) -> str:
         """生成报告标题格式提示
@@ -147,31 +248,7 @@ class BaseLLMAdapter(LLMAdapterInterface, ABC):
         """
         prompt_manager = get_prompt_manager()
         
-        # 根据文章数量动态调整内容长度
         article_count = len(articles)
-        if article_count <= 20:
-            max_content_length = 1000  # 允许较长内容
-        elif article_count <= 50:
-            max_content_length = 600   # 中等压缩
-        elif article_count <= 100:
-            max_content_length = 400   # 高度压缩
-        else:
-            max_content_length = 300   # 极度压缩
-        
-        # 构建文章列表（压缩版）
-        articles_text = f"# 待分析信息源（共 {article_count} 条）\n\n"
-        
-        for i, article in enumerate(articles, 1):
-            # 压缩内容
-            content = article.content[:max_content_length]
-            if len(article.content) > max_content_length:
-                content += "..."
-            
-            articles_text += f"""### [{i}] {article.title}
-- 来源: {article.source_name} | 时间: {article.published_at.strftime('%Y-%m-%d %H:%M')} | 行业: {article.industry.value}
-- 内容: {content}
-
-"""
         
         # 分析指令 - 支持自定义或品类化prompt
         if custom_prompt:
@@ -231,11 +308,28 @@ class BaseLLMAdapter(LLMAdapterInterface, ABC):
 **引用要求**：提到具体事实、数据或观点时，必须用 `[数字]` 标注来源（如 `[1]`、`[2][3]`），数字对应上方信息源列表的编号。
 """
         
+        # 按模型上下文窗口的 token 预算构建文章列表
+        articles_text = self._pack_articles_text(
+            articles,
+            [self._build_system_prompt(analysis_type, industry), task_description, format_instructions],
+            time_format='%Y-%m-%d %H:%M'
+        )
+        
         return f"""{task_description}
 
 {articles_text}
 {format_instructions}"""
     
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """流式补全：逐段返回生成的文本（不支持流式的后端一次性返回完整结果）"""
+        result = await self.complete(system_prompt, user_prompt, max_tokens=max_tokens)
+        yield result['text']
+    
     @abstractmethod
     async def analyze(
         self,
@@ -254,10 +348,101 @@ class BaseLLMAdapter(LLMAdapterInterface, ABC):
         """
         pass
     
+    async def complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """单次补全调用（分析、分块摘要等共用），启用响应缓存时先查缓存
+        
+        Args:
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            max_tokens: 最大输出 token 数，为 None 时使用模型默认上限
+        
+        Returns:
+            {'text': 响应文本, 'token_usage': 本次消耗的 token 数, 'cached': 是否命中缓存, ...}
+        """
+        cache = self.response_cache
+        if cache is None:
+            return {**await self._call(system_prompt, user_prompt, max_tokens), 'cached': False}
+        
+        backend = self.get_model_info()['backend']
+        cache_key = make_cache_key(
+            backend, self.model, system_prompt, user_prompt,
+            self._generation_options(max_tokens)
+        )
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            # 命中缓存不消耗 token
+            return {'text': cached['text'], 'token_usage': 0, 'cached': True}
+        
+        result = await self._call(system_prompt, user_prompt, max_tokens)
+        # 只缓存明确正常结束的响应；被截断（length）或未给出结束原因的响应不缓存
+        if result.get('finish_reason') == 'stop':
+            await cache.put(cache_key, backend, self.model, result)
+        return {**result, 'cached': False}
+    
+    def _generation_options(self, max_tokens: Optional[int] = None) -> dict:
+        """实际请求使用的生成参数（计入响应缓存键），子类按各自请求中的参数覆盖"""
+        return {'max_tokens': max_tokens, 'temperature': 0.3}
+    
+    async def _call(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """调用 _complete：每次尝试都经过进程级限流器；设置了重试策略时按策略重试 / 对冲并记录每次尝试"""
+        backend = self.get_model_info()['backend']
+        limiter = get_llm_rate_limiters().get(backend, self.model)
+        # 预估只用于预留额度，调用后按实际消耗修正，用字符估算即可，不必完整编码
+        estimated = (
+            estimate_tokens(system_prompt) + estimate_tokens(user_prompt)
+            + (max_tokens or DEFAULT_OUTPUT_ESTIMATE)
+        )
+        
+        async def limited_call() -> dict:
+            async with limiter.reserve(estimated) as usage:
+                result = await self._complete(system_prompt, user_prompt, max_tokens)
+                usage['tokens'] = result.get('token_usage')
+                return result
+        
+        if self.resilience is None:
+            return await limited_call()
+        return await self.resilience.run(limited_call, self.attempts, backend, self.model)
+    
     @abstractmethod
-    def get_model_info(self) -> dict:
-        """子类提供模型信息"""
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """子类实现实际的 LLM 调用
+        
+        Returns:
+            {'text': 响应文本, 'token_usage': 总 token 数, ...}
+        """
         pass
+    
+    @staticmethod
+    def _extract_executive_brief(response_text: str) -> str:
+        """提取执行摘要（取第一个有意义的段落）"""
+        for line in response_text.strip().split('\n'):
+            if line.strip() and not line.strip().startswith('#'):
+                return line.strip()[:500]
+        return response_text[:500]
+    
+    @classmethod
+    def describe_model(cls, model: str) -> dict:
+        """子类提供模型信息（类方法，不依赖客户端）"""
+        raise NotImplementedError
+    
+    def get_model_info(self) -> dict:
+        """获取当前模型信息"""
+        return self.describe_model(self.model)
 
 
 # ============================================================================
@@ -281,23 +466,36 @@ def create_llm_adapter(
         proxy_url: 代理URL，格式: 'http://host:port' 或 'https://host:port' 或 'socks5://host:port'
         proxy_config: 代理配置，格式: {'enabled': bool, 'http': 'http://host:port', 'https': 'https://host:port', 'socks5': 'socks5://host:port'}
     """
+    adapter_class = get_adapter_class(backend)
+    if backend.lower() == "ollama":
+        return adapter_class(model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+    return adapter_class(api_key=api_key, model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+
+
+def get_adapter_class(backend: str) -> type:
+    """
+    获取 LLM 适配器类（不创建实例，可用于 describe_model 等类方法）
+
+    Args:
+        backend: "ollama", "openai", "deepseek", "gemini"
+    """
     backend = backend.lower()
 
     if backend == "ollama":
         from llm.ollama_adapter import OllamaAdapter
-        return OllamaAdapter(model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+        return OllamaAdapter
 
     elif backend == "openai":
         from llm.openai_adapter import OpenAIAdapter
-        return OpenAIAdapter(api_key=api_key, model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+        return OpenAIAdapter
 
     elif backend == "deepseek":
         from llm.deepseek_adapter import DeepSeekAdapter
-        return DeepSeekAdapter(api_key=api_key, model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+        return DeepSeekAdapter
 
     elif backend == "gemini":
         from llm.gemini_adapter import GeminiAdapter
-        return GeminiAdapter(api_key=api_key, model=model, proxy_url=proxy_url, proxy_config=proxy_config)
+        return GeminiAdapter
 
     else:
         raise ValueError(f"Unknown LLM backend: {backend}")
@@ -0,0 +1,139 @@
+"""
+文章主题聚类
+
+提示词构建前把文章按主题分组，同一事件的多篇报道只展开最有代表性的几篇，
+其余只保留引用编号与标题，减少重复内容占用的输入 token：
+
+1. 分词：中日韩文本按字二元组（bigram），拉丁文本按单词，不依赖分词词典
+2. TF-IDF（次线性词频 + 平滑 IDF），行向量 L2 归一化，保存为稀疏矩阵
+3. 余弦相似度 + 平均链接层次聚类，相似度低于阈值的不合并
+4. 每个主题按与质心的相似度排序成员，最靠前的作为代表
+"""
+
+import math
+import re
+import logging
+from collections import Counter
+from typing import List, Sequence
+
+import numpy as np
+from scipy import sparse
+from scipy.cluster.hierarchy import fcluster, linkage
+from scipy.spatial.distance import squareform
+
+from models import Article
+
+logger = logging.getLogger(__name__)
+
+# 文章数少于该值时不聚类
+CLUSTER_MIN_ARTICLES = 8
+# 平均余弦相似度不低于该值的文章归为同一主题
+SIMILARITY_THRESHOLD = 0.35
+# 每个主题展开正文的代表文章数
+REPRESENTATIVES_PER_CLUSTER = 2
+# 参与向量化的正文长度（标题额外计两次）
+TEXT_CHARS = 400
+
+_CJK_RUN = re.compile(r'[㐀-䶿一-鿿぀-ヿ가-힯]+')
+_LATIN_WORD = re.compile(r'[a-z][a-z0-9]+|\d{3,}')
+_STOPWORDS = {
+    'the', 'and', 'for', 'with', 'that', 'this', 'from', 'are', 'was', 'will', 'has', 'have',
+    'its', 'into', 'not', 'but', 'you', 'your', 'our', 'can', 'more', 'new', 'how', 'what',
+    'http', 'https', 'www', 'com',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """中日韩字二元组 + 拉丁单词"""
+    text = text.lower()
+    tokens = []
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    tokens.extend(word for word in _LATIN_WORD.findall(text) if word not in _STOPWORDS)
+    return tokens
+
+
+def article_text(article: Article) -> str:
+    """向量化使用的文本：标题加权 + 正文开头"""
+    return f"{article.title} {article.title} {article.content[:TEXT_CHARS]}"
+
+
+def tfidf_matrix(texts: Sequence[str]) -> sparse.csr_matrix:
+    """TF-IDF 稀疏矩阵（行 L2 归一化，空文本为零向量）"""
+    vocabulary = {}
+    rows, cols, values = [], [], []
+    counts = []
+    for text in texts:
+        counter = Counter(tokenize(text))
+        counts.append(counter)
+        for token in counter:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    n = len(texts)
+    document_frequency = np.zeros(len(vocabulary))
+    for counter in counts:
+        for token in counter:
+            document_frequency[vocabulary[token]] += 1
+    idf = np.log((1 + n) / (1 + document_frequency)) + 1
+
+    for row, counter in enumerate(counts):
+        for token, count in counter.items():
+            col = vocabulary[token]
+            rows.append(row)
+            cols.append(col)
+            values.append((1 + math.log(count)) * idf[col])
+
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(n, len(vocabulary)))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+
+def cluster_articles(
+    articles: Sequence[Article],
+    threshold: float = SIMILARITY_THRESHOLD,
+    representatives: int = REPRESENTATIVES_PER_CLUSTER
+) -> List[dict]:
+    """
+    按主题聚类
+
+    Args:
+        articles: 文章列表
+        threshold: 合并所需的最低平均余弦相似度
+        representatives: 每个主题展开正文的文章数
+
+    Returns:
+        [{'members': [文章下标，按代表性从高到低], 'representatives': 展开正文的成员数}, ...]
+        多篇文章的主题按规模从大到小在前，单篇文章（独立报道）在后，各自成组
+    """
+    n = len(articles)
+    if n < 2:
+        return [{'members': [i], 'representatives': 1} for i in range(n)]
+
+    matrix = tfidf_matrix([article_text(a) for a in articles])
+    similarity = (matrix @ matrix.T).toarray()
+    distance = np.clip(1.0 - similarity, 0.0, 2.0)
+    np.fill_diagonal(distance, 0.0)
+    tree = linkage(squareform(distance, checks=False), method='average')
+    labels = fcluster(tree, t=1.0 - threshold, criterion='distance')
+
+    groups = {}
+    for index, label in enumerate(labels):
+        groups.setdefault(label, []).append(index)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) > 1:
+            rows = matrix[members]
+            centroid = np.asarray(rows.mean(axis=0)).ravel()
+            scores = rows @ centroid
+            members = [m for _, m in sorted(zip(-scores, members))]
+        clusters.append({'members': members, 'representatives': min(representatives, len(members))})
+
+    clusters.sort(key=lambda c: (-len(c['members']), min(c['members'])))
+    multi = sum(1 for c in clusters if len(c['members']) > 1)
+    logger.info(f"文章聚类: {n} 篇 → {multi} 个多篇主题 + {len(clusters) - multi} 篇独立报道")
+    return clusters
@@ -0,0 +1,144 @@
+"""
+文章摘要缓存
+
+为每篇文章生成一次简短摘要（多篇合并在一次 LLM 调用中），按标题+正文的哈希存入数据库。
+之后任何包含该文章的分析都用摘要代替截断的原文，重叠文章集的重复分析只需发送一次原文。
+"""
+
+import asyncio
+import hashlib
+import re
+import logging
+from typing import Dict, List
+
+from models import Article
+
+logger = logging.getLogger(__name__)
+
+# 每次调用处理的文章数
+DIGEST_BATCH_SIZE = 20
+# 最大并发调用数
+DIGEST_CONCURRENCY = 4
+# 生成摘要时每篇文章发送的正文字数
+DIGEST_SOURCE_CHARS = 1500
+# 摘要最大字数（超出时截断）
+DIGEST_MAX_CHARS = 200
+# 单次调用最大输出 token 数
+DIGEST_MAX_TOKENS = 4096
+
+DIGEST_SYSTEM_PROMPT = """你是一名资讯编辑，负责为每条资讯写一句高密度摘要，供后续分析使用。
+摘要只保留关键事实、数据和主体（谁、做了什么、影响），不加评价，不写铺垫。"""
+
+_DIGEST_LINE = re.compile(r'^\s*[-*]?\s*\[(\d+)\]\s*[:：]?\s*(.+?)\s*$')
+
+
+def article_content_hash(article: Article) -> str:
+    """文章内容哈希（标题 + 正文），内容变化后自动生成新摘要"""
+    payload = f"{article.title}\n{article.content}"
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def build_digest_prompt(batch: List[Article]) -> str:
+    """构建批量摘要提示词（批内编号从 1 开始）"""
+    lines = [f"# 待摘要资讯（共 {len(batch)} 条）\n"]
+    for i, article in enumerate(batch, 1):
+        content = article.content[:DIGEST_SOURCE_CHARS]
+        if len(article.content) > DIGEST_SOURCE_CHARS:
+            content += "..."
+        lines.append(f"### [{i}] {article.title}\n{content}\n")
+    lines.append(f"""---
+**任务**：为每条资讯写一句摘要（不超过 80 字）。
+**格式**：每行一条，以编号开头，如 `[1] 摘要内容`；共 {len(batch)} 行，不要输出其他内容。""")
+    return "\n".join(lines)
+
+
+def parse_digest_response(text: str, count: int) -> Dict[int, str]:
+    """解析 `[k] 摘要` 格式的响应，返回 {批内编号: 摘要}，忽略超出范围或空的行"""
+    digests = {}
+    for line in text.splitlines():
+        match = _DIGEST_LINE.match(line)
+        if not match:
+            continue
+        index, digest = int(match.group(1)), match.group(2).strip()
+        if 1 <= index <= count and digest and index not in digests:
+            digests[index] = digest[:DIGEST_MAX_CHARS]
+    return digests
+
+
+async def _digest_batch(adapter, batch: List[Article], semaphore: asyncio.Semaphore) -> dict:
+    """为一批文章生成摘要"""
+    async with semaphore:
+        try:
+            result = await adapter.complete(
+                DIGEST_SYSTEM_PROMPT, build_digest_prompt(batch), max_tokens=DIGEST_MAX_TOKENS
+            )
+        except Exception as e:
+            logger.warning(f"文章摘要生成失败（{len(batch)} 篇，将使用原文）: {e}")
+            return {'digests': {}, 'token_usage': 0}
+
+    parsed = parse_digest_response(result['text'], len(batch))
+    return {
+        'digests': {
+            article_content_hash(batch[index - 1]): digest
+            for index, digest in parsed.items()
+        },
+        'token_usage': result.get('token_usage') or 0
+    }
+
+
+async def ensure_digests(
+    adapter,
+    db,
+    articles: List[Article],
+    batch_size: int = DIGEST_BATCH_SIZE,
+    concurrency: int = DIGEST_CONCURRENCY
+) -> dict:
+    """
+    确保文章都有摘要：已缓存的直接读取，其余分批生成并保存
+
+    Args:
+        adapter: LLM 适配器（需提供 complete）
+        db: Database 实例
+        articles: 文章列表
+
+    Returns:
+        {
+            'digests': {content_hash: digest},
+            'cached': 已有摘要的文章数,
+            'generated': 本次生成的文章数,
+            'token_usage': 生成摘要消耗的 token 数
+        }
+    """
+    hashes = {article_content_hash(a): a for a in articles}
+    digests = await db.get_article_digests(list(hashes))
+    cached = len(digests)
+
+    missing = [article for content_hash, article in hashes.items() if content_hash not in digests]
+    token_usage = 0
+    generated: Dict[str, str] = {}
+
+    if missing:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        size = max(1, batch_size)
+        results = await asyncio.gather(*(
+            _digest_batch(adapter, missing[start:start + size], semaphore)
+            for start in range(0, len(missing), size)
+        ))
+        for result in results:
+            generated.update(result['digests'])
+            token_usage += result['token_usage']
+
+        model_info = adapter.get_model_info()
+        await db.save_article_digests(generated, model_info.get('backend'), adapter.model)
+        digests.update(generated)
+
+    logger.info(
+        f"文章摘要: {len(hashes)} 篇，复用 {cached} 篇，新生成 {len(generated)} 篇"
+        f"（{len(missing) - len(generated)} 篇失败将使用原文），消耗 {token_usage} tokens"
+    )
+    return {
+        'digests': digests,
+        'cached': cached,
+        'generated': len(generated),
+        'token_usage': token_usage,
+    }
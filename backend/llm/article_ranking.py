@@ -0,0 +1,233 @@
+"""
+文章预排序与筛选
+
+一键情报会把时间窗口内爬到的全部文章交给分析，高产出的信息源容易挤占提示词。
+分析前为每篇候选文章打分，按数量上限（top_k）或 token 预算选出最值得分析的文章：
+
+1. 显著性（salience）：TF-IDF 向量与本批文章质心的余弦相似度，反映是否处于本期讨论中心
+2. 跨源覆盖（coverage）：有多少个其他信息源报道了相似内容（相似度 ≥ 聚类阈值）
+3. 新颖度（novelty）：1 - 与最近 N 天已分析文章的最大相似度，已经报道过的事件得分低
+4. 来源优先级（priority）：官方 RSS > RSSHub 稳定路由 > 自定义爬虫 > RSSHub 高风险路由
+
+选择时按综合得分贪心挑选，同一信息源每多选一篇，后续文章得分乘以衰减系数，
+避免单个源占满名额；选出的文章保持原有顺序（引用编号不受排序影响）。
+"""
+
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models import Article, IndustryCategory, SourcePriority
+from llm.article_clustering import SIMILARITY_THRESHOLD, article_text, tfidf_matrix
+from llm.prompt_packer import ARTICLE_MAX_TOKENS
+from llm.token_accounting import ARTICLE_HEADER_TOKENS, TokenAccountant
+from llm.token_counter import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 综合得分权重
+DEFAULT_WEIGHTS = {
+    'salience': 0.35,
+    'coverage': 0.25,
+    'novelty': 0.25,
+    'priority': 0.15,
+}
+# 新颖度比较的历史窗口（天）
+DEFAULT_NOVELTY_DAYS = 7
+# 参与新颖度比较的历史文章上限（最近的优先）
+NOVELTY_HISTORY_LIMIT = 2000
+# 同一信息源每多选一篇，后续文章得分的衰减系数
+SOURCE_DECAY = 0.85
+
+PRIORITY_WEIGHTS = {
+    SourcePriority.OFFICIAL_RSS.value: 1.0,
+    SourcePriority.RSSHUB_STABLE.value: 0.8,
+    SourcePriority.CUSTOM_CRAWLER.value: 0.6,
+    SourcePriority.RSSHUB_HIGH_RISK.value: 0.5,
+}
+
+
+def source_priority_weight(source) -> float:
+    """信息源优先级权重：metadata['priority'] 优先（sources 表不保存 priority 字段）"""
+    if source is None:
+        return PRIORITY_WEIGHTS[SourcePriority.RSSHUB_STABLE.value]
+    priority = (source.metadata or {}).get('priority') or source.priority
+    if isinstance(priority, SourcePriority):
+        priority = priority.value
+    return PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS[SourcePriority.RSSHUB_STABLE.value])
+
+
+def score_articles(
+    articles: Sequence[Article],
+    history: Sequence[Article] = (),
+    priorities: Optional[Dict[str, float]] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> List[dict]:
+    """
+    为候选文章打分
+
+    Args:
+        articles: 候选文章
+        history: 最近已分析过的文章（用于新颖度）
+        priorities: {source_id: 优先级权重}，缺失的源按 RSSHub 稳定路由计
+        weights: 各项得分权重，缺省使用 DEFAULT_WEIGHTS
+
+    Returns:
+        与 articles 顺序一致的 [{'article_id', 'score', 'salience', 'coverage', 'novelty', 'priority'}, ...]
+    """
+    n = len(articles)
+    if n == 0:
+        return []
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    priorities = priorities or {}
+
+    # 候选与历史文章共用词表，新颖度与显著性的向量可直接比较
+    matrix = tfidf_matrix([article_text(a) for a in [*articles, *history]])
+    candidates = matrix[:n]
+    similarity = (candidates @ candidates.T).toarray()
+
+    centroid = np.asarray(candidates.mean(axis=0)).ravel()
+    salience = candidates @ centroid
+    if salience.max() > 0:
+        salience = salience / salience.max()
+
+    # 跨源覆盖：相似报道来自多少个其他信息源（对数压缩后归一化）
+    sources = [a.source_id or a.source_name or a.id for a in articles]
+    coverage = np.zeros(n)
+    for i in range(n):
+        similar = np.nonzero(similarity[i] >= SIMILARITY_THRESHOLD)[0]
+        coverage[i] = len({sources[j] for j in similar} - {sources[i]})
+    coverage = np.log1p(coverage)
+    if coverage.max() > 0:
+        coverage = coverage / coverage.max()
+
+    if history:
+        seen = (candidates @ matrix[n:].T).toarray().max(axis=1)
+        novelty = 1.0 - np.clip(seen, 0.0, 1.0)
+    else:
+        novelty = np.ones(n)
+
+    default_priority = PRIORITY_WEIGHTS[SourcePriority.RSSHUB_STABLE.value]
+    scores = []
+    for i, article in enumerate(articles):
+        entry = {
+            'article_id': article.id,
+            'salience': round(float(salience[i]), 4),
+            'coverage': round(float(coverage[i]), 4),
+            'novelty': round(float(novelty[i]), 4),
+            'priority': priorities.get(article.source_id, default_priority),
+        }
+        entry['score'] = round(sum(weights[key] * entry[key] for key in DEFAULT_WEIGHTS), 4)
+        scores.append(entry)
+    return scores
+
+
+def select_top(
+    articles: Sequence[Article],
+    scores: List[dict],
+    top_k: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    token_counts: Optional[List[int]] = None
+) -> List[Article]:
+    """
+    按得分贪心选择文章（同源衰减），写回每篇文章的 rank / selected
+
+    Args:
+        top_k: 最多选择的文章数
+        token_budget: 所选文章（标题 + 截断后正文）的 token 总预算
+        token_counts: 与 articles 对应的提示词 token 数，token_budget 不为空时必须提供
+
+    Returns:
+        选中的文章（保持原有顺序，至少一篇）
+    """
+    def source_of(i):
+        return articles[i].source_id or articles[i].source_name
+
+    # 惰性堆：弹出时若该源已被多选，按最新衰减重新入堆
+    picked_per_source: Dict[str, int] = {}
+    heap = [(-entry['score'], i, 0) for i, entry in enumerate(scores)]
+    heapq.heapify(heap)
+    selected = []
+    used_tokens = 0
+    rank = 0
+
+    while heap:
+        _, i, picked = heapq.heappop(heap)
+        current = picked_per_source.get(source_of(i), 0)
+        if current != picked:
+            heapq.heappush(heap, (-scores[i]['score'] * SOURCE_DECAY ** current, i, current))
+            continue
+        rank += 1
+        scores[i]['rank'] = rank
+
+        fits = top_k is None or len(selected) < top_k
+        # 得分最高的文章总会选中，即使单篇超出预算
+        if fits and token_budget is not None and selected:
+            fits = used_tokens + token_counts[i] <= token_budget
+        scores[i]['selected'] = fits
+        if fits:
+            selected.append(i)
+            used_tokens += token_counts[i] if token_counts else 0
+            picked_per_source[source_of(i)] = current + 1
+
+    return [articles[i] for i in sorted(selected)]
+
+
+async def rank_articles(
+    db,
+    articles: List[Article],
+    top_k: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    novelty_days: int = DEFAULT_NOVELTY_DAYS,
+    industry: Optional[IndustryCategory] = None,
+    weights: Optional[Dict[str, float]] = None
+) -> dict:
+    """
+    分析前打分并筛选文章
+
+    Args:
+        db: Database 实例（读取信息源优先级与历史分析文章）
+        articles: 候选文章
+        top_k: 最多保留的文章数，为 None 时不限
+        token_budget: 所选文章的 token 总预算，为 None 时不限
+        novelty_days: 与最近多少天内已分析的文章比较新颖度，0 表示不比较
+        industry: 只与同一行业的历史分析比较（为 None 时与全部分析比较）
+        weights: 各项得分权重
+
+    Returns:
+        {'articles': 选中的文章（原有顺序）, 'scores': 全部候选的得分（含 rank / selected / tokens）}
+    """
+    sources = await db.get_sources(enabled_only=False)
+    priorities = {source.id: source_priority_weight(source) for source in sources}
+
+    # 本次候选中已被分析过的文章也在历史中，重复分析的内容新颖度为 0
+    history = []
+    if novelty_days > 0:
+        history = await db.get_recently_analyzed_articles(
+            since=datetime.now() - timedelta(days=novelty_days),
+            industry=industry,
+            limit=NOVELTY_HISTORY_LIMIT
+        )
+
+    scores = score_articles(articles, history, priorities, weights)
+
+    token_counts = None
+    if token_budget is not None:
+        # 与提示词打包一致：正文按单篇上限截断，另加标题与来源行的开销
+        counts = await TokenAccountant(db).count_articles(articles)
+        token_counts = [
+            min(count, ARTICLE_MAX_TOKENS) + estimate_tokens(article.title) + ARTICLE_HEADER_TOKENS
+            for count, article in zip(counts, articles)
+        ]
+        for entry, count in zip(scores, token_counts):
+            entry['tokens'] = count
+
+    selected = select_top(articles, scores, top_k=top_k, token_budget=token_budget, token_counts=token_counts)
+    logger.info(
+        f"文章预排序: {len(articles)} 篇候选（历史 {len(history)} 篇）→ 选中 {len(selected)} 篇"
+        f"（top_k={top_k}, token_budget={token_budget}）"
+    )
+    return {'articles': selected, 'scores': scores}
@@ -0,0 +1,163 @@
+"""
+LLM 客户端注册表
+
+按后端、模型、API Key 与代理配置缓存适配器，请求之间复用其 HTTP 连接池，
+不再每个请求新建 AsyncOpenAI / httpx.AsyncClient（且从不关闭）。
+
+- acquire() 返回缓存适配器的浅拷贝：共享客户端，但响应缓存、文章摘要等
+  请求级状态互不影响
+- API Key 或代理配置变化时由 ConfigManager 调用 invalidate()；被替换的适配器
+  延迟一段时间再关闭，避免中断仍在进行中的请求
+- 应用关闭时 close_all() 关闭全部客户端
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+from llm.adapter import BaseLLMAdapter, create_llm_adapter, get_adapter_class
+
+logger = logging.getLogger(__name__)
+
+# 被替换的适配器延迟关闭的时间（秒），应长于单次分析的最长耗时
+RETIRE_GRACE_SECONDS = 600
+
+
+def _registry_key(
+    backend: str,
+    model: Optional[str],
+    api_key: Optional[str],
+    proxy_url: Optional[str],
+    proxy_config: Optional[dict]
+) -> Tuple[str, str, str, str]:
+    """缓存键：API Key 与代理配置只保存摘要"""
+    backend = backend.lower()
+    model = model or get_adapter_class(backend).DEFAULT_MODEL
+    key_digest = hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16]
+    proxy_digest = hashlib.sha256(
+        json.dumps({'url': proxy_url, 'config': proxy_config}, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:16]
+    return backend, model, key_digest, proxy_digest
+
+
+class LLMClientRegistry:
+    """
+    应用级 LLM 适配器注册表
+
+    Example:
+        registry = get_llm_client_registry()
+        adapter = registry.acquire("deepseek", api_key=key, proxy_config=proxy_config)
+        result = await adapter.complete(system_prompt, user_prompt)
+    """
+
+    def __init__(self, retire_grace_seconds: float = RETIRE_GRACE_SECONDS):
+        self.retire_grace_seconds = retire_grace_seconds
+        self._adapters: Dict[Tuple[str, str, str, str], BaseLLMAdapter] = {}
+        self._retiring: Dict[asyncio.Task, BaseLLMAdapter] = {}
+        self.created = 0
+        self.reused = 0
+
+    def acquire(
+        self,
+        backend: str,
+        api_key: Optional[str] = None,
+        model: Optional[str] = None,
+        proxy_url: Optional[str] = None,
+        proxy_config: Optional[dict] = None
+    ) -> BaseLLMAdapter:
+        """获取适配器（请求级浅拷贝，共享底层客户端）"""
+        key = _registry_key(backend, model, api_key, proxy_url, proxy_config)
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            adapter = create_llm_adapter(
+                backend=backend,
+                api_key=api_key,
+                model=model,
+                proxy_url=proxy_url,
+                proxy_config=proxy_config
+            )
+            self._adapters[key] = adapter
+            self.created += 1
+            logger.info(f"创建 LLM 客户端: {key[0]}/{key[1]}")
+        else:
+            self.reused += 1
+        return adapter.fork()
+
+    def invalidate(self, backend: Optional[str] = None) -> int:
+        """
+        使缓存的适配器失效（配置变化时调用）
+
+        Args:
+            backend: 只失效该后端，为 None 时全部失效
+
+        Returns:
+            失效的适配器数
+        """
+        keys = [
+            key for key in self._adapters
+            if backend is None or key[0] == backend.lower()
+        ]
+        for key in keys:
+            self._retire(self._adapters.pop(key))
+        if keys:
+            logger.info(f"LLM 客户端失效 {len(keys)} 个（{backend or '全部后端'}）")
+        return len(keys)
+
+    def _retire(self, adapter: BaseLLMAdapter):
+        """延迟关闭被替换的适配器；没有事件循环时无法调度，交给垃圾回收"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        async def close_later():
+            await asyncio.sleep(self.retire_grace_seconds)
+            await self._close(adapter)
+
+        task = loop.create_task(close_later())
+        self._retiring[task] = adapter
+        task.add_done_callback(lambda t: self._retiring.pop(t, None))
+
+    @staticmethod
+    async def _close(adapter: BaseLLMAdapter):
+        try:
+            await adapter.aclose()
+        except Exception as e:
+            logger.warning(f"关闭 LLM 客户端失败: {e}")
+
+    async def close_all(self):
+        """关闭全部客户端（应用关闭时调用）"""
+        adapters = list(self._adapters.values())
+        self._adapters.clear()
+        # 取消等待中的延迟关闭任务，其适配器在此直接关闭
+        for task, adapter in list(self._retiring.items()):
+            task.cancel()
+            adapters.append(adapter)
+        self._retiring.clear()
+        await asyncio.gather(*(self._close(adapter) for adapter in adapters))
+        logger.info(f"已关闭 {len(adapters)} 个 LLM 客户端")
+
+    def get_stats(self) -> dict:
+        """注册表统计"""
+        return {
+            'clients': [
+                {'backend': key[0], 'model': key[1]} for key in self._adapters
+            ],
+            'created': self.created,
+            'reused': self.reused,
+            'retiring': len(self._retiring),
+        }
+
+
+# 全局注册表实例
+_registry: Optional[LLMClientRegistry] = None
+
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    """获取全局 LLM 客户端注册表"""
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
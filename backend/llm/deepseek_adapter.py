@@ -15,6 +15,8 @@ from llm.adapter import BaseLLMAdapter
 class DeepSeekAdapter(BaseLLMAdapter):
     """DeepSeek API 适配器（兼容 OpenAI SDK）"""
     
+    DEFAULT_MODEL = "deepseek-chat"
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -22,23 +24,60 @@ class DeepSeekAdapter(BaseLLMAdapter):
         proxy_url: Optional[str] = None,
         proxy_config: Optional[dict] = None
     ):
-        super().__init__(api_key=api_key, model=model or "deepseek-chat", proxy_url=proxy_url, proxy_config=proxy_config)
+        super().__init__(api_key=api_key, model=model or self.DEFAULT_MODEL, proxy_url=proxy_url, proxy_config=proxy_config)
 
-        # 配置HTTP客户端以支持代理
+        # 配置HTTP客户端以支持代理（单个代理或代理池）
         http_client = None
-        if self.proxy_url:
-            http_client = httpx.AsyncClient(
-                proxies={
-                    'http://': self.proxy_url,
-                    'https://': self.proxy_url,
-                }
-            )
+        client_kwargs = self._http_client_kwargs()
+        if client_kwargs:
+            http_client = httpx.AsyncClient(**client_kwargs)
 
+        # 关闭 SDK 内置重试：重试、退避与限流只由 ResiliencePolicy 负责（计入 attempts 与重试预算）
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url="https://api.deepseek.com",
-            http_client=http_client
+            http_client=http_client,
+            max_retries=0
+        )
+    
+    async def aclose(self):
+        """关闭 AsyncOpenAI 客户端（同时关闭传入的 httpx 客户端）"""
+        await self.client.close()
+    
+    def _generation_options(self, max_tokens: Optional[int] = None) -> dict:
+        """chat.completions 的生成参数"""
+        # 根据模型设置 max_tokens
+        # deepseek-chat: 默认4K, 最大8K
+        # deepseek-reasoner: 默认32K, 最大64K
+        if max_tokens is None:
+            if self.model == "deepseek-chat":
+                max_tokens = 8192  # 使用最大值8K以获得更完整的输出
+            elif self.model == "deepseek-reasoner":
+                max_tokens = 65536  # 使用最大值64K以支持复杂推理
+            else:
+                max_tokens = 8192  # 默认值
+        return {'temperature': 0.3, 'max_tokens': max_tokens}
+    
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """单次补全调用"""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            **self._generation_options(max_tokens)
         )
+        return {
+            'text': response.choices[0].message.content or '',
+            'token_usage': response.usage.total_tokens if response.usage else 0,
+            'finish_reason': response.choices[0].finish_reason
+        }
     
     async def analyze(
         self,
@@ -60,31 +99,13 @@ class DeepSeekAdapter(BaseLLMAdapter):
         
         start_time = datetime.now()
         
-        # 根据模型设置 max_tokens
-        # deepseek-chat: 默认4K, 最大8K
-        # deepseek-reasoner: 默认32K, 最大64K
-        if self.model == "deepseek-chat":
-            max_tokens = 8192  # 使用最大值8K以获得更完整的输出
-        elif self.model == "deepseek-reasoner":
-            max_tokens = 65536  # 使用最大值64K以支持复杂推理
-        else:
-            max_tokens = 8192  # 默认值
-        
         # 调用 DeepSeek API（生成Markdown而不是JSON）
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=max_tokens
-        )
+        result = await self.complete(system_prompt, user_prompt)
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
         # 获取响应文本（Markdown格式）
-        response_text = response.choices[0].message.content
+        response_text = result['text']
         
         # 提取执行摘要（取第一个有意义的段落）
         lines = response_text.strip().split('\n')
@@ -98,7 +119,7 @@ class DeepSeekAdapter(BaseLLMAdapter):
             executive_brief = response_text[:500]
         
         # 计算成本
-        token_usage = response.usage.total_tokens
+        token_usage = result['token_usage']
         cost_per_1k = self.get_model_info()['cost_per_1k_tokens']
         estimated_cost = (token_usage / 1000) * cost_per_1k
         
@@ -131,30 +152,6 @@ class DeepSeekAdapter(BaseLLMAdapter):
         
         article_count = len(articles)
         
-        # 动态调整压缩策略
-        if article_count <= 20:
-            max_content = 1000
-        elif article_count <= 50:
-            max_content = 600
-        elif article_count <= 100:
-            max_content = 400
-        else:
-            max_content = 300
-        
-        # 构建文章列表（紧凑格式）
-        articles_text = f"# 待分析信息源（共 {article_count} 条）\n\n"
-        
-        for i, article in enumerate(articles, 1):
-            content = article.content[:max_content]
-            if len(article.content) > max_content:
-                content += "..."
-            
-            articles_text += f"""### [{i}] {article.title}
-- 来源: {article.source_name} | 时间: {article.published_at.strftime('%m-%d %H:%M')} | 行业: {article.industry.value}
-- 内容: {content}
-
-"""
-        
         # 获取品类特定的用户提示词模板
         if custom_prompt:
             task_desc = custom_prompt
@@ -168,6 +165,12 @@ class DeepSeekAdapter(BaseLLMAdapter):
         # 使用基类方法生成标题格式
         title_format = self._get_report_title_format(industry)
         
+        # 按模型上下文窗口的 token 预算构建文章列表（紧凑格式）
+        articles_text = self._pack_articles_text(
+            articles,
+            [self._build_system_prompt(analysis_type, industry), task_desc, report_format]
+        )
+        
         return f"""{task_desc}
 
 {articles_text}
@@ -183,19 +186,25 @@ class DeepSeekAdapter(BaseLLMAdapter):
 4. 如果内容较长，请务必输出完整，不要省略
 """
     
-    def get_model_info(self) -> dict:
-        """获取模型信息"""
-        # 根据模型返回对应的max_tokens
-        if self.model == "deepseek-chat":
+    @classmethod
+    def describe_model(cls, model: str) -> dict:
+        """获取模型信息（不需要创建客户端，成本估算等场景直接使用）"""
+        # 根据模型返回对应的max_tokens（输出上限）与上下文窗口
+        if model == "deepseek-chat":
             max_tokens = 8192  # deepseek-chat 最大8K
-        elif self.model == "deepseek-reasoner":
+            context_window = 65536  # 按 64K 保守计算
+        elif model == "deepseek-reasoner":
             max_tokens = 65536  # deepseek-reasoner 最大64K
+            context_window = 131072
         else:
             max_tokens = 8192
+            context_window = 65536
         
         return {
             'backend': 'deepseek',
-            'model': self.model,
+            'model': model,
             'max_tokens': max_tokens,
+            'context_window': context_window,
+            'max_output_tokens': max_tokens,
             'cost_per_1k_tokens': 0.00014  # DeepSeek 价格非常低
         }
@@ -1,14 +1,18 @@
 """
 Google Gemini API 适配器
+
+直接调用 Gemini REST API（streamGenerateContent），不依赖同步 SDK：
+- 原生异步，并发分析不占用线程池
+- 代理（单个或代理池）只配置在本适配器的 httpx 客户端上，不修改进程环境变量
 """
 
 import json
-import asyncio
 import logging
-import os
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 
+import httpx
+
 from models import Article, Analysis, AnalysisType, IndustryCategory, Trend, Signal, InformationGap
 from llm.adapter import BaseLLMAdapter
 
@@ -16,20 +20,18 @@ from llm.adapter import BaseLLMAdapter
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-# 延迟导入的 genai 模块引用
-_genai = None
-
-def _get_genai():
-    """延迟导入 google.generativeai，确保代理环境变量已设置"""
-    global _genai
-    if _genai is None:
-        import google.generativeai as genai
-        _genai = genai
-    return _genai
+# Gemini 输出上限（Gemini 2.5 Flash 支持最多 65536 输出 tokens）
+MAX_OUTPUT_TOKENS = 65536
 
 
 class GeminiAdapter(BaseLLMAdapter):
-    """Google Gemini API 适配器（使用官方 Google GenAI SDK）"""
+    """Google Gemini API 适配器（REST API + 长连接 httpx 异步客户端）"""
+    
+    DEFAULT_MODEL = "gemini-2.5-flash"
+    
+    # Gemini API 主机（代理池按主机粘滞）
+    API_HOST = "generativelanguage.googleapis.com"
+    BASE_URL = f"https://{API_HOST}/v1beta"
     
     def __init__(
         self,
@@ -39,39 +41,125 @@ class GeminiAdapter(BaseLLMAdapter):
         proxy_config: Optional[dict] = None
     ):
         # 使用最新稳定的 Gemini 2.5 Flash 模型
-        super().__init__(api_key=api_key, model=model or "gemini-2.5-flash", proxy_url=proxy_url, proxy_config=proxy_config)
+        super().__init__(api_key=api_key, model=model or self.DEFAULT_MODEL, proxy_url=proxy_url, proxy_config=proxy_config)
 
         if not self.api_key:
             raise ValueError("Gemini API Key is required. Please configure it in Settings.")
 
-        # 在导入 google.generativeai 之前设置代理环境变量
-        # 这是关键！httpx 在导入时会读取代理设置
-        if self.proxy_url:
-            os.environ['HTTP_PROXY'] = self.proxy_url
-            os.environ['HTTPS_PROXY'] = self.proxy_url
-            os.environ['http_proxy'] = self.proxy_url
-            os.environ['https_proxy'] = self.proxy_url
-            logger.info(f"Gemini 使用代理: {self.proxy_url}")
-        
-        # 延迟导入 genai 模块（此时代理环境变量已设置）
-        genai = _get_genai()
-        
-        # 配置 Google GenAI
-        genai.configure(api_key=self.api_key)
-        
-        # Gemini 2.5 Flash支持最多65536输出tokens（官方文档confirmed）
-        # 设置candidate_count=1确保生成完整单一候选
-        self.client = genai.GenerativeModel(
-            model_name=self.model,
-            generation_config=genai.GenerationConfig(
-                temperature=0.3,
-                max_output_tokens=65536,  # Gemini 2.5 Flash的真实最大输出token限制
-                candidate_count=1,  # 只生成1个候选，避免分散token
-                stop_sequences=None,  # 不设置停止序列，让模型完整输出
-            )
+        # 代理只作用于本客户端（单个代理或代理池），不修改进程环境变量
+        # 长输出可能持续数分钟，读超时按两次数据块之间的间隔计算（流式响应）
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(300, connect=30),
+            headers={'x-goog-api-key': self.api_key},
+            **self._http_client_kwargs()
         )
         
-        logger.info(f"Gemini 适配器初始化完成: {self.model}, max_output_tokens=65536")
+        logger.info(f"Gemini 适配器初始化完成: {self.model}, max_output_tokens={MAX_OUTPUT_TOKENS}")
+    
+    async def aclose(self):
+        """关闭 HTTP 客户端"""
+        await self.client.aclose()
+    
+    def _request_body(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int]) -> dict:
+        """generateContent 请求体"""
+        return {
+            'systemInstruction': {'parts': [{'text': system_prompt}]},
+            'contents': [{'role': 'user', 'parts': [{'text': user_prompt}]}],
+            'generationConfig': self._generation_options(max_tokens)
+        }
+    
+    def _generation_options(self, max_tokens: Optional[int] = None) -> dict:
+        """generationConfig"""
+        return {
+            'temperature': 0.3,
+            'maxOutputTokens': max_tokens or MAX_OUTPUT_TOKENS,
+            'candidateCount': 1,  # 只生成1个候选，避免分散token
+        }
+    
+    async def _stream_chunks(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """调用 streamGenerateContent（SSE），逐个返回响应块"""
+        async with self.client.stream(
+            "POST",
+            f"{self.BASE_URL}/models/{self.model}:streamGenerateContent",
+            params={'alt': 'sse'},
+            json=self._request_body(system_prompt, user_prompt, max_tokens)
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                logger.error(f"Gemini API 返回 {response.status_code}: {response.text[:500]}")
+                response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                if not line.startswith('data:'):
+                    continue
+                payload = line[5:].strip()
+                if payload:
+                    yield json.loads(payload)
+    
+    @staticmethod
+    def _parse_chunk(chunk: dict) -> dict:
+        """解析响应块：{'text', 'finish_reason', 'token_usage'}，被安全策略拦截时抛出异常"""
+        candidates = chunk.get('candidates') or []
+        if not candidates:
+            block_reason = (chunk.get('promptFeedback') or {}).get('blockReason')
+            if block_reason:
+                raise ValueError(f"Gemini 拒绝了请求: {block_reason}")
+        
+        text = ""
+        finish_reason = None
+        if candidates:
+            candidate = candidates[0]
+            parts = (candidate.get('content') or {}).get('parts') or []
+            text = "".join(part.get('text', '') for part in parts)
+            if candidate.get('finishReason'):
+                finish_reason = candidate['finishReason'].lower()
+        
+        usage = chunk.get('usageMetadata') or {}
+        return {
+            'text': text,
+            'finish_reason': finish_reason,
+            'token_usage': usage.get('totalTokenCount')
+        }
+    
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """流式补全：逐段返回生成的文本"""
+        async for chunk in self._stream_chunks(system_prompt, user_prompt, max_tokens):
+            text = self._parse_chunk(chunk)['text']
+            if text:
+                yield text
+    
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """单次补全调用（内部使用流式接口，长输出不会因整体读超时中断）"""
+        texts = []
+        finish_reason = None
+        token_usage = 0
+        async for chunk in self._stream_chunks(system_prompt, user_prompt, max_tokens):
+            parsed = self._parse_chunk(chunk)
+            texts.append(parsed['text'])
+            finish_reason = parsed['finish_reason'] or finish_reason
+            # usageMetadata 为累计值，以最后一块为准
+            token_usage = parsed['token_usage'] or token_usage
+        
+        return {
+            'text': "".join(texts),
+            'token_usage': token_usage,
+            'finish_reason': finish_reason
+        }
     
     async def analyze(
         self,
@@ -100,28 +188,20 @@ class GeminiAdapter(BaseLLMAdapter):
         logger.debug(f"提示词长度: {len(full_prompt)} 字符")
         
         try:
-            # 使用 asyncio.to_thread 在线程池中运行同步调用
-            response = await asyncio.to_thread(
-                self._sync_generate,
-                full_prompt
-            )
+            result = await self.complete(system_prompt, user_prompt)
             
-            response_text = response.text
+            response_text = result['text']
             
             # 清理表格中的过量空格（Gemini表格生成bug的workaround）
             response_text = self._clean_table_spaces(response_text)
             
             # 检查finish_reason，确保响应完整
-            finish_reason = None
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'finish_reason'):
-                    finish_reason = candidate.finish_reason
+            finish_reason = result.get('finish_reason')
             
             # 记录完整响应到日志
             logger.info(f"Gemini 响应长度: {len(response_text)} 字符")
             logger.info(f"Finish reason: {finish_reason}")
-            if finish_reason and finish_reason != 1:  # 1 = STOP (正常结束)
+            if finish_reason and finish_reason != 'stop':  # stop = 正常结束
                 logger.warning(f"⚠️ Gemini 响应未正常结束！Finish reason: {finish_reason}")
                 logger.warning("可能原因：1) 达到max_output_tokens限制 2) 触发安全过滤 3) 其他限制")
             logger.debug(f"Gemini 完整响应:\n{response_text}")
@@ -142,30 +222,13 @@ class GeminiAdapter(BaseLLMAdapter):
                 logger.warning(f"写入日志文件失败: {log_error}")
             
             # 获取 token 使用信息
-            token_usage = 0
-            if hasattr(response, 'usage_metadata'):
-                usage = response.usage_metadata
-                if hasattr(usage, 'total_token_count'):
-                    token_usage = usage.total_token_count
-                    logger.info(f"Token 使用: {token_usage}")
+            token_usage = result['token_usage']
+            logger.info(f"Token 使用: {token_usage}")
         
         except Exception as e:
             logger.error(f"Gemini API 调用失败: {str(e)}", exc_info=True)
-            # 如果调用失败，返回错误信息
-            return Analysis(
-                analysis_type=analysis_type,
-                article_ids=[a.id for a in articles if a.id],
-                executive_brief=f"❌ Gemini 分析失败: {str(e)}",
-                markdown_report=f"# 分析失败\n\n错误信息：{str(e)}",
-                trends=[],
-                signals=[],
-                information_gaps=[],
-                llm_backend="gemini",
-                llm_model=self.model,
-                token_usage=0,
-                estimated_cost=0.0,
-                processing_time_seconds=(datetime.now() - start_time).total_seconds()
-            )
+            # 向上抛出，由 Analyzer 按配置重试或切换后端
+            raise
         
         processing_time = (datetime.now() - start_time).total_seconds()
         logger.info(f"分析完成，耗时: {processing_time:.2f}秒")
@@ -224,30 +287,6 @@ class GeminiAdapter(BaseLLMAdapter):
         
         article_count = len(articles)
         
-        # 动态调整压缩策略
-        if article_count <= 20:
-            max_content = 1000
-        elif article_count <= 50:
-            max_content = 600
-        elif article_count <= 100:
-            max_content = 400
-        else:
-            max_content = 300
-        
-        # 构建文章列表（紧凑格式）
-        articles_text = f"# 待分析信息源（共 {article_count} 条）\n\n"
-        
-        for i, article in enumerate(articles, 1):
-            content = article.content[:max_content]
-            if len(article.content) > max_content:
-                content += "..."
-            
-            articles_text += f"""### [{i}] {article.title}
-- 来源: {article.source_name} | 时间: {article.published_at.strftime('%m-%d %H:%M')} | 行业: {article.industry.value}
-- 内容: {content}
-
-"""
-        
         # 获取品类特定的用户提示词模板
         if custom_prompt:
             task_desc = custom_prompt
@@ -261,6 +300,12 @@ class GeminiAdapter(BaseLLMAdapter):
         # 使用基类方法生成标题格式
         title_format = self._get_report_title_format(industry)
         
+        # 按模型上下文窗口的 token 预算构建文章列表（紧凑格式）
+        articles_text = self._pack_articles_text(
+            articles,
+            [self._build_system_prompt(analysis_type, industry), task_desc, report_format]
+        )
+        
         return f"""{task_desc}
 
 {articles_text}
@@ -315,12 +360,9 @@ class GeminiAdapter(BaseLLMAdapter):
         
         return result
     
-    def _sync_generate(self, prompt: str):
-        """同步调用 Gemini API（在线程池中运行）"""
-        return self.client.generate_content(prompt)
-    
-    def get_model_info(self) -> dict:
-        """获取模型信息"""
+    @classmethod
+    def describe_model(cls, model: str) -> dict:
+        """获取模型信息（不需要创建客户端，成本估算等场景直接使用）"""
         # 根据模型返回不同的配置
         model_configs = {
             'gemini-3-pro-preview': {
@@ -350,12 +392,14 @@ class GeminiAdapter(BaseLLMAdapter):
             }
         }
         
-        config = model_configs.get(self.model, model_configs['gemini-2.5-flash'])
+        config = model_configs.get(model, model_configs['gemini-2.5-flash'])
         
         return {
             'backend': 'gemini',
-            'model': self.model,
+            'model': model,
             'max_tokens': config['max_tokens'],
+            'context_window': config['max_tokens'],
+            'max_output_tokens': MAX_OUTPUT_TOKENS,
             'cost_per_1k_tokens': config['cost_per_1k_tokens'],
             'description': config['description']
         }
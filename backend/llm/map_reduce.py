@@ -0,0 +1,214 @@
+"""
+大批量文章的 Map-Reduce 分析
+
+文章数超过阈值时不再把每篇截断到几百字塞进一个提示词，而是：
+1. Map：按顺序分块，每块并发（有上限）调用一次 LLM 生成分块摘要，
+   摘要中用块内编号 [k] 标注来源
+2. 重映射：把块内编号改写为文章在完整列表中的位置 [n]（与 analysis_articles.position + 1 一致）
+3. Reduce：基于全部分块摘要和信息源索引生成最终报告，引用编号直接对应原始文章
+"""
+
+import asyncio
+import re
+import time
+import logging
+from typing import List, Optional, Tuple
+
+from models import Article, Analysis, AnalysisType, IndustryCategory
+from prompts import get_prompt_manager
+
+logger = logging.getLogger(__name__)
+
+# 超过该文章数时使用 Map-Reduce
+MAP_REDUCE_THRESHOLD = 100
+# 每块文章数
+CHUNK_SIZE = 25
+# Map 阶段最大并发 LLM 调用数
+MAP_CONCURRENCY = 4
+# Map 阶段每篇文章保留的正文字数
+MAP_CONTENT_CHARS = 1000
+# Map 阶段单块摘要的最大输出 token 数
+MAP_MAX_TOKENS = 2048
+
+_CITATION_PATTERN = re.compile(r'\[(\d+)\]')
+
+MAP_SYSTEM_PROMPT = """你是一名信息分析师，负责把一批资讯压缩成高密度的要点摘要，供后续撰写综合报告使用。
+只保留事实、数据、观点和值得关注的信号，不写报告、不加标题、不做铺垫。"""
+
+
+def chunk_articles(articles: List[Article], chunk_size: int = CHUNK_SIZE) -> List[Tuple[int, List[Article]]]:
+    """按顺序分块
+
+    Returns:
+        [(offset, chunk)]，offset 为块内第一篇在完整列表中的下标（从 0 开始）
+    """
+    size = max(1, chunk_size)
+    return [(offset, articles[offset:offset + size]) for offset in range(0, len(articles), size)]
+
+
+def remap_citations(text: str, offset: int, chunk_len: int) -> str:
+    """将块内引用 [k]（1..chunk_len）改写为全局编号 [offset + k]，超出范围的编号视为无效并移除"""
+    def replace(match: re.Match) -> str:
+        local = int(match.group(1))
+        if 1 <= local <= chunk_len:
+            return f"[{offset + local}]"
+        return ""
+    return _CITATION_PATTERN.sub(replace, text)
+
+
+def build_map_prompt(chunk: List[Article], adapter=None) -> str:
+    """构建单块摘要提示词（块内编号从 1 开始），传入 adapter 时优先使用其文章摘要"""
+    lines = [f"# 待压缩信息（共 {len(chunk)} 条）\n"]
+    for i, article in enumerate(chunk, 1):
+        if adapter is not None:
+            content = adapter._article_prompt_content(article, MAP_CONTENT_CHARS)
+        else:
+            content = article.content[:MAP_CONTENT_CHARS]
+            if len(article.content) > MAP_CONTENT_CHARS:
+                content += "..."
+        lines.append(
+            f"### [{i}] {article.title}\n"
+            f"- 来源: {article.source_name} | 时间: {article.published_at.strftime('%m-%d %H:%M')}\n"
+            f"- 内容: {content}\n"
+        )
+    lines.append("""---
+**任务**：输出 5-12 条要点（Markdown 无序列表），每条一句话。
+- 合并讲同一件事的多条信息，按重要性排序
+- 每条要点末尾用 `[编号]` 标注来源（如 `[3]`、`[2][5]`），编号对应上方列表
+- 纯噪音（广告、重复、无信息量）直接忽略
+- 只输出列表，不要其他内容""")
+    return "\n".join(lines)
+
+
+def build_reduce_prompt(
+    adapter,
+    articles: List[Article],
+    digests: List[str],
+    custom_prompt: Optional[str] = None,
+    industry: Optional[IndustryCategory] = None,
+    analysis_type: Optional[AnalysisType] = None
+) -> str:
+    """构建最终报告提示词：分块摘要 + 信息源索引 + 品类报告格式"""
+    prompt_manager = get_prompt_manager()
+    article_count = len(articles)
+
+    if custom_prompt:
+        task_desc = custom_prompt
+    else:
+        task_template = prompt_manager.get_user_prompt_template(industry)
+        task_desc = task_template.replace("{{article_count}}", str(article_count))
+
+    digest_text = "\n\n".join(
+        f"## 第 {i} 组\n{digest.strip()}" for i, digest in enumerate(digests, 1)
+    )
+    index_text = "\n".join(
+        f"[{i}] {article.title} | {article.source_name} | {article.published_at.strftime('%m-%d %H:%M')}"
+        for i, article in enumerate(articles, 1)
+    )
+
+    report_format = prompt_manager.get_report_format_prompt(industry, analysis_type)
+    title_format = adapter._get_report_title_format(industry)
+
+    return f"""{task_desc}
+
+# 信息摘要（共 {article_count} 条信息，已分 {len(digests)} 组预先压缩）
+
+{digest_text}
+
+# 信息源索引
+
+{index_text}
+
+---
+
+{report_format}
+
+⚠️ **输出要求**：
+- 报告标题格式：{title_format}
+- 直接输出 Markdown 格式，不要用代码块包裹
+- 必须完整输出所有章节，确保包含结尾总结
+- 引用来源时保留摘要中的 `[编号]`，编号对应信息源索引
+"""
+
+
+async def _map_chunk(adapter, offset: int, chunk: List[Article], semaphore: asyncio.Semaphore) -> dict:
+    """生成单块摘要并重映射引用"""
+    async with semaphore:
+        try:
+            result = await adapter.complete(MAP_SYSTEM_PROMPT, build_map_prompt(chunk, adapter), max_tokens=MAP_MAX_TOKENS)
+        except Exception as e:
+            logger.warning(f"分块摘要失败（第 {offset + 1}-{offset + len(chunk)} 篇）: {e}")
+            # 失败的分块只保留标题，不影响整体分析
+            fallback = "\n".join(
+                f"- {article.title} [{offset + i}]" for i, article in enumerate(chunk, 1)
+            )
+            return {'digest': fallback, 'token_usage': 0, 'failed': True}
+
+    return {
+        'digest': remap_citations(result['text'], offset, len(chunk)),
+        'token_usage': result.get('token_usage') or 0,
+        'failed': False
+    }
+
+
+async def map_reduce_analyze(
+    adapter,
+    articles: List[Article],
+    analysis_type: AnalysisType,
+    custom_prompt: Optional[str] = None,
+    industry: Optional[IndustryCategory] = None,
+    chunk_size: int = CHUNK_SIZE,
+    concurrency: int = MAP_CONCURRENCY
+) -> Analysis:
+    """
+    Map-Reduce 分析
+
+    Args:
+        adapter: LLM 适配器（需提供 complete）
+        articles: 待分析的文章列表（顺序即引用编号）
+        chunk_size: 每块文章数
+        concurrency: Map 阶段最大并发数
+
+    Returns:
+        分析结果，token_usage 为 Map 与 Reduce 之和
+    """
+    start = time.perf_counter()
+    chunks = chunk_articles(articles, chunk_size)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    mapped = await asyncio.gather(*(
+        _map_chunk(adapter, offset, chunk, semaphore) for offset, chunk in chunks
+    ))
+    failed = sum(1 for m in mapped if m['failed'])
+    if failed == len(mapped):
+        raise RuntimeError("所有分块摘要均生成失败")
+    logger.info(
+        f"Map-Reduce: {len(articles)} 篇文章分 {len(chunks)} 块完成摘要"
+        f"（失败 {failed} 块），耗时 {time.perf_counter() - start:.1f}s"
+    )
+
+    system_prompt = adapter._build_system_prompt(analysis_type, industry)
+    user_prompt = build_reduce_prompt(
+        adapter, articles, [m['digest'] for m in mapped], custom_prompt, industry, analysis_type
+    )
+    result = await adapter.complete(system_prompt, user_prompt)
+    response_text = result['text']
+
+    model_info = adapter.get_model_info()
+    token_usage = sum(m['token_usage'] for m in mapped) + (result.get('token_usage') or 0)
+    estimated_cost = (token_usage / 1000) * model_info.get('cost_per_1k_tokens', 0)
+
+    return Analysis(
+        analysis_type=analysis_type,
+        article_ids=[a.id for a in articles if a.id],
+        executive_brief=adapter._extract_executive_brief(response_text) or "分析完成",
+        markdown_report=response_text,
+        trends=[],
+        signals=[],
+        information_gaps=[],
+        llm_backend=model_info['backend'],
+        llm_model=adapter.model,
+        token_usage=token_usage,
+        estimated_cost=estimated_cost,
+        processing_time_seconds=time.perf_counter() - start
+    )
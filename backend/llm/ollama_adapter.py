@@ -1,28 +1,226 @@
 """
 Ollama 本地模型适配器
+
+使用 /api/chat 流式接口：
+- num_ctx（上下文窗口）与 keep_alive（模型常驻时间）可配置，提示词打包使用同一窗口
+- 启动时可预热模型，避免首个请求承担模型加载时间
+- 从响应的计时字段统计提示词处理与生成吞吐量
 """
 
 import json
+import logging
 import httpx
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from datetime import datetime
 
 from models import Article, Analysis, AnalysisType, IndustryCategory, Trend, Signal, InformationGap
 from llm.adapter import BaseLLMAdapter
+from llm.prompt_packer import output_reserve
+
+logger = logging.getLogger(__name__)
+
+# 吞吐量统计（进程级，按模型累计）
+_throughput: dict = {}
+
+
+def record_timings(model: str, timings: dict):
+    """累计一次调用的计时"""
+    stats = _throughput.setdefault(model, {
+        'calls': 0, 'prompt_tokens': 0, 'prompt_eval_seconds': 0.0,
+        'generated_tokens': 0, 'eval_seconds': 0.0, 'load_seconds': 0.0
+    })
+    stats['calls'] += 1
+    stats['prompt_tokens'] += timings['prompt_tokens']
+    stats['prompt_eval_seconds'] += timings['prompt_eval_ms'] / 1000
+    stats['generated_tokens'] += timings['generated_tokens']
+    stats['eval_seconds'] += timings['eval_ms'] / 1000
+    stats['load_seconds'] += timings['load_ms'] / 1000
+
+
+def get_ollama_throughput() -> dict:
+    """各模型的累计吞吐量：提示词处理（prompt eval）与生成（eval）分开统计"""
+    result = {}
+    for model, stats in _throughput.items():
+        result[model] = {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()},
+            'prompt_eval_tokens_per_second': round(stats['prompt_tokens'] / stats['prompt_eval_seconds'], 1) if stats['prompt_eval_seconds'] else None,
+            'eval_tokens_per_second': round(stats['generated_tokens'] / stats['eval_seconds'], 1) if stats['eval_seconds'] else None,
+        }
+    return result
+
+
+def parse_timings(final: dict) -> dict:
+    """解析最后一个响应块的计时字段（单位为纳秒）"""
+    prompt_tokens = final.get('prompt_eval_count') or 0
+    generated_tokens = final.get('eval_count') or 0
+    prompt_eval_ns = final.get('prompt_eval_duration') or 0
+    eval_ns = final.get('eval_duration') or 0
+    return {
+        'prompt_tokens': prompt_tokens,
+        'generated_tokens': generated_tokens,
+        'prompt_eval_ms': round(prompt_eval_ns / 1e6, 1),
+        'eval_ms': round(eval_ns / 1e6, 1),
+        'load_ms': round((final.get('load_duration') or 0) / 1e6, 1),
+        'total_ms': round((final.get('total_duration') or 0) / 1e6, 1),
+        'prompt_eval_tokens_per_second': round(prompt_tokens / (prompt_eval_ns / 1e9), 1) if prompt_eval_ns else None,
+        'eval_tokens_per_second': round(generated_tokens / (eval_ns / 1e9), 1) if eval_ns else None,
+    }
 
 
 class OllamaAdapter(BaseLLMAdapter):
     """Ollama 本地模型适配器"""
     
+    DEFAULT_MODEL = "llama3.1"
+    BASE_URL = "http://localhost:11434"
+    # 上下文窗口（请求时作为 num_ctx 传给服务端）
+    CONTEXT_WINDOW = 8192
+    # 请求结束后模型在显存中保留的时间（Ollama 默认 5 分钟）
+    KEEP_ALIVE = "30m"
+    MAX_OUTPUT_TOKENS = 32000
+    
+    @classmethod
+    def configure(
+        cls,
+        num_ctx: Optional[int] = None,
+        keep_alive: Optional[str] = None,
+        base_url: Optional[str] = None
+    ):
+        """更新 Ollama 设置（ConfigManager 保存配置与应用启动时调用）"""
+        if num_ctx:
+            cls.CONTEXT_WINDOW = int(num_ctx)
+        if keep_alive is not None:
+            cls.KEEP_ALIVE = keep_alive
+        if base_url:
+            cls.BASE_URL = base_url.rstrip('/')
+    
     def __init__(
         self,
         model: Optional[str] = None,
-        base_url: str = "http://localhost:11434",
+        base_url: Optional[str] = None,
         proxy_url: Optional[str] = None,
         proxy_config: Optional[dict] = None
     ):
-        super().__init__(api_key=None, model=model or "llama3.1", proxy_url=proxy_url, proxy_config=proxy_config)
-        self.base_url = base_url
+        super().__init__(api_key=None, model=model or self.DEFAULT_MODEL, proxy_url=proxy_url, proxy_config=proxy_config)
+        self.base_url = base_url or self.BASE_URL
+        # 最近一次调用的计时
+        self.last_timings: Optional[dict] = None
+        
+        # 长连接客户端（由客户端注册表复用，在 aclose 中关闭）
+        self.client = httpx.AsyncClient(timeout=300, **self._http_client_kwargs())
+    
+    async def aclose(self):
+        """关闭 HTTP 客户端"""
+        await self.client.aclose()
+    
+    def _request_body(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int]) -> dict:
+        """/api/chat 请求体"""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "stream": True,
+            "keep_alive": self.KEEP_ALIVE,
+            "options": self._generation_options(max_tokens)
+        }
+    
+    def _generation_options(self, max_tokens: Optional[int] = None) -> dict:
+        """/api/chat 的 options（num_ctx 不同时输出可能不同，需计入缓存键）"""
+        return {
+            "temperature": 0.3,
+            # 与提示词打包使用的上下文窗口一致，避免服务端默认窗口截断提示词
+            "num_ctx": self.CONTEXT_WINDOW,
+            # 输出上限不超过打包时为输出预留的部分
+            "num_predict": max_tokens or output_reserve(self.CONTEXT_WINDOW, self.MAX_OUTPUT_TOKENS)
+        }
+    
+    async def _stream_chunks(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[dict]:
+        """调用 /api/chat（NDJSON 流），逐个返回响应块"""
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json=self._request_body(system_prompt, user_prompt, max_tokens)
+        ) as response:
+            if response.status_code >= 400:
+                await response.aread()
+                logger.error(f"Ollama 返回 {response.status_code}: {response.text[:500]}")
+                response.raise_for_status()
+            
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise RuntimeError(f"Ollama 错误: {chunk['error']}")
+                yield chunk
+    
+    async def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> AsyncIterator[str]:
+        """流式补全：逐段返回生成的文本"""
+        async for chunk in self._stream_chunks(system_prompt, user_prompt, max_tokens):
+            text = (chunk.get('message') or {}).get('content')
+            if text:
+                yield text
+    
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """单次补全调用（内部使用流式接口，长输出不会因整体读超时中断）"""
+        texts = []
+        final: dict = {}
+        async for chunk in self._stream_chunks(system_prompt, user_prompt, max_tokens):
+            texts.append((chunk.get('message') or {}).get('content') or '')
+            if chunk.get('done'):
+                final = chunk
+        
+        timings = parse_timings(final)
+        self.last_timings = timings
+        record_timings(self.model, timings)
+        logger.info(
+            f"Ollama {self.model}: 提示词 {timings['prompt_tokens']} tokens "
+            f"（{timings['prompt_eval_tokens_per_second']} tok/s），生成 {timings['generated_tokens']} tokens "
+            f"（{timings['eval_tokens_per_second']} tok/s），加载 {timings['load_ms']}ms"
+        )
+        return {
+            'text': "".join(texts),
+            'token_usage': timings['prompt_tokens'] + timings['generated_tokens'],
+            # stop = 正常结束，length = 达到 num_predict / 上下文上限被截断
+            'finish_reason': final.get('done_reason') or ('stop' if final else None),
+            'timings': timings
+        }
+    
+    async def warm_up(self) -> float:
+        """
+        预热：空消息的 /api/chat 请求只加载模型（使用相同的 num_ctx，避免首个请求时重新加载）
+
+        Returns:
+            耗时（秒）
+        """
+        start = datetime.now()
+        response = await self.client.post(
+            f"{self.base_url}/api/chat",
+            json={
+                "model": self.model,
+                "messages": [],
+                "keep_alive": self.KEEP_ALIVE,
+                "options": {"num_ctx": self.CONTEXT_WINDOW}
+            }
+        )
+        response.raise_for_status()
+        return (datetime.now() - start).total_seconds()
     
     async def analyze(
         self,
@@ -44,34 +242,13 @@ class OllamaAdapter(BaseLLMAdapter):
         
         start_time = datetime.now()
         
-        # 配置代理（如果提供）
-        proxies = None
-        if self.proxy_url:
-            proxies = {
-                'http://': self.proxy_url,
-                'https://': self.proxy_url,
-            }
-        
         # 调用 Ollama API（生成Markdown而不是JSON）
-        async with httpx.AsyncClient(timeout=300, proxies=proxies) as client:
-            response = await client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": f"{system_prompt}\n\n{user_prompt}",
-                    "stream": False,
-                    "options": {
-                        "num_predict": 32000  # Ollama模型输出限制，设置足够大以避免截断
-                    }
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
+        result = await self.complete(system_prompt, user_prompt)
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
         # 获取响应文本（Markdown格式）
-        response_text = result.get('response', '')
+        response_text = result['text']
         
         # 提取执行摘要（取第一个有意义的段落）
         lines = response_text.strip().split('\n')
@@ -95,7 +272,7 @@ class OllamaAdapter(BaseLLMAdapter):
             information_gaps=[],
             llm_backend="ollama",
             llm_model=self.model,
-            token_usage=result.get('eval_count'),
+            token_usage=result['token_usage'],
             estimated_cost=0.0,  # 本地模型免费
             processing_time_seconds=processing_time
         )
@@ -113,30 +290,6 @@ class OllamaAdapter(BaseLLMAdapter):
         
         article_count = len(articles)
         
-        # 动态调整压缩策略
-        if article_count <= 20:
-            max_content = 1000
-        elif article_count <= 50:
-            max_content = 600
-        elif article_count <= 100:
-            max_content = 400
-        else:
-            max_content = 300
-        
-        # 构建文章列表（紧凑格式）
-        articles_text = f"# 待分析信息源（共 {article_count} 条）\n\n"
-        
-        for i, article in enumerate(articles, 1):
-            content = article.content[:max_content]
-            if len(article.content) > max_content:
-                content += "..."
-            
-            articles_text += f"""### [{i}] {article.title}
-- 来源: {article.source_name} | 时间: {article.published_at.strftime('%m-%d %H:%M')} | 行业: {article.industry.value}
-- 内容: {content}
-
-"""
-        
         # 获取品类特定的用户提示词模板
         if custom_prompt:
             task_desc = custom_prompt
@@ -150,6 +303,12 @@ class OllamaAdapter(BaseLLMAdapter):
         # 使用基类方法生成标题格式
         title_format = self._get_report_title_format(industry)
         
+        # 按模型上下文窗口的 token 预算构建文章列表（紧凑格式）
+        articles_text = self._pack_articles_text(
+            articles,
+            [self._build_system_prompt(analysis_type, industry), task_desc, report_format]
+        )
+        
         return f"""{task_desc}
 
 {articles_text}
@@ -164,11 +323,28 @@ class OllamaAdapter(BaseLLMAdapter):
 - 必须完整输出所有章节，确保包含结尾总结
 """
     
-    def get_model_info(self) -> dict:
-        """获取模型信息"""
+    @classmethod
+    def describe_model(cls, model: str) -> dict:
+        """获取模型信息（不需要创建客户端，成本估算等场景直接使用）"""
         return {
             'backend': 'ollama',
-            'model': self.model,
+            'model': model,
             'max_tokens': 4096,  # 根据具体模型调整
+            'context_window': cls.CONTEXT_WINDOW,
+            'max_output_tokens': cls.MAX_OUTPUT_TOKENS,
             'cost_per_1k_tokens': 0.0  # 本地模型免费
         }
+
+
+async def warm_up_ollama(model: Optional[str] = None) -> dict:
+    """预热 Ollama 模型（使用注册表中的共享客户端），失败不抛出异常"""
+    from llm.client_registry import get_llm_client_registry
+
+    adapter = get_llm_client_registry().acquire("ollama", model=model)
+    try:
+        seconds = await adapter.warm_up()
+    except Exception as e:
+        logger.warning(f"Ollama 模型 {adapter.model} 预热失败: {e}")
+        return {'success': False, 'model': adapter.model, 'error': str(e)}
+    logger.info(f"Ollama 模型 {adapter.model} 已加载（{seconds:.1f}s，keep_alive={adapter.KEEP_ALIVE}）")
+    return {'success': True, 'model': adapter.model, 'seconds': round(seconds, 2)}
@@ -15,6 +15,8 @@ from llm.adapter import BaseLLMAdapter
 class OpenAIAdapter(BaseLLMAdapter):
     """OpenAI API 适配器"""
     
+    DEFAULT_MODEL = "gpt-4o-mini"
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -22,19 +24,48 @@ class OpenAIAdapter(BaseLLMAdapter):
         proxy_url: Optional[str] = None,
         proxy_config: Optional[dict] = None
     ):
-        super().__init__(api_key=api_key, model=model or "gpt-4o-mini", proxy_url=proxy_url, proxy_config=proxy_config)
+        super().__init__(api_key=api_key, model=model or self.DEFAULT_MODEL, proxy_url=proxy_url, proxy_config=proxy_config)
 
-        # 配置HTTP客户端以支持代理
+        # 配置HTTP客户端以支持代理（单个代理或代理池）
         http_client = None
-        if self.proxy_url:
-            http_client = httpx.AsyncClient(
-                proxies={
-                    'http://': self.proxy_url,
-                    'https://': self.proxy_url,
-                }
-            )
+        client_kwargs = self._http_client_kwargs()
+        if client_kwargs:
+            http_client = httpx.AsyncClient(**client_kwargs)
 
-        self.client = AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+        # 关闭 SDK 内置重试：重试、退避与限流只由 ResiliencePolicy 负责（计入 attempts 与重试预算）
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=http_client, max_retries=0)
+    
+    async def aclose(self):
+        """关闭 AsyncOpenAI 客户端（同时关闭传入的 httpx 客户端）"""
+        await self.client.close()
+    
+    def _generation_options(self, max_tokens: Optional[int] = None) -> dict:
+        """chat.completions 的生成参数"""
+        return {
+            'temperature': 0.3,
+            'max_tokens': max_tokens or 16000  # GPT-4o 支持最大16K输出tokens（保守设置）
+        }
+    
+    async def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        max_tokens: Optional[int] = None
+    ) -> dict:
+        """单次补全调用"""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            **self._generation_options(max_tokens)
+        )
+        return {
+            'text': response.choices[0].message.content or '',
+            'token_usage': response.usage.total_tokens if response.usage else 0,
+            'finish_reason': response.choices[0].finish_reason
+        }
     
     async def analyze(
         self,
@@ -57,20 +88,12 @@ class OpenAIAdapter(BaseLLMAdapter):
         start_time = datetime.now()
         
         # 调用 OpenAI API（生成Markdown而不是JSON）
-        response = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3,
-            max_tokens=16000  # GPT-4o 支持最大16K输出tokens（保守设置）
-        )
+        result = await self.complete(system_prompt, user_prompt)
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
         # 获取响应文本（Markdown格式）
-        response_text = response.choices[0].message.content
+        response_text = result['text']
         
         # 提取执行摘要（取第一个有意义的段落）
         lines = response_text.strip().split('\n')
@@ -84,7 +107,7 @@ class OpenAIAdapter(BaseLLMAdapter):
             executive_brief = response_text[:500]
         
         # 计算成本
-        token_usage = response.usage.total_tokens
+        token_usage = result['token_usage']
         cost_per_1k = self.get_model_info()['cost_per_1k_tokens']
         estimated_cost = (token_usage / 1000) * cost_per_1k
         
@@ -117,30 +140,6 @@ class OpenAIAdapter(BaseLLMAdapter):
         
         article_count = len(articles)
         
-        # 动态调整压缩策略
-        if article_count <= 20:
-            max_content = 1000
-        elif article_count <= 50:
-            max_content = 600
-        elif article_count <= 100:
-            max_content = 400
-        else:
-            max_content = 300
-        
-        # 构建文章列表（紧凑格式）
-        articles_text = f"# 待分析信息源（共 {article_count} 条）\n\n"
-        
-        for i, article in enumerate(articles, 1):
-            content = article.content[:max_content]
-            if len(article.content) > max_content:
-                content += "..."
-            
-            articles_text += f"""### [{i}] {article.title}
-- 来源: {article.source_name} | 时间: {article.published_at.strftime('%m-%d %H:%M')} | 行业: {article.industry.value}
-- 内容: {content}
-
-"""
-        
         # 获取品类特定的用户提示词模板
         if custom_prompt:
             task_desc = custom_prompt
@@ -154,6 +153,12 @@ class OpenAIAdapter(BaseLLMAdapter):
         # 使用基类方法生成标题格式
         title_format = self._get_report_title_format(industry)
         
+        # 按模型上下文窗口的 token 预算构建文章列表（紧凑格式）
+        articles_text = self._pack_articles_text(
+            articles,
+            [self._build_system_prompt(analysis_type, industry), task_desc, report_format]
+        )
+        
         return f"""{task_desc}
 
 {articles_text}
@@ -168,8 +173,9 @@ class OpenAIAdapter(BaseLLMAdapter):
 - 必须完整输出所有章节，确保包含结尾总结
 """
     
-    def get_model_info(self) -> dict:
-        """获取模型信息"""
+    @classmethod
+    def describe_model(cls, model: str) -> dict:
+        """获取模型信息（不需要创建客户端，成本估算等场景直接使用）"""
         # 价格参考（2026 年可能有变化）
         pricing = {
             'gpt-4o': 0.005,
@@ -178,9 +184,16 @@ class OpenAIAdapter(BaseLLMAdapter):
             'gpt-3.5-turbo': 0.0005
         }
         
+        # 上下文窗口
+        context_windows = {
+            'gpt-3.5-turbo': 16385
+        }
+        
         return {
             'backend': 'openai',
-            'model': self.model,
+            'model': model,
             'max_tokens': 128000,
-            'cost_per_1k_tokens': pricing.get(self.model, 0.001)
+            'context_window': context_windows.get(model, 128000),
+            'max_output_tokens': 16000,
+            'cost_per_1k_tokens': pricing.get(model, 0.001)
         }
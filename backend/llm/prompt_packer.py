@@ -0,0 +1,250 @@
+"""
+按 token 预算打包文章
+
+替代按文章数选择固定截断长度（1000/600/400/300 字）的做法：
+1. 输入预算 = 上下文窗口 - 预留输出 - 其余提示词（系统提示词、任务说明、报告格式）- 安全余量
+2. 每篇文章的标题行、来源行是固定开销，先从预算中扣除
+3. 按时效与来源稀缺度为文章排序打分，分数越高分到的正文预算越多（加权注水分配），
+   预算充足时每篇都完整保留（不超过单篇上限），不足时优先压缩排名靠后的文章
+4. 文章在提示词中的顺序不变，引用编号 [n] 仍与 analysis_articles.position + 1 对应
+5. 提供主题聚类结果时按主题分组输出，每组只展开代表文章的正文，其余只列编号与标题
+   （引用编号不变）
+"""
+
+import logging
+from collections import Counter
+from typing import List, Optional, Sequence
+
+from models import Article
+from llm.token_counter import ENCODING_NAME, count_tokens, count_tokens_cached, truncate_to_tokens
+from llm.article_digest import article_content_hash
+
+logger = logging.getLogger(__name__)
+
+# 未提供上下文窗口时的默认值
+DEFAULT_CONTEXT_WINDOW = 32768
+DEFAULT_MAX_OUTPUT_TOKENS = 8192
+# 预留输出不超过上下文窗口的该比例（输出上限接近或超过窗口的本地模型）
+MAX_OUTPUT_RATIO = 0.5
+# 计数误差与提示词尾部说明的安全余量
+SAFETY_MARGIN_TOKENS = 512
+# 单篇正文的 token 上限与下限（下限以下的正文不如只保留标题）
+ARTICLE_MAX_TOKENS = 2000
+ARTICLE_MIN_TOKENS = 40
+
+
+def output_reserve(context_window: int, max_output_tokens: int) -> int:
+    """为输出预留的 token 数"""
+    return min(max_output_tokens, int(context_window * MAX_OUTPUT_RATIO))
+
+
+def rank_weights(articles: Sequence[Article]) -> List[float]:
+    """
+    文章权重（1.0 ~ 2.0）：越新、来源在本批中越少见的文章权重越高
+
+    只影响正文预算的分配，不改变文章顺序
+    """
+    if not articles:
+        return []
+    timestamps = [a.published_at.timestamp() for a in articles]
+    oldest, newest = min(timestamps), max(timestamps)
+    span = newest - oldest
+    source_counts = Counter(a.source_name for a in articles)
+
+    weights = []
+    for article, ts in zip(articles, timestamps):
+        recency = (ts - oldest) / span if span > 0 else 1.0
+        rarity = 1.0 / source_counts[article.source_name]
+        weights.append(1.0 + 0.5 * recency + 0.5 * rarity)
+    return weights
+
+
+def allocate_budgets(
+    needs: Sequence[int],
+    weights: Sequence[float],
+    budget: int,
+    min_tokens: int = ARTICLE_MIN_TOKENS
+) -> List[int]:
+    """
+    加权注水分配：找到最大水位 L，使 sum(min(need_i, max(min_tokens, L * w_i))) <= budget
+
+    预算连每篇 min_tokens 都不够时，按权重从高到低给 min_tokens，其余文章为 0（只保留标题）
+    """
+    count = len(needs)
+    if count == 0:
+        return []
+    if sum(needs) <= budget:
+        return list(needs)
+
+    floors = [min(need, min_tokens) for need in needs]
+    if sum(floors) > budget:
+        allocation = [0] * count
+        remaining = budget
+        for i in sorted(range(count), key=lambda k: -weights[k]):
+            if floors[i] <= remaining:
+                allocation[i] = floors[i]
+                remaining -= floors[i]
+        return allocation
+
+    def allocate(level: float) -> List[int]:
+        return [min(need, max(floor, int(level * w))) for need, floor, w in zip(needs, floors, weights)]
+
+    low, high = 0.0, float(max(needs)) / min(weights)
+    for _ in range(40):
+        mid = (low + high) / 2
+        if sum(allocate(mid)) <= budget:
+            low = mid
+        else:
+            high = mid
+    return allocate(low)
+
+
+def _article_header(index: int, article: Article, time_format: str) -> str:
+    return (
+        f"### [{index}] {article.title}\n"
+        f"- 来源: {article.source_name} | 时间: {article.published_at.strftime(time_format)}"
+        f" | 行业: {article.industry.value}\n"
+        f"- 内容: "
+    )
+
+
+def _article_brief(index: int, article: Article, time_format: str) -> str:
+    return f"- [{index}] {article.title}（{article.source_name} | {article.published_at.strftime(time_format)}）\n"
+
+
+def pack_articles(
+    articles: List[Article],
+    overhead_texts: Sequence[str] = (),
+    context_window: int = DEFAULT_CONTEXT_WINDOW,
+    max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+    digests: Optional[dict] = None,
+    time_format: str = '%m-%d %H:%M',
+    article_max_tokens: int = ARTICLE_MAX_TOKENS,
+    encoding_name: str = ENCODING_NAME,
+    clusters: Optional[List[dict]] = None
+) -> dict:
+    """
+    按 token 预算生成文章列表文本
+
+    Args:
+        articles: 文章列表（顺序即引用编号）
+        overhead_texts: 同一次调用中的其余提示词（系统提示词、任务说明、报告格式等）
+        context_window: 模型上下文窗口
+        max_output_tokens: 模型最大输出 token 数
+        digests: {content_hash: digest}，有摘要的文章用摘要代替原文
+        time_format: 时间显示格式
+        article_max_tokens: 单篇正文的 token 上限
+        encoding_name: 计数使用的 tiktoken 编码
+        clusters: cluster_articles() 的结果，为 None 时不分组
+
+    Returns:
+        {
+            'text': 文章列表文本,
+            'budget': 正文可用预算,
+            'prompt_tokens': 估算的输入 token 数（含其余提示词）,
+            'truncated': 被截断的文章数,
+            'title_only': 只保留标题的文章数,
+            'collapsed': 按主题折叠、只列标题的文章数
+        }
+    """
+    digests = digests or {}
+    expanded = set(range(len(articles)))
+    if clusters:
+        expanded = {i for c in clusters for i in c['members'][:c['representatives']]}
+        groups = [c for c in clusters if len(c['members']) > 1]
+        singles = [c['members'][0] for c in clusters if len(c['members']) == 1]
+        heading = f"# 待分析信息源（共 {len(articles)} 条，按主题聚合为 {len(groups)} 组）\n\n"
+    else:
+        heading = f"# 待分析信息源（共 {len(articles)} 条）\n\n"
+    headers = [
+        _article_header(i, a, time_format) if i - 1 in expanded else _article_brief(i, a, time_format)
+        for i, a in enumerate(articles, 1)
+    ]
+
+    bodies = []
+    needs = []
+    for index, article in enumerate(articles):
+        if index not in expanded:
+            bodies.append("")
+            needs.append(0)
+            continue
+        content_hash = article_content_hash(article)
+        digest = digests.get(content_hash)
+        if digest:
+            body, key = digest, f"digest:{content_hash}"
+        else:
+            body, key = article.content, f"content:{content_hash}"
+        bodies.append(body)
+        needs.append(min(count_tokens_cached(key, body, encoding_name), article_max_tokens))
+
+    section_titles = {}
+    if clusters:
+        for number, cluster in enumerate(groups, 1):
+            lead = articles[cluster['members'][0]].title
+            section_titles[id(cluster)] = f"## 主题 {number}：{lead}（{len(cluster['members'])} 条）\n\n"
+        if singles:
+            section_titles['singles'] = f"## 其他独立报道（{len(singles)} 条）\n\n"
+
+    overhead = sum(count_tokens(text, encoding_name) for text in overhead_texts)
+    overhead += count_tokens(heading, encoding_name)
+    overhead += sum(count_tokens(title, encoding_name) for title in section_titles.values())
+    overhead += sum(count_tokens(header, encoding_name) + 2 for header in headers)
+    input_window = context_window - output_reserve(context_window, max_output_tokens)
+    budget = max(0, input_window - overhead - SAFETY_MARGIN_TOKENS)
+
+    if budget == 0:
+        logger.warning(
+            f"提示词固定部分（{overhead} tokens）已接近上下文窗口（{input_window} tokens），"
+            f"{len(articles)} 篇文章只保留标题"
+        )
+
+    allocation = allocate_budgets(needs, rank_weights(articles), budget)
+
+    truncated = title_only = 0
+    rendered = []
+    for index, (header, body, need, tokens) in enumerate(zip(headers, bodies, needs, allocation)):
+        if index not in expanded:
+            rendered.append(header)
+            continue
+        if tokens <= 0:
+            content = "（略）"
+            title_only += 1
+        elif tokens < need or need == article_max_tokens:
+            content = truncate_to_tokens(body, tokens, encoding_name)
+            if len(content) < len(body):
+                content += "..."
+                truncated += 1
+        else:
+            content = body
+        rendered.append(f"{header}{content}\n\n")
+
+    parts = [heading]
+    if clusters:
+        for cluster in groups:
+            parts.append(section_titles[id(cluster)])
+            members = cluster['members']
+            parts.extend(rendered[i] for i in members[:cluster['representatives']])
+            rest = members[cluster['representatives']:]
+            if rest:
+                parts.append("同主题其他报道：\n")
+                parts.extend(rendered[i] for i in sorted(rest))
+                parts.append("\n")
+        if singles:
+            parts.append(section_titles['singles'])
+            parts.extend(rendered[i] for i in sorted(singles))
+    else:
+        parts.extend(rendered)
+
+    collapsed = len(articles) - len(expanded)
+    logger.info(
+        f"提示词打包: {len(articles)} 篇，正文预算 {budget} tokens，"
+        f"使用 {sum(allocation)}，截断 {truncated} 篇，仅标题 {title_only} 篇，按主题折叠 {collapsed} 篇"
+    )
+    return {
+        'text': "".join(parts),
+        'budget': budget,
+        'prompt_tokens': overhead + sum(allocation),
+        'truncated': truncated,
+        'title_only': title_only,
+        'collapsed': collapsed,
+    }
@@ -0,0 +1,246 @@
+"""
+LLM 调用限流
+
+进程级、按后端 + 模型划分的限流器，所有 LLM 调用（分析、Map-Reduce 分块、摘要、
+重试与对冲请求）都经过它：
+
+- 并发上限：同时进行中的请求数
+- TPM 令牌桶：调用前按预估 token 数（提示词 + 预计输出）扣减，调用后按实际
+  token_usage 多退少补；桶按每分钟额度匀速回填
+- 公平排队：先到先得（FIFO），队首请求获得额度前后来者不会插队，大请求不会被饿死
+- 统计：排队深度、进行中请求数、等待时间、剩余 token 额度
+"""
+
+import asyncio
+import time
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 各后端默认限额（tokens_per_minute 为 None 时只限制并发）
+DEFAULT_LIMITS = {
+    'deepseek': {'max_concurrency': 8, 'tokens_per_minute': None},
+    'openai': {'max_concurrency': 4, 'tokens_per_minute': 200000},
+    'gemini': {'max_concurrency': 4, 'tokens_per_minute': 1000000},
+    # 本地模型受显存限制，并发过高只会互相拖慢
+    'ollama': {'max_concurrency': 2, 'tokens_per_minute': None},
+}
+FALLBACK_LIMITS = {'max_concurrency': 4, 'tokens_per_minute': None}
+
+# 未指定 max_tokens 时按该输出量预估
+DEFAULT_OUTPUT_ESTIMATE = 2048
+
+
+class LLMRateLimiter:
+    """
+    单个后端 / 模型的限流器
+
+    Example:
+        limiter = get_llm_rate_limiters().get("openai", "gpt-4o-mini")
+        async with limiter.reserve(estimated_tokens) as usage:
+            result = await call()
+            usage['tokens'] = result['token_usage']
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 4, tokens_per_minute: Optional[int] = None):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute or None
+        self._tokens = float(self.tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        # 等待队列：[future, 预留 token 数, 入队时间]
+        self._waiters: deque = deque()
+        self._in_flight = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        # 统计
+        self.acquired = 0
+        self.queued = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def configure(self, max_concurrency: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        """调整限额（进行中的请求不受影响）"""
+        self._refill()
+        if max_concurrency is not None:
+            self.max_concurrency = max(1, max_concurrency)
+        if self.tokens_per_minute != (tokens_per_minute or None):
+            self.tokens_per_minute = tokens_per_minute or None
+            self._tokens = float(self.tokens_per_minute or 0)
+        self._wake()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute / 60
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def _clamp(self, tokens: int) -> int:
+        """单次预留不超过桶容量，否则永远无法获得额度"""
+        tokens = max(0, int(tokens))
+        if self.tokens_per_minute:
+            tokens = min(tokens, self.tokens_per_minute)
+        return tokens
+
+    def _can_run(self, tokens: int) -> bool:
+        if self._in_flight >= self.max_concurrency:
+            return False
+        return not self.tokens_per_minute or self._tokens >= tokens
+
+    def _grant(self, tokens: int, enqueued_at: float):
+        self._in_flight += 1
+        if self.tokens_per_minute:
+            self._tokens -= tokens
+        waited = time.monotonic() - enqueued_at
+        self.acquired += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def _wake(self):
+        """按 FIFO 放行队首请求；队首只缺 token 时定时等待回填"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._refill()
+
+        while self._waiters:
+            future, tokens, enqueued_at = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            if not self._can_run(tokens):
+                break
+            self._waiters.popleft()
+            self._grant(tokens, enqueued_at)
+            future.set_result(None)
+
+        if self._waiters and self._in_flight < self.max_concurrency and self.tokens_per_minute:
+            _, tokens, _ = self._waiters[0]
+            delay = max(0.01, (tokens - self._tokens) / (self.tokens_per_minute / 60))
+            self._timer = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    async def acquire(self, tokens: int = 0) -> int:
+        """
+        获取一个并发名额并预留 token（排队等待）
+
+        Returns:
+            实际预留的 token 数（释放时传回 release()）
+        """
+        tokens = self._clamp(tokens)
+        enqueued_at = time.monotonic()
+        self._refill()
+        if not self._waiters and self._can_run(tokens):
+            self._grant(tokens, enqueued_at)
+            return tokens
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, tokens, enqueued_at))
+        self.queued += 1
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 已获得名额但调用方被取消：归还
+                self.release(tokens, 0)
+            else:
+                self._wake()
+            raise
+        return tokens
+
+    def release(self, reserved: int, actual: Optional[int] = None):
+        """
+        释放名额，按实际消耗修正 token 桶
+
+        Args:
+            reserved: acquire() 预留的 token 数
+            actual: 实际消耗（None 表示未知，按预留计）
+        """
+        self._in_flight = max(0, self._in_flight - 1)
+        if self.tokens_per_minute and actual is not None:
+            self._refill()
+            self._tokens = min(float(self.tokens_per_minute), self._tokens + reserved - actual)
+        self._wake()
+
+    @asynccontextmanager
+    async def reserve(self, tokens: int = 0):
+        """上下文管理器形式：调用方把实际消耗写入 usage['tokens']"""
+        reserved = await self.acquire(tokens)
+        usage = {'tokens': None}
+        try:
+            yield usage
+        finally:
+            self.release(reserved, usage['tokens'])
+
+    def get_stats(self) -> dict:
+        """限流统计"""
+        self._refill()
+        return {
+            'name': self.name,
+            'max_concurrency': self.max_concurrency,
+            'tokens_per_minute': self.tokens_per_minute,
+            'tokens_available': round(self._tokens) if self.tokens_per_minute else None,
+            'in_flight': self._in_flight,
+            'queue_depth': sum(1 for future, _, _ in self._waiters if not future.done()),
+            'acquired': self.acquired,
+            'queued': self.queued,
+            'avg_wait_ms': round(self.total_wait_seconds / self.acquired * 1000, 1) if self.acquired else 0,
+            'max_wait_ms': round(self.max_wait_seconds * 1000, 1),
+        }
+
+
+class LLMRateLimiterRegistry:
+    """按后端 + 模型管理限流器，限额按后端配置"""
+
+    def __init__(self):
+        self._limiters: Dict[Tuple[str, str], LLMRateLimiter] = {}
+        self._limits: Dict[str, dict] = {backend: dict(limits) for backend, limits in DEFAULT_LIMITS.items()}
+
+    def get_limits(self, backend: str) -> dict:
+        return dict(self._limits.get(backend.lower(), FALLBACK_LIMITS))
+
+    def get(self, backend: str, model: Optional[str]) -> LLMRateLimiter:
+        backend = backend.lower()
+        key = (backend, model or '')
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = LLMRateLimiter(f"{backend}/{model or 'default'}", **self.get_limits(backend))
+            self._limiters[key] = limiter
+        return limiter
+
+    def configure(self, limits: Dict[str, dict]):
+        """
+        更新后端限额
+
+        Args:
+            limits: {backend: {'max_concurrency': int, 'tokens_per_minute': int | None}}
+        """
+        for backend, backend_limits in limits.items():
+            backend = backend.lower()
+            merged = {**self.get_limits(backend), **backend_limits}
+            self._limits[backend] = merged
+            for (limiter_backend, _), limiter in self._limiters.items():
+                if limiter_backend == backend:
+                    limiter.configure(merged['max_concurrency'], merged['tokens_per_minute'])
+
+    def get_stats(self) -> dict:
+        return {
+            'limits': {backend: dict(limits) for backend, limits in self._limits.items()},
+            'limiters': [limiter.get_stats() for limiter in self._limiters.values()],
+        }
+
+
+# 全局限流器注册表
+_registry: Optional[LLMRateLimiterRegistry] = None
+
+
+def get_llm_rate_limiters() -> LLMRateLimiterRegistry:
+    """获取全局 LLM 限流器注册表"""
+    global _registry
+    if _registry is None:
+        _registry = LLMRateLimiterRegistry()
+    return _registry
@@ -0,0 +1,288 @@
+"""
+分析报告结构化解析
+
+各适配器只返回 Markdown 报告，趋势 / 信号 / 信息差列表始终为空。保存分析时解析一次报告：
+
+1. 章节：按标题层级切分，记录层级、标题路径与正文
+2. 条目：章节内的顶层列表项（或带引用的段落），拆出标题、正文、引用编号与得分
+3. 分类：按最近的带关键词的标题把章节归为 trend / signal / gap / other
+4. 得分：优先取条目中的显式评分（置信度、重要性、星级、高/中/低），否则按引用的文章数估计
+
+引用编号 [n] 对应 analysis.article_ids[n - 1]（与 analysis_articles.position + 1 一致）。
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from models import Trend, Signal, InformationGap
+
+# 章节分类关键词（按顺序匹配，信息差优先于趋势，趋势优先于信号）
+KIND_KEYWORDS = [
+    ('gap', ['信息差', '盲点', '空白', '缺口', '被忽视', '被低估', '预期差', '矛盾', '分歧', '争议', 'gap']),
+    ('trend', ['趋势', '走向', '展望', '预测', '预判', '演变', '长期', '中期', '短期', '情景', 'trend']),
+    ('signal', ['信号', '动态', '事件', '要闻', '快讯', '简报', '速览', '异动', '发布', '风险', '机会',
+                '关注', '预警', '脉搏', 'signal']),
+]
+# 信息差子类型
+GAP_TYPES = [
+    ('conflict', ['矛盾', '冲突', '分歧', '争议', '对立']),
+    ('emerging', ['新兴', '萌芽', '早期', '初现', '苗头', '崛起']),
+]
+# 每类写入 Analysis 字段的条目上限
+MAX_ITEMS_PER_KIND = 20
+# 条目标题长度上限（与 Trend / Signal / InformationGap.title 一致）
+HEADLINE_MAX_CHARS = 200
+
+_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+_LIST_ITEM = re.compile(r'^(\s*)(?:[-*+]|\d+[.)、])\s+(.*)$')
+_CITATION = re.compile(r'\[(\d{1,4})\]')
+_BOLD_LEAD = re.compile(r'^\*\*(.+?)\*\*\s*[：:]?\s*(.*)$', re.S)
+_SENTENCE_END = re.compile(r'[。！？；;!?]')
+_DECORATION = re.compile(r'^[\W_]+(?=\w)', re.U)
+_REPORT_TITLE = re.compile(r'^\d{4}-\d{1,2}-\d{1,2}')
+_PART_PREFIX = re.compile(r'^第[一二三四五六七八九十\d]+(?:部分|层|维|章)[：:\s]*')
+
+_SCORE_KEYWORDS = r'置信度|可信度|确定性|重要性|重要程度|影响力|影响程度|优先级|评分|强度|概率'
+_SCORE_NUMBER = re.compile(rf'(?:{_SCORE_KEYWORDS})\s*[：:]?\s*(\d+(?:\.\d+)?)\s*(%|/\s*10|/\s*5|分)?')
+_SCORE_LEVEL = re.compile(rf'(?:{_SCORE_KEYWORDS})\s*[：:]?\s*(极高|很高|高|中高|中等|中|中低|低|极低)')
+_STARS = re.compile(r'[★⭐]{1,5}')
+LEVEL_SCORES = {
+    '极高': 0.95, '很高': 0.9, '高': 0.85, '中高': 0.7, '中等': 0.55, '中': 0.55,
+    '中低': 0.4, '低': 0.25, '极低': 0.1,
+}
+
+
+def clean_heading(text: str) -> str:
+    """去掉标题前的 emoji / 序号装饰与“第一部分：”前缀，保留括号内的说明"""
+    text = _DECORATION.sub('', text.replace('**', '').strip())
+    return _PART_PREFIX.sub('', text).strip() or text.strip()
+
+
+def classify(headings: Sequence[str]) -> str:
+    """按标题路径（由近到远）判断章节类型，“日期-行业-报告标题”格式的报告标题不参与"""
+    for heading in reversed(headings):
+        if _REPORT_TITLE.match(heading):
+            continue
+        lowered = heading.lower()
+        for kind, keywords in KIND_KEYWORDS:
+            if any(keyword in lowered for keyword in keywords):
+                return kind
+    return 'other'
+
+
+def gap_type(text: str) -> str:
+    """信息差子类型：conflict / emerging / missing"""
+    for name, keywords in GAP_TYPES:
+        if any(keyword in text for keyword in keywords):
+            return name
+    return 'missing'
+
+
+def extract_score(text: str) -> Optional[float]:
+    """条目中的显式评分，归一化到 0-1"""
+    match = _SCORE_NUMBER.search(text)
+    if match:
+        value = float(match.group(1))
+        unit = (match.group(2) or '').replace(' ', '')
+        if unit == '/5':
+            value /= 5
+        elif unit == '/10':
+            value /= 10
+        elif unit == '%' or value > 10:
+            value /= 100
+        elif value > 1 or unit == '分':
+            value /= 10
+        return round(min(max(value, 0.0), 1.0), 4)
+    match = _SCORE_LEVEL.search(text)
+    if match:
+        return LEVEL_SCORES[match.group(1)]
+    match = _STARS.search(text)
+    if match:
+        return round(len(match.group(0)) / 5, 4)
+    return None
+
+
+def citation_score(citations: Sequence[int]) -> float:
+    """没有显式评分时按引用的文章数估计：多源佐证的条目更可信"""
+    return round(min(1.0, 0.3 + 0.15 * len(citations)), 4)
+
+
+def split_headline(text: str) -> tuple:
+    """条目标题：**加粗前缀** 或第一句（不含引用）；返回 (headline, body)"""
+    match = _BOLD_LEAD.match(text)
+    if match and match.group(1).strip():
+        headline, body = match.group(1).strip(), match.group(2).strip()
+        return headline[:HEADLINE_MAX_CHARS], body or headline
+    plain = text.replace('**', '')
+    # 第一句，遇到引用编号提前结束
+    ends = [m.start() for m in (_SENTENCE_END.search(plain), _CITATION.search(plain)) if m and m.start() > 0]
+    headline = plain[:min(ends)] if ends else plain
+    headline = _CITATION.sub('', headline).strip(' ：:')
+    return headline[:HEADLINE_MAX_CHARS] or plain[:HEADLINE_MAX_CHARS], plain
+
+
+def _make_item(lines: List[str], section: dict, article_ids: Sequence[str]) -> Optional[dict]:
+    text = '\n'.join(line.strip() for line in lines).strip()
+    if not text:
+        return None
+    headline, body = split_headline(text)
+    if not headline:
+        return None
+    citations = list(dict.fromkeys(int(n) for n in _CITATION.findall(text)))
+    explicit = extract_score(text)
+    return {
+        'section_position': section['position'],
+        'kind': section['kind'],
+        'headline': headline,
+        'body': body,
+        'score': explicit if explicit is not None else citation_score(citations),
+        'score_source': 'explicit' if explicit is not None else 'citations',
+        'citations': citations,
+        'article_ids': list(dict.fromkeys(
+            article_ids[n - 1] for n in citations if 0 < n <= len(article_ids)
+        )),
+    }
+
+
+def parse_report(markdown: str, article_ids: Sequence[str] = ()) -> Dict[str, List[dict]]:
+    """
+    解析 Markdown 报告
+
+    Args:
+        markdown: 分析报告
+        article_ids: 分析的文章 ID（按引用编号顺序）
+
+    Returns:
+        {
+            'sections': [{'position', 'level', 'heading', 'path', 'kind', 'content'}, ...],
+            'items': [{'position', 'section_position', 'kind', 'headline', 'body', 'score',
+                       'score_source', 'citations', 'article_ids'}, ...]
+        }
+        报告标题之前的导语归入 position 为 0、level 为 0 的章节
+    """
+    sections: List[dict] = []
+    items: List[dict] = []
+    stack: List[tuple] = []  # (level, heading)
+
+    def open_section(level: int, heading: str) -> dict:
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        if level:
+            stack.append((level, heading))
+        headings = [h for _, h in stack]
+        section = {
+            'position': len(sections),
+            'level': level,
+            'heading': heading,
+            'path': ' / '.join(headings),
+            'kind': classify(headings),
+            'lines': [],
+        }
+        sections.append(section)
+        return section
+
+    current = open_section(0, '')
+    pending: List[str] = []
+    pending_is_list = False
+    in_code = False
+
+    def flush():
+        nonlocal pending, pending_is_list
+        # 普通段落只有带引用时才作为条目
+        if pending and (pending_is_list or _CITATION.search(' '.join(pending))):
+            item = _make_item(pending, current, article_ids)
+            if item:
+                item['position'] = len(items)
+                items.append(item)
+        pending = []
+        pending_is_list = False
+
+    for line in (markdown or '').splitlines():
+        stripped = line.strip()
+        if stripped.startswith('```'):
+            in_code = not in_code
+            current['lines'].append(line)
+            continue
+        if in_code:
+            current['lines'].append(line)
+            continue
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            flush()
+            current = open_section(len(heading.group(1)), clean_heading(heading.group(2)))
+            continue
+
+        current['lines'].append(line)
+        list_item = _LIST_ITEM.match(line)
+        if list_item and not list_item.group(1):
+            # 顶层列表项开始新条目，缩进的子项并入当前条目
+            flush()
+            pending = [list_item.group(2)]
+            pending_is_list = True
+        elif not stripped or stripped in ('---', '***'):
+            if not pending_is_list:
+                flush()
+        elif stripped.startswith('|') or stripped.startswith('>'):
+            # 表格与引用块只保留在章节正文中
+            if not pending_is_list:
+                flush()
+        else:
+            if pending_is_list and not line.startswith((' ', '\t')) and not list_item:
+                flush()
+            pending.append(stripped)
+    flush()
+
+    result_sections = []
+    for section in sections:
+        content = '\n'.join(section.pop('lines')).strip()
+        if section['level'] == 0 and not content:
+            continue
+        section['content'] = content
+        result_sections.append(section)
+    return {'sections': result_sections, 'items': items}
+
+
+def structured_fields(parsed: Dict[str, List[dict]]) -> dict:
+    """
+    由解析结果生成 Analysis 的 trends / signals / information_gaps
+
+    只取引用了文章的条目（有据可查），每类按得分取前 MAX_ITEMS_PER_KIND 条，保持报告中的顺序
+    """
+    headings = {section['position']: section['heading'] for section in parsed['sections']}
+
+    def top(kind):
+        candidates = [item for item in parsed['items'] if item['kind'] == kind and item['article_ids']]
+        keep = sorted(candidates, key=lambda item: -item['score'])[:MAX_ITEMS_PER_KIND]
+        return sorted(keep, key=lambda item: item['position'])
+
+    return {
+        'trends': [
+            Trend(
+                title=item['headline'],
+                description=item['body'],
+                confidence=item['score'],
+                supporting_article_ids=item['article_ids']
+            )
+            for item in top('trend')
+        ],
+        'signals': [
+            Signal(
+                title=item['headline'],
+                description=item['body'],
+                importance=item['score'],
+                source_article_ids=item['article_ids'],
+                category=headings.get(item['section_position']) or None
+            )
+            for item in top('signal')
+        ],
+        'information_gaps': [
+            InformationGap(
+                title=item['headline'],
+                description=item['body'],
+                gap_type=gap_type(f"{headings.get(item['section_position'], '')} {item['body']}"),
+                related_article_ids=item['article_ids']
+            )
+            for item in top('gap')
+        ],
+    }
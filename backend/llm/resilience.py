@@ -0,0 +1,239 @@
+"""
+LLM 调用重试、退避、对冲与跨后端故障转移
+
+- 单次调用（BaseLLMAdapter.complete）：可重试错误（429、5xx、连接/超时）按指数退避重试，
+  优先使用响应中的 Retry-After；一次分析内所有调用共享重试预算，避免 Map-Reduce 放大重试
+- 对冲（可选）：调用超过阈值仍未返回时并发发起第二个相同请求，取先成功的结果
+- 故障转移：主后端重试耗尽后由 Analyzer 按配置的链路（如 deepseek → openai → ollama）换后端重跑
+- 每次尝试都记录为一条 attempt，随 Analysis 一起保存
+"""
+
+import asyncio
+import random
+import time
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 可重试的 HTTP 状态码
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+# Retry-After 超过该值时不再等待，直接交给故障转移
+DEFAULT_MAX_RETRY_AFTER = 60.0
+# 一次分析内所有调用共享的重试次数上限
+DEFAULT_RETRY_BUDGET = 8
+
+
+def error_status(exc: BaseException) -> Optional[int]:
+    """从 httpx / openai 异常中取 HTTP 状态码"""
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        response = getattr(exc, 'response', None)
+        status = getattr(response, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """解析响应头中的 Retry-After（秒数或 HTTP 日期）/ retry-after-ms"""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """是否为可重试的临时错误"""
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    try:
+        import openai
+        return isinstance(exc, openai.APIConnectionError)
+    except ImportError:
+        return False
+
+
+class RetryBudget:
+    """重试预算（一次分析内所有 LLM 调用共享）"""
+
+    def __init__(self, max_retries: int = DEFAULT_RETRY_BUDGET):
+        self.remaining = max_retries
+
+    def take(self) -> bool:
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class ResiliencePolicy:
+    """
+    单次 LLM 调用的重试 / 退避 / 对冲策略
+
+    Example:
+        policy = ResiliencePolicy(max_attempts=3, hedge_after_seconds=20)
+        adapter.resilience = policy
+        result = await adapter.complete(system_prompt, user_prompt)
+        adapter.attempts  # 每次尝试的记录
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+        hedge_after_seconds: Optional[float] = None,
+        budget: Optional[RetryBudget] = None
+    ):
+        """
+        Args:
+            max_attempts: 单次调用最多尝试次数（含首次）
+            base_delay: 指数退避的基础延迟（秒）
+            max_delay: 退避延迟上限（秒）
+            max_retry_after: 愿意等待的 Retry-After 上限（秒）
+            hedge_after_seconds: 超过该耗时仍未返回时发起对冲请求，为 None 时不对冲
+            budget: 共享重试预算，为 None 时只受 max_attempts 限制
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.hedge_after_seconds = hedge_after_seconds
+        self.budget = budget
+
+    @classmethod
+    def from_config(cls, config: Optional[dict], budget: Optional[RetryBudget] = None) -> "ResiliencePolicy":
+        """从配置字典创建（缺省项使用默认值）"""
+        config = config or {}
+        if budget is None:
+            budget = RetryBudget(config.get('retry_budget', DEFAULT_RETRY_BUDGET))
+        return cls(
+            max_attempts=config.get('max_attempts', DEFAULT_MAX_ATTEMPTS),
+            base_delay=config.get('base_delay', DEFAULT_BASE_DELAY),
+            max_delay=config.get('max_delay', DEFAULT_MAX_DELAY),
+            max_retry_after=config.get('max_retry_after', DEFAULT_MAX_RETRY_AFTER),
+            hedge_after_seconds=config.get('hedge_after_seconds'),
+            budget=budget
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """第 attempt 次失败后的退避延迟（带 ±25% 抖动）"""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.75, 1.25)
+
+    async def _hedged(self, call: Callable[[], Awaitable[dict]], attempts: List[dict], context: dict) -> dict:
+        """超过阈值时并发发起第二个请求，返回先成功的结果"""
+        primary = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after_seconds)
+        if done:
+            return primary.result()
+
+        logger.info(f"LLM 调用超过 {self.hedge_after_seconds}s 未返回，发起对冲请求")
+        attempts.append({**context, 'outcome': 'hedge_started', 'at': datetime.now().isoformat()})
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            attempts.append({**context, 'outcome': 'hedge_won', 'at': datetime.now().isoformat()})
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run(self, call: Callable[[], Awaitable[dict]], attempts: List[dict], backend: str, model: Optional[str]) -> dict:
+        """
+        执行调用，失败时按策略重试
+
+        Args:
+            call: 无参数的异步调用（每次尝试都重新调用）
+            attempts: 尝试记录列表（原地追加）
+            backend / model: 记录用
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            context = {'backend': backend, 'model': model, 'attempt': attempt}
+            start = time.perf_counter()
+            try:
+                if self.hedge_after_seconds:
+                    result = await self._hedged(call, attempts, context)
+                else:
+                    result = await call()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                record = {
+                    **context,
+                    'outcome': 'error',
+                    'error': f"{type(e).__name__}: {str(e)[:300]}",
+                    'status_code': error_status(e),
+                    'duration_ms': round((time.perf_counter() - start) * 1000),
+                    'at': datetime.now().isoformat(),
+                }
+                attempts.append(record)
+
+                if not is_retryable(e) or attempt >= self.max_attempts:
+                    raise
+                retry_after = retry_after_seconds(e)
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    logger.warning(f"{backend} 要求等待 {retry_after:.0f}s，超过上限，放弃重试")
+                    raise
+                if self.budget is not None and not self.budget.take():
+                    logger.warning(f"{backend} 重试预算已用尽")
+                    raise
+
+                delay = retry_after if retry_after is not None else self.backoff_delay(attempt)
+                record['retry_after'] = retry_after
+                record['delay_seconds'] = round(delay, 2)
+                logger.warning(f"{backend} 调用失败（第 {attempt} 次）: {record['error']}，{delay:.1f}s 后重试")
+                await asyncio.sleep(delay)
+                continue
+
+            attempts.append({
+                **context,
+                'outcome': 'success',
+                'duration_ms': round((time.perf_counter() - start) * 1000),
+                'token_usage': result.get('token_usage'),
+                'at': datetime.now().isoformat(),
+            })
+            return result
+
+        raise RuntimeError("unreachable")
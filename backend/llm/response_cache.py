@@ -0,0 +1,155 @@
+"""
+LLM 响应缓存
+
+按内容寻址：缓存键是后端、模型、系统提示词、用户提示词和生成参数的哈希，
+相同文章、相同模型与提示词模板的重复分析（如 UI 超时后重试）直接返回已有结果。
+
+- 持久化在 SQLite（llm_response_cache 表），进程重启后仍然有效
+- 按 TTL 过期，总大小超过上限时按最近使用时间淘汰
+- 记录命中/未命中次数与节省的 token 数
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存有效期（小时）与总大小上限（字节）
+DEFAULT_TTL_HOURS = 24 * 7
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# 每写入多少条执行一次淘汰
+EVICT_EVERY = 50
+
+
+def make_cache_key(
+    backend: str,
+    model: Optional[str],
+    system_prompt: str,
+    user_prompt: str,
+    params: Optional[dict] = None
+) -> str:
+    """计算缓存键（SHA-256）"""
+    payload = json.dumps({
+        'backend': backend,
+        'model': model,
+        'system_prompt': system_prompt,
+        'user_prompt': user_prompt,
+        'params': params or {},
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    LLM 响应缓存
+
+    Example:
+        cache = get_llm_response_cache()
+        cached = await cache.get(key)
+        if cached is None:
+            result = await call_llm()
+            await cache.put(key, backend, model, result)
+    """
+
+    def __init__(
+        self,
+        db,
+        ttl_hours: float = DEFAULT_TTL_HOURS,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES
+    ):
+        """
+        Args:
+            db: Database 实例
+            ttl_hours: 缓存有效期（小时）
+            max_bytes: 缓存总大小上限（字节），为 None 时不限制
+        """
+        self.db = db
+        self.ttl = timedelta(hours=ttl_hours)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self._writes = 0
+
+    def _min_created_at(self) -> datetime:
+        return datetime.now() - self.ttl
+
+    async def get(self, cache_key: str) -> Optional[dict]:
+        """
+        读取缓存
+
+        Returns:
+            {'text', 'token_usage'}，未命中或已过期时返回 None
+        """
+        try:
+            entry = await self.db.get_llm_cache_entry(cache_key, self._min_created_at())
+        except Exception as e:
+            # 缓存不可用时不影响正常调用
+            logger.warning(f"读取 LLM 响应缓存失败: {e}")
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.saved_tokens += entry['token_usage'] or 0
+        logger.info(f"LLM 响应缓存命中（{entry['llm_backend']}/{entry['llm_model']}，节省 {entry['token_usage']} tokens）")
+        return {'text': entry['response_text'], 'token_usage': entry['token_usage']}
+
+    async def put(self, cache_key: str, backend: str, model: Optional[str], result: dict):
+        """写入缓存（空响应不缓存），并定期淘汰过期与超限条目"""
+        text = result.get('text')
+        if not text:
+            return
+        try:
+            await self.db.save_llm_cache_entry(
+                cache_key, backend, model, text, result.get('token_usage') or 0
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 1:
+                await self.evict()
+        except Exception as e:
+            logger.warning(f"写入 LLM 响应缓存失败: {e}")
+
+    async def evict(self) -> int:
+        """淘汰过期和超出大小上限的条目"""
+        removed = await self.db.evict_llm_cache(self._min_created_at(), self.max_bytes)
+        if removed:
+            logger.info(f"LLM 响应缓存淘汰 {removed} 条")
+        return removed
+
+    async def clear(self) -> int:
+        """清空缓存"""
+        return await self.db.clear_llm_cache()
+
+    async def get_stats(self) -> dict:
+        """缓存统计：本进程命中/未命中/节省 token，以及持久化的条目数与大小"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'saved_tokens': self.saved_tokens,
+            'ttl_hours': self.ttl.total_seconds() / 3600,
+            'max_bytes': self.max_bytes,
+            **(await self.db.get_llm_cache_summary()),
+        }
+
+
+# 全局缓存实例
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache(db=None) -> LLMResponseCache:
+    """获取全局 LLM 响应缓存（默认使用默认路径的数据库）"""
+    global _response_cache
+    if _response_cache is None:
+        if db is None:
+            from storage.database import Database
+            db = Database()
+        _response_cache = LLMResponseCache(db)
+    return _response_cache
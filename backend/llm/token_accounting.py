@@ -0,0 +1,178 @@
+"""
+Token 计数服务（成本估算）
+
+- 文章正文的 token 数按内容哈希与编码持久化在 article_token_counts 表，
+  进程内再缓存一层；与提示词打包共用同一内存缓存
+- 估算只需要模型描述（适配器类的 describe_model），不创建 LLM 客户端、不读取 API Key
+- 估算值与实际发送的提示词一致：正文按单篇上限与上下文窗口预算截断
+"""
+
+import logging
+from typing import List, Optional
+
+from models import Article, AnalysisType, IndustryCategory
+from llm.adapter import get_adapter_class
+from llm.article_digest import article_content_hash
+from llm.map_reduce import MAP_REDUCE_THRESHOLD
+from llm.prompt_packer import ARTICLE_MAX_TOKENS, SAFETY_MARGIN_TOKENS, output_reserve
+from llm.token_counter import (
+    ENCODING_NAME, count_tokens, effective_encoding, encoding_for_model,
+    get_cached_count, set_cached_count
+)
+
+logger = logging.getLogger(__name__)
+
+# 每篇文章标题行、来源行的固定开销（不含标题本身）
+ARTICLE_HEADER_TOKENS = 30
+
+
+def content_count_key(content_hash: str) -> str:
+    """正文 token 数的缓存键（与提示词打包一致）"""
+    return f"content:{content_hash}"
+
+
+class TokenAccountant:
+    """
+    Token 计数服务
+
+    Example:
+        accountant = get_token_accountant()
+        estimate = await accountant.estimate(articles, "deepseek")
+    """
+
+    def __init__(self, db=None):
+        """
+        Args:
+            db: Database 实例，为 None 时只使用内存缓存
+        """
+        self.db = db
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.computed = 0
+
+    async def count_articles(self, articles: List[Article], encoding_name: str = ENCODING_NAME) -> List[int]:
+        """
+        计算每篇文章正文的 token 数：内存缓存 -> 数据库 -> 编码，新计算的结果写回数据库
+
+        Returns:
+            与 articles 顺序一致的 token 数列表
+        """
+        hashes = [article_content_hash(article) for article in articles]
+        counts = {}
+        missing = {}
+        for content_hash, article in zip(hashes, articles):
+            if content_hash in counts or content_hash in missing:
+                continue
+            count = get_cached_count(content_count_key(content_hash), encoding_name)
+            if count is None:
+                missing[content_hash] = article
+            else:
+                counts[content_hash] = count
+        self.memory_hits += len(counts)
+
+        # 持久化的计数按实际使用的编码区分，编码器不可用时的估算值不会被当作精确值复用
+        stored_encoding = effective_encoding(encoding_name)
+        if missing and self.db is not None:
+            stored = await self.db.get_article_token_counts(list(missing), stored_encoding)
+            for content_hash, count in stored.items():
+                counts[content_hash] = count
+                set_cached_count(content_count_key(content_hash), count, encoding_name)
+                del missing[content_hash]
+            self.db_hits += len(stored)
+
+        if missing:
+            computed = {
+                content_hash: count_tokens(article.content, encoding_name)
+                for content_hash, article in missing.items()
+            }
+            for content_hash, count in computed.items():
+                counts[content_hash] = count
+                set_cached_count(content_count_key(content_hash), count, encoding_name)
+            self.computed += len(computed)
+            if self.db is not None:
+                try:
+                    await self.db.save_article_token_counts(computed, stored_encoding)
+                except Exception as e:
+                    logger.warning(f"保存文章 token 数失败: {e}")
+
+        return [counts[content_hash] for content_hash in hashes]
+
+    async def estimate(
+        self,
+        articles: List[Article],
+        backend: str,
+        model: Optional[str] = None,
+        analysis_type: AnalysisType = AnalysisType.COMPREHENSIVE,
+        industry: Optional[IndustryCategory] = None
+    ) -> dict:
+        """
+        估算分析的输入 token 数与成本（不创建 LLM 客户端）
+
+        Returns:
+            {
+                'token_count': 预计发送的输入 token 数,
+                'content_tokens': 文章正文的原始 token 数,
+                'estimated_cost_usd': 预计成本,
+                'model': 模型名,
+                'encoding': 实际使用的编码（estimate 表示字符估算）,
+                'context_window': 上下文窗口,
+                'exceeds_context': 正文是否会被按预算截断,
+                'map_reduce': 是否会使用 Map-Reduce 分析,
+                'model_info': 模型信息
+            }
+        """
+        from prompts import get_prompt_manager
+
+        adapter_class = get_adapter_class(backend)
+        model = model or adapter_class.DEFAULT_MODEL
+        model_info = adapter_class.describe_model(model)
+        encoding_name = encoding_for_model(backend.lower(), model)
+
+        counts = await self.count_articles(articles, encoding_name)
+        content_tokens = sum(counts)
+
+        prompt_manager = get_prompt_manager()
+        overhead = count_tokens(prompt_manager.get_system_prompt(industry, analysis_type), encoding_name)
+        overhead += count_tokens(prompt_manager.get_report_format_prompt(industry, analysis_type), encoding_name)
+        overhead += sum(count_tokens(article.title, encoding_name) + ARTICLE_HEADER_TOKENS for article in articles)
+
+        context_window = model_info.get('context_window') or model_info.get('max_tokens', 0)
+        max_output = model_info.get('max_output_tokens') or 0
+        budget = max(0, context_window - output_reserve(context_window, max_output) - overhead - SAFETY_MARGIN_TOKENS)
+        packed_content = sum(min(count, ARTICLE_MAX_TOKENS) for count in counts)
+        token_count = overhead + min(packed_content, budget)
+
+        return {
+            'token_count': token_count,
+            'content_tokens': content_tokens,
+            'estimated_cost_usd': (token_count / 1000) * model_info.get('cost_per_1k_tokens', 0),
+            'model': model,
+            'encoding': effective_encoding(encoding_name),
+            'context_window': context_window,
+            'exceeds_context': packed_content > budget,
+            'map_reduce': len(articles) > MAP_REDUCE_THRESHOLD,
+            'model_info': model_info,
+        }
+
+    def get_stats(self) -> dict:
+        """本进程的计数来源统计"""
+        return {
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'computed': self.computed,
+        }
+
+
+# 全局计数服务实例
+_token_accountant: Optional[TokenAccountant] = None
+
+
+def get_token_accountant(db=None) -> TokenAccountant:
+    """获取全局 Token 计数服务（默认使用默认路径的数据库）"""
+    global _token_accountant
+    if _token_accountant is None:
+        if db is None:
+            from storage.database import Database
+            db = Database()
+        _token_accountant = TokenAccountant(db)
+    return _token_accountant
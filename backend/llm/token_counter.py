@@ -0,0 +1,129 @@
+"""
+Token 计数
+
+- 每种 tiktoken 编码在进程内只加载一次；编码文件不可用（如离线环境）时
+  记住失败并改用按字符类别的估算，不会在每次计数时重试下载
+- OpenAI 模型使用其对应的编码（如 gpt-4o 为 o200k_base），其余后端没有公开的
+  tiktoken 编码，使用 cl100k_base 近似
+- 按键缓存计数结果（文章用内容哈希），重复构建提示词时不必重新编码
+"""
+
+import re
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+# 编码器不可用时使用的“编码名”（持久化计数时区分精确值与估算值）
+ESTIMATE_ENCODING = "estimate"
+# 计数缓存最大条目数
+COUNT_CACHE_SIZE = 20000
+
+# CJK 字符（含全角标点）按 1 token 估算，其余字符按 4 字符/token 估算
+_CJK_PATTERN = re.compile(r'[\u3000-\u303f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+
+_encoders: dict = {}
+_failed_encodings: set = set()
+_count_cache: "OrderedDict[str, int]" = OrderedDict()
+
+
+def get_encoder(encoding_name: str = ENCODING_NAME):
+    """获取全局 tiktoken 编码器，不可用时返回 None"""
+    encoder = _encoders.get(encoding_name)
+    if encoder is None and encoding_name not in _failed_encodings:
+        try:
+            import tiktoken
+            encoder = tiktoken.get_encoding(encoding_name)
+            _encoders[encoding_name] = encoder
+        except Exception as e:
+            _failed_encodings.add(encoding_name)
+            logger.warning(f"tiktoken 编码 {encoding_name} 不可用，改用字符估算: {e}")
+    return encoder
+
+
+def encoding_for_model(backend: Optional[str], model: Optional[str]) -> str:
+    """模型对应的 tiktoken 编码名（只有 OpenAI 模型有专用编码）"""
+    if backend == "openai" and model:
+        try:
+            from tiktoken.model import encoding_name_for_model
+            return encoding_name_for_model(model)
+        except Exception:
+            pass
+    return ENCODING_NAME
+
+
+def effective_encoding(encoding_name: str = ENCODING_NAME) -> str:
+    """实际使用的编码名：编码器不可用时为 estimate"""
+    return encoding_name if get_encoder(encoding_name) is not None else ESTIMATE_ENCODING
+
+
+def _char_cost(char: str) -> float:
+    return 1.0 if _CJK_PATTERN.match(char) else 0.25
+
+
+def estimate_tokens(text: str) -> int:
+    """按字符类别估算 token 数（编码器不可用时使用）"""
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def count_tokens(text: str, encoding_name: str = ENCODING_NAME) -> int:
+    """计算文本的 token 数"""
+    if not text:
+        return 0
+    encoder = get_encoder(encoding_name)
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return estimate_tokens(text)
+
+
+def get_cached_count(key: str, encoding_name: str = ENCODING_NAME) -> Optional[int]:
+    """读取内存中的计数缓存"""
+    cache_key = f"{encoding_name}:{key}"
+    count = _count_cache.get(cache_key)
+    if count is not None:
+        _count_cache.move_to_end(cache_key)
+    return count
+
+
+def set_cached_count(key: str, count: int, encoding_name: str = ENCODING_NAME):
+    """写入内存中的计数缓存"""
+    _count_cache[f"{encoding_name}:{key}"] = count
+    if len(_count_cache) > COUNT_CACHE_SIZE:
+        _count_cache.popitem(last=False)
+
+
+def count_tokens_cached(key: str, text: str, encoding_name: str = ENCODING_NAME) -> int:
+    """按键缓存的 token 计数（键需随文本内容变化，如内容哈希）"""
+    count = get_cached_count(key, encoding_name)
+    if count is None:
+        count = count_tokens(text, encoding_name)
+        set_cached_count(key, count, encoding_name)
+    return count
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encoding_name: str = ENCODING_NAME) -> str:
+    """截断文本使其不超过 max_tokens 个 token"""
+    if max_tokens <= 0:
+        return ""
+    encoder = get_encoder(encoding_name)
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        # 截断点可能落在多字节字符中间，去掉解码出的替换字符
+        return encoder.decode(tokens[:max_tokens]).rstrip('\ufffd')
+
+    cost = 0.0
+    for i, char in enumerate(text):
+        cost += _char_cost(char)
+        if cost > max_tokens:
+            return text[:i]
+    return text
+
+
+def clear_count_cache():
+    """清除内存中的计数缓存"""
+    _count_cache.clear()
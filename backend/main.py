@@ -5,7 +5,9 @@ NewsGap FastAPI 后端主应用
 提供 REST API 用于信息爬取、存储和分析
 """
 
+import asyncio
 import logging
+import os
 from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,51 +38,68 @@ async def lifespan(app: FastAPI):
     db = Database()
     await db.initialize()
     
-    # 插入一些示例信息源（如果数据库为空）
-    await _insert_default_sources(db)
+    # 从 YAML 差量同步信息源（新增/更新/禁用在同一事务内完成）
+    from config.source_sync import sync_sources_from_config, SourceConfigWatcher
+    try:
+        report = await sync_sources_from_config(db)
+        log(
+            f"✓ 信息源同步完成: 新增 {report['inserted']}，更新 {report['updated']}，"
+            f"禁用 {report['disabled']}，未变 {report['unchanged']}（耗时 {report['elapsed_ms']}ms）"
+        )
+    except Exception as e:
+        log(f"✗ 信息源同步失败，继续使用数据库中的信息源: {e}")
     
-    yield
-    
-    # 关闭时清理（如果需要）
-    pass
-
-
-async def _insert_default_sources(db: Database):
-    """插入默认信息源 - 从 YAML 配置文件加载"""
-    log("📄 从 YAML 配置文件加载信息源...")
-    from config.source_loader import load_sources_from_config
-    
-    all_sources = load_sources_from_config()
-    log(f"✓ 从 YAML 加载了 {len(all_sources)} 个信息源定义")
+    # 可选：监听 sources.yaml 变化并热更新
+    watcher = None
+    if os.getenv('NEWSGAP_WATCH_SOURCES', '').lower() in ('1', 'true', 'yes'):
+        watcher = SourceConfigWatcher(db)
+        watcher.start()
+        log("👀 已开启 sources.yaml 热更新")
     
-    # 获取现有信息源
-    existing = await db.get_sources(enabled_only=False)
-    existing_urls = {s.url for s in existing if s.url}
+    # 预热已见 URL 过滤器，入库时可在数据库操作前跳过已知文章
+    from crawler.seen_filter import warm_seen_url_filter
+    warmed = await warm_seen_url_filter(db)
+    log(f"✓ 已见 URL 过滤器预热完成: {warmed} 条")
     
-    log(f"📊 当前数据库有 {len(existing)} 个信息源")
+    # 应用已保存的 LLM 限流配置
+    from config_manager import ConfigManager
+    from llm.rate_limiter import get_llm_rate_limiters
+    config_mgr = ConfigManager(db)
+    rate_limits = await config_mgr.get_llm_rate_limits()
+    if rate_limits:
+        get_llm_rate_limiters().configure(rate_limits)
+        log(f"✓ 已应用 LLM 限流配置: {', '.join(rate_limits)}")
     
-    # 只添加不存在的源
-    new_sources = [s for s in all_sources if s.url not in existing_urls]
+    # 应用 Ollama 设置，按配置在后台预热模型（不阻塞启动）
+    from llm.ollama_adapter import OllamaAdapter, warm_up_ollama
+    ollama_config = await config_mgr.get_llm_config('ollama') or {}
+    OllamaAdapter.configure(
+        num_ctx=ollama_config.get('num_ctx'),
+        keep_alive=ollama_config.get('keep_alive'),
+        base_url=ollama_config.get('base_url')
+    )
+    warm_up_task = None
+    if ollama_config.get('warm_up'):
+        warm_up_task = asyncio.create_task(warm_up_ollama(ollama_config.get('model')))
+        log(f"⏳ 后台预热 Ollama 模型（num_ctx={OllamaAdapter.CONTEXT_WINDOW}）")
     
-    if not new_sources:
-        log(f"✓ 所有信息源已存在，无需添加")
-        return
+    # 滚动趋势洞察每日定时更新（是否运行、运行时刻与行业每次从配置读取）
+    from rolling_trend import RollingTrendScheduler
+    rolling_trend_scheduler = RollingTrendScheduler(db)
+    rolling_trend_scheduler.start()
     
-    log(f"🔄 开始添加 {len(new_sources)} 个新信息源...")
+    yield
     
-    success_count = 0
-    failed_count = 0
-    for source in new_sources:
-        try:
-            await db.save_source(source)
-            success_count += 1
-            log(f"  ✓ {source.name}")
-        except Exception as e:
-            failed_count += 1
-            log(f"  ✗ {source.name}: {str(e)}")
+    # 关闭时清理
+    if watcher:
+        await watcher.stop()
+    if warm_up_task and not warm_up_task.done():
+        warm_up_task.cancel()
+    await rolling_trend_scheduler.stop()
     
-    log(f"✅ 添加完成: 成功 {success_count} 个, 失败 {failed_count} 个")
-    log(f"📊 数据库现有 {len(existing) + success_count} 个信息源")
+    # 关闭缓存的 LLM 客户端连接
+    from llm.client_registry import get_llm_client_registry
+    await get_llm_client_registry().close_all()
 
 
 # 创建 FastAPI 应用
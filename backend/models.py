@@ -94,6 +94,22 @@ class Source(BaseModel):
     last_fetched_at: Optional[datetime] = None
     last_error: Optional[str] = None  # 新增：最后错误信息
     error_count: int = Field(default=0, ge=0)  # 新增：连续错误次数
+    # 健康统计
+    last_success_at: Optional[datetime] = None  # 最后一次成功爬取时间
+    mean_latency_ms: Optional[float] = None  # 爬取延迟滑动平均（毫秒）
+    avg_articles_per_fetch: Optional[float] = None  # 每次爬取文章数滑动平均
+    fetch_count: int = Field(default=0, ge=0)  # 累计爬取次数
+    circuit_open_until: Optional[datetime] = None  # 熔断冷却截止时间
+    disabled_reason: Optional[str] = None  # 禁用原因（'auto' 表示连续失败自动禁用）
+    avg_bytes_per_fetch: Optional[float] = None  # 每次爬取下载字节数滑动平均
+    total_bytes_downloaded: int = Field(default=0, ge=0)  # 累计下载字节数
+    # 增量爬取高水位
+    last_seen_guid: Optional[str] = None  # 已入库的最新条目 GUID（缺失时为链接）
+    last_seen_published_at: Optional[datetime] = None  # 已入库的最新条目发布时间
+    seen_since: Optional[datetime] = None  # 从该时间起的条目已连续入库
+    # 自适应爬取间隔
+    mean_publish_interval_minutes: Optional[float] = None  # 文章发布间隔滑动平均（分钟）
+    learned_interval_minutes: Optional[float] = None  # 学习到的爬取间隔（分钟）
     created_at: datetime = Field(default_factory=datetime.now)
     metadata: Optional[dict] = None  # 额外的源特定配置
     
@@ -111,6 +127,7 @@ class Article(BaseModel):
     id: Optional[str] = None
     title: str = Field(..., min_length=1, max_length=500)
     url: str = Field(..., min_length=1)
+    canonical_url: Optional[str] = None  # 规范化 URL，用于去重
     source_id: Optional[str] = None  # 关联的信息源ID
     source_name: Optional[str] = None  # 冗余字段，便于显示
     
@@ -189,6 +206,9 @@ class Analysis(BaseModel):
     llm_model: Optional[str] = None  # 具体模型名称
     token_usage: Optional[int] = None
     estimated_cost: Optional[float] = None  # USD
+    llm_attempts: List[dict] = Field(default_factory=list)  # 每次 LLM 调用尝试（重试、对冲、故障转移）
+    prompt_stats: Optional[dict] = None  # 提示词打包统计（输入 token、主题聚类节省的 token 等）
+    article_scores: List[dict] = Field(default_factory=list)  # 分析前预排序的候选文章得分（仅新建分析时返回）
     
     # 时间信息
     created_at: datetime = Field(default_factory=datetime.now)
@@ -370,6 +390,7 @@ class FetchRequest(BaseModel):
     industry: IndustryCategory
     hours: int = Field(default=24, ge=1, le=168)
     source_ids: Optional[List[str]] = None  # 如果为空，使用该行业的所有启用源
+    force_refresh: bool = False  # 忽略自适应爬取间隔，所有源都重新请求
 
 
 class FetchResponse(BaseModel):
@@ -378,6 +399,18 @@ class FetchResponse(BaseModel):
     count: int
     sources_used: List[str]
     fetch_time_seconds: float
+    skipped_sources: List[str] = Field(default_factory=list)  # 熔断中被跳过的源
+    cached_sources: List[str] = Field(default_factory=list)  # 未到爬取间隔、直接使用已入库文章的源
+
+
+class SourceValidateRequest(BaseModel):
+    """批量验证信息源请求"""
+    industry: Optional[IndustryCategory] = None
+    source_ids: Optional[List[str]] = None  # 如果为空，验证全部（或该行业的）信息源
+    include_disabled: bool = True  # 是否包含已禁用的源（验证成功可恢复自动禁用的源）
+    concurrency: int = Field(default=20, ge=1, le=100)
+    timeout: float = Field(default=20, gt=0, le=120)  # 单源超时（秒）
+    record_health: bool = True  # 是否写回健康统计
 
 
 class AnalyzeRequest(BaseModel):
@@ -387,6 +420,9 @@ class AnalyzeRequest(BaseModel):
     llm_backend: str = "gemini"  # "ollama", "openai", "deepseek", "gemini"
     llm_model: Optional[str] = None
     custom_prompt: Optional[str] = None
+    bypass_cache: bool = False  # 跳过 LLM 响应缓存，强制重新调用
+    use_digests: bool = False  # 先生成/复用单篇文章摘要，提示词中用摘要代替原文
+    cluster_articles: bool = False  # 先按主题聚类，提示词中每个主题只展开代表文章
 
 
 class AnalyzeResponse(BaseModel):
@@ -403,17 +439,61 @@ class IntelligenceRequest(BaseModel):
     llm_backend: str = "gemini"
     llm_model: Optional[str] = None
     source_ids: Optional[List[str]] = None  # 可选：进一步筛选源
+    force_refresh: bool = False  # 忽略自适应爬取间隔，所有源都重新请求
+    bypass_cache: bool = False  # 跳过 LLM 响应缓存，强制重新调用
+    use_digests: bool = False  # 先生成/复用单篇文章摘要，提示词中用摘要代替原文
+    cluster_articles: bool = False  # 先按主题聚类，提示词中每个主题只展开代表文章
+    top_k: Optional[int] = Field(default=None, ge=1)  # 预排序后最多分析的文章数，缺省使用已保存的配置
+    token_budget: Optional[int] = Field(default=None, ge=1)  # 预排序后所选文章的 token 总预算，缺省使用已保存的配置
 
 
 class IntelligenceResponse(BaseModel):
     """一键情报响应"""
-    article_ids: List[str]
+    article_ids: List[str]  # 实际送入分析的文章（预排序筛选后）
     article_count: int
+    crawled_article_ids: List[str] = Field(default_factory=list)  # 本次爬取到的全部文章（筛选前）
+    crawled_article_count: int = 0
     analysis_id: str
     analysis: Analysis
     total_time_seconds: float
 
 
+class BatchIntelligenceRequest(BaseModel):
+    """批量一键情报请求：多个行业 / 自定义分类共用一次爬取"""
+    industries: List[IndustryCategory] = Field(default_factory=list)
+    custom_category_ids: List[str] = Field(default_factory=list)
+    hours: int = Field(default=24, ge=1, le=168)
+    llm_backend: str = "gemini"
+    llm_model: Optional[str] = None
+    force_refresh: bool = False  # 忽略自适应爬取间隔，所有源都重新请求
+    bypass_cache: bool = False  # 跳过 LLM 响应缓存，强制重新调用
+    use_digests: bool = False  # 先生成/复用单篇文章摘要，提示词中用摘要代替原文
+    cluster_articles: bool = False  # 先按主题聚类，提示词中每个主题只展开代表文章
+    top_k: Optional[int] = Field(default=None, ge=1)  # 预排序后最多分析的文章数，缺省使用已保存的配置
+    token_budget: Optional[int] = Field(default=None, ge=1)  # 预排序后所选文章的 token 总预算，缺省使用已保存的配置
+
+
+class BatchIntelligenceItem(BaseModel):
+    """批量一键情报中单个行业 / 自定义分类的结果"""
+    industry: Optional[IndustryCategory] = None
+    custom_category_id: Optional[str] = None
+    category_name: Optional[str] = None
+    article_ids: List[str] = Field(default_factory=list)  # 实际送入分析的文章（预排序筛选后）
+    article_count: int = 0
+    crawled_article_ids: List[str] = Field(default_factory=list)  # 本次爬取到的全部文章（筛选前）
+    crawled_article_count: int = 0
+    analysis_id: Optional[str] = None
+    analysis: Optional[Analysis] = None
+    error: Optional[str] = None  # 该目标失败原因（不影响其他目标）
+
+
+class BatchIntelligenceResponse(BaseModel):
+    """批量一键情报响应"""
+    results: List[BatchIntelligenceItem]
+    fetch_summary: dict
+    total_time_seconds: float
+
+
 class ArticleQueryParams(BaseModel):
     """文章查询参数"""
     industry: Optional[IndustryCategory] = None
@@ -0,0 +1,278 @@
+"""
+滚动趋势洞察
+
+趋势洞察每次都把所选的全部报告重新发给 LLM，30 天视图每天从头计算，成本随窗口长度增长。
+滚动模式为每个行业保存一份状态（最新一版洞察 + 窗口内已纳入的分析）：
+
+1. 首次生成：取窗口内的全部分析（至少 2 份）生成第一版洞察
+2. 增量更新：只发送上次更新之后新增的分析（结构化摘要）与上一版洞察，由 LLM 输出更新后的完整报告
+3. 窗口滚动：超过窗口天数的分析移出 source_analysis_ids，提示词要求淘汰长期未再出现的话题
+
+每日更新的成本只与新增报告数成正比；没有新增分析时不调用 LLM。
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models import TrendInsight, IndustryCategory
+from llm.client_registry import get_llm_client_registry
+from llm.response_cache import get_llm_response_cache
+
+logger = logging.getLogger(__name__)
+
+# 默认滚动窗口（天）
+DEFAULT_WINDOW_DAYS = 30
+# 默认每天运行的时刻（本地时间）
+DEFAULT_RUN_AT_HOUR = 7
+# 单次更新最多纳入的新增分析数，其余留到下次更新
+MAX_NEW_ANALYSES = 30
+# 提示词中上一版洞察的字符上限
+STATE_MAX_CHARS = 8000
+# 首次生成时上一版洞察的占位说明
+FIRST_RUN_STATE = "（首次生成，暂无历史洞察）"
+
+
+def _prune_window(window_analyses: list, window_start: datetime) -> list:
+    """移除窗口之外的分析"""
+    return [
+        entry for entry in window_analyses
+        if datetime.fromisoformat(entry['created_at']) >= window_start
+    ]
+
+
+async def update_rolling_trend(
+    db,
+    config_mgr,
+    industry: str,
+    llm_backend: str = "deepseek",
+    llm_model: Optional[str] = None,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    force: bool = False
+) -> dict:
+    """
+    增量更新某行业的滚动趋势洞察
+
+    Args:
+        db: Database 实例
+        config_mgr: ConfigManager 实例（读取 API Key 与代理）
+        industry: 行业分类值
+        window_days: 滚动窗口（天）
+        force: 忽略已有状态，按窗口内的全部分析重新生成
+
+    Returns:
+        {
+            'status': 'updated' | 'unchanged' | 'insufficient',
+            'industry': str,
+            'new_analyses': int,  # 本次发送的新增分析数
+            'insight': TrendInsight | None,  # 本次生成的洞察
+            'state': dict | None  # 更新后的状态
+        }
+
+    Raises:
+        ValueError: 行业无效或缺少 API Key
+    """
+    # 避免与路由模块循环导入
+    from routes.trend_insight import (
+        build_rolling_trend_prompt, extract_executive_summary, load_trend_insight_prompt
+    )
+
+    industry_enum = IndustryCategory(industry)
+    now = datetime.now()
+    window_start = now - timedelta(days=window_days)
+
+    # 读取上一版状态；窗口参数变化、状态已整体过期或洞察被删除时重新生成
+    state = None if force else await db.get_rolling_trend_state(industry_enum.value)
+    previous = None
+    if state:
+        if (
+            state['window_days'] != window_days
+            or not state['last_analysis_at']
+            or state['last_analysis_at'] < window_start
+        ):
+            state = None
+        elif state['insight_id']:
+            previous = await db.get_trend_insight(state['insight_id'])
+            if previous is None:
+                state = None
+
+    since = state['last_analysis_at'] if state else window_start
+    new_analyses = await db.get_analyses_since(industry_enum, since, limit=MAX_NEW_ANALYSES)
+    result = {
+        'status': 'unchanged',
+        'industry': industry_enum.value,
+        'new_analyses': len(new_analyses),
+        'insight': None,
+        'state': state,
+    }
+    if not new_analyses:
+        logger.info(f"滚动趋势洞察 [{industry_enum.value}]: 没有新增分析，跳过")
+        return result
+    if state is None and len(new_analyses) < 2:
+        logger.info(f"滚动趋势洞察 [{industry_enum.value}]: 窗口内分析不足 2 份，暂不生成")
+        result['status'] = 'insufficient'
+        return result
+
+    previous_window = _prune_window(state['window_analyses'], window_start) if state else []
+    window = previous_window + [
+        {'id': a.id, 'created_at': a.created_at.isoformat()} for a in new_analyses
+    ]
+    date_range_start = datetime.fromisoformat(window[0]['created_at'])
+    date_range_end = new_analyses[-1].created_at
+    date_range_str = f"{date_range_start.strftime('%Y-%m-%d')} 至 {date_range_end.strftime('%Y-%m-%d')}"
+
+    if previous:
+        previous_state = previous.markdown_report
+        if len(previous_state) > STATE_MAX_CHARS:
+            previous_state = previous_state[:STATE_MAX_CHARS] + "\n...[内容已压缩]"
+        previous_end = state['last_analysis_at'].strftime('%Y-%m-%d')
+    else:
+        previous_state = FIRST_RUN_STATE
+        previous_end = "-"
+
+    # 获取 API Key
+    api_key = await config_mgr.get_api_key(llm_backend)
+    if llm_backend != 'ollama' and not api_key:
+        raise ValueError(f"使用 {llm_backend.upper()} 需要先在设置页面配置 API Key")
+    proxy_config = await config_mgr.get_detailed_proxy_config()
+
+    # 只发送新增分析的结构化摘要（保存分析时已解析）
+    structures = {a.id: await db.get_report_structure(a.id) for a in new_analyses}
+    system_prompt, user_prompt = build_rolling_trend_prompt(
+        new_analyses=new_analyses,
+        industry=industry_enum.value,
+        date_range=date_range_str,
+        previous_state=previous_state,
+        previous_count=len(previous_window),
+        previous_end=previous_end,
+        window_days=window_days,
+        window_count=len(window),
+        prompt_config=load_trend_insight_prompt(),
+        structures=structures
+    )
+
+    adapter = get_llm_client_registry().acquire(
+        backend=llm_backend,
+        api_key=api_key,
+        model=llm_model,
+        proxy_config=proxy_config
+    )
+    adapter.response_cache = get_llm_response_cache()
+
+    start_time = datetime.now()
+    # OpenAI/DeepSeek 限制输出 8K，Gemini/Ollama 使用适配器默认上限
+    max_tokens = 8192 if llm_backend in ('openai', 'deepseek') else None
+    completion = await adapter.complete(system_prompt, user_prompt, max_tokens=max_tokens)
+    response_text = completion['text']
+    token_usage = completion['token_usage']
+    processing_time = (datetime.now() - start_time).total_seconds()
+
+    model_info = adapter.get_model_info()
+    estimated_cost = (token_usage / 1000) * model_info.get('cost_per_1k_tokens', 0)
+
+    insight = TrendInsight(
+        source_analysis_ids=[entry['id'] for entry in window],
+        industry=industry_enum,
+        date_range_start=date_range_start,
+        date_range_end=date_range_end,
+        executive_summary=extract_executive_summary(response_text),
+        markdown_report=response_text,
+        llm_backend=llm_backend,
+        llm_model=llm_model or model_info.get('model'),
+        token_usage=token_usage,
+        estimated_cost=estimated_cost,
+        processing_time_seconds=processing_time
+    )
+    insight.id = await db.save_trend_insight(insight)
+
+    new_state = {
+        'industry': industry_enum.value,
+        'insight_id': insight.id,
+        'window_days': window_days,
+        'window_analyses': window,
+        'last_analysis_at': date_range_end,
+        'update_count': (state['update_count'] if state else 0) + 1,
+        'total_token_usage': (state['total_token_usage'] if state else 0) + token_usage,
+        'last_token_usage': token_usage,
+    }
+    await db.save_rolling_trend_state(new_state)
+
+    logger.info(
+        f"滚动趋势洞察 [{industry_enum.value}]: 新增 {len(new_analyses)} 份分析，"
+        f"窗口 {len(window)} 份，消耗 {token_usage} tokens，耗时 {processing_time:.2f}s"
+    )
+    result.update({
+        'status': 'updated',
+        'insight': insight,
+        'state': await db.get_rolling_trend_state(industry_enum.value),
+    })
+    return result
+
+
+class RollingTrendScheduler:
+    """
+    滚动趋势洞察的每日定时更新（轮询配置，到达运行时刻后每天运行一次）
+
+    Example:
+        scheduler = RollingTrendScheduler(db)
+        scheduler.start()
+        ...
+        await scheduler.stop()
+    """
+
+    def __init__(self, db, interval: float = 600.0):
+        self.db = db
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._last_run_date = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> list:
+        """到达当天运行时刻且尚未运行时，依次更新配置中的行业
+
+        Returns:
+            各行业的更新结果（未到运行时刻或未启用时为空）
+        """
+        from config_manager import ConfigManager
+
+        config_mgr = ConfigManager(self.db)
+        config = await config_mgr.get_rolling_trend_config()
+        now = now or datetime.now()
+        if not config['enabled'] or now.hour < config['run_at_hour'] or self._last_run_date == now.date():
+            return []
+        self._last_run_date = now.date()
+
+        results = []
+        for industry in config['industries']:
+            try:
+                results.append(await update_rolling_trend(
+                    self.db, config_mgr, industry,
+                    llm_backend=config['llm_backend'],
+                    llm_model=config['llm_model'],
+                    window_days=config['window_days']
+                ))
+            except Exception as e:
+                # 单个行业失败不影响其他行业，下次运行时从同一状态继续
+                logger.error(f"滚动趋势洞察 [{industry}] 更新失败: {e}", exc_info=True)
+        return results
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"滚动趋势洞察定时任务失败: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
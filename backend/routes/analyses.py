@@ -3,9 +3,10 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-from models import Analysis
+from models import Analysis, IndustryCategory
 from storage.database import Database
 
 router = APIRouter(prefix="/api/analyses", tags=["analyses"])
@@ -18,6 +19,36 @@ async def get_db():
     return db
 
 
+@router.get("/items")
+async def search_report_items(
+    q: Optional[str] = None,
+    kind: Optional[str] = None,
+    industry: Optional[IndustryCategory] = None,
+    article_id: Optional[str] = None,
+    days: Optional[int] = None,
+    min_score: Optional[float] = None,
+    limit: int = 50,
+    db: Database = Depends(get_db)
+):
+    """
+    跨分析检索报告条目
+    
+    kind 为 trend / signal / gap / other；article_id 查找引用了某篇文章的条目；days 限定最近几天的分析
+    """
+    if kind and kind not in ('trend', 'signal', 'gap', 'other'):
+        raise HTTPException(status_code=400, detail=f"未知的条目类型: {kind}")
+    
+    return await db.search_report_items(
+        query=q,
+        kind=kind,
+        industry=industry,
+        article_id=article_id,
+        since=datetime.now() - timedelta(days=days) if days else None,
+        min_score=min_score,
+        limit=min(max(limit, 1), 500)
+    )
+
+
 @router.get("/{analysis_id}", response_model=Analysis)
 async def get_analysis(
     analysis_id: str,
@@ -35,6 +66,36 @@ async def get_analysis(
     return analysis
 
 
+@router.get("/{analysis_id}/structure")
+async def get_report_structure(
+    analysis_id: str,
+    db: Database = Depends(get_db)
+):
+    """获取报告的章节与条目（保存分析时由 Markdown 报告解析）"""
+    if not await db.get_analysis(analysis_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"未找到分析 {analysis_id}"
+        )
+    
+    return await db.get_report_structure(analysis_id)
+
+
+@router.get("/{analysis_id}/article-scores")
+async def get_analysis_article_scores(
+    analysis_id: str,
+    db: Database = Depends(get_db)
+):
+    """获取分析前预排序的候选文章得分（按选择顺序，含未选中的文章）"""
+    if not await db.get_analysis(analysis_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"未找到分析 {analysis_id}"
+        )
+    
+    return await db.get_analysis_article_scores(analysis_id)
+
+
 @router.get("", response_model=List[Analysis])
 async def list_analyses(
     limit: int = 20,
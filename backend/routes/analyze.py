@@ -10,6 +10,7 @@ from models import AnalyzeRequest, AnalyzeResponse
 from storage.database import Database
 from analyzer import Analyzer
 from config_manager import ConfigManager
+from llm.token_accounting import get_token_accountant
 
 router = APIRouter(prefix="/api/analyze", tags=["analyze"])
 
@@ -69,7 +70,13 @@ async def analyze_articles(
         llm_backend=request.llm_backend,
         api_key=api_key,
         model=request.llm_model,  # 传递用户选择的模型
-        proxy_config=proxy_config
+        proxy_config=proxy_config,
+        use_cache=not request.bypass_cache,
+        use_digests=request.use_digests,
+        db=db,
+        resilience=await config_mgr.get_llm_resilience_config(),
+        failover=await config_mgr.get_llm_failover(request.llm_backend),
+        cluster_articles=request.cluster_articles
     )
     
     # 执行分析
@@ -99,20 +106,15 @@ async def analyze_articles(
 @router.post("/estimate-cost")
 async def estimate_analysis_cost(
     request: AnalyzeRequest,
-    db: Database = Depends(get_db),
-    config_mgr: ConfigManager = Depends(get_config_manager)
+    db: Database = Depends(get_db)
 ):
     """
     估算分析成本
     
-    在实际分析前估算 token 使用和成本
+    在实际分析前估算 token 使用和成本（只读取模型描述，不创建 LLM 客户端）
     """
-    # 获取文章
-    articles = []
-    for article_id in request.article_ids:
-        article = await db.get_article(article_id)
-        if article:
-            articles.append(article)
+    # 批量获取文章
+    articles = await db.get_articles_by_ids(request.article_ids)
     
     if not articles:
         raise HTTPException(
@@ -120,25 +122,17 @@ async def estimate_analysis_cost(
             detail="未找到任何指定的文章"
         )
     
-    # 获取 API Key
-    api_key = await config_mgr.get_api_key(request.llm_backend)
-
-    # 获取代理配置
-    proxy_config = await config_mgr.get_detailed_proxy_config()
-
-    # 创建分析器并估算
-    analyzer = Analyzer(
-        llm_backend=request.llm_backend,
-        api_key=api_key,
-        model=request.llm_model,
-        proxy_config=proxy_config
-    )
-    
-    cost_estimate = analyzer.estimate_cost(articles)
-    model_info = analyzer.get_model_info()
+    try:
+        estimate = await get_token_accountant(db).estimate(
+            articles,
+            backend=request.llm_backend,
+            model=request.llm_model,
+            analysis_type=request.analysis_type
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
-        **cost_estimate,
-        'model_info': model_info,
+        **estimate,
         'article_count': len(articles)
     }
@@ -5,17 +5,22 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import List, Optional
+from fastapi.responses import StreamingResponse
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 import httpx
+import json
 import time
 import logging
+from datetime import datetime
 
-from models import Source, IndustryCategory, SourceType
+from models import Source, IndustryCategory, SourceType, SourceValidateRequest
 from storage.database import Database
 from config_manager import ConfigManager
 from crawler.rsshub_helper import get_rsshub_helper, RSSHubHelper
 from utils.proxy_helper import ProxyHelper
+from utils.proxy_pool import ProxyPool, get_proxy_pool
+from llm.response_cache import get_llm_response_cache
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,23 @@ async def get_config_manager(db: Database = Depends(get_db)):
     return ConfigManager(db)
 
 
+async def _build_crawler(config_mgr: ConfigManager):
+    """按当前代理配置创建用于验证信息源的爬虫服务"""
+    from crawler.service import CrawlerService
+    
+    proxy_config = await config_mgr.get_detailed_proxy_config()
+    if proxy_config and proxy_config.get('enabled'):
+        formatted_config = {
+            'enabled': True,
+            'http': proxy_config.get('http'),
+            'https': proxy_config.get('https'),
+            'socks5': proxy_config.get('socks5'),
+            'pool': proxy_config.get('pool')
+        }
+        return CrawlerService(proxy_config=formatted_config)
+    return CrawlerService()
+
+
 @router.get("/sources", response_model=List[Source])
 async def get_sources(
     industry: Optional[IndustryCategory] = None,
@@ -47,6 +69,150 @@ async def get_sources(
     return sources
 
 
+@router.get("/sources/health")
+async def get_sources_health(
+    industry: Optional[IndustryCategory] = None,
+    unhealthy_only: bool = False,
+    db: Database = Depends(get_db)
+):
+    """
+    获取信息源健康状态
+    
+    包含连续失败次数、最后错误、最后成功时间、平均延迟、平均文章数、下载字节数、熔断状态，
+    以及学习到的发布间隔与爬取间隔
+    """
+    from crawler.source_health import health_status, is_circuit_open
+    from crawler.fetch_schedule import next_fetch_at
+    
+    sources = await db.get_sources(industry=industry, enabled_only=False)
+    now = datetime.now()
+    
+    results = []
+    for source in sources:
+        status = health_status(source, now)
+        if unhealthy_only and status in ('healthy', 'unknown'):
+            continue
+        results.append({
+            'id': source.id,
+            'name': source.name,
+            'url': source.url,
+            'industry': source.industry.value,
+            'enabled': source.enabled,
+            'status': status,
+            'error_count': source.error_count,
+            'last_error': source.last_error,
+            'last_success_at': source.last_success_at,
+            'last_fetched_at': source.last_fetched_at,
+            'mean_latency_ms': round(source.mean_latency_ms) if source.mean_latency_ms is not None else None,
+            'avg_articles_per_fetch': round(source.avg_articles_per_fetch, 1) if source.avg_articles_per_fetch is not None else None,
+            'fetch_count': source.fetch_count,
+            'circuit_open': is_circuit_open(source, now),
+            'circuit_open_until': source.circuit_open_until,
+            'disabled_reason': source.disabled_reason,
+            'avg_bytes_per_fetch': round(source.avg_bytes_per_fetch) if source.avg_bytes_per_fetch is not None else None,
+            'total_bytes_downloaded': source.total_bytes_downloaded,
+            'mean_publish_interval_minutes': round(source.mean_publish_interval_minutes, 1) if source.mean_publish_interval_minutes is not None else None,
+            'learned_interval_minutes': source.learned_interval_minutes,
+            'next_fetch_at': next_fetch_at(source),
+        })
+    
+    summary = {}
+    for item in results:
+        summary[item['status']] = summary.get(item['status'], 0) + 1
+    
+    return {
+        'total': len(results),
+        'summary': summary,
+        'sources': results
+    }
+
+
+@router.get("/sources/sync")
+async def get_sources_sync_status():
+    """获取最近一次 sources.yaml 同步结果"""
+    from config.source_sync import get_last_sync_report
+    
+    return {'last_sync': get_last_sync_report()}
+
+
+@router.post("/sources/sync")
+async def sync_sources(db: Database = Depends(get_db)):
+    """立即从 sources.yaml 差量同步信息源"""
+    from config.source_sync import sync_sources_from_config
+    
+    try:
+        report = await sync_sources_from_config(db)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"信息源同步失败: {str(e)}")
+    
+    return {'success': True, 'report': report}
+
+
+@router.post("/sources/validate")
+async def validate_sources(
+    request: SourceValidateRequest,
+    db: Database = Depends(get_db),
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """
+    并发批量验证信息源
+    
+    以 NDJSON 流式返回：每个源完成即输出一行 {"type": "result", ...}，
+    最后输出一行 {"type": "summary", ...}。默认将结果写回源的健康统计。
+    """
+    from crawler.source_validator import validate_sources as run_validation, summarize_results
+    
+    sources = await db.get_sources(
+        industry=request.industry,
+        enabled_only=not request.include_disabled
+    )
+    if request.source_ids:
+        wanted = set(request.source_ids)
+        sources = [s for s in sources if s.id in wanted]
+    
+    crawler = await _build_crawler(config_mgr)
+    
+    async def stream():
+        start = time.monotonic()
+        results = []
+        async for result in run_validation(
+            crawler,
+            sources,
+            db=db if request.record_health else None,
+            concurrency=request.concurrency,
+            timeout=request.timeout
+        ):
+            results.append(result)
+            yield json.dumps({'type': 'result', **result}, ensure_ascii=False) + "\n"
+        
+        summary = summarize_results(results, time.monotonic() - start)
+        logger.info(
+            f"批量验证完成: {summary['valid']}/{summary['total']} 可用，"
+            f"耗时 {summary['elapsed_seconds']} 秒"
+        )
+        yield json.dumps({'type': 'summary', **summary}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/sources/{source_id}/health/reset")
+async def reset_source_health(
+    source_id: str,
+    enable: bool = True,
+    db: Database = Depends(get_db)
+):
+    """清除信息源的失败计数与熔断状态，默认同时重新启用"""
+    reset = await db.reset_source_health(source_id, enable=enable)
+    
+    if not reset:
+        raise HTTPException(
+            status_code=404,
+            detail=f"未找到信息源 {source_id}"
+        )
+    
+    return {'success': True, 'message': '信息源健康状态已重置'}
+
+
 @router.post("/sources", response_model=Source)
 async def create_source(
     source: Source,
@@ -56,20 +222,7 @@ async def create_source(
     """
     创建新的信息源
     """
-    from crawler.service import CrawlerService
-    
-    # 获取代理配置用于验证信息源
-    proxy_config = await config_mgr.get_detailed_proxy_config()
-    if proxy_config and proxy_config.get('enabled'):
-        formatted_config = {
-            'enabled': True,
-            'http': proxy_config.get('http'),
-            'https': proxy_config.get('https'),
-            'socks5': proxy_config.get('socks5')
-        }
-        crawler = CrawlerService(proxy_config=formatted_config)
-    else:
-        crawler = CrawlerService()
+    crawler = await _build_crawler(config_mgr)
     
     # 验证信息源是否可访问
     is_valid = await crawler.validate_source(source)
@@ -184,6 +337,62 @@ async def get_llm_backends():
     }
 
 
+# Ollama 设置
+class OllamaConfigRequest(BaseModel):
+    base_url: str = "http://localhost:11434"
+    model: Optional[str] = None  # 预热使用的模型，为空时使用默认模型
+    num_ctx: int = 8192  # 上下文窗口，提示词按该窗口打包
+    keep_alive: str = "30m"  # 模型常驻时间，如 '30m'、'-1'（一直常驻）、'0'（用完即卸载）
+    warm_up: bool = True  # 启动时预热模型
+
+
+@router.get("/ollama")
+async def get_ollama_config(
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """获取 Ollama 设置与各模型的提示词处理 / 生成吞吐量"""
+    from llm.ollama_adapter import OllamaAdapter, get_ollama_throughput
+
+    config = await config_mgr.get_llm_config('ollama') or {}
+    return {
+        'base_url': OllamaAdapter.BASE_URL,
+        'model': config.get('model') or OllamaAdapter.DEFAULT_MODEL,
+        'num_ctx': OllamaAdapter.CONTEXT_WINDOW,
+        'keep_alive': OllamaAdapter.KEEP_ALIVE,
+        'warm_up': bool(config.get('warm_up')),
+        'throughput': get_ollama_throughput()
+    }
+
+
+@router.post("/ollama")
+async def set_ollama_config(
+    request: OllamaConfigRequest,
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """设置 Ollama 连接地址、上下文窗口与模型常驻时间（立即生效）"""
+    if request.num_ctx < 2048:
+        raise HTTPException(status_code=400, detail="num_ctx 至少为 2048")
+
+    config = await config_mgr.get_llm_config('ollama') or {}
+    config.update(request.model_dump())
+    await config_mgr.set_llm_config('ollama', config)
+    return {
+        'success': True,
+        'message': 'Ollama 设置已保存'
+    }
+
+
+@router.post("/ollama/warm-up")
+async def warm_up_ollama_model(
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """立即预热 Ollama 模型"""
+    from llm.ollama_adapter import warm_up_ollama
+
+    config = await config_mgr.get_llm_config('ollama') or {}
+    return await warm_up_ollama(config.get('model'))
+
+
 # API Key 管理
 class APIKeyRequest(BaseModel):
     backend: str
@@ -259,6 +468,194 @@ async def delete_api_key(
     }
 
 
+@router.get("/llm-cache")
+async def get_llm_cache_stats(
+    db: Database = Depends(get_db)
+):
+    """获取 LLM 响应缓存统计（命中/未命中、节省的 token、条目数与大小）"""
+    return await get_llm_response_cache().get_stats()
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache(
+    db: Database = Depends(get_db)
+):
+    """清空 LLM 响应缓存"""
+    removed = await get_llm_response_cache().clear()
+    return {
+        'success': True,
+        'message': f'已清除 {removed} 条缓存',
+        'removed': removed
+    }
+
+
+class LLMResilienceConfigRequest(BaseModel):
+    failover_chain: List[str] = []  # 后端优先顺序，如 ['deepseek', 'openai', 'ollama']
+    max_attempts: int = 3  # 单次调用最多尝试次数（含首次）
+    retry_budget: int = 8  # 一次分析内所有调用共享的重试次数上限
+    hedge_after_seconds: Optional[float] = None  # 超过该耗时发起对冲请求
+
+
+@router.get("/llm-resilience")
+async def get_llm_resilience_config(
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """获取 LLM 重试 / 故障转移配置"""
+    return await config_mgr.get_llm_resilience_config()
+
+
+@router.post("/llm-resilience")
+async def set_llm_resilience_config(
+    request: LLMResilienceConfigRequest,
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """设置 LLM 重试 / 故障转移配置"""
+    from llm.adapter import get_adapter_class
+
+    for backend in request.failover_chain:
+        try:
+            get_adapter_class(backend)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"不支持的 LLM 后端: {backend}")
+    if request.max_attempts < 1 or request.retry_budget < 0:
+        raise HTTPException(status_code=400, detail="max_attempts 至少为 1，retry_budget 不能为负")
+    if request.hedge_after_seconds is not None and request.hedge_after_seconds <= 0:
+        raise HTTPException(status_code=400, detail="hedge_after_seconds 必须大于 0")
+
+    config = request.model_dump()
+    config['failover_chain'] = [backend.lower() for backend in request.failover_chain]
+    await config_mgr.set_llm_resilience_config(config)
+    return {
+        'success': True,
+        'message': 'LLM 重试 / 故障转移配置已保存',
+        'config': config
+    }
+
+
+class ArticleRankingConfigRequest(BaseModel):
+    top_k: Optional[int] = None  # 最多分析的文章数，None 表示不限
+    token_budget: Optional[int] = None  # 所选文章的 token 总预算，None 表示不限
+    novelty_days: int = 7  # 与最近多少天内已分析的文章比较新颖度，0 表示不比较
+    weights: Optional[Dict[str, float]] = None  # salience / coverage / novelty / priority 权重
+
+
+@router.get("/article-ranking")
+async def get_article_ranking_config(
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """获取一键情报的文章预排序配置"""
+    return await config_mgr.get_article_ranking_config()
+
+
+@router.post("/article-ranking")
+async def set_article_ranking_config(
+    request: ArticleRankingConfigRequest,
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """设置一键情报的文章预排序配置（单次请求的 top_k / token_budget 优先）"""
+    from llm.article_ranking import DEFAULT_WEIGHTS
+
+    if (request.top_k is not None and request.top_k < 1) or (request.token_budget is not None and request.token_budget < 1):
+        raise HTTPException(status_code=400, detail="top_k 与 token_budget 必须大于 0")
+    if request.novelty_days < 0:
+        raise HTTPException(status_code=400, detail="novelty_days 不能为负")
+    weights = {**DEFAULT_WEIGHTS, **(request.weights or {})}
+    unknown = set(weights) - set(DEFAULT_WEIGHTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的得分项: {sorted(unknown)}")
+    if any(weight < 0 for weight in weights.values()):
+        raise HTTPException(status_code=400, detail="得分权重不能为负")
+
+    config = {**request.model_dump(), 'weights': weights}
+    await config_mgr.set_article_ranking_config(config)
+    return {
+        'success': True,
+        'message': '文章预排序配置已保存',
+        'config': config
+    }
+
+
+class RollingTrendConfigRequest(BaseModel):
+    enabled: bool = False  # 是否每天定时更新
+    industries: List[str] = []  # 参与滚动更新的行业
+    llm_backend: str = 'deepseek'
+    llm_model: Optional[str] = None
+    window_days: int = 30  # 滚动窗口（天）
+    run_at_hour: int = 7  # 每天几点（本地时间）运行
+
+
+@router.get("/rolling-trend")
+async def get_rolling_trend_config(
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """获取滚动趋势洞察的定时更新配置"""
+    return await config_mgr.get_rolling_trend_config()
+
+
+@router.post("/rolling-trend")
+async def set_rolling_trend_config(
+    request: RollingTrendConfigRequest,
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """设置滚动趋势洞察的定时更新配置（后台任务每次运行时读取，无需重启）"""
+    valid = {industry.value for industry in IndustryCategory}
+    unknown = [industry for industry in request.industries if industry not in valid]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"未知的行业: {unknown}")
+    if not 1 <= request.window_days <= 365:
+        raise HTTPException(status_code=400, detail="window_days 必须在 1-365 之间")
+    if not 0 <= request.run_at_hour <= 23:
+        raise HTTPException(status_code=400, detail="run_at_hour 必须在 0-23 之间")
+
+    config = request.model_dump()
+    await config_mgr.set_rolling_trend_config(config)
+    return {
+        'success': True,
+        'message': '滚动趋势洞察配置已保存',
+        'config': config
+    }
+
+
+class LLMRateLimitRequest(BaseModel):
+    backend: str
+    max_concurrency: int = 4  # 同时进行中的请求数
+    tokens_per_minute: Optional[int] = None  # 每分钟 token 额度，None 表示不限
+
+
+@router.get("/llm-rate-limits")
+async def get_llm_rate_limits():
+    """获取 LLM 限流配置与各后端 / 模型的排队深度、进行中请求数、等待时间"""
+    from llm.rate_limiter import get_llm_rate_limiters
+    return get_llm_rate_limiters().get_stats()
+
+
+@router.post("/llm-rate-limits")
+async def set_llm_rate_limit(
+    request: LLMRateLimitRequest,
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """设置某个后端的并发上限与每分钟 token 额度（立即生效）"""
+    from llm.adapter import get_adapter_class
+
+    backend = request.backend.lower()
+    try:
+        get_adapter_class(backend)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"不支持的 LLM 后端: {request.backend}")
+    if request.max_concurrency < 1:
+        raise HTTPException(status_code=400, detail="max_concurrency 至少为 1")
+    if request.tokens_per_minute is not None and request.tokens_per_minute <= 0:
+        raise HTTPException(status_code=400, detail="tokens_per_minute 必须大于 0")
+
+    limits = {'max_concurrency': request.max_concurrency, 'tokens_per_minute': request.tokens_per_minute}
+    await config_mgr.set_llm_rate_limits({backend: limits})
+    return {
+        'success': True,
+        'message': f'{backend.upper()} 限流配置已更新',
+        'limits': limits
+    }
+
+
 @router.get("/rsshub/routes")
 async def get_rsshub_routes():
     """获取 RSSHub 常用路由"""
@@ -279,6 +676,16 @@ async def get_rsshub_instance():
     }
 
 
+@router.get("/rsshub/health")
+async def get_rsshub_health():
+    """获取各 RSSHub 实例的健康与延迟统计（按当前路由优先级排序）"""
+    helper = get_rsshub_helper()
+    return {
+        'instance': helper.get_instance_url(),
+        'instances': helper.get_instance_stats()
+    }
+
+
 @router.post("/rsshub/instance")
 async def set_rsshub_instance(
     instance_url: str = Body(..., embed=True)
@@ -299,6 +706,7 @@ class ProxyConfigRequest(BaseModel):
     http_proxy: str = ""  # 'http://host:port'
     https_proxy: str = ""  # 'https://host:port'
     socks5_proxy: str = ""  # 'socks5://host:port'
+    proxy_pool: List[str] = []  # 代理池（可选），多个代理 URL，按延迟/失败率加权轮换
 
 
 @router.get("/proxy")
@@ -317,18 +725,23 @@ async def set_proxy_config(
 ):
     """设置代理配置"""
     # 检查是否有任何代理配置
-    if request.enabled and not (request.http_proxy or request.https_proxy or request.socks5_proxy):
+    if request.enabled and not (request.http_proxy or request.https_proxy or request.socks5_proxy or request.proxy_pool):
         # 如果启用了代理但没有任何代理配置，则要求至少一个有效配置
         raise HTTPException(
             status_code=400,
-            detail="启用代理时必须至少配置一个代理地址 (HTTP, HTTPS, 或 SOCKS5)"
+            detail="启用代理时必须至少配置一个代理地址 (HTTP, HTTPS, SOCKS5 或代理池)"
         )
 
+    invalid = [url for url in request.proxy_pool if not ProxyHelper.validate_proxy_url(url)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"代理池地址格式无效: {', '.join(invalid)}")
+
     proxy_config = {
         'enabled': request.enabled,
         'http_proxy': request.http_proxy,
         'https_proxy': request.https_proxy,
-        'socks5_proxy': request.socks5_proxy
+        'socks5_proxy': request.socks5_proxy,
+        'proxy_pool': request.proxy_pool
     }
 
     await config_mgr.set_proxy_config(proxy_config)
@@ -349,7 +762,8 @@ async def delete_proxy_config(
         'enabled': False,
         'http_proxy': '',
         'https_proxy': '',
-        'socks5_proxy': ''
+        'socks5_proxy': '',
+        'proxy_pool': []
     }
     await config_mgr.set_proxy_config(proxy_config)
 
@@ -359,6 +773,15 @@ async def delete_proxy_config(
     }
 
 
+@router.get("/proxy/pool")
+async def get_proxy_pool_stats():
+    """获取代理池中各代理的健康与延迟统计（按选择权重排序）"""
+    pool = get_proxy_pool()
+    return {
+        'proxies': pool.get_stats()
+    }
+
+
 @router.post("/proxy/test")
 async def test_proxy_config(
     request: ProxyConfigRequest,
@@ -371,7 +794,7 @@ async def test_proxy_config(
     if not request.enabled:
         raise HTTPException(status_code=400, detail="请先启用代理再进行测试")
 
-    if not (request.http_proxy or request.https_proxy or request.socks5_proxy):
+    if not (request.http_proxy or request.https_proxy or request.socks5_proxy or request.proxy_pool):
         raise HTTPException(status_code=400, detail="请至少配置一个代理地址")
 
     # 构建 ProxyHelper 所需的配置格式
@@ -380,10 +803,14 @@ async def test_proxy_config(
         'http': request.http_proxy or None,
         'https': request.https_proxy or None,
         'socks5': request.socks5_proxy or None,
+        'pool': request.proxy_pool,
     }
     httpx_proxies = ProxyHelper.convert_to_httpx_proxies(proxy_config)
+    pool_urls = ProxyHelper.get_pool_urls(proxy_config)
+    # 测试未保存的配置，不影响全局代理池统计
+    test_pool = ProxyPool()
 
-    if not httpx_proxies:
+    if not httpx_proxies and not pool_urls:
         raise HTTPException(status_code=400, detail="代理地址格式无效，请检查")
 
     # 测试目标：包含国内可达和需要代理才能达的目标
@@ -423,7 +850,7 @@ async def test_proxy_config(
         try:
             start = time.time()
             async with httpx.AsyncClient(
-                proxies=httpx_proxies,
+                **ProxyHelper.build_httpx_client_kwargs(proxy_config, verify=False, pool=test_pool),
                 timeout=10,
                 verify=False,
                 follow_redirects=True,
@@ -465,6 +892,7 @@ async def test_proxy_config(
         'success': overall_success,
         'message': '代理连接正常' if overall_success else '代理连接失败，请检查代理配置',
         'proxy_config_used': httpx_proxies,
+        'proxy_pool_used': pool_urls,
         'results': results,
     }
 
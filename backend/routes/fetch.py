@@ -12,6 +12,8 @@ import logging
 from models import FetchRequest, FetchResponse, IndustryCategory
 from storage.database import Database
 from crawler.service import CrawlerService
+from crawler.ingest import crawl_source
+from crawler.source_health import split_by_circuit
 
 router = APIRouter(prefix="/api/fetch", tags=["fetch"])
 logger = logging.getLogger(__name__)
@@ -35,7 +37,8 @@ async def get_crawler(db: Database = Depends(get_db)):
             'enabled': True,
             'http': proxy_config.get('http'),
             'https': proxy_config.get('https'),
-            'socks5': proxy_config.get('socks5')
+            'socks5': proxy_config.get('socks5'),
+            'pool': proxy_config.get('pool')
         }
         return CrawlerService(proxy_config=formatted_config)
     else:
@@ -66,6 +69,11 @@ async def fetch_articles(
     if request.source_ids:
         sources = [s for s in sources if s.id in request.source_ids]
     
+    # 熔断中的源本次跳过
+    sources, skipped_sources = split_by_circuit(sources)
+    if skipped_sources:
+        logger.info(f"熔断跳过 {len(skipped_sources)} 个源: {[s.name for s in skipped_sources]}")
+    
     if not sources:
         raise HTTPException(
             status_code=404,
@@ -74,37 +82,23 @@ async def fetch_articles(
     
     # 并发爬取所有源
     async def fetch_from_source(source):
-        """从单个源爬取"""
-        try:
-            logger.info(f"开始爬取: {source.name}")
-            articles = await crawler.fetch(source, hours=request.hours)
-            
-            # 保存文章
-            article_ids = []
-            for article in articles:
-                article_id = await db.save_article(article)
-                article_ids.append(article_id)
-            
-            # 更新源的最后爬取时间
-            from datetime import datetime
-            source.last_fetched_at = datetime.now()
-            await db.save_source(source)
-            
-            logger.info(f"✓ {source.name}: 爬取 {len(articles)} 篇文章")
-            return {
-                'success': True,
-                'source_name': source.name,
-                'article_ids': article_ids
-            }
+        """从单个源爬取（单个源失败不影响整体，健康统计由 crawl_source 记录）"""
+        logger.info(f"开始爬取: {source.name}")
+        result = await crawl_source(
+            db, crawler, source, hours=request.hours,
+            respect_schedule=not request.force_refresh
+        )
         
-        except Exception as e:
-            # 单个源失败不影响整体
-            logger.error(f"✗ {source.name}: {str(e)}")
-            return {
-                'success': False,
-                'source_name': source.name,
-                'error': str(e)
-            }
+        if result.get('from_cache'):
+            logger.info(f"⏭ {source.name}: 未到爬取间隔，使用已入库的 {len(result['article_ids'])} 篇文章")
+        elif result['success']:
+            logger.info(
+                f"✓ {source.name}: 爬取 {result['article_count']} 篇文章"
+                f"（{result['bytes_downloaded'] / 1024:.1f} KB）"
+            )
+        else:
+            logger.error(f"✗ {source.name}: {result['error']}")
+        return result
     
     # 并发执行所有爬取任务，设置超时
     try:
@@ -119,6 +113,7 @@ async def fetch_articles(
     # 汇总结果
     article_ids = []
     source_names = []
+    cached_sources = []
     failed_sources = []
     
     for result in results:
@@ -126,6 +121,8 @@ async def fetch_articles(
             if result.get('success'):
                 article_ids.extend(result.get('article_ids', []))
                 source_names.append(result.get('source_name'))
+                if result.get('from_cache'):
+                    cached_sources.append(result.get('source_name'))
             else:
                 failed_sources.append({
                     'source': result.get('source_name'),
@@ -144,7 +141,9 @@ async def fetch_articles(
         article_ids=article_ids,
         count=len(article_ids),
         sources_used=source_names,
-        fetch_time_seconds=fetch_time
+        fetch_time_seconds=fetch_time,
+        skipped_sources=[s.name for s in skipped_sources],
+        cached_sources=cached_sources
     )
 
 
@@ -9,11 +9,17 @@ import time
 import asyncio
 import logging
 
-from models import IntelligenceRequest, IntelligenceResponse
+from models import (
+    IntelligenceRequest, IntelligenceResponse,
+    BatchIntelligenceRequest, BatchIntelligenceResponse, BatchIntelligenceItem, AnalysisType
+)
 from storage.database import Database
 from crawler.service import CrawlerService
+from crawler.ingest import crawl_source, crawl_sources_once, source_feed_key
+from crawler.source_health import split_by_circuit
 from analyzer import Analyzer
 from config_manager import ConfigManager
+from llm.article_ranking import rank_articles
 
 router = APIRouter(prefix="/api/intelligence", tags=["intelligence"])
 logger = logging.getLogger(__name__)
@@ -35,7 +41,8 @@ async def get_crawler(db: Database = Depends(get_db)):
             'enabled': True,
             'http': proxy_config.get('http'),
             'https': proxy_config.get('https'),
-            'socks5': proxy_config.get('socks5')
+            'socks5': proxy_config.get('socks5'),
+            'pool': proxy_config.get('pool')
         }
         return CrawlerService(proxy_config=formatted_config)
     else:
@@ -47,6 +54,29 @@ async def get_config_manager(db: Database = Depends(get_db)):
     return ConfigManager(db)
 
 
+async def preselect_articles(db: Database, articles, ranking_config: dict, request, industry):
+    """
+    分析前预排序：按请求（优先）或已保存配置的 top_k / token_budget 筛选文章
+    
+    Returns:
+        (选中的文章, 全部候选的得分)；两者都未设置时不筛选，得分为空
+    """
+    top_k = request.top_k or ranking_config.get('top_k')
+    token_budget = request.token_budget or ranking_config.get('token_budget')
+    if top_k is None and token_budget is None:
+        return articles, []
+    
+    ranking = await rank_articles(
+        db, articles,
+        top_k=top_k,
+        token_budget=token_budget,
+        novelty_days=ranking_config.get('novelty_days', 0),
+        industry=industry,
+        weights=ranking_config.get('weights')
+    )
+    return ranking['articles'], ranking['scores']
+
+
 @router.post("", response_model=IntelligenceResponse)
 async def fetch_and_analyze(
     request: IntelligenceRequest,
@@ -110,6 +140,11 @@ async def fetch_and_analyze(
         if request.source_ids:
             sources = [s for s in sources if s.id in request.source_ids]
     
+    # 熔断中的源本次跳过
+    sources, skipped_sources = split_by_circuit(sources)
+    if skipped_sources:
+        logger.info(f"熔断跳过 {len(skipped_sources)} 个源: {[s.name for s in skipped_sources]}")
+    
     if not sources:
         detail = f"未找到自定义分类 '{category_name}' 的可用信息源" if request.custom_category_id else f"未找到行业 '{request.industry}' 的可用信息源"
         raise HTTPException(
@@ -118,9 +153,11 @@ async def fetch_and_analyze(
         )
     
     article_ids = []
-    article_urls = set()  # 用于去重
+    article_urls = {}  # 用于去重（规范化 URL → 文章 ID）
     fetch_summary = {
         'total_sources': len(sources),
+        'skipped_sources': len(skipped_sources),
+        'cached_sources': 0,
         'successful_sources': 0,
         'failed_sources': 0,
         'total_articles': 0,
@@ -138,41 +175,22 @@ async def fetch_and_analyze(
     # 并发爬取所有源
     async def fetch_from_source(source):
         """从单个源爬取"""
-        try:
-            logger.info(f"\n[DEBUG] 正在爬取: {source.name}")
-            logger.info(f"[DEBUG] URL: {source.url}")
-            
-            articles = await crawler.fetch(source, hours=request.hours)
-            
-            logger.info(f"[DEBUG] {source.name}: 获取到 {len(articles)} 篇文章")
-            
-            # 保存文章
-            saved_ids = []
-            for article in articles:
-                # 去重：同一个 URL 在本次爬取中只处理一次
-                if article.url not in article_urls:
-                    article_urls.add(article.url)
-                    article_id = await db.save_article(article)
-                    saved_ids.append(article_id)
-            
-            from datetime import datetime
-            source.last_fetched_at = datetime.now()
-            await db.save_source(source)
-            
-            return {
-                'success': True,
-                'source_name': source.name,
-                'article_ids': saved_ids,
-                'article_count': len(articles)
-            }
+        logger.info(f"\n[DEBUG] 正在爬取: {source.name}")
+        logger.info(f"[DEBUG] URL: {source.url}")
         
-        except Exception as e:
-            logger.error(f"[ERROR] 从源 {source.name} 爬取失败: {str(e)}")
-            return {
-                'success': False,
-                'source_name': source.name,
-                'error': str(e)
-            }
+        # 同一个规范化 URL 在本次爬取中只处理一次，已入库文章跳过写操作
+        result = await crawl_source(
+            db, crawler, source, hours=request.hours, batch_seen=article_urls,
+            respect_schedule=not request.force_refresh
+        )
+        
+        if result.get('from_cache'):
+            logger.info(f"[DEBUG] {source.name}: 未到爬取间隔，使用已入库的 {len(result['article_ids'])} 篇文章")
+        elif result['success']:
+            logger.info(f"[DEBUG] {source.name}: 获取到 {result['article_count']} 篇文章")
+        else:
+            logger.error(f"[ERROR] 从源 {source.name} 爬取失败: {result['error']}")
+        return result
     
     # 并发执行所有爬取任务
     try:
@@ -190,10 +208,16 @@ async def fetch_and_analyze(
             if result.get('success'):
                 article_ids.extend(result.get('article_ids', []))
                 fetch_summary['successful_sources'] += 1
+                if result.get('from_cache'):
+                    fetch_summary['cached_sources'] += 1
                 fetch_summary['total_articles'] += result.get('article_count', 0)
             else:
                 fetch_summary['failed_sources'] += 1
     
+    # 未到期源从数据库取回的文章不经过 article_urls 去重，与其他源重新爬到的同一文章合并
+    # （analysis_articles 以 (analysis_id, article_id) 为主键，重复 ID 会打乱引用编号）
+    article_ids = list(dict.fromkeys(article_ids))
+    
     logger.info(f"\n{'='*80}")
     logger.info(f"[DEBUG] 爬取完成!")
     logger.info(f"[DEBUG] 成功: {fetch_summary['successful_sources']}/{fetch_summary['total_sources']} 个源")
@@ -209,6 +233,7 @@ async def fetch_and_analyze(
             "message": "未能从任何信息源获取到文章",
             "sources_attempted": fetch_summary['total_sources'],
             "sources_failed": fetch_summary['failed_sources'],
+            "sources_skipped": fetch_summary['skipped_sources'],
             "suggestion": "请检查信息源配置或稍后重试"
         }
         
@@ -267,7 +292,13 @@ async def fetch_and_analyze(
         llm_backend=request.llm_backend,
         api_key=api_key,
         model=request.llm_model,
-        proxy_config=proxy_config
+        proxy_config=proxy_config,
+        use_cache=not request.bypass_cache,
+        use_digests=request.use_digests,
+        db=db,
+        resilience=await config_mgr.get_llm_resilience_config(),
+        failover=await config_mgr.get_llm_failover(request.llm_backend),
+        cluster_articles=request.cluster_articles
     )
     
     try:
@@ -277,12 +308,18 @@ async def fetch_and_analyze(
         # 如果是标准行业分类（包括 daily_info_gap），则传递原始请求的 industry
         analysis_industry = None if request.custom_category_id else request.industry
         
+        # 预排序：高产出的源不再挤占提示词，已报道过的内容靠后
+        articles, article_scores = await preselect_articles(
+            db, articles, await config_mgr.get_article_ranking_config(), request, analysis_industry
+        )
+        
         analysis = await analyzer.analyze(
             articles=articles,
             analysis_type=AnalysisType.COMPREHENSIVE,
             custom_prompt=custom_prompt,  # 传递自定义提示词
             industry=analysis_industry  # 传递原始请求的 industry，避免自动推断导致分类错误
         )
+        analysis.article_scores = article_scores
         
         analysis_id = await db.save_analysis(analysis)
         analysis.id = analysis_id
@@ -290,8 +327,10 @@ async def fetch_and_analyze(
         total_time = time.time() - start_time
         
         return IntelligenceResponse(
-            article_ids=article_ids,
-            article_count=len(article_ids),
+            article_ids=[a.id for a in articles],
+            article_count=len(articles),
+            crawled_article_ids=article_ids,
+            crawled_article_count=len(article_ids),
             analysis_id=analysis_id,
             analysis=analysis,
             total_time_seconds=total_time
@@ -302,3 +341,156 @@ async def fetch_and_analyze(
             status_code=500,
             detail=f"分析失败: {str(e)}"
         )
+
+
+@router.post("/batch", response_model=BatchIntelligenceResponse)
+async def batch_fetch_and_analyze(
+    request: BatchIntelligenceRequest,
+    db: Database = Depends(get_db),
+    crawler: CrawlerService = Depends(get_crawler),
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """
+    批量一键情报
+    
+    多个行业 / 自定义分类共用一次爬取：先求信息源并集（相同 feed 只爬取一次），
+    再并发执行各自的分析（受 LLM 限流器约束）。单个目标失败不影响其他目标。
+    """
+    start_time = time.time()
+    
+    if not request.industries and not request.custom_category_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="必须至少指定一个 industry 或 custom_category_id"
+        )
+    
+    api_key = await config_mgr.get_api_key(request.llm_backend)
+    if request.llm_backend != 'ollama' and not api_key:
+        raise HTTPException(
+            status_code=400,
+            detail=f"使用 {request.llm_backend.upper()} 需要先在设置页面配置 API Key"
+        )
+    
+    # 第一步：确定每个目标的信息源
+    targets = []
+    for industry in dict.fromkeys(request.industries):
+        sources = await db.get_sources(industry=industry, enabled_only=True)
+        targets.append({
+            'item': BatchIntelligenceItem(industry=industry),
+            'sources': sources,
+            'custom_prompt': None,
+            'industry': industry
+        })
+    for category_id in dict.fromkeys(request.custom_category_ids):
+        category = await db.get_custom_category(category_id)
+        if not category:
+            raise HTTPException(
+                status_code=404,
+                detail=f"未找到自定义分类 {category_id}"
+            )
+        if not category.enabled:
+            raise HTTPException(
+                status_code=400,
+                detail=f"自定义分类 '{category.name}' 已禁用"
+            )
+        targets.append({
+            'item': BatchIntelligenceItem(custom_category_id=category_id, category_name=category.name),
+            'sources': await db.get_sources_by_custom_category(category_id),
+            # 自定义分类使用自定义提示词，不传 industry
+            'custom_prompt': category.custom_prompt,
+            'industry': None
+        })
+    
+    # 熔断中的源本次跳过
+    skipped_feeds = set()
+    for target in targets:
+        target['sources'], skipped = split_by_circuit(target['sources'])
+        skipped_feeds.update(source_feed_key(source) for source in skipped)
+    
+    # 第二步：信息源并集只爬取一次
+    all_sources = [source for target in targets for source in target['sources']]
+    results = await crawl_sources_once(
+        db, crawler, all_sources, hours=request.hours,
+        respect_schedule=not request.force_refresh
+    )
+    fetch_summary = {
+        'total_sources': len(all_sources),
+        'unique_feeds': len(results),
+        'skipped_feeds': len(skipped_feeds),
+        'cached_feeds': sum(1 for r in results.values() if r.get('from_cache')),
+        'successful_feeds': sum(1 for r in results.values() if r['success']),
+        'failed_feeds': sum(1 for r in results.values() if not r['success']),
+        'total_articles': sum(r.get('article_count', 0) for r in results.values())
+    }
+    logger.info(
+        f"批量爬取完成: {len(targets)} 个目标，{fetch_summary['total_sources']} 个源去重为 "
+        f"{fetch_summary['unique_feeds']} 个 feed，成功 {fetch_summary['successful_feeds']}"
+    )
+    
+    for target in targets:
+        article_ids = []
+        for source in target['sources']:
+            result = results.get(source_feed_key(source))
+            if result and result['success']:
+                article_ids.extend(result.get('article_ids', []))
+        item = target['item']
+        item.crawled_article_ids = list(dict.fromkeys(article_ids))
+        item.crawled_article_count = len(item.crawled_article_ids)
+        if not target['sources']:
+            item.error = "没有可用信息源"
+        elif not item.crawled_article_ids:
+            item.error = "未能从任何信息源获取到文章"
+    
+    # 第三步：并发分析（并发度由 LLM 限流器控制）
+    proxy_config = await config_mgr.get_detailed_proxy_config()
+    resilience = await config_mgr.get_llm_resilience_config()
+    failover = await config_mgr.get_llm_failover(request.llm_backend)
+    ranking_config = await config_mgr.get_article_ranking_config()
+    
+    async def analyze_target(target):
+        item = target['item']
+        if item.error:
+            return
+        articles = await db.get_articles_by_ids(item.crawled_article_ids)
+        if not articles:
+            item.error = "无法加载文章数据"
+            return
+        analyzer = Analyzer(
+            llm_backend=request.llm_backend,
+            api_key=api_key,
+            model=request.llm_model,
+            proxy_config=proxy_config,
+            use_cache=not request.bypass_cache,
+            use_digests=request.use_digests,
+            db=db,
+            resilience=resilience,
+            failover=failover,
+            cluster_articles=request.cluster_articles
+        )
+        try:
+            articles, article_scores = await preselect_articles(
+                db, articles, ranking_config, request, target['industry']
+            )
+            analysis = await analyzer.analyze(
+                articles=articles,
+                analysis_type=AnalysisType.COMPREHENSIVE,
+                custom_prompt=target['custom_prompt'],
+                industry=target['industry']
+            )
+            analysis.article_scores = article_scores
+            analysis.id = await db.save_analysis(analysis)
+            item.article_ids = [a.id for a in articles]
+            item.article_count = len(articles)
+            item.analysis_id = analysis.id
+            item.analysis = analysis
+        except Exception as e:
+            logger.error(f"批量分析失败（{item.industry or item.category_name}）: {e}")
+            item.error = f"分析失败: {str(e)}"
+    
+    await asyncio.gather(*(analyze_target(target) for target in targets))
+    
+    return BatchIntelligenceResponse(
+        results=[target['item'] for target in targets],
+        fetch_summary=fetch_summary,
+        total_time_seconds=time.time() - start_time
+    )
@@ -16,7 +16,8 @@ from pydantic import BaseModel, Field
 from models import TrendInsight, IndustryCategory
 from storage.database import Database
 from config_manager import ConfigManager
-from llm.adapter import create_llm_adapter
+from llm.client_registry import get_llm_client_registry
+from llm.response_cache import get_llm_response_cache
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -35,6 +36,15 @@ class TrendInsightRequest(BaseModel):
     llm_model: Optional[str] = Field(default=None, description="具体模型名称")
 
 
+class RollingTrendRequest(BaseModel):
+    """滚动趋势洞察更新请求"""
+    industry: str = Field(..., description="行业分类")
+    llm_backend: str = Field(default="deepseek", description="LLM 后端")
+    llm_model: Optional[str] = Field(default=None, description="具体模型名称")
+    window_days: Optional[int] = Field(default=None, ge=1, le=365, description="滚动窗口（天），缺省使用配置")
+    force: bool = Field(default=False, description="忽略已有状态，按窗口内全部分析重新生成")
+
+
 # ============================================================================
 # 依赖注入
 # ============================================================================
@@ -66,24 +76,73 @@ def load_trend_insight_prompt():
         return yaml.safe_load(f)
 
 
-def build_trend_insight_prompt(
-    analyses: list,
-    industry: str,
-    date_range: str,
-    prompt_config: dict
-) -> tuple:
-    """构建趋势洞察 prompt
+# 行业中文映射
+INDUSTRY_CN_MAP = {
+    "daily_info_gap": "综合信息差",
+    "socialmedia": "社交媒体",
+    "news": "新闻资讯",
+    "tech": "科技互联网",
+    "developer": "开发者",
+    "finance": "财经金融",
+    "entertainment": "娱乐影视",
+    "gaming": "游戏电竞",
+    "anime": "动漫二次元",
+    "shopping": "电商购物",
+    "education": "学习教育",
+    "lifestyle": "生活方式",
+    "custom": "自定义",
+    "other": "其他"
+}
+
+# 结构化摘要中每份报告保留的条目数
+STRUCTURED_ITEMS_PER_REPORT = 15
+# 结构化摘要中单个条目正文的字符上限
+STRUCTURED_BODY_CHARS = 120
+KIND_LABELS = {'trend': "趋势", 'signal': "信号", 'gap': "信息差"}
+
+
+def format_structured_report(analysis, sections: list) -> Optional[str]:
+    """用保存时解析出的条目代替完整报告：执行摘要 + 按得分排序的趋势 / 信号 / 信息差条目
     
     Returns:
-        (system_prompt, user_prompt)
+        报告没有可用条目时返回 None（调用方回退为压缩全文）
     """
-    # 构建报告内容
+    items = [
+        item for section in sections for item in section['items']
+        if item['kind'] in KIND_LABELS
+    ]
+    if not items:
+        return None
+    
+    items = sorted(items, key=lambda item: -item['score'])[:STRUCTURED_ITEMS_PER_REPORT]
+    lines = [f"摘要：{analysis.executive_brief}", ""]
+    for kind, label in KIND_LABELS.items():
+        kind_items = [item for item in items if item['kind'] == kind]
+        if not kind_items:
+            continue
+        lines.append(f"**{label}**")
+        for item in kind_items:
+            body = item['body'].replace('\n', ' ')
+            if len(body) > STRUCTURED_BODY_CHARS:
+                body = body[:STRUCTURED_BODY_CHARS] + "…"
+            lines.append(f"- {item['headline']}（得分 {item['score']:.2f}，{len(item['article_ids'])} 篇来源）：{body}")
+        lines.append("")
+    return '\n'.join(lines).strip()
+
+
+def format_reports_content(analyses: list, structures: Optional[dict] = None) -> str:
+    """拼接各报告的内容（结构化摘要优先，否则压缩全文）"""
+    structures = structures or {}
+    
     reports_content = ""
     for i, analysis in enumerate(analyses, 1):
         created_date = analysis.created_at.strftime('%Y-%m-%d')
         
-        # 压缩报告内容（保留核心部分）
-        report_content = analysis.markdown_report or analysis.executive_brief
+        # 优先使用保存时解析出的结构化条目，不再重新发送完整报告
+        report_content = format_structured_report(analysis, structures.get(analysis.id, []))
+        if report_content is None:
+            # 压缩报告内容（保留核心部分）
+            report_content = analysis.markdown_report or analysis.executive_brief
         
         # 智能压缩：如果报告太长，只保留关键部分
         if len(report_content) > 3000:
@@ -116,25 +175,36 @@ def build_trend_insight_prompt(
 
 ---
 """
+    return reports_content
+
+
+def format_report_format(prompt_config: dict, industry_cn: str, date_range: str, report_count: int) -> str:
+    """填充输出格式参考"""
+    report_format = prompt_config.get('report_format', '')
+    report_format = report_format.replace('{{industry}}', industry_cn)
+    report_format = report_format.replace('{{date_range}}', date_range)
+    report_format = report_format.replace('{{report_count}}', str(report_count))
+    report_format = report_format.replace('{{generated_at}}', datetime.now().strftime('%Y-%m-%d %H:%M'))
+    return report_format
+
+
+def build_trend_insight_prompt(
+    analyses: list,
+    industry: str,
+    date_range: str,
+    prompt_config: dict,
+    structures: Optional[dict] = None
+) -> tuple:
+    """构建趋势洞察 prompt
     
-    # 行业中文映射
-    industry_cn_map = {
-        "daily_info_gap": "综合信息差",
-        "socialmedia": "社交媒体",
-        "news": "新闻资讯",
-        "tech": "科技互联网",
-        "developer": "开发者",
-        "finance": "财经金融",
-        "entertainment": "娱乐影视",
-        "gaming": "游戏电竞",
-        "anime": "动漫二次元",
-        "shopping": "电商购物",
-        "education": "学习教育",
-        "lifestyle": "生活方式",
-        "custom": "自定义",
-        "other": "其他"
-    }
-    industry_cn = industry_cn_map.get(industry, industry)
+    Args:
+        structures: {analysis_id: 报告章节（含条目）}，有条目的报告使用结构化摘要代替全文
+    
+    Returns:
+        (system_prompt, user_prompt)
+    """
+    reports_content = format_reports_content(analyses, structures)
+    industry_cn = INDUSTRY_CN_MAP.get(industry, industry)
     
     # 构建系统提示词
     system_prompt = prompt_config.get('system_prompt', '')
@@ -147,11 +217,7 @@ def build_trend_insight_prompt(
     user_prompt = user_prompt.replace('{{reports_content}}', reports_content)
     
     # 构建报告格式提示
-    report_format = prompt_config.get('report_format', '')
-    report_format = report_format.replace('{{industry}}', industry_cn)
-    report_format = report_format.replace('{{date_range}}', date_range)
-    report_format = report_format.replace('{{report_count}}', str(len(analyses)))
-    report_format = report_format.replace('{{generated_at}}', datetime.now().strftime('%Y-%m-%d %H:%M'))
+    report_format = format_report_format(prompt_config, industry_cn, date_range, len(analyses))
     
     # 合并完整提示词
     full_user_prompt = f"{user_prompt}\n\n## 输出格式参考\n\n{report_format}"
@@ -159,6 +225,60 @@ def build_trend_insight_prompt(
     return system_prompt, full_user_prompt
 
 
+def build_rolling_trend_prompt(
+    new_analyses: list,
+    industry: str,
+    date_range: str,
+    previous_state: str,
+    previous_count: int,
+    previous_end: str,
+    window_days: int,
+    window_count: int,
+    prompt_config: dict,
+    structures: Optional[dict] = None
+) -> tuple:
+    """构建滚动趋势洞察 prompt：上一版洞察 + 新增报告
+    
+    Args:
+        new_analyses: 上次更新之后新增的分析（只发送这些报告）
+        previous_state: 上一版洞察报告（首次生成时为占位说明）
+        previous_count: 上一版覆盖的报告数
+        previous_end: 上一版覆盖的截止日期
+        window_count: 更新后窗口内的报告数（用于输出格式中的报告数）
+    
+    Returns:
+        (system_prompt, user_prompt)
+    """
+    reports_content = format_reports_content(new_analyses, structures)
+    industry_cn = INDUSTRY_CN_MAP.get(industry, industry)
+    
+    system_prompt = prompt_config.get('system_prompt', '')
+    
+    user_template = prompt_config.get('rolling_user_prompt_template', '')
+    user_prompt = user_template.replace('{{previous_count}}', str(previous_count))
+    user_prompt = user_prompt.replace('{{previous_end}}', previous_end)
+    user_prompt = user_prompt.replace('{{report_count}}', str(len(new_analyses)))
+    user_prompt = user_prompt.replace('{{date_range}}', date_range)
+    user_prompt = user_prompt.replace('{{window_days}}', str(window_days))
+    user_prompt = user_prompt.replace('{{industry}}', industry_cn)
+    # 上一版洞察与新增报告最后替换，其中的文本不再参与其他占位符替换
+    user_prompt = user_prompt.replace('{{reports_content}}', reports_content)
+    user_prompt = user_prompt.replace('{{previous_state}}', previous_state)
+    
+    report_format = format_report_format(prompt_config, industry_cn, date_range, window_count)
+    full_user_prompt = f"{user_prompt}\n\n## 输出格式参考\n\n{report_format}"
+    
+    return system_prompt, full_user_prompt
+
+
+def extract_executive_summary(response_text: str) -> str:
+    """提取执行摘要（取第一段非标题文本）"""
+    for line in response_text.strip().split('\n'):
+        if line.strip() and not line.strip().startswith('#'):
+            return line.strip()[:500]
+    return response_text[:500]
+
+
 # ============================================================================
 # API 端点
 # ============================================================================
@@ -219,92 +339,40 @@ async def create_trend_insight(
     # 加载 prompt 配置
     prompt_config = load_trend_insight_prompt()
     
-    # 构建 prompt
+    # 构建 prompt（报告结构在保存分析时已解析）
+    structures = {a.id: await db.get_report_structure(a.id) for a in analyses}
     system_prompt, user_prompt = build_trend_insight_prompt(
         analyses=analyses,
         industry=dominant_industry,
         date_range=date_range_str,
-        prompt_config=prompt_config
+        prompt_config=prompt_config,
+        structures=structures
     )
     
-    # 创建 LLM 适配器
-    adapter = create_llm_adapter(
+    # 获取 LLM 适配器（应用级注册表复用连接池）
+    adapter = get_llm_client_registry().acquire(
         backend=request.llm_backend,
         api_key=api_key,
         model=request.llm_model,
         proxy_config=proxy_config
     )
+    adapter.response_cache = get_llm_response_cache()
     
     # 执行分析
     start_time = datetime.now()
     
     try:
         # 直接调用 LLM（不通过 Analyzer，因为这是特殊的趋势分析）
-        if request.llm_backend == 'gemini':
-            # Gemini 使用 generate_content
-            import asyncio
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            response = await asyncio.to_thread(
-                adapter._sync_generate,
-                full_prompt
-            )
-            response_text = response.text
-            token_usage = 0
-            if hasattr(response, 'usage_metadata') and hasattr(response.usage_metadata, 'total_token_count'):
-                token_usage = response.usage_metadata.total_token_count
-        elif request.llm_backend == 'ollama':
-            # Ollama 使用 HTTP API
-            import httpx
-            proxies = None
-            if adapter.proxy_url:
-                proxies = {
-                    'http://': adapter.proxy_url,
-                    'https://': adapter.proxy_url,
-                }
-            async with httpx.AsyncClient(timeout=300, proxies=proxies) as http_client:
-                resp = await http_client.post(
-                    f"{adapter.base_url}/api/generate",
-                    json={
-                        "model": request.llm_model or "llama3.1",
-                        "prompt": f"{system_prompt}\n\n{user_prompt}",
-                        "stream": False,
-                        "options": {"num_predict": 32000}
-                    }
-                )
-                resp.raise_for_status()
-                result = resp.json()
-            response_text = result.get('response', '')
-            token_usage = result.get('eval_count', 0)
-        else:
-            # OpenAI/DeepSeek: 使用 adapter 中已配置好代理的客户端
-            model = request.llm_model
-            if not model:
-                model = "deepseek-chat" if request.llm_backend == 'deepseek' else "gpt-4o-mini"
-            
-            response = await adapter.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=8192
-            )
-            
-            response_text = response.choices[0].message.content
-            token_usage = response.usage.total_tokens if response.usage else 0
+        # OpenAI/DeepSeek 限制输出 8K，Gemini/Ollama 使用适配器默认上限
+        max_tokens = 8192 if request.llm_backend in ('openai', 'deepseek') else None
+        result = await adapter.complete(system_prompt, user_prompt, max_tokens=max_tokens)
+        response_text = result['text']
+        token_usage = result['token_usage']
         
         processing_time = (datetime.now() - start_time).total_seconds()
         
         # 提取执行摘要（取第一段）
-        lines = response_text.strip().split('\n')
-        executive_summary = ""
-        for line in lines:
-            if line.strip() and not line.strip().startswith('#'):
-                executive_summary = line.strip()[:500]
-                break
-        if not executive_summary:
-            executive_summary = response_text[:500]
+        executive_summary = extract_executive_summary(response_text)
         
         # 计算成本
         model_info = adapter.get_model_info()
@@ -347,6 +415,53 @@ async def create_trend_insight(
         )
 
 
+@router.post("/rolling")
+async def update_rolling_trend_insight(
+    request: RollingTrendRequest,
+    db: Database = Depends(get_db),
+    config_mgr: ConfigManager = Depends(get_config_manager)
+):
+    """
+    增量更新某行业的滚动趋势洞察
+    
+    只发送上次更新之后新增的分析；没有新增分析时不调用 LLM（status 为 unchanged）
+    """
+    from rolling_trend import update_rolling_trend
+    
+    if request.window_days is None:
+        window_days = (await config_mgr.get_rolling_trend_config())['window_days']
+    else:
+        window_days = request.window_days
+    
+    try:
+        return await update_rolling_trend(
+            db, config_mgr, request.industry,
+            llm_backend=request.llm_backend,
+            llm_model=request.llm_model,
+            window_days=window_days,
+            force=request.force
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"滚动趋势洞察更新失败: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"滚动趋势洞察更新失败: {str(e)}"
+        )
+
+
+@router.get("/rolling")
+async def list_rolling_trend_states(
+    industry: Optional[str] = None,
+    db: Database = Depends(get_db)
+):
+    """
+    获取滚动趋势洞察状态（各行业最新一版洞察 ID、窗口内的分析与累计 token）
+    """
+    return await db.get_rolling_trend_states(industry)
+
+
 @router.get("s", response_model=List[TrendInsight])
 async def list_trend_insights(
     industry: Optional[str] = None,
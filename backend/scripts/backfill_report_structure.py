@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+为已有分析补齐报告结构（章节、条目）与趋势 / 信号 / 信息差字段
+
+新保存的分析会自动解析，此脚本只需在升级后运行一次。
+用法: python scripts/backfill_report_structure.py [数据库路径]
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from storage.database import Database
+
+
+async def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "./data/newsgap.db"
+    if not Path(db_path).exists():
+        print(f"❌ 数据库文件不存在: {db_path}")
+        return 1
+
+    db = Database(db_path=db_path)
+    await db.initialize()
+
+    async with db._get_connection() as conn:
+        cursor = await conn.execute("SELECT id FROM analyses WHERE markdown_report IS NOT NULL")
+        analysis_ids = [row[0] for row in await cursor.fetchall()]
+
+    print(f"🔄 解析 {len(analysis_ids)} 份报告...")
+    items = 0
+    for analysis_id in analysis_ids:
+        analysis = await db.get_analysis(analysis_id)
+        await db.save_analysis(analysis)
+        items += sum(len(section['items']) for section in await db.get_report_structure(analysis_id))
+
+    print(f"✅ 完成：{len(analysis_ids)} 份报告，{items} 个条目")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -7,8 +7,8 @@ SQLite 数据库封装
 import aiosqlite
 import json
 import uuid
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict
 from pathlib import Path
 
 from models import (
@@ -17,11 +17,36 @@ from models import (
     StorageInterface, CustomCategory, TrendInsight
 )
 from storage.custom_category_db import CustomCategoryDB
+from crawler.url_normalizer import canonicalize_url
 
 
 class Database(StorageInterface, CustomCategoryDB):
     """SQLite 数据库管理器"""
     
+    # 增量列迁移：(表名, 列名, 列定义)
+    # schema.sql 只能为新库建表，已有数据库的新增列在这里补齐
+    COLUMN_MIGRATIONS = [
+        ('articles', 'canonical_url', 'TEXT'),
+        ('sources', 'last_error', 'TEXT'),
+        ('sources', 'error_count', 'INTEGER NOT NULL DEFAULT 0'),
+        ('sources', 'last_success_at', 'TIMESTAMP'),
+        ('sources', 'mean_latency_ms', 'REAL'),
+        ('sources', 'avg_articles_per_fetch', 'REAL'),
+        ('sources', 'fetch_count', 'INTEGER NOT NULL DEFAULT 0'),
+        ('sources', 'circuit_open_until', 'TIMESTAMP'),
+        ('sources', 'disabled_reason', 'TEXT'),
+        ('sources', 'avg_bytes_per_fetch', 'REAL'),
+        ('sources', 'total_bytes_downloaded', 'INTEGER NOT NULL DEFAULT 0'),
+        ('sources', 'config_hash', 'TEXT'),
+        ('sources', 'last_seen_guid', 'TEXT'),
+        ('sources', 'last_seen_published_at', 'TIMESTAMP'),
+        ('sources', 'seen_since', 'TIMESTAMP'),
+        ('sources', 'mean_publish_interval_minutes', 'REAL'),
+        ('sources', 'learned_interval_minutes', 'REAL'),
+        ('analyses', 'llm_attempts', 'TEXT'),
+        ('analyses', 'prompt_stats', 'TEXT'),
+    ]
+    
     def __init__(self, db_path: str = "./data/newsgap.db"):
         self.db_path = db_path
         self._ensure_db_dir()
@@ -43,9 +68,42 @@ class Database(StorageInterface, CustomCategoryDB):
             schema = f.read()
         
         async with aiosqlite.connect(self.db_path) as db:
+            # 先补列，否则 schema 中引用新列的索引会在老库上执行失败
+            added_columns = await self._migrate_columns(db)
             await db.executescript(schema)
+            
+            if ('articles', 'canonical_url') in added_columns:
+                await self._backfill_canonical_urls(db)
+            
             await db.commit()
     
+    async def _migrate_columns(self, db: aiosqlite.Connection) -> List[tuple]:
+        """为已有表补齐缺失的列，返回新增的 (表名, 列名) 列表"""
+        added = []
+        for table, column, definition in self.COLUMN_MIGRATIONS:
+            cursor = await db.execute(f"PRAGMA table_info({table})")
+            existing_columns = {row[1] for row in await cursor.fetchall()}
+            
+            # 表不存在（新库）时由 schema.sql 负责创建
+            if not existing_columns or column in existing_columns:
+                continue
+            
+            await db.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            added.append((table, column))
+        
+        return added
+    
+    async def _backfill_canonical_urls(self, db: aiosqlite.Connection):
+        """为历史文章回填 canonical_url"""
+        cursor = await db.execute(
+            "SELECT id, url FROM articles WHERE canonical_url IS NULL"
+        )
+        rows = await cursor.fetchall()
+        await db.executemany(
+            "UPDATE articles SET canonical_url = ? WHERE id = ?",
+            [(canonicalize_url(url), article_id) for article_id, url in rows]
+        )
+    
     # ========================================================================
     # Article 操作
     # ========================================================================
@@ -54,12 +112,14 @@ class Database(StorageInterface, CustomCategoryDB):
         """保存文章（如果 URL 已存在则更新）"""
         if article.id is None:
             article.id = str(uuid.uuid4())
+        if not article.canonical_url:
+            article.canonical_url = canonicalize_url(article.url)
         
         async with aiosqlite.connect(self.db_path) as db:
-            # 检查是否已存在（根据 URL）
+            # 检查是否已存在（根据 URL 或规范化 URL）
             cursor = await db.execute(
-                "SELECT id FROM articles WHERE url = ?",
-                (article.url,)
+                "SELECT id FROM articles WHERE url = ? OR canonical_url = ? LIMIT 1",
+                (article.url, article.canonical_url)
             )
             existing = await cursor.fetchone()
             
@@ -72,13 +132,14 @@ class Database(StorageInterface, CustomCategoryDB):
                         industry = ?, published_at = ?, fetched_at = ?,
                         author = ?, language = ?, word_count = ?,
                         source_id = ?, source_name = ?,
-                        metadata = ?
+                        canonical_url = ?, metadata = ?
                     WHERE id = ?
                 """, (
                     article.title, article.content, article.summary,
                     article.industry.value, article.published_at, article.fetched_at,
                     article.author, article.language, article.word_count,
                     article.source_id, article.source_name,
+                    article.canonical_url,
                     json.dumps(article.metadata) if article.metadata else None,
                     article.id
                 ))
@@ -86,12 +147,12 @@ class Database(StorageInterface, CustomCategoryDB):
                 # 插入新文章
                 await db.execute("""
                     INSERT INTO articles (
-                        id, title, url, content, summary, industry,
+                        id, title, url, canonical_url, content, summary, industry,
                         published_at, fetched_at, author, language, word_count,
                         source_id, source_name, archived, metadata
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
-                    article.id, article.title, article.url, article.content,
+                    article.id, article.title, article.url, article.canonical_url, article.content,
                     article.summary, article.industry.value,
                     article.published_at, article.fetched_at,
                     article.author, article.language, article.word_count,
@@ -118,6 +179,62 @@ class Database(StorageInterface, CustomCategoryDB):
         
         return article.id
     
+    async def get_article_ids_by_canonical_urls(self, canonical_urls: List[str]) -> Dict[str, str]:
+        """批量查询规范化 URL 对应的文章 ID，返回 {canonical_url: article_id}"""
+        result = {}
+        unique_urls = list(dict.fromkeys(u for u in canonical_urls if u))
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            # 分批查询，避免超过 SQLite 参数数量上限
+            for i in range(0, len(unique_urls), 500):
+                chunk = unique_urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = await db.execute(
+                    f"SELECT canonical_url, id FROM articles WHERE canonical_url IN ({placeholders})",
+                    chunk
+                )
+                for canonical_url, article_id in await cursor.fetchall():
+                    result[canonical_url] = article_id
+        
+        return result
+    
+    async def get_article_ids_by_source(self, source_id: str, since: datetime) -> List[str]:
+        """
+        获取某个源在指定时间之后发布的文章 ID（按发布时间倒序）
+        
+        published_at 可能带不同时区偏移，先用放宽一天的字符串比较走索引，再精确过滤
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("""
+                SELECT id, published_at FROM articles
+                WHERE source_id = ? AND published_at >= ?
+                ORDER BY published_at DESC
+            """, (source_id, (since - timedelta(days=1)).replace(tzinfo=None)))
+            rows = await cursor.fetchall()
+        
+        article_ids = []
+        for article_id, published_at in rows:
+            published = datetime.fromisoformat(published_at)
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            if published >= since:
+                article_ids.append(article_id)
+        return article_ids
+    
+    async def get_recent_canonical_urls(self, days: int = 30, limit: int = 200000) -> List[str]:
+        """获取最近抓取文章的规范化 URL（用于预热已见 URL 过滤器）"""
+        since = datetime.now() - timedelta(days=days)
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("""
+                SELECT canonical_url FROM articles
+                WHERE canonical_url IS NOT NULL AND fetched_at >= ?
+                ORDER BY fetched_at DESC
+                LIMIT ?
+            """, (since, limit))
+            return [row[0] for row in await cursor.fetchall()]
+    
     async def get_article(self, article_id: str) -> Optional[Article]:
         """根据 ID 获取文章"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -140,6 +257,36 @@ class Database(StorageInterface, CustomCategoryDB):
             
             return self._row_to_article(row, tags)
     
+    async def get_articles_by_ids(self, article_ids: List[str]) -> List[Article]:
+        """批量获取文章（按传入顺序返回，不存在的 ID 忽略）"""
+        if not article_ids:
+            return []
+        
+        unique = list(dict.fromkeys(article_ids))
+        rows = {}
+        tags: Dict[str, List[str]] = {}
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            # 分批查询，避免超过 SQLite 参数上限
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor = await db.execute(
+                    f"SELECT * FROM articles WHERE id IN ({placeholders})", batch
+                )
+                for row in await cursor.fetchall():
+                    rows[row['id']] = row
+                tag_cursor = await db.execute(
+                    f"SELECT article_id, tag_name FROM article_tags WHERE article_id IN ({placeholders})", batch
+                )
+                for row in await tag_cursor.fetchall():
+                    tags.setdefault(row[0], []).append(row[1])
+        
+        return [
+            self._row_to_article(rows[article_id], tags.get(article_id, []))
+            for article_id in unique if article_id in rows
+        ]
+    
     async def query_articles(
         self,
         industry: Optional[IndustryCategory] = None,
@@ -245,16 +392,19 @@ class Database(StorageInterface, CustomCategoryDB):
             if existing_row:
                 # 存在则更新，使用已有的ID
                 source.id = existing_row['id']
+                # 重新启用时清除禁用原因；健康统计由 record_source_fetch 维护，这里不覆盖
                 await db.execute("""
                     UPDATE sources SET
                         name = ?, source_type = ?, industry = ?, enabled = ?,
-                        fetch_interval_hours = ?, last_fetched_at = ?, metadata = ?
+                        fetch_interval_hours = ?, last_fetched_at = ?, metadata = ?,
+                        disabled_reason = CASE WHEN ? = 1 THEN NULL ELSE disabled_reason END
                     WHERE id = ?
                 """, (
                     source.name, source.source_type.value, source.industry.value,
                     1 if source.enabled else 0,
                     source.fetch_interval_hours, source.last_fetched_at,
                     json.dumps(source.metadata) if source.metadata else None,
+                    1 if source.enabled else 0,
                     source.id
                 ))
             else:
@@ -278,6 +428,201 @@ class Database(StorageInterface, CustomCategoryDB):
         
         return source.id
     
+    async def get_source_sync_state(self) -> List[Dict]:
+        """获取配置同步所需的信息源状态（id、url、enabled、disabled_reason、config_hash）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT id, url, enabled, disabled_reason, config_hash FROM sources ORDER BY created_at"
+            )
+            return [dict(row) for row in await cursor.fetchall()]
+    
+    async def apply_source_sync(
+        self,
+        inserts: List[tuple],
+        updates: List[tuple],
+        disables: List[str]
+    ):
+        """
+        在单个事务内应用配置同步计划
+        
+        Args:
+            inserts: [(Source, config_hash)]
+            updates: [(id, Source, config_hash, enabled, disabled_reason)]
+            disables: [id]（标记为已从配置中移除）
+        """
+        from config.source_sync import DISABLED_REASON_CONFIG, DISABLED_REASON_CONFIG_REMOVED
+        
+        if not (inserts or updates or disables):
+            return
+        
+        insert_rows = []
+        for source, config_hash in inserts:
+            source.id = source.id or str(uuid.uuid4())
+            insert_rows.append((
+                source.id, source.name, source.url,
+                source.source_type.value, source.industry.value,
+                1 if source.enabled else 0,
+                None if source.enabled else DISABLED_REASON_CONFIG,
+                source.fetch_interval_hours,
+                json.dumps(source.metadata) if source.metadata else None,
+                config_hash
+            ))
+        
+        update_rows = [
+            (
+                source.name, source.source_type.value, source.industry.value,
+                1 if enabled else 0, disabled_reason,
+                source.fetch_interval_hours,
+                json.dumps(source.metadata) if source.metadata else None,
+                config_hash, source_id
+            )
+            for source_id, source, config_hash, enabled, disabled_reason in updates
+        ]
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT INTO sources (
+                    id, name, url, source_type, industry, enabled, disabled_reason,
+                    fetch_interval_hours, metadata, config_hash
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, insert_rows)
+            await db.executemany("""
+                UPDATE sources SET
+                    name = ?, source_type = ?, industry = ?, enabled = ?, disabled_reason = ?,
+                    fetch_interval_hours = ?, metadata = ?, config_hash = ?
+                WHERE id = ?
+            """, update_rows)
+            await db.executemany(
+                "UPDATE sources SET enabled = 0, disabled_reason = ? WHERE id = ?",
+                [(DISABLED_REASON_CONFIG_REMOVED, source_id) for source_id in disables]
+            )
+            await db.commit()
+    
+    async def record_source_fetch(
+        self,
+        source_id: str,
+        success: bool,
+        latency_ms: float,
+        article_count: int = 0,
+        error: Optional[str] = None,
+        probe: bool = False,
+        bytes_downloaded: Optional[int] = None
+    ) -> Optional[Source]:
+        """
+        记录一次爬取结果，更新源的健康统计、熔断与自动禁用状态
+        
+        Args:
+            bytes_downloaded: 本次爬取下载的字节数（为 None 时不统计）
+            probe: 是否为验证探测（不计入爬取次数、最后爬取时间和平均文章数；
+                   探测失败只记录错误，不计入连续失败、不触发熔断或自动禁用；
+                   探测成功时恢复被自动禁用的源）
+        
+        最后爬取时间（自适应间隔的起点）只在成功时推进，失败的源不会被当作刚爬取过而直接用库存文章。
+        
+        Returns:
+            更新后的信息源，源不存在时返回 None
+        """
+        from crawler.source_health import (
+            ewma, cooldown_for, AUTO_DISABLE_THRESHOLD, DISABLED_REASON_AUTO
+        )
+        
+        now = datetime.now()
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM sources WHERE id = ?",
+                (source_id,)
+            )
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            
+            source = self._row_to_source(row)
+            if not probe:
+                source.fetch_count += 1
+                if success:
+                    source.last_fetched_at = now
+            if bytes_downloaded is not None:
+                source.total_bytes_downloaded += bytes_downloaded
+                if not probe:
+                    source.avg_bytes_per_fetch = ewma(source.avg_bytes_per_fetch, bytes_downloaded)
+            
+            if success:
+                source.error_count = 0
+                source.last_success_at = now
+                source.circuit_open_until = None
+                source.mean_latency_ms = ewma(source.mean_latency_ms, latency_ms)
+                if not probe:
+                    source.avg_articles_per_fetch = ewma(source.avg_articles_per_fetch, article_count)
+                elif source.disabled_reason == DISABLED_REASON_AUTO:
+                    source.enabled = True
+                    source.disabled_reason = None
+            elif probe:
+                source.last_error = (error or '')[:1000]
+            else:
+                source.error_count += 1
+                source.last_error = (error or '')[:1000]
+                cooldown = cooldown_for(source.error_count)
+                source.circuit_open_until = now + cooldown if cooldown else None
+                if source.error_count >= AUTO_DISABLE_THRESHOLD and source.enabled:
+                    source.enabled = False
+                    source.disabled_reason = DISABLED_REASON_AUTO
+            
+            await db.execute("""
+                UPDATE sources SET
+                    enabled = ?, last_fetched_at = ?, last_error = ?, error_count = ?,
+                    last_success_at = ?, mean_latency_ms = ?, avg_articles_per_fetch = ?,
+                    fetch_count = ?, circuit_open_until = ?, disabled_reason = ?,
+                    avg_bytes_per_fetch = ?, total_bytes_downloaded = ?
+                WHERE id = ?
+            """, (
+                1 if source.enabled else 0, source.last_fetched_at, source.last_error,
+                source.error_count, source.last_success_at, source.mean_latency_ms,
+                source.avg_articles_per_fetch, source.fetch_count,
+                source.circuit_open_until, source.disabled_reason,
+                source.avg_bytes_per_fetch, source.total_bytes_downloaded,
+                source_id
+            ))
+            await db.commit()
+        
+        return source
+    
+    # update_source_crawl_state 可写入的列（爬取过程维护的状态）
+    CRAWL_STATE_COLUMNS = (
+        'last_seen_guid', 'last_seen_published_at', 'seen_since',
+        'mean_publish_interval_minutes', 'learned_interval_minutes',
+    )
+    
+    async def update_source_crawl_state(self, source_id: str, **fields):
+        """更新源的增量爬取状态（高水位、发布间隔等），一次 UPDATE 完成"""
+        unknown = set(fields) - set(self.CRAWL_STATE_COLUMNS)
+        if unknown:
+            raise ValueError(f"不支持的爬取状态字段: {sorted(unknown)}")
+        if not fields:
+            return
+        
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                f"UPDATE sources SET {assignments} WHERE id = ?",
+                (*fields.values(), source_id)
+            )
+            await db.commit()
+    
+    async def reset_source_health(self, source_id: str, enable: bool = True) -> bool:
+        """清除源的失败计数与熔断状态（可选重新启用）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("""
+                UPDATE sources SET
+                    error_count = 0, last_error = NULL, circuit_open_until = NULL,
+                    enabled = CASE WHEN ? = 1 THEN 1 ELSE enabled END,
+                    disabled_reason = CASE WHEN ? = 1 THEN NULL ELSE disabled_reason END
+                WHERE id = ?
+            """, (1 if enable else 0, 1 if enable else 0, source_id))
+            await db.commit()
+            return cursor.rowcount > 0
+    
     async def get_source(self, source_id: str) -> Optional[Source]:
         """根据 ID 获取信息源"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -356,15 +701,24 @@ class Database(StorageInterface, CustomCategoryDB):
         if analysis.id is None:
             analysis.id = str(uuid.uuid4())
         
+        # 解析一次报告结构；适配器没有给出结构化结果时用解析结果补齐
+        structure = None
+        if analysis.markdown_report:
+            from llm.report_parser import parse_report, structured_fields
+            structure = parse_report(analysis.markdown_report, analysis.article_ids)
+            if not (analysis.trends or analysis.signals or analysis.information_gaps):
+                for field, values in structured_fields(structure).items():
+                    setattr(analysis, field, values)
+        
         async with aiosqlite.connect(self.db_path) as db:
             await db.execute("""
                 INSERT OR REPLACE INTO analyses (
                     id, analysis_type, industry, executive_brief, markdown_report,
                     trends, signals, information_gaps,
-                    llm_backend, llm_model, token_usage, estimated_cost,
+                    llm_backend, llm_model, token_usage, estimated_cost, llm_attempts, prompt_stats,
                     created_at, processing_time_seconds,
                     user_rating, user_notes
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
                 analysis.id, analysis.analysis_type.value,
                 analysis.industry.value if analysis.industry else 'other',
@@ -375,6 +729,8 @@ class Database(StorageInterface, CustomCategoryDB):
                 json.dumps([g.model_dump() for g in analysis.information_gaps]),
                 analysis.llm_backend, analysis.llm_model,
                 analysis.token_usage, analysis.estimated_cost,
+                json.dumps(analysis.llm_attempts, ensure_ascii=False, default=str),
+                json.dumps(analysis.prompt_stats) if analysis.prompt_stats else None,
                 analysis.created_at, analysis.processing_time_seconds,
                 analysis.user_rating, analysis.user_notes
             ))
@@ -386,10 +742,199 @@ class Database(StorageInterface, CustomCategoryDB):
                     VALUES (?, ?, ?)
                 """, (analysis.id, article_id, position))
             
+            # 保存预排序得分（含未选中的候选文章）
+            if analysis.article_scores:
+                await db.execute("DELETE FROM analysis_article_scores WHERE analysis_id = ?", (analysis.id,))
+                await db.executemany("""
+                    INSERT INTO analysis_article_scores (
+                        analysis_id, article_id, rank, score, salience, coverage, novelty, priority,
+                        tokens, selected
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        analysis.id, entry['article_id'], entry['rank'], entry['score'],
+                        entry['salience'], entry['coverage'], entry['novelty'], entry['priority'],
+                        entry.get('tokens'), 1 if entry.get('selected') else 0
+                    )
+                    for entry in analysis.article_scores
+                ])
+            
+            if structure is not None:
+                await self._save_report_structure(db, analysis.id, structure)
+            
             await db.commit()
         
         return analysis.id
     
+    async def _save_report_structure(self, db, analysis_id: str, structure: dict):
+        """写入报告章节、条目与条目引用的文章（覆盖该分析已有的结构）"""
+        for table in ('report_sections', 'report_items', 'report_item_articles'):
+            await db.execute(f"DELETE FROM {table} WHERE analysis_id = ?", (analysis_id,))
+        
+        await db.executemany("""
+            INSERT INTO report_sections (analysis_id, position, level, heading, path, kind, content)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (analysis_id, section['position'], section['level'], section['heading'],
+             section['path'], section['kind'], section['content'])
+            for section in structure['sections']
+        ])
+        await db.executemany("""
+            INSERT INTO report_items (
+                analysis_id, position, section_position, kind, headline, body,
+                score, score_source, citations
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (analysis_id, item['position'], item['section_position'], item['kind'], item['headline'],
+             item['body'], item['score'], item['score_source'], json.dumps(item['citations']))
+            for item in structure['items']
+        ])
+        await db.executemany("""
+            INSERT OR IGNORE INTO report_item_articles (analysis_id, item_position, article_id)
+            VALUES (?, ?, ?)
+        """, [
+            (analysis_id, item['position'], article_id)
+            for item in structure['items']
+            for article_id in item['article_ids']
+        ])
+    
+    async def get_report_structure(self, analysis_id: str) -> List[dict]:
+        """获取报告章节（按顺序），每个章节附带其条目及条目引用的文章 ID"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM report_sections WHERE analysis_id = ? ORDER BY position ASC",
+                (analysis_id,)
+            )
+            sections = [dict(row) for row in await cursor.fetchall()]
+            cursor = await db.execute(
+                "SELECT * FROM report_items WHERE analysis_id = ? ORDER BY position ASC",
+                (analysis_id,)
+            )
+            items = [dict(row) for row in await cursor.fetchall()]
+            cursor = await db.execute(
+                "SELECT item_position, article_id FROM report_item_articles WHERE analysis_id = ?",
+                (analysis_id,)
+            )
+            item_articles: Dict[int, List[str]] = {}
+            for row in await cursor.fetchall():
+                item_articles.setdefault(row['item_position'], []).append(row['article_id'])
+        
+        by_section: Dict[int, List[dict]] = {}
+        for item in items:
+            del item['analysis_id']
+            item['citations'] = json.loads(item['citations'])
+            item['article_ids'] = item_articles.get(item['position'], [])
+            by_section.setdefault(item['section_position'], []).append(item)
+        for section in sections:
+            del section['analysis_id']
+            section['items'] = by_section.get(section['position'], [])
+        return sections
+    
+    async def search_report_items(
+        self,
+        query: Optional[str] = None,
+        kind: Optional[str] = None,
+        industry: Optional[IndustryCategory] = None,
+        article_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        min_score: Optional[float] = None,
+        limit: int = 50
+    ) -> List[dict]:
+        """跨分析检索报告条目（最新的分析在前，同一分析内按得分排序）"""
+        query_sql = """
+            SELECT i.*, s.heading AS section_heading, an.industry, an.created_at
+            FROM report_items i
+            JOIN analyses an ON an.id = i.analysis_id
+            LEFT JOIN report_sections s
+                ON s.analysis_id = i.analysis_id AND s.position = i.section_position
+            WHERE 1 = 1
+        """
+        params: list = []
+        if query:
+            query_sql += " AND (i.headline LIKE ? OR i.body LIKE ?)"
+            params.extend([f"%{query}%", f"%{query}%"])
+        if kind:
+            query_sql += " AND i.kind = ?"
+            params.append(kind)
+        if industry:
+            query_sql += " AND an.industry = ?"
+            params.append(industry.value)
+        if article_id:
+            query_sql += """ AND EXISTS (
+                SELECT 1 FROM report_item_articles ia
+                WHERE ia.analysis_id = i.analysis_id AND ia.item_position = i.position AND ia.article_id = ?
+            )"""
+            params.append(article_id)
+        if since:
+            query_sql += " AND an.created_at >= ?"
+            params.append(since)
+        if min_score is not None:
+            query_sql += " AND i.score >= ?"
+            params.append(min_score)
+        query_sql += " ORDER BY an.created_at DESC, i.score DESC, i.position ASC LIMIT ?"
+        params.append(limit)
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(query_sql, params)
+            rows = await cursor.fetchall()
+        
+        items = []
+        for row in rows:
+            item = dict(row)
+            item['citations'] = json.loads(item['citations'])
+            items.append(item)
+        return items
+    
+    async def get_analysis_article_scores(self, analysis_id: str) -> List[dict]:
+        """获取分析前预排序的候选文章得分（按选择顺序）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute("""
+                SELECT s.*, a.title, a.source_name
+                FROM analysis_article_scores s
+                LEFT JOIN articles a ON a.id = s.article_id
+                WHERE s.analysis_id = ?
+                ORDER BY s.rank ASC
+            """, (analysis_id,))
+            rows = await cursor.fetchall()
+        
+        scores = []
+        for row in rows:
+            entry = dict(row)
+            del entry['analysis_id']
+            entry['selected'] = bool(entry['selected'])
+            scores.append(entry)
+        return scores
+    
+    async def get_recently_analyzed_articles(
+        self,
+        since: datetime,
+        industry: Optional[IndustryCategory] = None,
+        limit: int = 2000
+    ) -> List[Article]:
+        """获取某时间之后的分析中用到的文章（去重，最近分析的优先，不含标签）"""
+        query = """
+            SELECT a.*, MAX(an.created_at) AS analyzed_at
+            FROM analysis_articles aa
+            JOIN analyses an ON an.id = aa.analysis_id
+            JOIN articles a ON a.id = aa.article_id
+            WHERE an.created_at >= ?
+        """
+        params: list = [since]
+        if industry:
+            query += " AND an.industry = ?"
+            params.append(industry.value)
+        query += " GROUP BY a.id ORDER BY analyzed_at DESC LIMIT ?"
+        params.append(limit)
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(query, params)
+            rows = await cursor.fetchall()
+        return [self._row_to_article(row, []) for row in rows]
+    
     async def get_analysis(self, analysis_id: str) -> Optional[Analysis]:
         """根据 ID 获取分析结果"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -443,6 +988,7 @@ class Database(StorageInterface, CustomCategoryDB):
             id=row['id'],
             title=row['title'],
             url=row['url'],
+            canonical_url=row['canonical_url'],
             source_id=row['source_id'],
             source_name=row['source_name'],
             content=row['content'],
@@ -472,6 +1018,21 @@ class Database(StorageInterface, CustomCategoryDB):
             enabled=bool(row['enabled']),
             fetch_interval_hours=row['fetch_interval_hours'],
             last_fetched_at=datetime.fromisoformat(row['last_fetched_at']) if row['last_fetched_at'] else None,
+            last_error=row['last_error'],
+            error_count=row['error_count'] or 0,
+            last_success_at=datetime.fromisoformat(row['last_success_at']) if row['last_success_at'] else None,
+            mean_latency_ms=row['mean_latency_ms'],
+            avg_articles_per_fetch=row['avg_articles_per_fetch'],
+            fetch_count=row['fetch_count'] or 0,
+            circuit_open_until=datetime.fromisoformat(row['circuit_open_until']) if row['circuit_open_until'] else None,
+            disabled_reason=row['disabled_reason'],
+            avg_bytes_per_fetch=row['avg_bytes_per_fetch'],
+            total_bytes_downloaded=row['total_bytes_downloaded'] or 0,
+            last_seen_guid=row['last_seen_guid'],
+            last_seen_published_at=datetime.fromisoformat(row['last_seen_published_at']) if row['last_seen_published_at'] else None,
+            seen_since=datetime.fromisoformat(row['seen_since']) if row['seen_since'] else None,
+            mean_publish_interval_minutes=row['mean_publish_interval_minutes'],
+            learned_interval_minutes=row['learned_interval_minutes'],
             metadata=json.loads(row['metadata']) if row['metadata'] else None
         )
     
@@ -487,6 +1048,13 @@ class Database(StorageInterface, CustomCategoryDB):
             except (ValueError, KeyError):
                 industry = IndustryCategory.OTHER
         
+        llm_attempts = []
+        if 'llm_attempts' in row.keys() and row['llm_attempts']:
+            llm_attempts = json.loads(row['llm_attempts'])
+        prompt_stats = None
+        if 'prompt_stats' in row.keys() and row['prompt_stats']:
+            prompt_stats = json.loads(row['prompt_stats'])
+        
         return Analysis(
             id=row['id'],
             analysis_type=AnalysisType(row['analysis_type']),
@@ -501,6 +1069,8 @@ class Database(StorageInterface, CustomCategoryDB):
             llm_model=row['llm_model'],
             token_usage=row['token_usage'],
             estimated_cost=row['estimated_cost'],
+            llm_attempts=llm_attempts,
+            prompt_stats=prompt_stats,
             created_at=datetime.fromisoformat(row['created_at']),
             processing_time_seconds=row['processing_time_seconds'],
             user_rating=row['user_rating'],
@@ -550,6 +1120,75 @@ class Database(StorageInterface, CustomCategoryDB):
         
         return insight.id
     
+    async def get_rolling_trend_state(self, industry: str) -> Optional[dict]:
+        """获取某行业的滚动趋势洞察状态"""
+        states = await self.get_rolling_trend_states(industry)
+        return states[0] if states else None
+    
+    async def get_rolling_trend_states(self, industry: Optional[str] = None) -> List[dict]:
+        """获取滚动趋势洞察状态（全部或指定行业）"""
+        query = "SELECT * FROM rolling_trend_states"
+        params = []
+        if industry:
+            query += " WHERE industry = ?"
+            params.append(industry)
+        query += " ORDER BY industry ASC"
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(query, params)
+            rows = await cursor.fetchall()
+        
+        states = []
+        for row in rows:
+            state = dict(row)
+            state['window_analyses'] = json.loads(state['window_analyses'])
+            for key in ('last_analysis_at', 'updated_at'):
+                if state[key]:
+                    state[key] = datetime.fromisoformat(state[key])
+            states.append(state)
+        return states
+    
+    async def save_rolling_trend_state(self, state: dict):
+        """保存滚动趋势洞察状态（按行业覆盖）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                INSERT OR REPLACE INTO rolling_trend_states (
+                    industry, insight_id, window_days, window_analyses, last_analysis_at,
+                    update_count, total_token_usage, last_token_usage, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                state['industry'], state.get('insight_id'), state['window_days'],
+                json.dumps(state['window_analyses'], default=str),
+                state['last_analysis_at'].isoformat() if state.get('last_analysis_at') else None,
+                state.get('update_count', 0), state.get('total_token_usage', 0),
+                state.get('last_token_usage'), datetime.now().isoformat()
+            ))
+            await db.commit()
+    
+    async def get_analyses_since(
+        self,
+        industry: IndustryCategory,
+        since: datetime,
+        limit: int = 100
+    ) -> List[Analysis]:
+        """获取某行业在指定时间之后创建的分析（按创建时间从早到晚）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("""
+                SELECT id FROM analyses
+                WHERE industry = ? AND created_at > ?
+                ORDER BY created_at ASC
+                LIMIT ?
+            """, (industry.value, since, limit))
+            analysis_ids = [row[0] for row in await cursor.fetchall()]
+        
+        analyses = []
+        for analysis_id in analysis_ids:
+            analysis = await self.get_analysis(analysis_id)
+            if analysis:
+                analyses.append(analysis)
+        return analyses
+    
     async def get_trend_insight(self, insight_id: str) -> Optional[TrendInsight]:
         """根据 ID 获取趋势洞察结果"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -636,3 +1275,185 @@ class Database(StorageInterface, CustomCategoryDB):
             created_at=datetime.fromisoformat(row['created_at']),
             processing_time_seconds=row['processing_time_seconds']
         )
+    
+    # ========================================================================
+    # LLM 响应缓存操作
+    # ========================================================================
+    
+    async def get_llm_cache_entry(self, cache_key: str, min_created_at: datetime) -> Optional[dict]:
+        """读取未过期的缓存响应，命中时累加命中次数"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM llm_response_cache WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, min_created_at.isoformat())
+            )
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            
+            await db.execute(
+                "UPDATE llm_response_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE cache_key = ?",
+                (datetime.now().isoformat(), cache_key)
+            )
+            await db.commit()
+            return dict(row)
+    
+    async def save_llm_cache_entry(
+        self,
+        cache_key: str,
+        llm_backend: str,
+        llm_model: Optional[str],
+        response_text: str,
+        token_usage: int
+    ):
+        """写入缓存响应（相同键覆盖）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute("""
+                INSERT OR REPLACE INTO llm_response_cache (
+                    cache_key, llm_backend, llm_model, response_text,
+                    token_usage, size_bytes, hit_count, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+            """, (
+                cache_key, llm_backend, llm_model, response_text,
+                token_usage, len(response_text.encode('utf-8')),
+                datetime.now().isoformat()
+            ))
+            await db.commit()
+    
+    async def evict_llm_cache(self, min_created_at: datetime, max_bytes: Optional[int] = None) -> int:
+        """
+        淘汰缓存：删除过期条目，总大小超过 max_bytes 时按最近使用时间从旧到新删除
+        
+        Returns:
+            删除的条目数
+        """
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "DELETE FROM llm_response_cache WHERE created_at < ?",
+                (min_created_at.isoformat(),)
+            )
+            removed = cursor.rowcount
+            
+            if max_bytes:
+                cursor = await db.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM llm_response_cache")
+                excess = (await cursor.fetchone())[0] - max_bytes
+                if excess > 0:
+                    cursor = await db.execute("""
+                        SELECT cache_key, size_bytes FROM llm_response_cache
+                        ORDER BY COALESCE(last_hit_at, created_at) ASC
+                    """)
+                    victims = []
+                    for cache_key, size_bytes in await cursor.fetchall():
+                        if excess <= 0:
+                            break
+                        victims.append((cache_key,))
+                        excess -= size_bytes
+                    await db.executemany("DELETE FROM llm_response_cache WHERE cache_key = ?", victims)
+                    removed += len(victims)
+            
+            await db.commit()
+            return removed
+    
+    async def get_llm_cache_summary(self) -> dict:
+        """缓存条目数、总大小与累计命中（持久化部分）"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("""
+                SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(SUM(hit_count), 0),
+                       COALESCE(SUM(hit_count * token_usage), 0)
+                FROM llm_response_cache
+            """)
+            entries, size_bytes, hits, saved_tokens = await cursor.fetchone()
+            return {
+                'entries': entries,
+                'size_bytes': size_bytes,
+                'total_hits': hits,
+                'total_saved_tokens': saved_tokens,
+            }
+    
+    async def clear_llm_cache(self) -> int:
+        """清空缓存，返回删除的条目数"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("DELETE FROM llm_response_cache")
+            await db.commit()
+            return cursor.rowcount
+    
+    # ========================================================================
+    # 文章摘要缓存操作
+    # ========================================================================
+    
+    async def get_article_digests(self, content_hashes: List[str]) -> Dict[str, str]:
+        """批量读取文章摘要，返回 {content_hash: digest}"""
+        if not content_hashes:
+            return {}
+        
+        digests = {}
+        unique = list(dict.fromkeys(content_hashes))
+        async with aiosqlite.connect(self.db_path) as db:
+            # 分批查询，避免超过 SQLite 参数上限
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor = await db.execute(
+                    f"SELECT content_hash, digest FROM article_digests WHERE content_hash IN ({placeholders})",
+                    batch
+                )
+                digests.update({row[0]: row[1] for row in await cursor.fetchall()})
+        return digests
+    
+    async def save_article_digests(
+        self,
+        digests: Dict[str, str],
+        llm_backend: Optional[str] = None,
+        llm_model: Optional[str] = None
+    ):
+        """批量保存文章摘要（相同哈希覆盖）"""
+        if not digests:
+            return
+        
+        now = datetime.now().isoformat()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT OR REPLACE INTO article_digests (content_hash, digest, llm_backend, llm_model, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (content_hash, digest, llm_backend, llm_model, now)
+                for content_hash, digest in digests.items()
+            ])
+            await db.commit()
+    
+    async def get_article_token_counts(self, content_hashes: List[str], encoding: str) -> Dict[str, int]:
+        """批量读取文章 token 数，返回 {content_hash: token_count}"""
+        if not content_hashes:
+            return {}
+        
+        counts = {}
+        unique = list(dict.fromkeys(content_hashes))
+        async with aiosqlite.connect(self.db_path) as db:
+            # 分批查询，避免超过 SQLite 参数上限
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                cursor = await db.execute(
+                    f"SELECT content_hash, token_count FROM article_token_counts "
+                    f"WHERE encoding = ? AND content_hash IN ({placeholders})",
+                    [encoding, *batch]
+                )
+                counts.update({row[0]: row[1] for row in await cursor.fetchall()})
+        return counts
+    
+    async def save_article_token_counts(self, counts: Dict[str, int], encoding: str):
+        """批量保存文章 token 数（相同哈希与编码覆盖）"""
+        if not counts:
+            return
+        
+        now = datetime.now().isoformat()
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany("""
+                INSERT OR REPLACE INTO article_token_counts (content_hash, encoding, token_count, created_at)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (content_hash, encoding, count, now)
+                for content_hash, count in counts.items()
+            ])
+            await db.commit()
@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 同步 sources.yaml 配置到数据库
+
+差量同步：新增、更新有变化的源，禁用已从配置中移除的源（与启动时的同步逻辑一致）
 """
 import asyncio
 import sys
@@ -9,7 +11,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config.source_loader import SourceConfigLoader, log
+from config.source_loader import log
+from config.source_sync import sync_sources_from_config
 from storage.database import Database
 
 
@@ -18,29 +21,18 @@ async def sync_sources_to_db():
     
     log("开始同步信息源配置...")
     
-    # 加载配置
-    loader = SourceConfigLoader()
-    sources = loader.load_sources()
-    log(f"从 sources.yaml 加载了 {len(sources)} 个信息源")
-    
     # 连接数据库
     db = Database()
     await db.initialize()
     log("数据库连接成功")
     
     # 同步到数据库
-    success_count = 0
-    fail_count = 0
-    
-    for source in sources:
-        try:
-            await db.save_source(source)
-            success_count += 1
-        except Exception as e:
-            log(f"⚠️  保存失败: {source.name} - {str(e)}")
-            fail_count += 1
-    
-    log(f"✅ 同步完成: 成功 {success_count} 个, 失败 {fail_count} 个")
+    report = await sync_sources_from_config(db)
+    log(
+        f"✅ 同步完成: 新增 {report['inserted']} 个, 更新 {report['updated']} 个, "
+        f"禁用 {report['disabled']} 个, 未变 {report['unchanged']} 个 "
+        f"（耗时 {report['elapsed_ms']}ms）"
+    )
     
     # 统计
     all_sources = await db.get_sources(enabled_only=False)
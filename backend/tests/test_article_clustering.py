@@ -0,0 +1,98 @@
+"""
+文章主题聚类测试
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article
+from llm.article_clustering import cluster_articles, tokenize
+from llm.prompt_packer import pack_articles
+
+
+STORIES = [
+    ("OpenAI 发布 GPT-5 模型", "OpenAI 今日发布新一代大模型 GPT-5，推理能力大幅提升。"),
+    ("GPT-5 正式发布：推理能力提升", "OpenAI 发布 GPT-5 大模型，官方称推理能力显著提升。"),
+    ("OpenAI 推出 GPT-5", "OpenAI 推出新一代大模型 GPT-5，推理能力更强。"),
+    ("GPT-5 来了：OpenAI 新模型发布", "OpenAI 新一代大模型 GPT-5 发布，推理能力提升明显。"),
+    ("苹果发布 iPhone 17", "苹果公司秋季发布会推出 iPhone 17 手机。"),
+    ("iPhone 17 发布会汇总", "苹果秋季发布会 iPhone 17 新功能一览。"),
+    ("央行宣布降息", "中国人民银行宣布下调贷款市场报价利率。"),
+    ("比特币价格创新高", "比特币突破十万美元。"),
+    ("某地发布暴雨预警", "气象台发布暴雨橙色预警。"),
+]
+
+
+def make_articles(repeat: int = 1):
+    now = datetime.now()
+    return [
+        Article(
+            id=f"a{i}", title=title, url=f"https://example.com/{i}",
+            content=content * repeat, source_name=f"源{i % 3}",
+            published_at=now - timedelta(minutes=i)
+        )
+        for i, (title, content) in enumerate(STORIES)
+    ]
+
+
+class TestArticleClustering:
+
+    def test_tokenize_cjk_bigrams(self):
+        assert tokenize("大模型 GPT release") == ["大模", "模型", "gpt", "release"]
+
+    def test_groups_same_story(self):
+        clusters = cluster_articles(make_articles())
+        groups = [sorted(c['members']) for c in clusters if len(c['members']) > 1]
+        assert groups == [[0, 1, 2, 3], [4, 5]]
+        assert clusters[0]['representatives'] == 2
+        assert sum(len(c['members']) for c in clusters) == len(STORIES)
+
+    def test_prompt_grouped_with_citations_intact(self):
+        articles = make_articles(repeat=30)
+        clusters = cluster_articles(articles)
+        flat = pack_articles(articles, context_window=128000)
+        grouped = pack_articles(articles, context_window=128000, clusters=clusters)
+
+        assert grouped['collapsed'] == 2
+        assert "按主题聚合为 2 组" in grouped['text']
+        assert "## 其他独立报道（3 条）" in grouped['text']
+        citations = sorted(int(n) for n in re.findall(r"\[(\d+)\]", grouped['text']))
+        assert citations == list(range(1, len(STORIES) + 1))
+        assert grouped['prompt_tokens'] < flat['prompt_tokens']
+
+    def test_adapter_records_tokens_saved(self):
+        from llm.ollama_adapter import OllamaAdapter
+
+        adapter = OllamaAdapter()
+        adapter.cluster_articles = True
+        adapter._pack_articles_text(make_articles(repeat=5), ["系统提示词"])
+        stats = adapter.prompt_stats
+        assert stats['clusters'] == 2 and stats['collapsed'] == 2
+        assert stats['tokens_saved'] == stats['flat_prompt_tokens'] - stats['prompt_tokens'] > 0
+
+        assert adapter.fork().cluster_articles is False
+
+    @pytest.mark.asyncio
+    async def test_prompt_stats_persisted(self, tmp_path):
+        from storage.database import Database
+        from models import Analysis, AnalysisType
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        stats = {'articles': 9, 'clusters': 2, 'collapsed': 2, 'prompt_tokens': 800, 'tokens_saved': 120}
+        analysis_id = await db.save_analysis(Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE,
+            article_ids=["a1"],
+            executive_brief="摘要",
+            llm_backend="ollama",
+            prompt_stats=stats
+        ))
+
+        assert (await db.get_analysis(analysis_id)).prompt_stats == stats
@@ -0,0 +1,117 @@
+"""
+文章摘要缓存测试
+"""
+
+import re
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article, AnalysisType
+from llm.adapter import BaseLLMAdapter
+from llm.article_digest import (
+    DIGEST_SYSTEM_PROMPT, article_content_hash, parse_digest_response, ensure_digests
+)
+
+
+def make_articles(count: int) -> List[Article]:
+    return [
+        Article(
+            id=f"a{i}",
+            title=f"文章 {i}",
+            url=f"https://example.com/{i}",
+            source_name="测试源",
+            content=f"正文 {i} " * 200,
+            published_at=datetime(2026, 1, 1, 8, 0)
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class DigestAdapter(BaseLLMAdapter):
+    """摘要调用返回 `[k] 摘要-标题`，其余调用回显用户提示词"""
+
+    def __init__(self):
+        super().__init__(model="fake")
+        self.digest_calls = 0
+
+    async def _complete(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None) -> dict:
+        if system_prompt == DIGEST_SYSTEM_PROMPT:
+            self.digest_calls += 1
+            titles = re.findall(r"### \[(\d+)\] (.+)", user_prompt)
+            text = "\n".join(f"[{k}] 摘要-{title}" for k, title in titles)
+            return {'text': text, 'token_usage': 30}
+        return {'text': user_prompt, 'token_usage': 100}
+
+    async def analyze(self, articles, analysis_type, custom_prompt=None, industry=None):
+        raise NotImplementedError
+
+    def get_model_info(self) -> dict:
+        return {'backend': 'fake', 'model': 'fake', 'max_tokens': 4096, 'cost_per_1k_tokens': 0.0}
+
+
+async def _make_db(tmp_path):
+    from storage.database import Database
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    return db
+
+
+class TestDigestParsing:
+
+    def test_parse_ignores_noise_and_out_of_range(self):
+        text = "以下是摘要：\n[1] 第一条\n- [2]：第二条\n[3] \n[9] 越界\n[1] 重复"
+        assert parse_digest_response(text, 3) == {1: "第一条", 2: "第二条"}
+
+    def test_hash_changes_with_content(self):
+        a, b = make_articles(2)
+        assert article_content_hash(a) != article_content_hash(b)
+        a2 = a.model_copy(update={'id': 'other', 'url': 'https://example.com/other'})
+        assert article_content_hash(a) == article_content_hash(a2)
+
+
+class TestEnsureDigests:
+
+    @pytest.mark.asyncio
+    async def test_digests_reused_across_calls(self, tmp_path):
+        db = await _make_db(tmp_path)
+        adapter = DigestAdapter()
+        articles = make_articles(5)
+
+        first = await ensure_digests(adapter, db, articles[:3], batch_size=2)
+        assert first['generated'] == 3 and first['cached'] == 0
+        assert first['token_usage'] == 60
+        assert adapter.digest_calls == 2
+
+        # 重叠的文章集只为新文章生成摘要
+        second = await ensure_digests(adapter, db, articles, batch_size=10)
+        assert second['cached'] == 3 and second['generated'] == 2
+        assert adapter.digest_calls == 3
+        assert second['digests'][article_content_hash(articles[4])] == "摘要-文章 5"
+
+    @pytest.mark.asyncio
+    async def test_prompt_uses_digests(self, tmp_path):
+        from analyzer import Analyzer
+
+        db = await _make_db(tmp_path)
+        analyzer = Analyzer(llm_backend="ollama", use_cache=False, use_digests=True, db=db)
+        adapter = DigestAdapter()
+        analyzer.adapter = adapter
+
+        articles = make_articles(3)
+        prompt = adapter._build_user_prompt(articles, AnalysisType.COMPREHENSIVE)
+        assert "正文 1 正文 1" in prompt
+
+        # 基类 analyze 未实现，直接验证摘要准备阶段
+        with pytest.raises(NotImplementedError):
+            await analyzer.analyze(articles)
+        prompt = adapter._build_user_prompt(articles, AnalysisType.COMPREHENSIVE)
+        assert "摘要-文章 1" in prompt
+        assert "正文 1 正文 1" not in prompt
@@ -0,0 +1,113 @@
+"""
+分析前文章预排序测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article, Analysis, AnalysisType, IndustryCategory, Source, SourceType
+from llm.article_ranking import rank_articles, score_articles, select_top
+
+
+def make_article(index: int, title: str, content: str, source: str) -> Article:
+    return Article(
+        id=f"a{index}", title=title, url=f"https://example.com/{index}", content=content,
+        source_id=source, source_name=source, industry=IndustryCategory.TECH,
+        published_at=datetime.now() - timedelta(minutes=index)
+    )
+
+
+# 一个高产出的源连发同质内容，另有一条多源报道的重要新闻
+NOISY = [
+    make_article(i, f"今日快讯第 {i} 期", f"快讯栏目今日更新第 {i} 期，汇总社区热帖与段子。", "noisy")
+    for i in range(6)
+]
+IMPORTANT = [
+    make_article(10, "OpenAI 发布 GPT-5 模型", "OpenAI 今日发布新一代大模型 GPT-5，推理能力大幅提升。", "s1"),
+    make_article(11, "GPT-5 正式发布", "OpenAI 发布 GPT-5 大模型，官方称推理能力显著提升。", "s2"),
+    make_article(12, "OpenAI 推出 GPT-5", "OpenAI 推出新一代大模型 GPT-5，推理能力更强。", "s3"),
+]
+OLD_NEWS = make_article(20, "苹果发布 iPhone 17", "苹果公司秋季发布会推出 iPhone 17 手机。", "s4")
+
+
+class TestArticleRanking:
+
+    def test_coverage_and_novelty(self):
+        articles = [*NOISY, *IMPORTANT, OLD_NEWS]
+        history = [make_article(99, "iPhone 17 发布会汇总", "苹果秋季发布会 iPhone 17 手机新功能一览。", "s5")]
+        scores = {s['article_id']: s for s in score_articles(articles, history, {'s1': 1.0})}
+
+        assert scores['a10']['coverage'] == 1.0
+        assert scores['a0']['coverage'] == 0.0  # 同源的相似文章不算跨源覆盖
+        assert scores['a20']['novelty'] < 0.6 < scores['a10']['novelty']
+        assert scores['a10']['priority'] == 1.0 and scores['a11']['priority'] == 0.8
+        assert scores['a10']['score'] > max(scores[f"a{i}"]['score'] for i in range(6))
+
+    def test_source_decay_limits_noisy_source(self):
+        articles = [*NOISY, *IMPORTANT]
+        # 高产出源的得分略高，不衰减时会占满名额
+        scores = [{'article_id': a.id, 'score': 0.9 if a.source_id == "noisy" else 0.8} for a in articles]
+        selected = select_top(articles, scores, top_k=4)
+
+        assert sum(1 for a in selected if a.source_id == "noisy") == 1
+        assert [a.id for a in selected] == ["a0", "a10", "a11", "a12"]  # 保持原有顺序
+        assert sorted(s['rank'] for s in scores) == list(range(1, len(articles) + 1))
+        assert sum(s['selected'] for s in scores) == 4
+
+    def test_token_budget(self):
+        articles = [*IMPORTANT, OLD_NEWS]
+        scores = [{'article_id': a.id, 'score': 1.0 - i * 0.1} for i, a in enumerate(articles)]
+        selected = select_top(articles, scores, token_budget=250, token_counts=[100, 200, 100, 100])
+        assert [a.id for a in selected] == ["a10", "a12"]
+
+        # 得分最高的文章总会选中
+        assert len(select_top(articles, scores, token_budget=10, token_counts=[100] * 4)) == 1
+
+    @pytest.mark.asyncio
+    async def test_rank_and_persist_scores(self, tmp_path):
+        from storage.database import Database
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        for name in ["noisy", "s1", "s2", "s3", "s4"]:
+            source = Source(
+                name=name, url=f"https://example.com/feed/{name}", source_type=SourceType.RSS,
+                industry=IndustryCategory.TECH, metadata={'priority': "official_rss"} if name == "s1" else None
+            )
+            await db.save_source(source)
+            for article in [*NOISY, *IMPORTANT, OLD_NEWS]:
+                if article.source_name == name:
+                    article.source_id = source.id
+        for article in [*NOISY, *IMPORTANT, OLD_NEWS]:
+            await db.save_article(article)
+
+        # 昨天的分析已经报道过 iPhone 17
+        await db.save_analysis(Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE, industry=IndustryCategory.TECH,
+            article_ids=[OLD_NEWS.id], executive_brief="昨日", llm_backend="ollama",
+            created_at=datetime.now() - timedelta(days=1)
+        ))
+
+        candidates = await db.get_articles_by_ids([a.id for a in [*NOISY, *IMPORTANT, OLD_NEWS]])
+        ranking = await rank_articles(db, candidates, top_k=4, industry=IndustryCategory.TECH)
+        scores = {s['article_id']: s for s in ranking['scores']}
+        assert len(ranking['articles']) == 4
+        assert all(scores[a.id]['selected'] for a in IMPORTANT)
+        assert scores[OLD_NEWS.id]['novelty'] == 0 and not scores[OLD_NEWS.id]['selected']
+        assert scores[IMPORTANT[0].id]['priority'] == 1.0
+
+        analysis = Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE, article_ids=[a.id for a in ranking['articles']],
+            executive_brief="今日", llm_backend="ollama", article_scores=ranking['scores']
+        )
+        analysis_id = await db.save_analysis(analysis)
+        stored = await db.get_analysis_article_scores(analysis_id)
+        assert [s['rank'] for s in stored] == list(range(1, 11))
+        assert sum(s['selected'] for s in stored) == 4
+        assert stored[0]['title'] and stored[0]['source_name']
@@ -0,0 +1,240 @@
+"""
+批量一键情报测试（共用爬取 + 并发分析）
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Source, SourceType, IndustryCategory, BatchIntelligenceRequest, IntelligenceRequest
+
+
+def build_feed(prefix: str, count: int) -> str:
+    now = datetime.now(timezone.utc)
+    entries = "".join(
+        f"<item><title>{prefix} 文章 {i}</title><link>https://example.com/{prefix}/{i}</link>"
+        f"<guid>{prefix}-{i}</guid><pubDate>{format_datetime(now - timedelta(minutes=10 + i))}</pubDate>"
+        f"<description>{prefix} 内容 {i}</description></item>"
+        for i in range(count)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'
+
+
+# 聚合源转载了 shared 的第一篇（订阅地址不同，条目链接相同）
+OVERLAP_FEED = build_feed("overlap", 1).replace(
+    "</channel>",
+    f"<item><title>转载 shared 文章 0</title><link>https://example.com/shared/0</link>"
+    f"<guid>overlap-shared-0</guid><pubDate>{format_datetime(datetime.now(timezone.utc))}</pubDate>"
+    f"<description>转载内容</description></item></channel>"
+)
+
+FEEDS = {
+    "https://example.com/shared-feed": build_feed("shared", 3),
+    "https://example.com/finance-feed": build_feed("finance", 2),
+    "https://example.com/overlap-feed": OVERLAP_FEED,
+}
+
+
+async def _setup(tmp_path):
+    from storage.database import Database
+    from crawler.service import CrawlerService
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    # 科技源同时属于每日信息差；同一个 feed 又以不同写法登记在财经下
+    for name, url, industry, metadata in [
+        ("科技源", "https://example.com/shared-feed", IndustryCategory.TECH, {'daily_info_gap': True}),
+        ("财经源", "https://example.com/finance-feed", IndustryCategory.FINANCE, {}),
+        ("财经镜像源", "https://www.example.com/shared-feed/", IndustryCategory.FINANCE, {}),
+    ]:
+        await db.save_source(Source(
+            name=name, url=url, source_type=SourceType.RSS, industry=industry, metadata=metadata
+        ))
+
+    crawler = CrawlerService()
+    requested = []
+
+    async def fake_fetch(url, headers=None):
+        requested.append(url)
+        return FEEDS[url.replace("www.", "").rstrip("/")], 200
+
+    crawler.fetcher.fetch = fake_fetch
+    return db, crawler, requested
+
+
+class TestBatchIntelligence:
+
+    @pytest.mark.asyncio
+    async def test_shared_feed_crawled_once(self, tmp_path):
+        from crawler.ingest import crawl_sources_once, source_feed_key
+
+        db, crawler, requested = await _setup(tmp_path)
+        sources = await db.get_sources(enabled_only=True)
+        results = await crawl_sources_once(db, crawler, sources)
+
+        assert len(requested) == 2
+        assert len(results) == 2
+        assert all(results[source_feed_key(source)]['success'] for source in sources)
+
+    @pytest.mark.asyncio
+    async def test_shared_item_kept_for_each_feed(self, tmp_path):
+        """不同 feed 转载同一篇文章：只入库一次，但每个 feed 的结果都包含它"""
+        from crawler.ingest import crawl_sources_once, source_feed_key
+
+        db, crawler, requested = await _setup(tmp_path)
+        await db.save_source(Source(
+            name="财经聚合源", url="https://example.com/overlap-feed",
+            source_type=SourceType.RSS, industry=IndustryCategory.FINANCE
+        ))
+        sources = await db.get_sources(enabled_only=True)
+        results = await crawl_sources_once(db, crawler, sources)
+
+        shared_ids = results[source_feed_key(next(s for s in sources if s.name == "科技源"))]['article_ids']
+        overlap_ids = results[source_feed_key(next(s for s in sources if s.name == "财经聚合源"))]['article_ids']
+        assert len(shared_ids) == 3
+        assert len(overlap_ids) == 2
+        assert set(shared_ids) & set(overlap_ids) == {shared_ids[0]}
+        assert len(await db.get_article_ids_by_canonical_urls(["https://example.com/shared/0"])) == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_endpoint_runs_each_industry(self, tmp_path, monkeypatch):
+        from config_manager import ConfigManager
+        from llm.client_registry import get_llm_client_registry
+        from llm.ollama_adapter import OllamaAdapter
+        from routes.intelligence import batch_fetch_and_analyze
+
+        async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+            return {'text': "# 报告\n\n结论", 'token_usage': 10, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+        db, crawler, requested = await _setup(tmp_path)
+
+        response = await batch_fetch_and_analyze(
+            BatchIntelligenceRequest(
+                industries=[IndustryCategory.TECH, IndustryCategory.DAILY_INFO_GAP, IndustryCategory.FINANCE],
+                llm_backend="ollama",
+                bypass_cache=True
+            ),
+            db=db,
+            crawler=crawler,
+            config_mgr=ConfigManager(db)
+        )
+
+        assert len(requested) == 2
+        assert response.fetch_summary['total_sources'] == 4
+        assert response.fetch_summary['unique_feeds'] == 2
+
+        tech, info_gap, finance = response.results
+        assert tech.article_count == 3 and finance.article_count == 5
+        assert info_gap.article_ids == tech.article_ids
+        assert set(tech.article_ids) < set(finance.article_ids)
+        for item in response.results:
+            assert item.error is None
+            assert (await db.get_analysis(item.analysis_id)).industry == item.industry
+        await get_llm_client_registry().close_all()
+
+    @pytest.mark.asyncio
+    async def test_single_route_deduplicates_article_ids(self, tmp_path, monkeypatch):
+        """未到期源从数据库取回的文章与另一个源重新爬到的同一文章只计一次"""
+        from config_manager import ConfigManager
+        from crawler.ingest import crawl_source
+        from llm.client_registry import get_llm_client_registry
+        from llm.ollama_adapter import OllamaAdapter
+        from routes.intelligence import fetch_and_analyze
+
+        async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+            return {'text': "# 报告\n\n结论", 'token_usage': 10, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+        db, crawler, requested = await _setup(tmp_path)
+        await db.save_source(Source(
+            name="科技聚合源", url="https://example.com/overlap-feed",
+            source_type=SourceType.RSS, industry=IndustryCategory.TECH
+        ))
+        shared = next(s for s in await db.get_sources(enabled_only=True) if s.name == "科技源")
+        # 先爬一次：学到发布间隔后，本次请求时该源未到期，直接使用数据库中的文章
+        await crawl_source(db, crawler, shared)
+        requested.clear()
+
+        response = await fetch_and_analyze(
+            IntelligenceRequest(industry=IndustryCategory.TECH, llm_backend="ollama", bypass_cache=True),
+            db=db,
+            crawler=crawler,
+            config_mgr=ConfigManager(db)
+        )
+
+        assert requested == ["https://example.com/overlap-feed"]
+        assert len(response.article_ids) == len(set(response.article_ids)) == 4
+        await get_llm_client_registry().close_all()
+
+    @pytest.mark.asyncio
+    async def test_response_reports_selected_articles(self, tmp_path, monkeypatch):
+        """预排序筛选后，article_ids 为实际分析的文章，crawled_article_ids 为全部爬取结果"""
+        from config_manager import ConfigManager
+        from llm.client_registry import get_llm_client_registry
+        from llm.ollama_adapter import OllamaAdapter
+        from routes.intelligence import fetch_and_analyze, batch_fetch_and_analyze
+
+        async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+            return {'text': "# 报告\n\n结论", 'token_usage': 10, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+        db, crawler, _ = await _setup(tmp_path)
+        config_mgr = ConfigManager(db)
+
+        response = await fetch_and_analyze(
+            IntelligenceRequest(industry=IndustryCategory.FINANCE, llm_backend="ollama", bypass_cache=True, top_k=2),
+            db=db, crawler=crawler, config_mgr=config_mgr
+        )
+        assert response.crawled_article_count == 5 and response.article_count == 2
+        assert set(response.article_ids) < set(response.crawled_article_ids)
+        assert set((await db.get_analysis(response.analysis_id)).article_ids) == set(response.article_ids)
+
+        batch = await batch_fetch_and_analyze(
+            BatchIntelligenceRequest(
+                industries=[IndustryCategory.FINANCE], llm_backend="ollama", bypass_cache=True,
+                force_refresh=True, top_k=2
+            ),
+            db=db, crawler=crawler, config_mgr=config_mgr
+        )
+        item = batch.results[0]
+        assert item.crawled_article_count == 5 and item.article_count == 2
+        assert set(item.article_ids) < set(item.crawled_article_ids)
+        await get_llm_client_registry().close_all()
+
+    @pytest.mark.asyncio
+    async def test_intelligence_endpoint_accepts_llm_options(self, tmp_path, monkeypatch):
+        """POST /api/intelligence：bypass_cache / use_digests 属于一键情报请求"""
+        import httpx
+        from config_manager import ConfigManager
+        from llm.client_registry import get_llm_client_registry
+        from llm.ollama_adapter import OllamaAdapter
+        from main import app
+        from routes import intelligence
+
+        async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+            return {'text': "# 报告\n\n结论", 'token_usage': 10, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+        db, crawler, _ = await _setup(tmp_path)
+        app.dependency_overrides[intelligence.get_db] = lambda: db
+        app.dependency_overrides[intelligence.get_crawler] = lambda: crawler
+        app.dependency_overrides[intelligence.get_config_manager] = lambda: ConfigManager(db)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.post("/api/intelligence", json={
+                    'industry': "finance", 'llm_backend': "ollama", 'bypass_cache': True, 'use_digests': False
+                })
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body['article_count'] == 5
+        assert (await db.get_analysis(body['analysis_id'])).article_ids
+        await get_llm_client_registry().close_all()
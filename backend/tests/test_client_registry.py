@@ -0,0 +1,56 @@
+"""
+LLM 客户端注册表测试
+"""
+
+import asyncio
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.client_registry import LLMClientRegistry
+
+
+class TestClientRegistry:
+
+    @pytest.mark.asyncio
+    async def test_reuses_client_with_independent_request_state(self):
+        registry = LLMClientRegistry()
+        first = registry.acquire("ollama")
+        second = registry.acquire("ollama", model="llama3.1")
+
+        assert first is not second
+        assert first.client is second.client
+        first.article_digests["h"] = "摘要"
+        first.response_cache = object()
+        assert second.article_digests == {} and second.response_cache is None
+
+        other_model = registry.acquire("ollama", model="qwen2.5")
+        other_proxy = registry.acquire("ollama", proxy_url="http://127.0.0.1:7890")
+        assert other_model.client is not first.client
+        assert other_proxy.client is not first.client
+        assert registry.get_stats()['created'] == 3
+
+        await registry.close_all()
+        assert first.client.is_closed and other_proxy.client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_invalidate_closes_after_grace_period(self):
+        registry = LLMClientRegistry(retire_grace_seconds=0.05)
+        old = registry.acquire("ollama")
+
+        assert registry.invalidate("deepseek") == 0
+        assert registry.invalidate("ollama") == 1
+
+        # 进行中的请求仍可使用旧客户端，宽限期后才关闭
+        assert not old.client.is_closed
+        new = registry.acquire("ollama")
+        assert new.client is not old.client
+
+        await asyncio.sleep(0.1)
+        assert old.client.is_closed
+        assert not new.client.is_closed
+        await registry.close_all()
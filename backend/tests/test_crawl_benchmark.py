@@ -0,0 +1,57 @@
+"""
+爬取基准测试工具的冒烟测试（本地 Mock 服务，不访问外网）
+"""
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.mock_rsshub import MockRSSHubServer, route_key
+from benchmarks.crawl_benchmark import run_benchmark, percentile
+
+
+class TestMockRSSHub:
+    """测试 Mock 服务器"""
+
+    @pytest.mark.asyncio
+    async def test_serves_synthetic_feed_and_errors(self):
+        """按路由返回合成 feed，错误率为 1 时全部返回 503"""
+        async with MockRSSHubServer(items=5, snapshot_dir=None) as server:
+            url = server.url_for("http://localhost:1200/zhihu/hotlist")
+            assert url.endswith(route_key("http://localhost:1200/zhihu/hotlist"))
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url)
+            assert response.status_code == 200
+            assert response.text.count("<item>") == 5
+
+        async with MockRSSHubServer(error_rate=1.0, snapshot_dir=None) as server:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(server.url_for("https://example.com/feed"))
+            assert response.status_code == 503
+
+
+class TestCrawlBenchmark:
+    """测试基准测试流程"""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+
+    @pytest.mark.asyncio
+    async def test_run_benchmark(self, tmp_path):
+        """端到端爬取并入库，指标完整"""
+        metrics = await run_benchmark(
+            items=5, item_bytes=200, limit=3, concurrency=2,
+            db_path=str(tmp_path / "bench.db"), snapshot_dir=None
+        )
+        assert metrics['sources'] == 3
+        assert metrics['articles'] == 15
+        assert metrics['failed_sources'] == 0
+        assert metrics['latency_p50_ms'] is not None
+        assert metrics['mock_server']['requests'] == 3
@@ -0,0 +1,74 @@
+"""
+Fetcher 流式下载与大小限制测试
+"""
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crawler.fetcher import Fetcher, FetchError, measure_transfer
+
+
+def make_fetcher(handler, **kwargs) -> Fetcher:
+    """使用 MockTransport 的 Fetcher（不发起真实网络请求）"""
+    fetcher = Fetcher(rsshub_failover=False, **kwargs)
+    client_kwargs = fetcher._get_client_kwargs()
+    client_kwargs.pop('proxies')
+    client_kwargs['transport'] = httpx.MockTransport(handler)
+    fetcher._get_client_kwargs = lambda: dict(client_kwargs)
+    return fetcher
+
+
+class TestStreamingFetch:
+    """测试流式下载"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_decoding(self):
+        """按响应头声明的编码增量解码"""
+        body = "<rss><title>中文标题</title></rss>".encode('gbk')
+        fetcher = make_fetcher(lambda request: httpx.Response(
+            200, content=body, headers={'content-type': 'application/rss+xml; charset=gbk'}
+        ))
+        with measure_transfer() as meter:
+            content, status = await fetcher.fetch("https://example.com/feed")
+        assert status == 200
+        assert "中文标题" in content
+        assert meter.bytes_downloaded == len(body)
+        assert meter.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_abort_oversized_body(self):
+        """正文超过字节上限时中止，且不重试"""
+        async def chunks():
+            for _ in range(3):
+                yield b"x" * 600
+
+        def handler(request):
+            return httpx.Response(200, content=chunks(), headers={'content-type': 'text/html'})
+
+        fetcher = make_fetcher(handler, max_bytes=1000)
+        with measure_transfer() as meter:
+            with pytest.raises(FetchError) as exc_info:
+                await fetcher.fetch("https://example.com/huge")
+        assert not exc_info.value.retryable
+        assert meter.aborted == 1
+        assert meter.bytes_downloaded == 1200
+
+    @pytest.mark.asyncio
+    async def test_abort_on_headers(self):
+        """声明长度超限或非文本内容类型时，在读取正文前中止"""
+        fetcher = make_fetcher(lambda request: httpx.Response(
+            200, content=b"x" * 2000, headers={'content-type': 'text/html'}
+        ), max_bytes=1000)
+        with pytest.raises(FetchError, match="too large"):
+            await fetcher.fetch("https://example.com/huge")
+
+        fetcher = make_fetcher(lambda request: httpx.Response(
+            200, content=b"\x89PNG", headers={'content-type': 'image/png'}
+        ))
+        with pytest.raises(FetchError, match="content type"):
+            await fetcher.fetch("https://example.com/image.png")
@@ -0,0 +1,83 @@
+"""
+Gemini REST 适配器测试（httpx MockTransport，不访问外网）
+"""
+
+import json
+import os
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.gemini_adapter import GeminiAdapter
+
+
+def sse_response(chunks) -> httpx.Response:
+    body = "".join(f"data: {json.dumps(chunk)}\r\n\r\n" for chunk in chunks)
+    return httpx.Response(200, text=body, headers={'content-type': 'text/event-stream'})
+
+
+def make_adapter(handler, **kwargs) -> GeminiAdapter:
+    adapter = GeminiAdapter(api_key="test-key", **kwargs)
+    adapter.client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        headers={'x-goog-api-key': adapter.api_key}
+    )
+    return adapter
+
+
+CHUNKS = [
+    {'candidates': [{'content': {'parts': [{'text': "# 报告\n"}]}}]},
+    {'candidates': [{'content': {'parts': [{'text': "结论"}]}, 'finishReason': "STOP"}],
+     'usageMetadata': {'totalTokenCount': 42}},
+]
+
+
+class TestGeminiAdapter:
+
+    @pytest.mark.asyncio
+    async def test_complete_over_streaming_rest(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return sse_response(CHUNKS)
+
+        adapter = make_adapter(handler)
+        result = await adapter.complete("系统", "用户", max_tokens=100)
+
+        assert result == {'text': "# 报告\n结论", 'token_usage': 42, 'finish_reason': "stop", 'cached': False}
+        request = requests[0]
+        assert request.url.path == "/v1beta/models/gemini-2.5-flash:streamGenerateContent"
+        assert request.url.params['alt'] == "sse"
+        assert request.headers['x-goog-api-key'] == "test-key"
+        body = json.loads(request.content)
+        assert body['systemInstruction']['parts'][0]['text'] == "系统"
+        assert body['generationConfig']['maxOutputTokens'] == 100
+        await adapter.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_text_chunks(self):
+        adapter = make_adapter(lambda request: sse_response(CHUNKS))
+        assert [text async for text in adapter.stream("系统", "用户")] == ["# 报告\n", "结论"]
+
+    @pytest.mark.asyncio
+    async def test_blocked_prompt_and_http_errors(self):
+        blocked = make_adapter(lambda request: sse_response([{'promptFeedback': {'blockReason': "SAFETY"}}]))
+        with pytest.raises(ValueError, match="SAFETY"):
+            await blocked.complete("系统", "用户")
+
+        failing = make_adapter(lambda request: httpx.Response(429, json={'error': {'message': "quota"}}))
+        with pytest.raises(httpx.HTTPStatusError):
+            await failing.complete("系统", "用户")
+
+    def test_proxy_does_not_touch_environment(self, monkeypatch):
+        for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
+            monkeypatch.delenv(name, raising=False)
+
+        GeminiAdapter(api_key="test-key", proxy_url="http://127.0.0.1:7890")
+        assert not any(os.environ.get(name) for name in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'))
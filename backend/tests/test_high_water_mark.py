@@ -0,0 +1,153 @@
+"""
+增量爬取高水位测试
+"""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Source, SourceType, IndustryCategory
+
+
+def build_feed(items):
+    """items: [(guid, 距今分钟数)]，按给定顺序输出"""
+    now = datetime.now(timezone.utc)
+    entries = "".join(
+        f"<item><title>文章 {guid}</title><link>https://example.com/p/{guid}</link>"
+        f"<guid>{guid}</guid><pubDate>{format_datetime(now - timedelta(minutes=minutes))}</pubDate>"
+        f"<description>内容 {guid}</description></item>"
+        for guid, minutes in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>{entries}</channel></rss>'
+
+
+async def _setup(tmp_path):
+    from storage.database import Database
+    from crawler.service import CrawlerService
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    source = Source(name="测试源", url="https://example.com/feed",
+                    source_type=SourceType.RSS, industry=IndustryCategory.TECH)
+    await db.save_source(source)
+
+    crawler = CrawlerService()
+    feed = {'content': ''}
+
+    async def fake_fetch(url, headers=None):
+        return feed['content'], 200
+
+    crawler.fetcher.fetch = fake_fetch
+    return db, source, crawler, feed
+
+
+class TestHighWaterMark:
+    """测试按高水位提前停止"""
+
+    @pytest.mark.asyncio
+    async def test_steady_state_only_parses_new_items(self, tmp_path):
+        """第二次爬取只解析新条目，返回的文章 ID 仍覆盖整个时间窗口"""
+        from crawler.ingest import crawl_source
+
+        db, source, crawler, feed = await _setup(tmp_path)
+        feed['content'] = build_feed([(f"g{i}", 10 + i * 10) for i in range(5)])
+
+        first = await crawl_source(db, crawler, await db.get_source(source.id))
+        assert first['article_count'] == 5
+
+        stored = await db.get_source(source.id)
+        assert stored.last_seen_guid == "g0"
+        assert stored.seen_since is not None
+
+        second = await crawl_source(db, crawler, stored)
+        assert second['article_count'] == 0
+        assert set(second['article_ids']) == set(first['article_ids'])
+
+        feed['content'] = build_feed([("new1", 1), ("new2", 2)] + [(f"g{i}", 10 + i * 10) for i in range(5)])
+        third = await crawl_source(db, crawler, await db.get_source(source.id))
+        assert third['article_count'] == 2
+        assert len(third['article_ids']) == 7
+        assert (await db.get_source(source.id)).last_seen_guid == "new1"
+
+    @pytest.mark.asyncio
+    async def test_wider_window_and_unordered_feed(self, tmp_path):
+        """时间窗口扩大或 feed 乱序时完整处理"""
+        from crawler.ingest import crawl_source
+
+        db, source, crawler, feed = await _setup(tmp_path)
+        feed['content'] = build_feed([("a", 10), ("b", 60 * 30)])
+
+        first = await crawl_source(db, crawler, await db.get_source(source.id), hours=24)
+        assert first['article_count'] == 1
+
+        wider = await crawl_source(db, crawler, await db.get_source(source.id), hours=48)
+        assert wider['article_count'] == 2
+
+        feed['content'] = build_feed([("b", 60 * 30), ("a", 10)])
+        unordered = await crawl_source(db, crawler, await db.get_source(source.id), hours=48)
+        assert unordered['article_count'] == 2
+
+
+class TestAdaptiveInterval:
+    """测试自适应爬取间隔"""
+
+    def test_publish_interval_and_bounds(self):
+        """发布间隔滑动平均与上下限"""
+        from crawler.fetch_schedule import (
+            update_publish_interval, learned_interval,
+            MIN_FETCH_INTERVAL_MINUTES, MAX_FETCH_INTERVAL_MINUTES
+        )
+
+        now = datetime.now(timezone.utc)
+        times = [now - timedelta(minutes=60 * i) for i in range(6)]
+        mean = update_publish_interval(None, times)
+        assert mean == pytest.approx(60)
+
+        # 长时间没有新文章时间隔变大
+        slower = update_publish_interval(mean, [], last_seen_published_at=now - timedelta(days=2), now=now)
+        assert slower > mean
+
+        # 同一个平均间隔内多次空爬取只计入一次静默，不叠加
+        last_published = now - timedelta(minutes=150)
+        fetched_at = (now - timedelta(minutes=10)).astimezone().replace(tzinfo=None)  # 本地时间
+        penalized = update_publish_interval(60, [], last_seen_published_at=last_published, now=now)
+        assert penalized > 60
+        assert update_publish_interval(
+            60, [], last_seen_published_at=last_published, now=now, last_fetched_at=fetched_at
+        ) == 60
+        # 跨入新的间隔后再次计入
+        assert update_publish_interval(
+            60, [], last_seen_published_at=last_published, now=now + timedelta(minutes=30),
+            last_fetched_at=fetched_at
+        ) > 60
+
+        assert learned_interval(1) == MIN_FETCH_INTERVAL_MINUTES
+        assert learned_interval(10 ** 6) == MAX_FETCH_INTERVAL_MINUTES
+        assert learned_interval(None) is None
+
+    @pytest.mark.asyncio
+    async def test_not_due_source_served_from_db(self, tmp_path):
+        """未到期的源不发起请求，直接返回窗口内已入库文章；强制刷新时重新请求"""
+        from crawler.ingest import crawl_source
+
+        db, source, crawler, feed = await _setup(tmp_path)
+        feed['content'] = build_feed([(f"g{i}", 60 + i * 60) for i in range(5)])
+
+        first = await crawl_source(db, crawler, await db.get_source(source.id), respect_schedule=True)
+        stored = await db.get_source(source.id)
+        assert stored.mean_publish_interval_minutes == pytest.approx(60)
+        assert stored.learned_interval_minutes is not None
+
+        feed['content'] = "不应被请求"
+        cached = await crawl_source(db, crawler, stored, respect_schedule=True)
+        assert cached['from_cache'] is True
+        assert set(cached['article_ids']) == set(first['article_ids'])
+
+        feed['content'] = build_feed([(f"g{i}", 60 + i * 60) for i in range(5)])
+        forced = await crawl_source(db, crawler, stored, respect_schedule=False)
+        assert forced['from_cache'] is False
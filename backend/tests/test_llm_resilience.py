@@ -0,0 +1,167 @@
+"""
+LLM 调用重试、对冲与故障转移测试
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzer import Analyzer
+from llm.client_registry import get_llm_client_registry
+from llm.resilience import ResiliencePolicy, RetryBudget, is_retryable, retry_after_seconds
+from models import Article, AnalysisType, IndustryCategory
+
+
+def status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://llm.test/v1/chat")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def make_article(index: int) -> Article:
+    return Article(
+        id=f"a{index}",
+        title=f"标题 {index}",
+        url=f"https://example.com/{index}",
+        source_id="s1",
+        content="正文内容" * 20,
+        published_at=datetime.now(),
+        fetched_at=datetime.now(),
+        industry=IndustryCategory.TECH,
+    )
+
+
+class TestRetryPolicy:
+
+    def test_classifies_errors(self):
+        assert is_retryable(status_error(429))
+        assert is_retryable(status_error(503))
+        assert is_retryable(httpx.ConnectError("refused"))
+        assert not is_retryable(status_error(401))
+        assert not is_retryable(ValueError("blocked"))
+
+        assert retry_after_seconds(status_error(429, {'retry-after': "2"})) == 2
+        assert retry_after_seconds(status_error(429, {'retry-after-ms': "250"})) == 0.25
+        assert retry_after_seconds(status_error(429)) is None
+
+    @pytest.mark.asyncio
+    async def test_retries_with_retry_after(self):
+        calls = []
+
+        async def call():
+            calls.append(1)
+            if len(calls) < 3:
+                raise status_error(429, {'retry-after': "0.01"})
+            return {'text': "ok", 'token_usage': 5}
+
+        attempts = []
+        policy = ResiliencePolicy(max_attempts=3)
+        result = await policy.run(call, attempts, "deepseek", "deepseek-chat")
+
+        assert result['text'] == "ok"
+        assert [a['outcome'] for a in attempts] == ["error", "error", "success"]
+        assert attempts[0]['status_code'] == 429
+        assert attempts[0]['delay_seconds'] == 0.01
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_and_budget(self):
+        async def unauthorized():
+            raise status_error(401)
+
+        attempts = []
+        with pytest.raises(httpx.HTTPStatusError):
+            await ResiliencePolicy(max_attempts=3).run(unauthorized, attempts, "openai", None)
+        assert len(attempts) == 1
+
+        async def overloaded():
+            raise status_error(503, {'retry-after': "0"})
+
+        attempts = []
+        budget = RetryBudget(1)
+        with pytest.raises(httpx.HTTPStatusError):
+            await ResiliencePolicy(max_attempts=5, budget=budget).run(overloaded, attempts, "openai", None)
+        assert len(attempts) == 2 and budget.remaining == 0
+
+    @pytest.mark.asyncio
+    async def test_hedged_request_wins(self):
+        calls = []
+
+        async def call():
+            calls.append(1)
+            if len(calls) == 1:
+                await asyncio.sleep(1)
+                return {'text': "slow"}
+            return {'text': "fast"}
+
+        attempts = []
+        result = await ResiliencePolicy(hedge_after_seconds=0.02).run(call, attempts, "ollama", "llama3.1")
+        assert result['text'] == "fast"
+        assert [a['outcome'] for a in attempts] == ["hedge_started", "hedge_won", "success"]
+
+
+class TestFailover:
+
+    @pytest.mark.asyncio
+    async def test_sdk_clients_do_not_retry(self):
+        """OpenAI 兼容客户端不做内置重试，所有重试都经过 ResiliencePolicy"""
+        from llm.deepseek_adapter import DeepSeekAdapter
+        from llm.openai_adapter import OpenAIAdapter
+
+        for adapter_class in (OpenAIAdapter, DeepSeekAdapter):
+            adapter = adapter_class(api_key="sk-test")
+            assert adapter.client.max_retries == 0
+            await adapter.aclose()
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_next_backend(self, monkeypatch):
+        from llm.ollama_adapter import OllamaAdapter
+        from llm.openai_adapter import OpenAIAdapter
+
+        async def ollama_down(self, system_prompt, user_prompt, max_tokens=None):
+            raise status_error(503, {'retry-after': "0"})
+
+        async def openai_ok(self, system_prompt, user_prompt, max_tokens=None):
+            return {'text': "# 报告\n\n结论", 'token_usage': 100, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", ollama_down)
+        monkeypatch.setattr(OpenAIAdapter, "_complete", openai_ok)
+
+        analyzer = Analyzer(
+            llm_backend="ollama",
+            use_cache=False,
+            resilience={'max_attempts': 2, 'retry_budget': 4},
+            failover=[{'backend': "openai", 'api_key': "sk-test", 'model': None}]
+        )
+        analysis = await analyzer.analyze([make_article(i) for i in range(3)], AnalysisType.COMPREHENSIVE)
+
+        assert analysis.llm_backend == "openai"
+        assert [(a['backend'], a['outcome']) for a in analysis.llm_attempts] == [
+            ("ollama", "error"), ("ollama", "error"), ("openai", "success")
+        ]
+        await get_llm_client_registry().close_all()
+
+    @pytest.mark.asyncio
+    async def test_attempts_persisted_with_analysis(self, tmp_path):
+        from storage.database import Database
+        from models import Analysis
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        analysis = Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE,
+            article_ids=["a1"],
+            executive_brief="摘要",
+            llm_backend="openai",
+            llm_attempts=[{'backend': "deepseek", 'attempt': 1, 'outcome': "error", 'status_code': 429}]
+        )
+        analysis_id = await db.save_analysis(analysis)
+
+        loaded = await db.get_analysis(analysis_id)
+        assert loaded.llm_attempts == analysis.llm_attempts
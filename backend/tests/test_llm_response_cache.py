@@ -0,0 +1,138 @@
+"""
+LLM 响应缓存测试
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.adapter import BaseLLMAdapter
+from llm.response_cache import LLMResponseCache, make_cache_key
+
+
+class CountingAdapter(BaseLLMAdapter):
+    """统计实际调用次数的假适配器"""
+
+    def __init__(self, model: str = "fake-model", finish_reason: Optional[str] = "stop"):
+        super().__init__(model=model)
+        self.calls = 0
+        self.finish_reason = finish_reason
+
+    async def _complete(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None) -> dict:
+        self.calls += 1
+        return {'text': f"响应 {self.calls}", 'token_usage': 500, 'finish_reason': self.finish_reason}
+
+    async def analyze(self, articles, analysis_type, custom_prompt=None, industry=None):
+        raise NotImplementedError
+
+    def get_model_info(self) -> dict:
+        return {'backend': 'fake', 'model': self.model, 'max_tokens': 4096, 'cost_per_1k_tokens': 0.0}
+
+
+async def _make_cache(tmp_path, **kwargs) -> LLMResponseCache:
+    from storage.database import Database
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    return LLMResponseCache(db, **kwargs)
+
+
+class TestResponseCache:
+
+    def test_key_covers_all_inputs(self):
+        base = make_cache_key("deepseek", "deepseek-chat", "sys", "user", {'max_tokens': None})
+        assert base == make_cache_key("deepseek", "deepseek-chat", "sys", "user", {'max_tokens': None})
+        assert base != make_cache_key("openai", "deepseek-chat", "sys", "user", {'max_tokens': None})
+        assert base != make_cache_key("deepseek", "deepseek-reasoner", "sys", "user", {'max_tokens': None})
+        assert base != make_cache_key("deepseek", "deepseek-chat", "sys2", "user", {'max_tokens': None})
+        assert base != make_cache_key("deepseek", "deepseek-chat", "sys", "user", {'max_tokens': 100})
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_llm_call(self, tmp_path):
+        cache = await _make_cache(tmp_path)
+        adapter = CountingAdapter()
+        adapter.response_cache = cache
+
+        first = await adapter.complete("sys", "user")
+        second = await adapter.complete("sys", "user")
+        third = await adapter.complete("sys", "other user")
+
+        assert adapter.calls == 2
+        assert first == {'text': "响应 1", 'token_usage': 500, 'finish_reason': "stop", 'cached': False}
+        assert second == {'text': "响应 1", 'token_usage': 0, 'cached': True}
+        assert third['text'] == "响应 2"
+
+        stats = await cache.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 2
+        assert stats['saved_tokens'] == 500
+        assert stats['entries'] == 2 and stats['total_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_incomplete_response_not_cached(self, tmp_path):
+        """被截断（length）或未给出结束原因的响应不缓存"""
+        cache = await _make_cache(tmp_path)
+        for finish_reason in ("length", None):
+            adapter = CountingAdapter(model=f"fake-{finish_reason}", finish_reason=finish_reason)
+            adapter.response_cache = cache
+
+            first = await adapter.complete("sys", "user")
+            second = await adapter.complete("sys", "user")
+
+            assert first['finish_reason'] == finish_reason
+            assert adapter.calls == 2 and second['cached'] is False
+        assert (await cache.get_stats())['entries'] == 0
+
+    @pytest.mark.asyncio
+    async def test_key_includes_adapter_generation_options(self, tmp_path, monkeypatch):
+        """缓存键包含适配器实际使用的生成参数（如 Ollama 的 num_ctx）"""
+        from llm.ollama_adapter import OllamaAdapter
+
+        calls = []
+
+        async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+            calls.append(self.CONTEXT_WINDOW)
+            return {'text': f"响应 {len(calls)}", 'token_usage': 10, 'finish_reason': "stop"}
+
+        monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+        cache = await _make_cache(tmp_path)
+        adapter = OllamaAdapter(model="qwen2.5")
+        adapter.response_cache = cache
+
+        await adapter.complete("sys", "user")
+        assert (await adapter.complete("sys", "user"))['cached'] is True
+
+        monkeypatch.setattr(OllamaAdapter, "CONTEXT_WINDOW", OllamaAdapter.CONTEXT_WINDOW * 2)
+        result = await adapter.complete("sys", "user")
+        assert result['cached'] is False and len(calls) == 2
+        await adapter.aclose()
+
+    @pytest.mark.asyncio
+    async def test_bypass_when_disabled(self, tmp_path):
+        adapter = CountingAdapter()
+        await adapter.complete("sys", "user")
+        await adapter.complete("sys", "user")
+        assert adapter.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_size_eviction(self, tmp_path):
+        cache = await _make_cache(tmp_path, ttl_hours=1, max_bytes=30)
+        db = cache.db
+        await db.save_llm_cache_entry("old", "fake", "m", "x" * 10, 10)
+        await db.save_llm_cache_entry("a", "fake", "m", "a" * 20, 10)
+        await db.save_llm_cache_entry("b", "fake", "m", "b" * 20, 10)
+
+        # 过期条目读取不到
+        assert await db.get_llm_cache_entry("old", datetime.now() + timedelta(seconds=1)) is None
+
+        # "a" 最近被使用，超限时先淘汰最久未用的 "old"、"b"
+        assert await cache.get("a") is not None
+        removed = await cache.evict()
+        assert removed == 2
+        assert await cache.get("a") is not None
+        assert await cache.get("b") is None
@@ -0,0 +1,115 @@
+"""
+Map-Reduce 分析测试
+"""
+
+import asyncio
+import re
+from datetime import datetime
+from typing import List, Optional
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article, AnalysisType
+from llm.adapter import BaseLLMAdapter
+from llm.map_reduce import (
+    MAP_SYSTEM_PROMPT, chunk_articles, remap_citations, map_reduce_analyze
+)
+from analyzer import Analyzer
+
+
+def make_articles(count: int) -> List[Article]:
+    return [
+        Article(
+            id=f"a{i}",
+            title=f"文章 {i}",
+            url=f"https://example.com/{i}",
+            source_name="测试源",
+            content=f"正文 {i} " * 50,
+            published_at=datetime(2026, 1, 1, 8, 0)
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class FakeAdapter(BaseLLMAdapter):
+    """记录调用的假适配器：Map 阶段引用块内第 1 和最后一篇"""
+
+    def __init__(self, fail_first_chunk: bool = False):
+        super().__init__(model="fake")
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_first_chunk = fail_first_chunk
+
+    async def _complete(self, system_prompt: str, user_prompt: str, max_tokens: Optional[int] = None) -> dict:
+        self.calls.append((system_prompt, user_prompt))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        if system_prompt == MAP_SYSTEM_PROMPT:
+            if self.fail_first_chunk and "### [1] 文章 1\n" in user_prompt:
+                raise RuntimeError("boom")
+            count = int(re.search(r"共 (\d+) 条", user_prompt).group(1))
+            return {'text': f"- 要点 [1][{count}] [999]", 'token_usage': 10}
+        return {'text': "# 报告\n\n结论 [1][150]", 'token_usage': 100}
+
+    async def analyze(self, articles, analysis_type, custom_prompt=None, industry=None):
+        raise AssertionError("超过阈值时不应走单次分析")
+
+    def get_model_info(self) -> dict:
+        return {'backend': 'fake', 'model': 'fake', 'max_tokens': 4096, 'cost_per_1k_tokens': 0.001}
+
+
+class TestCitationRemap:
+
+    def test_chunking_and_remap(self):
+        chunks = chunk_articles(make_articles(60), chunk_size=25)
+        assert [(offset, len(chunk)) for offset, chunk in chunks] == [(0, 25), (25, 25), (50, 10)]
+        assert remap_citations("事实 [1][10] 噪音 [11]", offset=50, chunk_len=10) == "事实 [51][60] 噪音 "
+
+
+class TestMapReduce:
+
+    @pytest.mark.asyncio
+    async def test_map_reduce_remaps_to_original_positions(self):
+        articles = make_articles(150)
+        adapter = FakeAdapter()
+
+        analysis = await map_reduce_analyze(
+            adapter, articles, AnalysisType.COMPREHENSIVE, chunk_size=25, concurrency=2
+        )
+
+        # 6 个分块 + 1 次汇总，并发不超过上限
+        assert len(adapter.calls) == 7
+        assert adapter.max_in_flight <= 2
+
+        reduce_prompt = adapter.calls[-1][1]
+        for offset in range(0, 150, 25):
+            assert f"- 要点 [{offset + 1}][{offset + 25}]" in reduce_prompt
+        assert "[999]" not in reduce_prompt
+        assert "[150] 文章 150 | 测试源" in reduce_prompt
+
+        assert analysis.article_ids == [a.id for a in articles]
+        assert analysis.token_usage == 6 * 10 + 100
+        assert analysis.llm_backend == "fake"
+        assert analysis.executive_brief == "结论 [1][150]"
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_falls_back_to_titles(self):
+        adapter = FakeAdapter(fail_first_chunk=True)
+        await map_reduce_analyze(adapter, make_articles(50), AnalysisType.COMPREHENSIVE, chunk_size=25)
+        assert "- 文章 25 [25]" in adapter.calls[-1][1]
+
+    @pytest.mark.asyncio
+    async def test_analyzer_uses_threshold(self):
+        analyzer = Analyzer(llm_backend="ollama", map_reduce_threshold=100)
+        analyzer.adapter = FakeAdapter()
+        analysis = await analyzer.analyze(make_articles(101))
+        assert analysis.markdown_report.startswith("# 报告")
@@ -0,0 +1,102 @@
+"""
+Ollama /api/chat 适配器测试（httpx MockTransport，不需要本地 Ollama）
+"""
+
+import json
+
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.ollama_adapter import OllamaAdapter, get_ollama_throughput
+
+
+def ndjson_response(chunks) -> httpx.Response:
+    body = "".join(json.dumps(chunk) + "\n" for chunk in chunks)
+    return httpx.Response(200, text=body, headers={'content-type': 'application/x-ndjson'})
+
+
+def make_adapter(handler, **kwargs) -> OllamaAdapter:
+    adapter = OllamaAdapter(**kwargs)
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return adapter
+
+
+CHUNKS = [
+    {'message': {'role': "assistant", 'content': "# 报告\n"}, 'done': False},
+    {'message': {'role': "assistant", 'content': "结论"}, 'done': False},
+    {'message': {'role': "assistant", 'content': ""}, 'done': True, 'done_reason': "stop",
+     'total_duration': 3_000_000_000, 'load_duration': 500_000_000,
+     'prompt_eval_count': 400, 'prompt_eval_duration': 500_000_000,
+     'eval_count': 50, 'eval_duration': 2_000_000_000},
+]
+
+
+class TestOllamaAdapter:
+
+    @pytest.mark.asyncio
+    async def test_complete_over_streaming_chat(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return ndjson_response(CHUNKS)
+
+        adapter = make_adapter(handler, model="qwen2.5:7b")
+        result = await adapter.complete("系统", "用户")
+
+        assert result['text'] == "# 报告\n结论"
+        assert result['token_usage'] == 450
+        assert result['finish_reason'] == "stop"
+        assert result['timings']['prompt_eval_tokens_per_second'] == 800
+        assert result['timings']['eval_tokens_per_second'] == 25
+        assert get_ollama_throughput()["qwen2.5:7b"]['calls'] >= 1
+
+        request = requests[0]
+        assert request.url.path == "/api/chat"
+        body = json.loads(request.content)
+        assert body['stream'] is True
+        assert body['keep_alive'] == OllamaAdapter.KEEP_ALIVE
+        assert [m['role'] for m in body['messages']] == ["system", "user"]
+        assert body['options']['num_ctx'] == OllamaAdapter.CONTEXT_WINDOW
+        assert body['options']['num_predict'] <= OllamaAdapter.CONTEXT_WINDOW // 2
+        await adapter.aclose()
+
+    @pytest.mark.asyncio
+    async def test_stream_and_truncation(self):
+        adapter = make_adapter(lambda request: ndjson_response(CHUNKS))
+        assert [text async for text in adapter.stream("系统", "用户")] == ["# 报告\n", "结论"]
+
+        truncated = [*CHUNKS[:2], {**CHUNKS[2], 'done_reason': "length"}]
+        adapter = make_adapter(lambda request: ndjson_response(truncated))
+        assert (await adapter.complete("系统", "用户"))['finish_reason'] == "length"
+
+        failing = make_adapter(lambda request: ndjson_response([{'error': "model not found"}]))
+        with pytest.raises(RuntimeError, match="model not found"):
+            await failing.complete("系统", "用户")
+
+    @pytest.mark.asyncio
+    async def test_warm_up_and_configure(self):
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(json.loads(request.content))
+            return httpx.Response(200, json={'done': True, 'done_reason': "load"})
+
+        original = (OllamaAdapter.CONTEXT_WINDOW, OllamaAdapter.KEEP_ALIVE, OllamaAdapter.BASE_URL)
+        try:
+            OllamaAdapter.configure(num_ctx=16384, keep_alive="-1", base_url="http://gpu-box:11434/")
+            assert OllamaAdapter.describe_model("llama3.1")['context_window'] == 16384
+
+            adapter = make_adapter(handler)
+            assert adapter.base_url == "http://gpu-box:11434"
+            await adapter.warm_up()
+            assert requests[0]['messages'] == []
+            assert requests[0]['keep_alive'] == "-1"
+            assert requests[0]['options']['num_ctx'] == 16384
+        finally:
+            OllamaAdapter.CONTEXT_WINDOW, OllamaAdapter.KEEP_ALIVE, OllamaAdapter.BASE_URL = original
@@ -0,0 +1,91 @@
+"""
+提示词 token 预算打包测试
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article, AnalysisType
+from llm.prompt_packer import allocate_budgets, pack_articles, output_reserve
+from llm.token_counter import count_tokens
+
+
+def make_articles(count: int, repeat: int = 400) -> List[Article]:
+    return [
+        Article(
+            id=f"a{i}",
+            title=f"文章 {i}",
+            url=f"https://example.com/{i}",
+            source_name=f"源 {i % 3}",
+            content=f"第 {i} 篇正文内容。" * repeat,
+            published_at=datetime(2026, 1, 1, 8, 0) + timedelta(minutes=i)
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class TestAllocation:
+
+    def test_everything_fits(self):
+        assert allocate_budgets([10, 20, 30], [1.0, 1.0, 1.0], 100) == [10, 20, 30]
+
+    def test_fills_without_exceeding(self):
+        allocation = allocate_budgets([1000, 1000, 50], [1.0, 2.0, 1.0], 1000)
+        assert sum(allocation) <= 1000
+        assert sum(allocation) >= 990
+        # 短文章完整保留，高权重文章分到更多
+        assert allocation[2] == 50
+        assert allocation[1] > allocation[0]
+
+    def test_below_floor_keeps_highest_ranked(self):
+        allocation = allocate_budgets([500, 500, 500], [1.0, 2.0, 1.5], 90, min_tokens=40)
+        assert allocation == [0, 40, 40]
+
+
+class TestPackArticles:
+
+    def test_respects_context_window(self):
+        articles = make_articles(60)
+        overhead = ["系统提示词" * 100, "任务说明" * 100]
+        packed = pack_articles(articles, overhead, context_window=16384, max_output_tokens=4096)
+
+        input_window = 16384 - output_reserve(16384, 4096)
+        assert count_tokens(packed['text']) + sum(count_tokens(t) for t in overhead) <= input_window
+        assert packed['truncated'] == 60
+        # 文章顺序与编号不变
+        positions = [packed['text'].index(f"### [{i}] 文章 {i}\n") for i in range(1, 61)]
+        assert positions == sorted(positions)
+
+    def test_large_window_keeps_full_content(self):
+        articles = make_articles(5, repeat=20)
+        packed = pack_articles(articles, context_window=131072, max_output_tokens=8192)
+        assert packed['truncated'] == 0
+        assert articles[0].content in packed['text']
+
+    def test_digest_replaces_content(self):
+        from llm.article_digest import article_content_hash
+
+        articles = make_articles(2)
+        digests = {article_content_hash(articles[0]): "一句话摘要"}
+        packed = pack_articles(articles, digests=digests, context_window=131072)
+        assert "- 内容: 一句话摘要\n" in packed['text']
+
+
+class TestAdapterPrompt:
+
+    def test_deepseek_prompt_fits_window(self):
+        from llm.deepseek_adapter import DeepSeekAdapter
+
+        adapter = DeepSeekAdapter(api_key="sk-test")
+        info = adapter.get_model_info()
+        prompt = adapter._build_markdown_prompt(make_articles(100), analysis_type=AnalysisType.COMPREHENSIVE)
+        system_prompt = adapter._build_system_prompt(AnalysisType.COMPREHENSIVE, None)
+
+        total = count_tokens(prompt) + count_tokens(system_prompt) + info['max_output_tokens']
+        assert total <= info['context_window']
+        assert "### [100] 文章 100" in prompt
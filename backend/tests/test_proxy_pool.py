@@ -0,0 +1,124 @@
+"""
+代理池选择、摘除与传输层重试测试
+"""
+
+import random
+import httpx
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.proxy_helper import ProxyHelper
+from utils.proxy_pool import ProxyPool, ProxyPoolTransport
+
+FAST = "http://fast:7890"
+SLOW = "http://slow:7890"
+BAD = "socks5://bad:1080"
+
+
+class TestProxyPool:
+    """测试加权选择、粘滞与摘除"""
+
+    def test_weighted_selection_prefers_fast_proxy(self):
+        """低延迟代理被选中的概率更高"""
+        pool = ProxyPool([FAST, SLOW], rng=random.Random(1))
+        pool.record_success(FAST, 0.05)
+        pool.record_success(SLOW, 1.0)
+
+        picks = [pool.select() for _ in range(500)]
+        assert picks.count(FAST) > picks.count(SLOW) * 5
+        assert pool.get_stats()[0]['url'] == FAST
+
+    def test_host_stickiness(self):
+        """同一主机在粘滞期内沿用同一代理，失败后重新选择"""
+        pool = ProxyPool([FAST, SLOW], rng=random.Random(2))
+        first = pool.select("api.openai.com")
+        assert all(pool.select("api.openai.com") == first for _ in range(20))
+
+        pool.record_failure(first, "ConnectError", host="api.openai.com")
+        assert "api.openai.com" not in pool._sticky
+
+    def test_eject_after_consecutive_failures(self):
+        """连续失败达到阈值后摘除，成功后恢复"""
+        pool = ProxyPool([FAST, BAD], rng=random.Random(3))
+        for _ in range(ProxyPool.FAILURE_THRESHOLD):
+            pool.record_failure(BAD, "ProxyError")
+
+        assert not pool.stats[BAD].is_available()
+        assert all(pool.select() == FAST for _ in range(50))
+
+        pool.record_success(BAD, 0.1)
+        assert pool.stats[BAD].is_available()
+
+    def test_all_ejected_still_returns_proxy(self):
+        """全部被摘除时返回最早结束冷却的代理"""
+        pool = ProxyPool([FAST, BAD])
+        for _ in range(ProxyPool.FAILURE_THRESHOLD + 1):
+            pool.record_failure(BAD, "ProxyError")
+        for _ in range(ProxyPool.FAILURE_THRESHOLD):
+            pool.record_failure(FAST, "ProxyError")
+        assert pool.select() == FAST
+
+    def test_configure_keeps_stats(self):
+        """重新配置时保留已有代理的统计"""
+        pool = ProxyPool([FAST, SLOW])
+        pool.record_success(FAST, 0.2)
+        pool.configure([FAST, BAD])
+        assert pool.proxies == [FAST, BAD]
+        assert pool.stats[FAST].success_count == 1
+        assert pool.select(exclude=[FAST, BAD]) is None
+
+
+class TestProxyHelperPool:
+    """测试代理池配置解析"""
+
+    def test_pool_urls(self):
+        config = {'enabled': True, 'http': FAST, 'pool': [SLOW, FAST, 'invalid']}
+        assert ProxyHelper.get_pool_urls(config) == [SLOW, FAST]
+        assert ProxyHelper.get_pool_urls({'enabled': True, 'http': FAST}) == []
+        assert ProxyHelper.get_pool_urls({'enabled': False, 'pool': [SLOW]}) == []
+
+    def test_client_kwargs(self):
+        """有代理池时返回 transport，否则保持原有 proxies"""
+        kwargs = ProxyHelper.build_httpx_client_kwargs(
+            {'enabled': True, 'pool': [FAST, SLOW]}, pool=ProxyPool()
+        )
+        assert isinstance(kwargs['transport'], ProxyPoolTransport)
+
+        kwargs = ProxyHelper.build_httpx_client_kwargs({'enabled': True, 'http': FAST})
+        assert kwargs == {'proxies': {'http://': FAST, 'https://': FAST}}
+        assert ProxyHelper.build_httpx_client_kwargs(None) == {}
+
+
+class TestProxyPoolTransport:
+    """测试传输层的代理切换与统计回写"""
+
+    @pytest.mark.asyncio
+    async def test_failover_to_next_proxy(self):
+        """代理连接失败时换下一个代理，并记录两侧统计"""
+        pool = ProxyPool([BAD, FAST])
+        pool.record_success(BAD, 0.001)  # 让 BAD 更可能被首先选中
+        used = []
+
+        def make_transport(proxy):
+            def handler(request):
+                used.append(proxy)
+                if proxy == BAD:
+                    raise httpx.ConnectError("proxy refused", request=request)
+                return httpx.Response(200, text="ok")
+            return httpx.MockTransport(handler)
+
+        transport = ProxyPoolTransport(pool)
+        transport._transport_for = make_transport
+
+        async with httpx.AsyncClient(transport=transport) as client:
+            for _ in range(5):
+                response = await client.get("https://example.com/feed")
+                assert response.text == "ok"
+
+        assert pool.stats[FAST].success_count == 5
+        if BAD in used:
+            assert pool.stats[BAD].failure_count == used.count(BAD)
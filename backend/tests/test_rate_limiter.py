@@ -0,0 +1,99 @@
+"""
+LLM 限流器测试
+"""
+
+import asyncio
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.rate_limiter import LLMRateLimiter, LLMRateLimiterRegistry
+
+
+class TestRateLimiter:
+
+    @pytest.mark.asyncio
+    async def test_limits_in_flight_requests(self):
+        limiter = LLMRateLimiter("test", max_concurrency=2)
+        running = []
+        peak = []
+
+        async def call():
+            async with limiter.reserve():
+                running.append(1)
+                peak.append(len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*(call() for _ in range(6)))
+        assert max(peak) == 2
+        stats = limiter.get_stats()
+        assert stats['acquired'] == 6 and stats['queued'] == 4
+        assert stats['in_flight'] == 0 and stats['queue_depth'] == 0
+        assert stats['max_wait_ms'] > 0
+
+    @pytest.mark.asyncio
+    async def test_fifo_order(self):
+        limiter = LLMRateLimiter("test", max_concurrency=1)
+        order = []
+
+        async def call(index):
+            async with limiter.reserve():
+                order.append(index)
+                await asyncio.sleep(0)
+
+        await asyncio.gather(*(call(i) for i in range(5)))
+        assert order == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_tokens_per_minute_bucket(self):
+        # 6000 TPM = 每秒回填 100 token
+        limiter = LLMRateLimiter("test", max_concurrency=10, tokens_per_minute=6000)
+
+        async with limiter.reserve(5000) as usage:
+            usage['tokens'] = 1000
+        # 实际消耗少于预估，多扣的额度退回
+        assert limiter.get_stats()['tokens_available'] >= 4999
+
+        await limiter.acquire(5000)
+        waiter = asyncio.ensure_future(limiter.acquire(5000))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        assert limiter.get_stats()['queue_depth'] == 1
+
+        # 大请求排队时后来的小请求不插队
+        small = asyncio.ensure_future(limiter.acquire(10))
+        await asyncio.sleep(0)
+        assert not small.done()
+
+        limiter.release(5000, 0)
+        await asyncio.wait_for(waiter, 1)
+        await asyncio.wait_for(small, 1)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        limiter = LLMRateLimiter("test", max_concurrency=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        limiter.release(0)
+        assert limiter.get_stats()['in_flight'] == 0
+        await asyncio.wait_for(limiter.acquire(), 1)
+
+    def test_registry_applies_backend_limits(self):
+        registry = LLMRateLimiterRegistry()
+        limiter = registry.get("openai", "gpt-4o-mini")
+        assert registry.get("openai", "gpt-4o-mini") is limiter
+        assert registry.get("openai", "gpt-4o") is not limiter
+
+        registry.configure({'openai': {'max_concurrency': 1, 'tokens_per_minute': 1000}})
+        assert limiter.max_concurrency == 1 and limiter.tokens_per_minute == 1000
+        assert registry.get_limits("ollama")['max_concurrency'] == 2
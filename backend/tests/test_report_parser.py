@@ -0,0 +1,143 @@
+"""
+分析报告结构化解析测试
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Analysis, AnalysisType, IndustryCategory
+from llm.report_parser import extract_score, parse_report, structured_fields
+
+
+REPORT = """# 2026-10-19-科技互联网-行业动态
+
+本期 AI 领域密集发布[1][2]。
+
+## 🔬 第一部分：技术动态（事实简报）
+
+### 技术发布与突破
+- **GPT-5 发布**：OpenAI 发布新一代模型，推理能力提升[1][2][3]
+  - 价格同步下调[2]
+- iPhone 17 正式开售，首销火爆[4]。
+
+### 政策与监管
+1. 欧盟启动反垄断调查[5]，重要性：高
+
+## 💡 第三部分：投资与趋势
+
+### 趋势洞察
+#### 中期（1-2年）
+- **端侧模型普及**：置信度 80%，多家厂商布局[2][6]
+
+## 被忽视的信息差
+- **芯片供应矛盾**：厂商口径与渠道数据存在矛盾[7]
+- 尚无来源支撑的推测
+
+```
+- 代码块中的列表不是条目 [1]
+```
+"""
+ARTICLE_IDS = [f"a{i}" for i in range(1, 8)]
+
+
+class TestReportParser:
+
+    def test_sections_and_kinds(self):
+        parsed = parse_report(REPORT, ARTICLE_IDS)
+        sections = {s['heading']: s for s in parsed['sections']}
+
+        assert sections['2026-10-19-科技互联网-行业动态']['kind'] == 'other'
+        assert sections['技术动态（事实简报）']['level'] == 2
+        assert sections['技术发布与突破']['kind'] == 'signal'
+        assert sections['中期（1-2年）']['path'].endswith("投资与趋势 / 趋势洞察 / 中期（1-2年）")
+        assert sections['中期（1-2年）']['kind'] == 'trend'
+        assert sections['被忽视的信息差']['kind'] == 'gap'
+
+    def test_items_citations_and_scores(self):
+        items = parse_report(REPORT, ARTICLE_IDS)['items']
+        by_headline = {item['headline']: item for item in items}
+
+        gpt = by_headline['GPT-5 发布']
+        assert gpt['citations'] == [1, 2, 3]
+        assert gpt['article_ids'] == ["a1", "a2", "a3"]
+        assert "价格同步下调" in gpt['body']
+        assert gpt['score_source'] == 'citations'
+
+        assert by_headline['欧盟启动反垄断调查']['score'] == 0.85
+        assert by_headline['端侧模型普及']['score'] == 0.8
+        assert by_headline['端侧模型普及']['score_source'] == 'explicit'
+        assert all("代码块" not in item['body'] for item in items)
+
+    def test_extract_score_units(self):
+        assert extract_score("置信度：75%") == 0.75
+        assert extract_score("重要性 4/5") == 0.8
+        assert extract_score("评分 8分") == 0.8
+        assert extract_score("影响力：中等") == 0.55
+        assert extract_score("⭐⭐⭐") == 0.6
+        assert extract_score("没有评分") is None
+
+    def test_structured_fields(self):
+        fields = structured_fields(parse_report(REPORT, ARTICLE_IDS))
+
+        assert [t.title for t in fields['trends']] == ["端侧模型普及"]
+        assert fields['trends'][0].supporting_article_ids == ["a2", "a6"]
+        assert "GPT-5 发布" in [s.title for s in fields['signals']]
+        # 没有引用的条目不写入结构化字段
+        assert [g.title for g in fields['information_gaps']] == ["芯片供应矛盾"]
+        assert fields['information_gaps'][0].gap_type == "conflict"
+
+    @pytest.mark.asyncio
+    async def test_parsed_at_save_time(self, tmp_path):
+        from storage.database import Database
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        analysis_id = await db.save_analysis(Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE, industry=IndustryCategory.TECH,
+            article_ids=ARTICLE_IDS, executive_brief="摘要", markdown_report=REPORT, llm_backend="ollama"
+        ))
+
+        loaded = await db.get_analysis(analysis_id)
+        assert loaded.trends[0].title == "端侧模型普及"
+        assert loaded.information_gaps
+
+        structure = await db.get_report_structure(analysis_id)
+        gap_section = next(s for s in structure if s['kind'] == 'gap')
+        assert [item['headline'] for item in gap_section['items']][0] == "芯片供应矛盾"
+
+        found = await db.search_report_items(article_id="a6")
+        assert [item['headline'] for item in found] == ["端侧模型普及"]
+        assert (await db.search_report_items(query="GPT-5", kind="signal"))[0]['industry'] == "tech"
+
+        # 重新保存覆盖旧结构
+        await db.save_analysis(loaded)
+        assert len(await db.get_report_structure(analysis_id)) == len(structure)
+        assert len(await db.search_report_items(article_id="a6")) == 1
+
+    @pytest.mark.asyncio
+    async def test_trend_insight_uses_structure(self, tmp_path):
+        from storage.database import Database
+        from routes.trend_insight import build_trend_insight_prompt
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        analysis_id = await db.save_analysis(Analysis(
+            analysis_type=AnalysisType.COMPREHENSIVE, article_ids=ARTICLE_IDS,
+            executive_brief="摘要", markdown_report=REPORT + "\n冗长的正文段落" * 500, llm_backend="ollama"
+        ))
+        analysis = await db.get_analysis(analysis_id)
+
+        prompt_config = {'user_prompt_template': "{{reports_content}}"}
+        _, structured = build_trend_insight_prompt(
+            [analysis], "tech", "", prompt_config, {analysis_id: await db.get_report_structure(analysis_id)}
+        )
+        _, full = build_trend_insight_prompt([analysis], "tech", "", prompt_config)
+
+        assert "端侧模型普及（得分 0.80，2 篇来源）" in structured
+        assert "冗长的正文段落" not in structured
+        # 全文压缩只保留前几个章节，靠后的趋势会丢失
+        assert "端侧模型普及" not in full
@@ -0,0 +1,136 @@
+"""
+滚动趋势洞察测试
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Analysis, AnalysisType, IndustryCategory
+
+
+def make_analysis(topic: str, days_ago: float, industry=IndustryCategory.TECH) -> Analysis:
+    report = f"""# 报告
+
+## 趋势洞察
+- **{topic}**：多家厂商跟进[1][2]
+"""
+    return Analysis(
+        analysis_type=AnalysisType.COMPREHENSIVE, industry=industry, article_ids=["a1", "a2"],
+        executive_brief=f"{topic}摘要", markdown_report=report, llm_backend="ollama",
+        created_at=datetime.now() - timedelta(days=days_ago)
+    )
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """记录发送给 LLM 的提示词，返回递增编号的洞察报告"""
+    import rolling_trend
+    from llm.ollama_adapter import OllamaAdapter
+
+    prompts = []
+
+    async def fake_complete(self, system_prompt, user_prompt, max_tokens=None):
+        prompts.append(user_prompt)
+        return {'text': f"# 趋势洞察\n\n第 {len(prompts)} 版洞察", 'token_usage': 100, 'finish_reason': "stop"}
+
+    monkeypatch.setattr(OllamaAdapter, "_complete", fake_complete)
+    monkeypatch.setattr(rolling_trend, "get_llm_response_cache", lambda: None)
+    return prompts
+
+
+async def make_db(tmp_path):
+    from storage.database import Database
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    return db
+
+
+class TestRollingTrend:
+
+    @pytest.mark.asyncio
+    async def test_incremental_updates(self, tmp_path, fake_llm):
+        from config_manager import ConfigManager
+        from rolling_trend import update_rolling_trend
+
+        db = await make_db(tmp_path)
+        config_mgr = ConfigManager(db)
+        await db.save_analysis(make_analysis("过期话题", 40))
+        await db.save_analysis(make_analysis("其他行业话题", 2, IndustryCategory.FINANCE))
+        first_ids = [
+            await db.save_analysis(make_analysis("端侧模型普及", 3)),
+            await db.save_analysis(make_analysis("AI 芯片扩产", 2)),
+        ]
+
+        first = await update_rolling_trend(db, config_mgr, "tech", llm_backend="ollama")
+        assert first['status'] == 'updated' and first['new_analyses'] == 2
+        assert first['insight'].source_analysis_ids == first_ids
+        assert "（首次生成，暂无历史洞察）" in fake_llm[0]
+        assert "端侧模型普及（得分" in fake_llm[0]
+        assert "过期话题" not in fake_llm[0] and "其他行业话题" not in fake_llm[0]
+
+        # 没有新增分析时不调用 LLM
+        unchanged = await update_rolling_trend(db, config_mgr, "tech", llm_backend="ollama")
+        assert unchanged['status'] == 'unchanged' and len(fake_llm) == 1
+
+        new_id = await db.save_analysis(make_analysis("机器人量产", 0))
+        second = await update_rolling_trend(db, config_mgr, "tech", llm_backend="ollama")
+        assert second['new_analyses'] == 1
+        # 只发送新增分析与上一版洞察
+        assert "机器人量产" in fake_llm[1] and "第 1 版洞察" in fake_llm[1]
+        assert "端侧模型普及" not in fake_llm[1]
+        assert second['insight'].source_analysis_ids == [*first_ids, new_id]
+
+        state = await db.get_rolling_trend_state("tech")
+        assert state['insight_id'] == second['insight'].id
+        assert state['update_count'] == 2 and state['total_token_usage'] == 200
+
+        # 强制重新生成：按窗口内全部分析从头计算
+        rebuilt = await update_rolling_trend(db, config_mgr, "tech", llm_backend="ollama", force=True)
+        assert rebuilt['new_analyses'] == 3 and "（首次生成，暂无历史洞察）" in fake_llm[2]
+
+    @pytest.mark.asyncio
+    async def test_first_run_needs_two_analyses(self, tmp_path, fake_llm):
+        from config_manager import ConfigManager
+        from rolling_trend import update_rolling_trend
+
+        db = await make_db(tmp_path)
+        await db.save_analysis(make_analysis("端侧模型普及", 1))
+
+        result = await update_rolling_trend(db, ConfigManager(db), "tech", llm_backend="ollama")
+        assert result['status'] == 'insufficient'
+        assert not fake_llm and await db.get_rolling_trend_state("tech") is None
+
+    @pytest.mark.asyncio
+    async def test_scheduler_runs_once_per_day(self, tmp_path, fake_llm):
+        from config_manager import ConfigManager
+        from rolling_trend import RollingTrendScheduler
+
+        db = await make_db(tmp_path)
+        await db.save_analysis(make_analysis("端侧模型普及", 3))
+        await db.save_analysis(make_analysis("AI 芯片扩产", 2))
+        scheduler = RollingTrendScheduler(db)
+        today = datetime.now().replace(hour=8, minute=0)
+
+        # 未启用时不运行
+        assert await scheduler.run_once(today) == []
+
+        await ConfigManager(db).set_rolling_trend_config({
+            'enabled': True, 'industries': ["tech", "finance"], 'llm_backend': "ollama", 'run_at_hour': 7
+        })
+        assert await scheduler.run_once(today.replace(hour=6)) == []
+
+        results = await scheduler.run_once(today)
+        assert [r['status'] for r in results] == ['updated', 'unchanged']
+        assert await scheduler.run_once(today.replace(hour=20)) == []
+        assert len(fake_llm) == 1
+
+        # 第二天只有在有新增分析时才调用 LLM
+        results = await scheduler.run_once(today + timedelta(days=1))
+        assert results[0]['status'] == 'unchanged' and len(fake_llm) == 1
@@ -0,0 +1,123 @@
+"""
+RSSHub 实例故障转移与延迟路由测试
+"""
+
+import asyncio
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from crawler.rsshub_helper import RSSHubHelper
+from crawler.fetcher import Fetcher, FetchError
+
+
+class TestInstanceRouting:
+    """测试实例排序与改写"""
+
+    def test_replace_domain_between_instances(self):
+        """任意已知实例之间可互相改写"""
+        helper = RSSHubHelper("http://localhost:1200")
+        url = "http://localhost:1200/zhihu/hotlist"
+        assert helper.replace_rsshub_domain(url, "https://rsshub.app") == "https://rsshub.app/zhihu/hotlist"
+        assert helper.replace_rsshub_domain("https://rsshub.app/v2ex/topics/hot") == \
+            "http://localhost:1200/v2ex/topics/hot"
+        assert helper.replace_rsshub_domain("https://example.com/feed") == "https://example.com/feed"
+
+    def test_rank_by_health_and_latency(self):
+        """冷却中的实例排在最后，健康实例按延迟排序"""
+        helper = RSSHubHelper("http://localhost:1200")
+        helper.record_success("https://rsshub.app", 0.2)
+        helper.record_success("http://localhost:1200", 0.5)
+        for _ in range(RSSHubHelper.FAILURE_THRESHOLD):
+            helper.record_failure("https://rss.shab.fun", "HTTP error 503")
+
+        ranked = helper.rank_instances()
+        assert ranked[0] == "https://rsshub.app"
+        assert ranked[-1] == "https://rss.shab.fun"
+
+        # 其他路由上的延迟不可比，首选实例仍排第一，其余按延迟排序
+        candidates = helper.get_candidate_urls("http://localhost:1200/36kr", max_candidates=2)
+        assert candidates == [
+            ("http://localhost:1200", "http://localhost:1200/36kr"),
+            ("https://rsshub.app", "https://rsshub.app/36kr"),
+        ]
+        assert helper.get_candidate_urls("https://example.com/feed") == []
+
+    def test_preferred_kept_unless_much_slower_on_same_route(self):
+        """首选实例只在同一路由上慢 2 倍以上或不健康时让位"""
+        helper = RSSHubHelper("http://localhost:1200")
+        url = "http://localhost:1200/zhihu/hotlist"
+        helper.record_success("http://localhost:1200", 3.0, "/zhihu/hotlist")
+        helper.record_success("https://rsshub.app", 0.3, "/36kr")
+
+        # 公共实例只在其他路由上测过（或未测过），不抢占首选
+        assert helper.get_candidate_urls(url)[0][0] == "http://localhost:1200"
+
+        # 同一路由上慢不到 2 倍：仍用首选
+        helper.record_success("https://rsshub.app", 1.8, "/zhihu/hotlist")
+        assert helper.get_candidate_urls(url)[0][0] == "http://localhost:1200"
+
+        # 同一路由上慢 2 倍以上：让位给更快的实例
+        helper.record_success("https://rss.shab.fun", 1.0, "/zhihu/hotlist")
+        assert helper.get_candidate_urls(url)[0][0] == "https://rss.shab.fun"
+
+        # 不健康时让位
+        fresh = RSSHubHelper("http://localhost:1200")
+        for _ in range(RSSHubHelper.FAILURE_THRESHOLD):
+            fresh.record_failure("http://localhost:1200", "HTTP error 503")
+        assert fresh.get_candidate_urls(url)[0][0] != "http://localhost:1200"
+
+
+class TestFailover:
+    """测试 Fetcher 故障转移"""
+
+    @pytest.mark.asyncio
+    async def test_retry_on_5xx(self):
+        """5xx 时切换实例，并记录失败"""
+        helper = RSSHubHelper("http://localhost:1200")
+        fetcher = Fetcher(rsshub_helper=helper)
+
+        async def fake_fetch_once(url, headers=None):
+            if url.startswith("http://localhost:1200"):
+                raise FetchError(f"HTTP error 503 for {url}", status_code=503, retryable=True)
+            return f"ok:{url}", 200
+
+        fetcher._fetch_once = fake_fetch_once
+        content, status = await fetcher.fetch("http://localhost:1200/zhihu/hotlist")
+        assert status == 200
+        assert not content.startswith("ok:http://localhost:1200")
+        assert helper.stats["http://localhost:1200"].consecutive_failures == 1
+
+    @pytest.mark.asyncio
+    async def test_no_retry_on_4xx(self):
+        """4xx 说明路由本身有问题，不再尝试其他实例"""
+        helper = RSSHubHelper("http://localhost:1200")
+        fetcher = Fetcher(rsshub_helper=helper)
+        calls = []
+
+        async def fake_fetch_once(url, headers=None):
+            calls.append(url)
+            raise FetchError(f"HTTP error 404 for {url}", status_code=404)
+
+        fetcher._fetch_once = fake_fetch_once
+        with pytest.raises(FetchError):
+            await fetcher.fetch("http://localhost:1200/not/exist")
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_request(self):
+        """主实例过慢时对冲请求，取先返回的结果"""
+        helper = RSSHubHelper("http://localhost:1200")
+        fetcher = Fetcher(rsshub_helper=helper, hedge_delay=0.05)
+
+        async def fake_fetch_once(url, headers=None):
+            if url.startswith("http://localhost:1200"):
+                await asyncio.sleep(1)
+            return url, 200
+
+        fetcher._fetch_once = fake_fetch_once
+        content, _ = await asyncio.wait_for(fetcher.fetch("http://localhost:1200/36kr"), timeout=0.5)
+        assert not content.startswith("http://localhost:1200")
@@ -0,0 +1,162 @@
+"""
+信息源健康统计与熔断测试
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Source, SourceType, IndustryCategory
+from crawler.source_health import (
+    CIRCUIT_FAILURE_THRESHOLD, AUTO_DISABLE_THRESHOLD, DISABLED_REASON_AUTO,
+    split_by_circuit, health_status
+)
+
+
+async def _make_db(tmp_path):
+    from storage.database import Database
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    source = Source(
+        name="测试源",
+        url="https://example.com/feed",
+        source_type=SourceType.RSS,
+        industry=IndustryCategory.TECH,
+    )
+    source_id = await db.save_source(source)
+    return db, source_id
+
+
+class TestSourceHealth:
+    """测试健康统计持久化"""
+
+    @pytest.mark.asyncio
+    async def test_success_updates_stats(self, tmp_path):
+        """成功爬取记录延迟与文章数"""
+        db, source_id = await _make_db(tmp_path)
+        await db.record_source_fetch(source_id, success=True, latency_ms=100, article_count=10)
+        await db.record_source_fetch(source_id, success=True, latency_ms=200, article_count=20)
+
+        source = await db.get_source(source_id)
+        assert source.fetch_count == 2
+        assert source.error_count == 0
+        assert source.last_success_at is not None
+        assert 100 < source.mean_latency_ms < 200
+        assert 10 < source.avg_articles_per_fetch < 20
+        assert health_status(source) == 'healthy'
+
+    @pytest.mark.asyncio
+    async def test_failure_does_not_advance_last_fetched(self, tmp_path):
+        """失败不推进最后爬取时间，避免按未到期直接使用库存文章"""
+        from crawler.fetch_schedule import is_due
+
+        db, source_id = await _make_db(tmp_path)
+        await db.record_source_fetch(source_id, success=False, latency_ms=50, error="timeout")
+        source = await db.get_source(source_id)
+        assert source.fetch_count == 1 and source.last_fetched_at is None
+
+        await db.update_source_crawl_state(source_id, learned_interval_minutes=60)
+        await db.record_source_fetch(source_id, success=True, latency_ms=50, article_count=1)
+        fetched_at = (await db.get_source(source_id)).last_fetched_at
+        await db.record_source_fetch(source_id, success=False, latency_ms=50, error="timeout")
+        source = await db.get_source(source_id)
+        assert source.last_fetched_at == fetched_at
+        assert not is_due(source)
+
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_opens(self, tmp_path):
+        """连续失败达到阈值后熔断，成功后恢复"""
+        db, source_id = await _make_db(tmp_path)
+        for _ in range(CIRCUIT_FAILURE_THRESHOLD):
+            await db.record_source_fetch(source_id, success=False, latency_ms=50, error="HTTP error 503")
+
+        source = await db.get_source(source_id)
+        assert source.error_count == CIRCUIT_FAILURE_THRESHOLD
+        assert source.last_error == "HTTP error 503"
+        available, skipped = split_by_circuit([source])
+        assert available == [] and skipped == [source]
+
+        await db.record_source_fetch(source_id, success=True, latency_ms=50, article_count=1)
+        source = await db.get_source(source_id)
+        assert source.circuit_open_until is None
+        assert split_by_circuit([source])[0] == [source]
+
+    @pytest.mark.asyncio
+    async def test_auto_disable_and_reset(self, tmp_path):
+        """连续失败过多自动禁用，重置后重新启用"""
+        db, source_id = await _make_db(tmp_path)
+        for _ in range(AUTO_DISABLE_THRESHOLD):
+            await db.record_source_fetch(source_id, success=False, latency_ms=50, error="timeout")
+
+        source = await db.get_source(source_id)
+        assert source.enabled is False
+        assert source.disabled_reason == DISABLED_REASON_AUTO
+
+        assert await db.reset_source_health(source_id)
+        source = await db.get_source(source_id)
+        assert source.enabled is True
+        assert source.error_count == 0
+        assert source.disabled_reason is None
+
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_not_counted(self, tmp_path):
+        """验证探测失败只记录错误，不计入连续失败、熔断与自动禁用"""
+        db, source_id = await _make_db(tmp_path)
+        for _ in range(AUTO_DISABLE_THRESHOLD):
+            await db.record_source_fetch(source_id, success=False, latency_ms=50, error="HTTP error 503", probe=True)
+
+        source = await db.get_source(source_id)
+        assert source.last_error == "HTTP error 503"
+        assert source.error_count == 0 and source.fetch_count == 0
+        assert source.circuit_open_until is None
+        assert source.enabled is True and source.disabled_reason is None
+
+
+class TestBulkValidation:
+    """测试批量并发验证"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_and_write_back(self, tmp_path):
+        """并发受限、结果全部产出，并写回健康统计"""
+        import asyncio
+        from crawler.source_validator import validate_sources, summarize_results
+
+        db, source_id = await _make_db(tmp_path)
+        for _ in range(AUTO_DISABLE_THRESHOLD):
+            await db.record_source_fetch(source_id, success=False, latency_ms=50, error="timeout")
+        sources = [await db.get_source(source_id)] + [
+            Source(id=f"s{i}", name=f"源{i}", url=f"https://example.com/{i}",
+                   source_type=SourceType.RSS, industry=IndustryCategory.TECH)
+            for i in range(9)
+        ]
+
+        class FakeCrawler:
+            in_flight = 0
+            peak = 0
+
+            async def check_source(self, source):
+                FakeCrawler.in_flight += 1
+                FakeCrawler.peak = max(FakeCrawler.peak, FakeCrawler.in_flight)
+                await asyncio.sleep(0.01)
+                FakeCrawler.in_flight -= 1
+                valid = source.url != "https://example.com/3"
+                return {'valid': valid, 'status_code': 200 if valid else 503,
+                        'entry_count': 5 if valid else None, 'error': None if valid else "HTTP error 503"}
+
+        results = [r async for r in validate_sources(FakeCrawler(), sources, db=db, concurrency=3)]
+        assert len(results) == 10
+        assert FakeCrawler.peak <= 3
+
+        summary = summarize_results(results, elapsed=1.0)
+        assert summary['valid'] == 9 and summary['invalid'] == 1
+
+        # 探测成功恢复自动禁用的源，且不计入爬取次数
+        source = await db.get_source(source_id)
+        assert source.enabled is True
+        assert source.error_count == 0
+        assert source.fetch_count == AUTO_DISABLE_THRESHOLD
@@ -0,0 +1,96 @@
+"""
+sources.yaml 差量同步测试
+"""
+
+import pytest
+import yaml
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Source, SourceType, IndustryCategory
+from config.source_sync import (
+    sync_sources_from_config, DISABLED_REASON_CONFIG, DISABLED_REASON_CONFIG_REMOVED
+)
+from crawler.source_health import AUTO_DISABLE_THRESHOLD, DISABLED_REASON_AUTO
+
+
+def write_config(path: Path, entries):
+    path.write_text(yaml.safe_dump({'official_rss': entries}, allow_unicode=True), encoding='utf-8')
+
+
+def entry(name, url, enabled=True, metadata=None):
+    return {'name': name, 'url': url, 'type': 'rss', 'priority': 'official_rss',
+            'industry': 'tech', 'enabled': enabled, 'metadata': metadata}
+
+
+async def _sources_by_url(db):
+    return {s.url: s for s in await db.get_sources(enabled_only=False)}
+
+
+class TestSourceSync:
+    """测试差量同步"""
+
+    @pytest.mark.asyncio
+    async def test_insert_update_disable(self, tmp_path):
+        """新增、定义变化、移除三种情况，未变化的源不写库"""
+        from storage.database import Database
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        config = tmp_path / "sources.yaml"
+
+        write_config(config, [entry("A", "https://a.com/feed"), entry("B", "https://b.com/feed")])
+        report = await sync_sources_from_config(db, str(config))
+        assert (report['inserted'], report['updated'], report['disabled']) == (2, 0, 0)
+
+        report = await sync_sources_from_config(db, str(config))
+        assert report['unchanged'] == 2 and report['updated'] == 0
+
+        # 用户通过 API 添加的源不受配置同步影响
+        await db.save_source(Source(name="手动", url="https://manual.com/feed",
+                                    source_type=SourceType.RSS, industry=IndustryCategory.TECH))
+
+        write_config(config, [
+            entry("A", "https://a.com/feed", enabled=False),
+            entry("C", "https://c.com/feed", metadata={'daily_info_gap': True}),
+        ])
+        report = await sync_sources_from_config(db, str(config))
+        assert (report['inserted'], report['updated'], report['disabled']) == (1, 1, 1)
+
+        sources = await _sources_by_url(db)
+        assert sources["https://a.com/feed"].disabled_reason == DISABLED_REASON_CONFIG
+        assert sources["https://b.com/feed"].disabled_reason == DISABLED_REASON_CONFIG_REMOVED
+        assert sources["https://c.com/feed"].metadata == {'daily_info_gap': True}
+        assert sources["https://manual.com/feed"].enabled is True
+
+        # 重新加回配置的源恢复启用
+        write_config(config, [entry("A", "https://a.com/feed"), entry("B", "https://b.com/feed")])
+        await sync_sources_from_config(db, str(config))
+        sources = await _sources_by_url(db)
+        assert sources["https://a.com/feed"].enabled and sources["https://b.com/feed"].enabled
+
+    @pytest.mark.asyncio
+    async def test_respects_auto_disabled(self, tmp_path):
+        """自动禁用的源不会被配置重新启用"""
+        from storage.database import Database
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+        config = tmp_path / "sources.yaml"
+
+        write_config(config, [entry("A", "https://a.com/feed")])
+        await sync_sources_from_config(db, str(config))
+        source = (await _sources_by_url(db))["https://a.com/feed"]
+        for _ in range(AUTO_DISABLE_THRESHOLD):
+            await db.record_source_fetch(source.id, success=False, latency_ms=10, error="timeout")
+
+        write_config(config, [entry("A2", "https://a.com/feed")])
+        report = await sync_sources_from_config(db, str(config))
+        assert report['updated'] == 1
+        source = (await _sources_by_url(db))["https://a.com/feed"]
+        assert source.name == "A2"
+        assert source.enabled is False
+        assert source.disabled_reason == DISABLED_REASON_AUTO
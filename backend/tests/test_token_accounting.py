@@ -0,0 +1,85 @@
+"""
+Token 计数服务测试
+"""
+
+import pytest
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from llm.adapter import get_adapter_class
+from llm.token_accounting import TokenAccountant
+from llm.token_counter import clear_count_cache, encoding_for_model
+from benchmarks.token_benchmark import make_articles, run_benchmark
+
+
+async def _make_db(tmp_path):
+    from storage.database import Database
+
+    db = Database(db_path=str(tmp_path / "test.db"))
+    await db.initialize()
+    return db
+
+
+class TestModelDescription:
+
+    def test_describe_model_without_client(self):
+        info = get_adapter_class("deepseek").describe_model("deepseek-reasoner")
+        assert info['backend'] == "deepseek"
+        assert info['max_output_tokens'] == 65536
+        assert get_adapter_class("openai").DEFAULT_MODEL == "gpt-4o-mini"
+        with pytest.raises(ValueError):
+            get_adapter_class("unknown")
+
+    def test_model_specific_encoding(self):
+        assert encoding_for_model("openai", "gpt-4o") == "o200k_base"
+        assert encoding_for_model("deepseek", "deepseek-chat") == "cl100k_base"
+
+
+class TestTokenAccountant:
+
+    @pytest.mark.asyncio
+    async def test_counts_persisted_by_content_hash(self, tmp_path):
+        db = await _make_db(tmp_path)
+        articles = make_articles(20, content_chars=500)
+        clear_count_cache()
+
+        first = TokenAccountant(db)
+        counts = await first.count_articles(articles)
+        assert first.computed == 20
+
+        # 进程重启（内存缓存清空）后从数据库读取
+        clear_count_cache()
+        second = TokenAccountant(db)
+        assert await second.count_articles(articles) == counts
+        assert second.computed == 0 and second.db_hits == 20
+
+        await second.count_articles(articles)
+        assert second.memory_hits == 20
+
+    @pytest.mark.asyncio
+    async def test_estimate_uses_model_limits(self, tmp_path):
+        db = await _make_db(tmp_path)
+        accountant = TokenAccountant(db)
+
+        small = await accountant.estimate(make_articles(5, content_chars=200), "ollama")
+        assert small['model'] == "llama3.1"
+        assert small['estimated_cost_usd'] == 0
+        assert not small['exceeds_context']
+
+        large = await accountant.estimate(make_articles(200, content_chars=3000), "deepseek")
+        assert large['exceeds_context'] and large['map_reduce']
+        assert large['token_count'] < large['content_tokens']
+        assert large['token_count'] <= large['context_window']
+
+
+class TestTokenBenchmark:
+
+    @pytest.mark.asyncio
+    async def test_benchmark_smoke(self):
+        metrics = await run_benchmark(articles=30, content_chars=300)
+        assert metrics['articles'] == 30
+        assert metrics['db_hits'] == 30
+        assert metrics['content_tokens'] > 0
@@ -0,0 +1,138 @@
+"""
+URL 规范化与已见 URL 过滤器测试
+"""
+
+import pytest
+from datetime import datetime
+
+import sys
+from pathlib import Path
+# 添加 backend 目录到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from models import Article, IndustryCategory
+from crawler.url_normalizer import canonicalize_url
+from crawler.seen_filter import BloomFilter, SeenURLFilter
+
+
+class TestCanonicalizeURL:
+    """测试 URL 规范化"""
+
+    def test_tracking_params_and_trailing_slash(self):
+        """追踪参数、末尾斜杠、协议和 www 归一"""
+        variants = [
+            "https://example.com/post/1",
+            "http://example.com/post/1/",
+            "https://www.Example.com/post/1?utm_source=rss&utm_medium=feed",
+            "https://example.com:443/post/1#comments",
+        ]
+        assert {canonicalize_url(u) for u in variants} == {"https://example.com/post/1"}
+
+    def test_query_params_sorted_and_kept(self):
+        """非追踪参数保留并排序"""
+        assert canonicalize_url("https://example.com/a?b=2&a=1&spm=x") == "https://example.com/a?a=1&b=2"
+
+    def test_generic_params_kept_unless_domain_rule(self):
+        """from / source / feed 等通用参数名可能是内容 ID，只按站点规则去除"""
+        assert canonicalize_url("https://example.com/view?source=123") != \
+            canonicalize_url("https://example.com/view?source=456")
+        assert canonicalize_url("https://example.com/list?feed=7&utm_source=rss") == "https://example.com/list?feed=7"
+        assert canonicalize_url("https://medium.com/@a/post-1?source=rss----abc") == "https://medium.com/@a/post-1"
+        assert canonicalize_url("https://finance.sina.com.cn/a.shtml?from=wap") == "https://finance.sina.com.cn/a.shtml"
+
+    def test_domain_rules(self):
+        """按域名规则只保留身份参数"""
+        url = "https://mp.weixin.qq.com/s?__biz=MzA&mid=1&idx=1&sn=abc&chksm=zz&scene=21"
+        assert canonicalize_url(url) == "https://mp.weixin.qq.com/s?__biz=MzA&idx=1&mid=1&sn=abc"
+        assert canonicalize_url("https://m.bilibili.com/video/BV1?vd_source=1") == "https://bilibili.com/video/BV1"
+
+    def test_search_pages_not_collapsed(self):
+        """热搜 / 站内搜索链接靠搜索词区分，不套用主站的参数规则"""
+        first = canonicalize_url("https://s.weibo.com/weibo?q=%23A%23&t=31")
+        second = canonicalize_url("https://s.weibo.com/weibo?q=%23B%23&t=31")
+        assert first != second
+        assert canonicalize_url("https://search.bilibili.com/all?keyword=A") != \
+            canonicalize_url("https://search.bilibili.com/all?keyword=B")
+        # 搜索词在只保留身份参数的站点也保留
+        assert canonicalize_url("https://weibo.com/search?q=A&from=feed") == "https://weibo.com/search?q=A"
+        # 主站及移动版的文章链接仍按规则去参数
+        assert canonicalize_url("https://m.weibo.cn/detail/123?sourceType=weixin") == "https://weibo.cn/detail/123"
+        assert canonicalize_url("https://movie.douban.com/subject/1/?from=showing") == "https://movie.douban.com/subject/1"
+
+    def test_rsshub_wrapped_links(self):
+        """RSSHub 实例域名统一，嵌入的原始链接被解包"""
+        assert canonicalize_url("http://localhost:1200/zhihu/hotlist") == \
+            canonicalize_url("https://rsshub.app/zhihu/hotlist")
+        wrapped = "http://localhost:1200/redirect?url=https%3A%2F%2Fexample.com%2Fpost%2F1%3Futm_source%3Drss"
+        assert canonicalize_url(wrapped) == "https://example.com/post/1"
+
+
+class TestSeenURLFilter:
+    """测试已见 URL 过滤器"""
+
+    def test_bloom_filter_membership(self):
+        """已添加元素一定命中"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        urls = [f"https://example.com/{i}" for i in range(1000)]
+        for url in urls:
+            bloom.add(url)
+        assert all(url in bloom for url in urls)
+        false_positives = sum(f"https://other.com/{i}" in bloom for i in range(1000))
+        assert false_positives < 50
+
+    def test_generation_rotation(self):
+        """写满后轮换，最近两代仍可命中，更早的被淘汰"""
+        seen = SeenURLFilter(capacity=10, error_rate=0.001)
+        for i in range(30):
+            seen.add(f"https://example.com/{i}")
+        assert seen.might_contain("https://example.com/29")
+        assert seen.might_contain("https://example.com/15")
+        assert not seen.might_contain("https://example.com/0")
+
+
+class TestIngest:
+    """测试入库去重"""
+
+    @pytest.mark.asyncio
+    async def test_save_articles_dedupes_variants(self, tmp_path):
+        """同一文章的不同 URL 写法只入库一次"""
+        from storage.database import Database
+        from crawler.ingest import save_articles
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+
+        def make(url):
+            return Article(
+                title="测试文章",
+                url=url,
+                content="测试内容",
+                industry=IndustryCategory.TECH,
+                published_at=datetime.now(),
+            )
+
+        first = await save_articles(db, [make("https://example.com/p/1?utm_source=rss")])
+        second = await save_articles(db, [make("http://www.example.com/p/1/")])
+        assert first == second
+
+        ids = await db.get_article_ids_by_canonical_urls(["https://example.com/p/1"])
+        assert ids == {"https://example.com/p/1": first[0]}
+
+    @pytest.mark.asyncio
+    async def test_hot_search_items_not_merged(self, tmp_path):
+        """不同热搜话题的链接只差搜索词，入库时不能合并为一篇"""
+        from storage.database import Database
+        from crawler.ingest import save_articles
+
+        db = Database(db_path=str(tmp_path / "test.db"))
+        await db.initialize()
+
+        articles = [
+            Article(
+                title=f"热搜 {topic}", url=f"https://s.weibo.com/weibo?q=%23{topic}%23&Refer=top",
+                content="热搜", industry=IndustryCategory.SOCIAL, published_at=datetime.now()
+            )
+            for topic in ("A", "B")
+        ]
+        ids = await save_articles(db, articles, batch_seen={})
+        assert len(set(ids)) == 2
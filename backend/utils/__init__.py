@@ -3,5 +3,6 @@
 """
 
 from .proxy_helper import ProxyHelper
+from .proxy_pool import ProxyPool, ProxyPoolTransport, get_proxy_pool
 
-__all__ = ['ProxyHelper']
+__all__ = ['ProxyHelper', 'ProxyPool', 'ProxyPoolTransport', 'get_proxy_pool']
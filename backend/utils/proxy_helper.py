@@ -6,7 +6,9 @@
 
 import re
 import logging
-from typing import Optional, Dict
+from typing import Optional, Dict, List
+
+from utils.proxy_pool import ProxyPool, ProxyPoolTransport, get_proxy_pool
 
 logger = logging.getLogger(__name__)
 
@@ -139,6 +141,74 @@ class ProxyHelper:
         
         return None
     
+    @staticmethod
+    def get_pool_urls(proxy_config: Optional[Dict]) -> List[str]:
+        """获取代理池中的全部代理 URL
+        
+        只有配置了 pool 列表时才启用代理池，此时 http/https/socks5 字段中的代理也加入代理池。
+        
+        Args:
+            proxy_config: 代理配置字典，在 convert_to_httpx_proxies 的格式基础上增加:
+                {
+                    'pool': ['http://host1:port', 'socks5://host2:port', ...]
+                }
+        
+        Returns:
+            去重后的有效代理 URL 列表，未启用代理池时返回空列表
+        
+        Examples:
+            >>> config = {'enabled': True, 'http': 'http://a:7890', 'pool': ['http://b:7890']}
+            >>> ProxyHelper.get_pool_urls(config)
+            ['http://b:7890', 'http://a:7890']
+        """
+        if not proxy_config or not proxy_config.get('enabled') or not proxy_config.get('pool'):
+            return []
+        
+        urls = []
+        candidates = list(proxy_config.get('pool') or []) + [
+            proxy_config.get(key) for key in ['http', 'https', 'socks5']
+        ]
+        for proxy_url in candidates:
+            if not proxy_url or proxy_url in urls:
+                continue
+            if ProxyHelper.validate_proxy_url(proxy_url):
+                urls.append(proxy_url)
+            else:
+                logger.warning(f"无效的代理池 URL: {proxy_url}")
+        return urls
+    
+    @staticmethod
+    def build_httpx_client_kwargs(
+        proxy_config: Optional[Dict],
+        proxy_url: Optional[str] = None,
+        verify: bool = True,
+        pool: Optional[ProxyPool] = None
+    ) -> Dict:
+        """生成 httpx.AsyncClient 的代理相关参数
+        
+        - 配置了代理池：返回基于全局代理池的 transport（按主机粘滞、加权选择、故障摘除）
+        - 否则：返回静态 proxies（兼容原有按协议配置或单个代理 URL）
+        
+        Args:
+            proxy_config: 代理配置字典
+            proxy_url: 旧版单个代理 URL（proxy_config 未启用代理时使用）
+            verify: 是否验证 SSL（使用 transport 时 AsyncClient 的 verify 参数不生效，需在此传入）
+            pool: 使用的代理池，默认为全局代理池（测试未保存的配置时传入独立实例）
+        
+        Returns:
+            {'transport': ...} 或 {'proxies': ...}，不使用代理时返回空字典
+        """
+        pool_urls = ProxyHelper.get_pool_urls(proxy_config)
+        if pool_urls:
+            pool = pool or get_proxy_pool()
+            pool.configure(pool_urls)
+            return {'transport': ProxyPoolTransport(pool, verify=verify)}
+        
+        proxies = ProxyHelper.convert_to_httpx_proxies(proxy_config)
+        if proxies is None and proxy_url:
+            proxies = {'http://': proxy_url, 'https://': proxy_url}
+        return {'proxies': proxies} if proxies else {}
+    
     @staticmethod
     def convert_single_url_to_config(proxy_url: Optional[str]) -> Optional[Dict]:
         """将单个代理 URL 转换为标准配置格式（向后兼容）
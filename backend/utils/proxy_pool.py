@@ -0,0 +1,248 @@
+"""
+代理池
+
+在多个代理端点（http/https/socks5）之间分配请求：
+- 每个代理记录延迟（EWMA）与成功/失败次数，按得分加权随机选择
+- 同一目标主机在粘滞期内固定使用同一代理（保持连接复用与出口 IP 稳定）
+- 连续失败达到阈值的代理被摘除，冷却（指数退避）后重新参与选择
+
+ProxyPoolTransport 将代理池接入 httpx：每个请求按目标主机选择代理，
+代理连接失败时换下一个代理重试，并把结果回写到代理池统计。
+Fetcher 与各 LLM 适配器共用全局代理池（get_proxy_pool）。
+"""
+
+import random
+import time
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class ProxyStats:
+    """单个代理的健康/延迟统计"""
+
+    # 延迟 EWMA 平滑系数
+    EWMA_ALPHA = 0.3
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ewma_latency: Optional[float] = None  # 秒（到收到响应头为止）
+        self.success_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0  # time.monotonic() 时间戳
+        self.last_error: Optional[str] = None
+
+    def is_available(self, now: Optional[float] = None) -> bool:
+        """是否可用（未被摘除或已过冷却期）"""
+        return (now or time.monotonic()) >= self.ejected_until
+
+    def to_dict(self) -> dict:
+        """转换为可序列化的字典"""
+        now = time.monotonic()
+        return {
+            'url': self.url,
+            'available': self.is_available(now),
+            'ewma_latency_ms': round(self.ewma_latency * 1000) if self.ewma_latency is not None else None,
+            'success_count': self.success_count,
+            'failure_count': self.failure_count,
+            'consecutive_failures': self.consecutive_failures,
+            'ejected_remaining_seconds': max(0, round(self.ejected_until - now, 1)),
+            'last_error': self.last_error,
+        }
+
+
+class ProxyPool:
+    """代理池：加权选择、主机粘滞与故障摘除"""
+
+    # 连续失败多少次后摘除
+    FAILURE_THRESHOLD = 3
+    # 摘除时间（指数退避）：基础秒数与上限
+    EJECT_BASE_SECONDS = 30
+    EJECT_MAX_SECONDS = 600
+    # 没有延迟数据的代理使用的先验延迟（秒）
+    LATENCY_PRIOR_SECONDS = 1.0
+    # 主机粘滞时长（秒），过期后按最新得分重新选择
+    STICKY_SECONDS = 300
+
+    def __init__(self, proxies: Optional[Iterable[str]] = None, rng: Optional[random.Random] = None):
+        self.stats: Dict[str, ProxyStats] = {}
+        self._members: List[str] = []
+        self._sticky: Dict[str, Tuple[str, float]] = {}  # host -> (proxy, 过期时间)
+        self._rng = rng or random.Random()
+        if proxies:
+            self.configure(proxies)
+
+    @property
+    def proxies(self) -> List[str]:
+        """当前参与选择的代理"""
+        return list(self._members)
+
+    def configure(self, proxies: Iterable[str]):
+        """设置代理列表（保留已有代理的统计，移除的代理不再参与选择）"""
+        members = list(dict.fromkeys(p for p in proxies if p))
+        if members == self._members:
+            return
+        self._members = members
+        for url in members:
+            if url not in self.stats:
+                self.stats[url] = ProxyStats(url)
+        self._sticky = {
+            host: entry for host, entry in self._sticky.items() if entry[0] in members
+        }
+        logger.info(f"代理池: {len(members)} 个代理")
+
+    def weight(self, url: str) -> float:
+        """选择权重：平滑成功率 / 延迟"""
+        stats = self.stats[url]
+        latency = stats.ewma_latency if stats.ewma_latency is not None else self.LATENCY_PRIOR_SECONDS
+        success_rate = (stats.success_count + 1) / (stats.success_count + stats.failure_count + 2)
+        return success_rate / max(latency, 0.01)
+
+    def select(self, host: Optional[str] = None, exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        为目标主机选择代理
+
+        - 粘滞期内且代理可用时沿用该主机上次的代理
+        - 否则在可用代理中按权重随机选择
+        - 全部被摘除时选择最早结束冷却的代理（不让请求因此失败）
+
+        Returns:
+            代理 URL，代理池为空（或全部被排除）时返回 None
+        """
+        excluded = set(exclude)
+        candidates = [url for url in self._members if url not in excluded]
+        if not candidates:
+            return None
+
+        now = time.monotonic()
+        if host and host in self._sticky:
+            proxy, expires_at = self._sticky[host]
+            if proxy in candidates and now < expires_at and self.stats[proxy].is_available(now):
+                return proxy
+
+        available = [url for url in candidates if self.stats[url].is_available(now)]
+        if available:
+            weights = [self.weight(url) for url in available]
+            proxy = self._rng.choices(available, weights=weights, k=1)[0]
+        else:
+            proxy = min(candidates, key=lambda url: self.stats[url].ejected_until)
+
+        if host:
+            self._sticky[host] = (proxy, now + self.STICKY_SECONDS)
+        return proxy
+
+    def record_success(self, url: str, latency: float):
+        """记录一次成功请求（代理可达即视为成功，与目标站点的 HTTP 状态无关）"""
+        stats = self.stats.get(url)
+        if stats is None:
+            return
+        if stats.ewma_latency is None:
+            stats.ewma_latency = latency
+        else:
+            stats.ewma_latency = ProxyStats.EWMA_ALPHA * latency + (1 - ProxyStats.EWMA_ALPHA) * stats.ewma_latency
+        stats.success_count += 1
+        stats.consecutive_failures = 0
+        stats.ejected_until = 0.0
+
+    def record_failure(self, url: str, error: str, host: Optional[str] = None):
+        """记录一次失败（代理连接失败/超时），连续失败达到阈值后摘除"""
+        stats = self.stats.get(url)
+        if stats is None:
+            return
+        stats.failure_count += 1
+        stats.consecutive_failures += 1
+        stats.last_error = error[:200]
+
+        # 该主机下次重新选择代理
+        if host and self._sticky.get(host, (None,))[0] == url:
+            del self._sticky[host]
+
+        overflow = stats.consecutive_failures - self.FAILURE_THRESHOLD
+        if overflow >= 0:
+            cooldown = min(self.EJECT_BASE_SECONDS * (2 ** overflow), self.EJECT_MAX_SECONDS)
+            stats.ejected_until = time.monotonic() + cooldown
+            logger.warning(f"代理 {url} 连续失败 {stats.consecutive_failures} 次，摘除 {cooldown} 秒")
+
+    def get_stats(self) -> List[dict]:
+        """所有代理的统计（按权重从高到低）"""
+        ranked = sorted(self._members, key=self.weight, reverse=True)
+        return [self.stats[url].to_dict() for url in ranked]
+
+
+class ProxyPoolTransport(httpx.AsyncBaseTransport):
+    """
+    基于代理池的 httpx 传输层
+
+    Example:
+        client = httpx.AsyncClient(transport=ProxyPoolTransport(get_proxy_pool()))
+    """
+
+    # 换代理重试的异常：请求尚未到达目标站点，重试是安全的
+    RETRYABLE_ERRORS = (httpx.ProxyError, httpx.ConnectError, httpx.ConnectTimeout)
+
+    def __init__(self, pool: ProxyPool, max_attempts: int = 2, **transport_kwargs):
+        """
+        Args:
+            pool: 代理池
+            max_attempts: 代理连接失败时最多尝试的代理数
+            transport_kwargs: 传给每个代理的 httpx.AsyncHTTPTransport 的参数（如 verify）
+        """
+        self.pool = pool
+        self.max_attempts = max(1, max_attempts)
+        self._transport_kwargs = transport_kwargs
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+
+    def _transport_for(self, proxy: str) -> httpx.AsyncHTTPTransport:
+        if proxy not in self._transports:
+            self._transports[proxy] = httpx.AsyncHTTPTransport(proxy=proxy, **self._transport_kwargs)
+        return self._transports[proxy]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        tried: List[str] = []
+        last_error: Optional[Exception] = None
+
+        for _ in range(self.max_attempts):
+            proxy = self.pool.select(host, exclude=tried)
+            if proxy is None:
+                break
+            tried.append(proxy)
+            start = time.monotonic()
+            try:
+                response = await self._transport_for(proxy).handle_async_request(request)
+            except self.RETRYABLE_ERRORS as e:
+                self.pool.record_failure(proxy, f"{type(e).__name__}: {e}", host=host)
+                last_error = e
+                logger.info(f"代理 {proxy} 连接失败，换下一个代理: {e}")
+                continue
+            except httpx.TimeoutException as e:
+                # 读超时可能是目标站点慢，计入代理失败但不重试
+                self.pool.record_failure(proxy, f"{type(e).__name__}: {e}", host=host)
+                raise
+            self.pool.record_success(proxy, time.monotonic() - start)
+            return response
+
+        if last_error is not None:
+            raise last_error
+        raise httpx.ProxyError("代理池中没有可用代理", request=request)
+
+    async def aclose(self):
+        for transport in self._transports.values():
+            await transport.aclose()
+        self._transports.clear()
+
+
+# 全局代理池（Fetcher 与 LLM 适配器共享统计）
+_proxy_pool: Optional[ProxyPool] = None
+
+
+def get_proxy_pool() -> ProxyPool:
+    """获取全局代理池"""
+    global _proxy_pool
+    if _proxy_pool is None:
+        _proxy_pool = ProxyPool()
+    return _proxy_pool
@@ -96,7 +96,7 @@ export default function HomePage() {
   const intelligenceMutation = useMutation({
     mutationFn: (data: IntelligenceRequest) => api.intelligence(data),
     onSuccess: (data) => {
-      alert(`✅ 一键情报完成！\n\n爬取 ${data.article_count} 篇文章，已生成分析报告。`)
+      alert(`✅ 一键情报完成！\n\n爬取 ${data.crawled_article_count} 篇文章，分析其中 ${data.article_count} 篇，已生成分析报告。`)
       // 刷新文章列表缓存
       queryClient.invalidateQueries({ queryKey: ['articles'], refetchType: 'all' })
       // 自动跳转到分析报告详情页面
@@ -478,7 +478,7 @@ export default function HomePage() {
               {intelligenceMutation.data.analysis.executive_brief}
             </p>
             <div className="text-sm text-green-600">
-              <p>文章数量: {intelligenceMutation.data.article_count}</p>
+              <p>文章数量: {intelligenceMutation.data.article_count}（爬取 {intelligenceMutation.data.crawled_article_count} 篇）</p>
               <p>处理时间: {intelligenceMutation.data.total_time_seconds.toFixed(2)}秒</p>
             </div>
           </div>
@@ -11,7 +11,14 @@ import type {
   AnalyzeResponse,
   IntelligenceRequest,
   IntelligenceResponse,
+  BatchIntelligenceRequest,
+  BatchIntelligenceResponse,
   Analysis,
+  ArticleScore,
+  ReportSection,
+  ReportItem,
+  RollingTrendState,
+  RollingTrendResult,
   CustomCategory,
   CreateCustomCategoryRequest,
   UpdateCustomCategoryRequest,
@@ -51,6 +58,12 @@ export const api = {
     return data
   },
 
+  // 批量一键情报（多个行业 / 自定义分类共用一次爬取）
+  batchIntelligence: async (request: BatchIntelligenceRequest): Promise<BatchIntelligenceResponse> => {
+    const { data } = await client.post('/api/intelligence/batch', request)
+    return data
+  },
+
   // 文章相关
   getArticles: async (params?: {
     industry?: string
@@ -146,6 +159,29 @@ export const api = {
     return data
   },
 
+  getAnalysisArticleScores: async (id: string): Promise<ArticleScore[]> => {
+    const { data } = await client.get(`/api/analyses/${id}/article-scores`)
+    return data
+  },
+
+  getReportStructure: async (id: string): Promise<ReportSection[]> => {
+    const { data } = await client.get(`/api/analyses/${id}/structure`)
+    return data
+  },
+
+  searchReportItems: async (params: {
+    q?: string
+    kind?: string
+    industry?: string
+    article_id?: string
+    days?: number
+    min_score?: number
+    limit?: number
+  }): Promise<ReportItem[]> => {
+    const { data } = await client.get('/api/analyses/items', { params })
+    return data
+  },
+
   getAnalysesList: async (): Promise<Analysis[]> => {
     const { data } = await client.get('/api/analyses')
     return data
@@ -251,4 +287,23 @@ export const api = {
     const { data } = await client.get(`/api/trend-insights/${id}`)
     return data
   },
+
+  // 滚动趋势洞察：只发送上次更新之后新增的分析
+  updateRollingTrend: async (params: {
+    industry: string
+    llm_backend: string
+    llm_model?: string
+    window_days?: number
+    force?: boolean
+  }): Promise<RollingTrendResult> => {
+    const { data } = await client.post('/api/trend-insight/rolling', params)
+    return data
+  },
+
+  getRollingTrendStates: async (industry?: string): Promise<RollingTrendState[]> => {
+    const { data } = await client.get('/api/trend-insight/rolling', {
+      params: industry ? { industry } : undefined
+    })
+    return data
+  },
 }
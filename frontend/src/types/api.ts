@@ -34,6 +34,8 @@ export interface Source {
   last_fetched_at?: string
   last_error?: string
   error_count?: number
+  mean_publish_interval_minutes?: number
+  learned_interval_minutes?: number
   created_at?: string
   metadata?: Record<string, any>
 }
@@ -62,6 +64,92 @@ export interface InformationGap {
   actionable_insight?: string
 }
 
+export interface LLMAttempt {
+  backend: string
+  model?: string
+  attempt: number
+  outcome: string  // 'success' | 'error' | 'hedge_started' | 'hedge_won'
+  error?: string
+  status_code?: number
+  retry_after?: number
+  delay_seconds?: number
+  duration_ms?: number
+  token_usage?: number
+  at: string
+}
+
+export interface PromptStats {
+  articles: number
+  prompt_tokens: number
+  truncated: number
+  title_only: number
+  clusters: number
+  collapsed: number
+  flat_prompt_tokens?: number
+  tokens_saved?: number
+}
+
+export interface ArticleScore {
+  article_id: string
+  rank: number
+  score: number
+  salience: number
+  coverage: number
+  novelty: number
+  priority: number
+  tokens?: number
+  selected: boolean
+  title?: string
+  source_name?: string
+}
+
+export interface ReportItem {
+  position: number
+  section_position: number
+  kind: string  // 'trend' | 'signal' | 'gap' | 'other'
+  headline: string
+  body: string
+  score: number
+  score_source: string  // 'explicit' | 'citations'
+  citations: number[]
+  article_ids?: string[]
+  // 跨分析检索时返回
+  analysis_id?: string
+  section_heading?: string
+  industry?: string
+  created_at?: string
+}
+
+export interface ReportSection {
+  position: number
+  level: number
+  heading: string
+  path: string
+  kind: string
+  content: string
+  items: ReportItem[]
+}
+
+export interface RollingTrendState {
+  industry: string
+  insight_id?: string
+  window_days: number
+  window_analyses: { id: string; created_at: string }[]
+  last_analysis_at?: string
+  update_count: number
+  total_token_usage: number
+  last_token_usage?: number
+  updated_at: string
+}
+
+export interface RollingTrendResult {
+  status: 'updated' | 'unchanged' | 'insufficient'
+  industry: string
+  new_analyses: number
+  insight?: any
+  state?: RollingTrendState
+}
+
 export interface Analysis {
   id?: string
   analysis_type: string
@@ -75,6 +163,9 @@ export interface Analysis {
   llm_model?: string
   token_usage?: number
   estimated_cost?: number
+  llm_attempts?: LLMAttempt[]
+  prompt_stats?: PromptStats
+  article_scores?: ArticleScore[]
   created_at?: string
   processing_time_seconds?: number
   user_rating?: number
@@ -100,6 +191,9 @@ export interface AnalyzeRequest {
   llm_backend: string
   llm_model?: string
   custom_prompt?: string
+  bypass_cache?: boolean
+  use_digests?: boolean
+  cluster_articles?: boolean
 }
 
 export interface AnalyzeResponse {
@@ -114,16 +208,57 @@ export interface IntelligenceRequest {
   llm_backend: string
   llm_model?: string
   source_ids?: string[]
+  force_refresh?: boolean
+  bypass_cache?: boolean
+  use_digests?: boolean
+  cluster_articles?: boolean
+  top_k?: number
+  token_budget?: number
 }
 
 export interface IntelligenceResponse {
-  article_ids: string[]
+  article_ids: string[]  // 实际送入分析的文章（预排序筛选后）
   article_count: number
+  crawled_article_ids: string[]  // 本次爬取到的全部文章
+  crawled_article_count: number
   analysis_id: string
   analysis: Analysis
   total_time_seconds: number
 }
 
+export interface BatchIntelligenceRequest {
+  industries?: string[]
+  custom_category_ids?: string[]
+  hours: number
+  llm_backend: string
+  llm_model?: string
+  force_refresh?: boolean
+  bypass_cache?: boolean
+  use_digests?: boolean
+  cluster_articles?: boolean
+  top_k?: number
+  token_budget?: number
+}
+
+export interface BatchIntelligenceItem {
+  industry?: string
+  custom_category_id?: string
+  category_name?: string
+  article_ids: string[]  // 实际送入分析的文章（预排序筛选后）
+  article_count: number
+  crawled_article_ids: string[]  // 本次爬取到的全部文章
+  crawled_article_count: number
+  analysis_id?: string
+  analysis?: Analysis
+  error?: string
+}
+
+export interface BatchIntelligenceResponse {
+  results: BatchIntelligenceItem[]
+  fetch_summary: Record<string, number>
+  total_time_seconds: number
+}
+
 export interface CustomCategory {
   id?: string
   name: string